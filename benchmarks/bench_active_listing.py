@@ -0,0 +1,147 @@
+"""Benchmark: Active-conversation listing at 5k contacts.
+
+Lists every active seller/buyer conversation the way the ``/active``
+endpoints do. Compares one cache ``get`` per contact against chunked
+``get_many`` calls. Every cache call pays a simulated Redis round trip,
+so the numbers reflect round-trip count. Uses synthetic data only.
+
+Target: <100ms per listing (P99) at 0.5ms simulated RTT.
+"""
+import asyncio
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bots.buyer_bot.buyer_bot import JorgeBuyerBot  # noqa: E402
+from bots.seller_bot.jorge_seller_bot import JorgeSellerBot  # noqa: E402
+from bots.shared.cache_service import MemoryCache  # noqa: E402
+from bots.shared.logger import get_logger  # noqa: E402
+
+CONTACTS = 5_000
+ITERATIONS = 20
+SERIAL_ITERATIONS = 2
+TARGET_MS = 100
+SIMULATED_RTT_S = 0.0005
+
+HISTORY = [
+    {"role": "user" if i % 2 else "assistant", "content": f"Message {i} about the property on Main St"}
+    for i in range(20)
+]
+
+
+def percentile(data, p):
+    k = (len(data) - 1) * p / 100
+    f = int(k)
+    c = f + 1 if f + 1 < len(data) else f
+    return data[f] + (k - f) * (data[c] - data[f])
+
+
+class RoundTripCache:
+    """MemoryCache where every call costs one simulated network round trip."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def get(self, key):
+        await asyncio.sleep(SIMULATED_RTT_S)
+        return await self.inner.get(key)
+
+    async def smembers(self, key):
+        await asyncio.sleep(SIMULATED_RTT_S)
+        return await self.inner.smembers(key)
+
+    async def srem(self, key, *values):
+        await asyncio.sleep(SIMULATED_RTT_S)
+        return await self.inner.srem(key, *values)
+
+
+class BatchRoundTripCache(RoundTripCache):
+    async def get_many(self, keys):
+        await asyncio.sleep(SIMULATED_RTT_S)
+        return await self.inner.get_many(keys)
+
+
+async def _populate():
+    inner = MemoryCache(max_entries=4 * CONTACTS)
+    seller_ids = [f"seller_{i}" for i in range(CONTACTS)]
+    buyer_ids = [f"buyer_{i}" for i in range(CONTACTS)]
+    await inner.set_many({
+        f"seller:state:{cid}": {
+            "contact_id": cid, "location_id": "loc", "current_question": 2, "questions_answered": 2,
+            "stage": "Q2", "price_expectation": 650000, "conversation_history": HISTORY,
+            "extracted_data": {"condition": "good"}, "last_interaction": "2026-03-01T17:00:00",
+            "conversation_started": "2026-02-28T09:15:00",
+        }
+        for cid in seller_ids
+    }, ttl=3600)
+    await inner.set_many({
+        f"buyer:state:{cid}": {
+            "contact_id": cid, "location_id": "loc", "current_question": 3, "stage": "Q3",
+            "beds_min": 3, "price_max": 750000, "conversation_history": HISTORY,
+            "last_interaction": "2026-03-01T17:00:00", "conversation_started": "2026-02-27T11:00:00",
+        }
+        for cid in buyer_ids
+    }, ttl=3600)
+    await inner.sadd("seller:active_contacts", *seller_ids)
+    await inner.sadd("buyer:active_contacts", *buyer_ids)
+    return inner
+
+
+def _bot(cls, cache):
+    bot = cls.__new__(cls)
+    bot.cache = cache
+    bot.logger = get_logger(__name__)
+    return bot
+
+
+async def _measure(cls, cache_cls, iterations):
+    bot = _bot(cls, cache_cls(await _populate()))
+    # The stand-in's 10k states would live in Redis, not in the worker's heap;
+    # keep them out of GC passes so collections don't scan them
+    gc.freeze()
+    try:
+        await bot.get_all_active_conversations()  # warm-up
+        times = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            states = await bot.get_all_active_conversations()
+            times.append((time.perf_counter() - start) * 1000)
+            assert len(states) == CONTACTS
+    finally:
+        gc.unfreeze()
+    times.sort()
+    return times
+
+
+def _result(op, times, target_ms):
+    p99 = round(percentile(times, 99), 4)
+    return {
+        "op": op,
+        "n": len(times),
+        "p50": round(percentile(times, 50), 4),
+        "p95": round(percentile(times, 95), 4),
+        "p99": p99,
+        "target": f"<{target_ms}ms" if target_ms else "baseline",
+        "passed": p99 < target_ms if target_ms else True,
+    }
+
+
+def run():
+    """Run active-conversation listing benchmarks."""
+    serial = asyncio.run(_measure(JorgeSellerBot, RoundTripCache, SERIAL_ITERATIONS))
+    seller = asyncio.run(_measure(JorgeSellerBot, BatchRoundTripCache, ITERATIONS))
+    buyer = asyncio.run(_measure(JorgeBuyerBot, BatchRoundTripCache, ITERATIONS))
+    return {
+        "active_listing_serial": _result("Seller /active, get per contact (5k)", serial, None),
+        "active_listing_seller": _result("Seller /active, chunked get_many (5k)", seller, TARGET_MS),
+        "active_listing_buyer": _result("Buyer /active, chunked get_many (5k)", buyer, TARGET_MS),
+    }
+
+
+if __name__ == "__main__":
+    for name, r in run().items():
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"[{status}] {r['op']}: P50={r['p50']}ms P95={r['p95']}ms P99={r['p99']}ms")
@@ -0,0 +1,101 @@
+"""Benchmark: Cache backend get/set.
+
+Per-call latency and throughput of ``set`` and ``get`` for a seller
+conversation state (the hot value of a conversation turn) on MemoryCache,
+SQLiteCache (temporary WAL file, default batched commits) and, when
+``BENCH_REDIS_URL`` points at a reachable server, RedisCache.  Uses
+synthetic data only.
+
+Target: SQLite get and set <1ms (P99), well under one Redis round trip.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_cache_codecs import SELLER_STATE  # noqa: E402
+from bots.shared.cache_service import MemoryCache, RedisCache  # noqa: E402
+from bots.shared.sqlite_cache import SQLiteCache  # noqa: E402
+
+ITERATIONS = 5000
+KEYS = 500
+TARGET_MS = 1.0
+
+
+def percentile(data, p):
+    k = (len(data) - 1) * p / 100
+    f = int(k)
+    c = f + 1 if f + 1 < len(data) else f
+    return data[f] + (k - f) * (data[c] - data[f])
+
+
+async def _measure(cache):
+    keys = [f"seller:state:bench_{i}" for i in range(KEYS)]
+    timings = {"set": [], "get": []}
+    for i in range(ITERATIONS):
+        key = keys[i % KEYS]
+        start = time.perf_counter()
+        await cache.set(key, SELLER_STATE, ttl=3600)
+        timings["set"].append((time.perf_counter() - start) * 1000)
+    for i in range(ITERATIONS):
+        key = keys[i % KEYS]
+        start = time.perf_counter()
+        await cache.get(key)
+        timings["get"].append((time.perf_counter() - start) * 1000)
+    await cache.delete_many(keys)
+    return timings
+
+
+async def _redis():
+    url = os.environ.get("BENCH_REDIS_URL")
+    if not url:
+        return None
+    cache = RedisCache(url)
+    try:
+        await cache.redis.ping()
+    except Exception as e:
+        print(f"Redis at {url} unreachable ({e}), skipping")
+        return None
+    return cache
+
+
+def run():
+    """Run cache backend benchmarks."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SQLiteCache(os.path.join(tmp, "bench.sqlite3"))
+        backends = [("memory", MemoryCache()), ("sqlite", sqlite)]
+        redis = asyncio.run(_redis())
+        if redis is not None:
+            backends.append(("redis", redis))
+
+        print(f"{'Backend':<10} {'set ops/s':>12} {'get ops/s':>12}")
+        for name, cache in backends:
+            timings = asyncio.run(_measure(cache))
+            rates = []
+            for op in ("set", "get"):
+                times = sorted(timings[op])
+                rates.append(len(times) / (sum(times) / 1000))
+                p99 = round(percentile(times, 99), 4)
+                gated = name == "sqlite"
+                results[f"cache_backend_{name}_{op}"] = {
+                    "op": f"Cache Backend {name} {op} (seller state)",
+                    "n": ITERATIONS,
+                    "p50": round(percentile(times, 50), 4),
+                    "p95": round(percentile(times, 95), 4),
+                    "p99": p99,
+                    "target": f"<{TARGET_MS}ms" if gated else "baseline",
+                    "passed": p99 < TARGET_MS if gated else True,
+                }
+            print(f"{name:<10} {rates[0]:>12,.0f} {rates[1]:>12,.0f}")
+        sqlite.close()
+    return results
+
+
+if __name__ == "__main__":
+    for name, r in run().items():
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"[{status}] {r['op']}: P50={r['p50']}ms P95={r['p95']}ms P99={r['p99']}ms")
@@ -0,0 +1,143 @@
+"""Benchmark: Cache value codecs.
+
+Encode + decode time and encoded size of seller and buyer conversation
+state dicts (20-turn history, as saved by ``save_conversation_state``) for
+each codec / compression combination that is installed.  Uses synthetic
+data only.
+
+Target: <0.5ms round trip (P99) with the default codec.
+"""
+import importlib.util
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bots.shared.cache_codecs import ValueSerializer  # noqa: E402
+
+ITERATIONS = 2000
+TARGET_MS = 0.5
+
+
+def percentile(data, p):
+    k = (len(data) - 1) * p / 100
+    f = int(k)
+    c = f + 1 if f + 1 < len(data) else f
+    return data[f] + (k - f) * (data[c] - data[f])
+
+
+def _history(turns=20):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"We have a 3 bed 2 bath in Rancho Cucamonga, reply {i}"})
+        history.append({"role": "assistant", "content": f"Got it. What price would you need to move on it? ({i})"})
+    return history[:turns]
+
+
+SELLER_STATE = {
+    "contact_id": "contact_12345",
+    "location_id": "loc_abc",
+    "current_question": 3,
+    "questions_answered": 2,
+    "is_qualified": False,
+    "stage": "Q3",
+    "condition": "needs minor repairs",
+    "price_expectation": 650000,
+    "motivation": "relocating for work",
+    "urgency": "30_days",
+    "offer_accepted": None,
+    "timeline_acceptable": True,
+    "scheduling_offered": False,
+    "appointment_booked": False,
+    "appointment_id": None,
+    "conversation_history": _history(),
+    "extracted_data": {"condition": "needs minor repairs", "price": 650000, "motivation": "relocating"},
+    "last_interaction": "2026-03-01T17:00:00",
+    "conversation_started": "2026-02-28T09:15:00",
+}
+
+BUYER_STATE = {
+    "contact_id": "contact_67890",
+    "location_id": "loc_abc",
+    "current_question": 4,
+    "questions_answered": 3,
+    "is_qualified": True,
+    "stage": "Q4",
+    "beds_min": 3,
+    "baths_min": 2,
+    "sqft_min": 1600,
+    "price_min": 550000,
+    "price_max": 750000,
+    "preferred_location": "Upland",
+    "preapproved": True,
+    "timeline_days": 45,
+    "motivation": "growing family",
+    "matches": [
+        {"id": f"prop_{i}", "address": f"{100 + i} Main St, Upland CA", "price": 600000 + i * 10000,
+         "beds": 3, "baths": 2, "sqft": 1700 + i * 50}
+        for i in range(5)
+    ],
+    "conversation_history": _history(),
+    "extracted_data": {"budget": 750000, "beds": 3, "location": "Upland"},
+    "last_interaction": "2026-03-01T17:00:00",
+    "conversation_started": "2026-02-27T11:00:00",
+    "opportunity_created": False,
+    "scheduling_offered": True,
+    "appointment_booked": False,
+    "appointment_id": None,
+}
+
+
+def _variants():
+    variants = [("pickle", "none"), ("orjson", "none")]
+    if importlib.util.find_spec("msgpack"):
+        variants.append(("msgpack", "none"))
+    variants.append(("orjson", "zlib"))
+    if importlib.util.find_spec("zstandard"):
+        variants.append(("orjson", "zstd"))
+    if importlib.util.find_spec("lz4"):
+        variants.append(("orjson", "lz4"))
+    return variants
+
+
+def _measure(serializer, value):
+    times = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        serializer.loads(serializer.dumps(value))
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times
+
+
+def run():
+    """Run cache codec benchmarks."""
+    results = {}
+    print(f"{'Codec':<18} {'Seller bytes':>13} {'Buyer bytes':>12}")
+    for codec, compression in _variants():
+        serializer = ValueSerializer(codec=codec, compression=compression, compress_min_bytes=1024)
+        label = codec if compression == "none" else f"{codec}+{compression}"
+        sizes = []
+        for kind, value in (("seller", SELLER_STATE), ("buyer", BUYER_STATE)):
+            sizes.append(len(serializer.dumps(value)))
+            times = _measure(serializer, value)
+            is_default = codec == "orjson" and compression == "none"
+            p99 = round(percentile(times, 99), 4)
+            results[f"cache_codec_{label}_{kind}"] = {
+                "op": f"Cache Codec {label}, {kind} state round trip",
+                "n": ITERATIONS,
+                "p50": round(percentile(times, 50), 4),
+                "p95": round(percentile(times, 95), 4),
+                "p99": p99,
+                "target": f"<{TARGET_MS}ms" if is_default else "baseline",
+                "passed": p99 < TARGET_MS if is_default else True,
+            }
+        print(f"{label:<18} {sizes[0]:>13} {sizes[1]:>12}")
+    return results
+
+
+if __name__ == "__main__":
+    for name, r in run().items():
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"[{status}] {r['op']}: P50={r['p50']}ms P95={r['p95']}ms P99={r['p99']}ms")
@@ -0,0 +1,110 @@
+"""Benchmark: Claude reply latency with a stalling primary model, with and without hedging.
+
+Sends bot-reply ``agenerate`` calls through a real ``ClaudeClient`` whose API
+client only sleeps: Sonnet answers in REPLY_MS (jittered), except for
+STALL_RATE of calls that stall for STALL_MS; Haiku answers in HEDGE_MS
+(about 1/20 of production latencies).  The unhedged flow waits for every
+stall.  The hedged flow sends a call still pending after Sonnet's recent
+p95 to Haiku as well.  Uses synthetic data only.
+
+Target: hedged P99 under 3x one reply call.
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bots.shared.claude_client import ClaudeClient  # noqa: E402
+from bots.shared.claude_hedge import ClaudeHedger  # noqa: E402
+from bots.shared.config import settings  # noqa: E402
+
+CALLS = 240
+BATCH = 8
+REPLY_MS = 75
+STALL_MS = 600
+STALL_RATE = 0.06
+HEDGE_MS = 40
+DEADLINE_SECONDS = 2.0
+TARGET_MS = REPLY_MS * 3
+
+
+def percentile(data, p):
+    k = (len(data) - 1) * p / 100
+    f = int(k)
+    c = f + 1 if f + 1 < len(data) else f
+    return data[f] + (k - f) * (data[c] - data[f])
+
+
+class SimulatedMessages:
+    """``messages.create`` with a heavy-tailed primary model and a fast fallback."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    async def create(self, **request):
+        if request["model"] == settings.claude_haiku_model:
+            delay_ms = HEDGE_MS
+        elif self.rng.random() < STALL_RATE:
+            delay_ms = STALL_MS
+        else:
+            delay_ms = REPLY_MS * self.rng.uniform(0.9, 1.1)
+        await asyncio.sleep(delay_ms / 1000)
+        usage = SimpleNamespace(input_tokens=400, output_tokens=40, cache_creation_input_tokens=0,
+                                cache_read_input_tokens=0)
+        block = SimpleNamespace(type="text", text="Got it. Are you pre-approved or paying cash?")
+        return SimpleNamespace(content=[block], usage=usage, stop_reason="end_turn")
+
+
+async def _replay(hedge):
+    hedger = ClaudeHedger(hedge_delay_ms=REPLY_MS * 2)
+    client = ClaudeClient(api_key="bench", hedger=hedger)
+    client._async_client = SimpleNamespace(messages=SimulatedMessages(seed=7))
+
+    async def reply():
+        start = time.perf_counter()
+        await client.agenerate(
+            prompt="Buyer responded: 3 beds in Upland", system_prompt="You are Jorge.", max_tokens=400,
+            deadline_seconds=DEADLINE_SECONDS if hedge else None, hedge=hedge,
+        )
+        return (time.perf_counter() - start) * 1000
+
+    times = []
+    for _ in range(CALLS // BATCH):
+        times.extend(await asyncio.gather(*(reply() for _ in range(BATCH))))
+    times.sort()
+    return times, hedger.get_stats()["models"].get(settings.claude_sonnet_model, {})
+
+
+def _result(op, times, target_ms):
+    p99 = round(percentile(times, 99), 4)
+    return {
+        "op": op,
+        "n": len(times),
+        "p50": round(percentile(times, 50), 4),
+        "p95": round(percentile(times, 95), 4),
+        "p99": p99,
+        "target": f"<{target_ms:g}ms" if target_ms else "baseline",
+        "passed": p99 < target_ms if target_ms else True,
+    }
+
+
+def run():
+    """Run reply latency benchmarks with and without hedging."""
+    plain_times, _ = asyncio.run(_replay(False))
+    hedged_times, stats = asyncio.run(_replay(True))
+    print(f"hedges fired: {stats.get('hedges_fired', 0)}, won: {stats.get('hedges_won', 0)} "
+          f"of {len(hedged_times)} replies")
+    return {
+        "claude_hedging_off": _result("Bot reply, stalling model, no hedging", plain_times, None),
+        "claude_hedging_on": _result("Bot reply, stalling model, hedged", hedged_times, TARGET_MS),
+    }
+
+
+if __name__ == "__main__":
+    for name, r in run().items():
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"[{status}] {r['op']}: P50={r['p50']}ms P95={r['p95']}ms P99={r['p99']}ms")
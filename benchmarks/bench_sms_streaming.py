@@ -0,0 +1,146 @@
+"""Benchmark: Bot reply latency, full generation vs SMS-budgeted streaming.
+
+Sends seller-reply ``agenerate`` calls through a real ``ClaudeClient`` whose
+API client only sleeps: TTFT_MS before the first token, then TOKEN_MS per
+token (4 characters), about 1/10 of production latencies.  Replies are
+short, about one SMS budget, or verbose (the model ignoring "under 100
+words").  The full flow waits for the whole reply, and sanitize_bot_response
+then cuts it to 480 characters.  The SMS flow streams it and stops at the
+first sentence end past SMS_REPLY_CHAR_BUDGET.  Uses synthetic data only.
+
+Target: SMS P99 under the time to generate one 480-character SMS.
+"""
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bots.shared.claude_client import ClaudeClient  # noqa: E402
+from bots.shared.response_filter import SMS_MAX_LENGTH, sanitize_bot_response  # noqa: E402
+
+ROUNDS = 10
+TTFT_MS = 30
+TOKEN_MS = 2
+CHARS_PER_TOKEN = 4
+TOKENS_PER_CHUNK = 4
+TARGET_MS = TTFT_MS + SMS_MAX_LENGTH / CHARS_PER_TOKEN * TOKEN_MS
+
+_SENTENCE = "Totally understand, a place like that can still sell fast for cash here. "  # 74 chars
+REPLIES = {
+    "short": _SENTENCE * 2,
+    "one_sms": _SENTENCE * 5,
+    "verbose": _SENTENCE * 12,
+}
+
+
+def percentile(data, p):
+    k = (len(data) - 1) * p / 100
+    f = int(k)
+    c = f + 1 if f + 1 < len(data) else f
+    return data[f] + (k - f) * (data[c] - data[f])
+
+
+def _usage(text):
+    return SimpleNamespace(input_tokens=600, output_tokens=len(text) // CHARS_PER_TOKEN,
+                           cache_creation_input_tokens=0, cache_read_input_tokens=0)
+
+
+class SimulatedMessages:
+    """``messages.create``/``stream`` that generate ``reply`` at a fixed token rate."""
+
+    def __init__(self):
+        self.reply = ""
+        self.generated_chars = 0
+
+    def _text(self, max_tokens):
+        return self.reply[:max_tokens * CHARS_PER_TOKEN]
+
+    async def create(self, **request):
+        text = self._text(request["max_tokens"])
+        await asyncio.sleep((TTFT_MS + len(text) / CHARS_PER_TOKEN * TOKEN_MS) / 1000)
+        self.generated_chars += len(text)
+        block = SimpleNamespace(type="text", text=text)
+        return SimpleNamespace(content=[block], usage=_usage(text), stop_reason="end_turn")
+
+    def stream(self, **request):
+        return _SimulatedStream(self, self._text(request["max_tokens"]))
+
+
+class _SimulatedStream:
+    def __init__(self, messages, text):
+        self.messages = messages
+        self.text = text
+        self.current_message_snapshot = SimpleNamespace(usage=_usage(""), stop_reason="end_turn")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        await asyncio.sleep(TTFT_MS / 1000)
+        step = TOKENS_PER_CHUNK * CHARS_PER_TOKEN
+        for start in range(0, len(self.text), step):
+            await asyncio.sleep(TOKENS_PER_CHUNK * TOKEN_MS / 1000)
+            chunk = self.text[start:start + step]
+            self.messages.generated_chars += len(chunk)
+            yield chunk
+
+
+async def _replay(channel):
+    client = ClaudeClient(api_key="bench")
+    messages = SimulatedMessages()
+    client._async_client = SimpleNamespace(messages=messages)
+    times, sent_chars = [], 0
+    for _ in range(ROUNDS):
+        for reply in REPLIES.values():
+            messages.reply = reply
+            start = time.perf_counter()
+            response = await client.agenerate(
+                prompt="Seller responded: it needs a new roof", system_prompt="You are Jorge.",
+                max_tokens=500, channel=channel,
+            )
+            sent_chars += len(sanitize_bot_response(response.content))
+            times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times, messages.generated_chars / len(times), sent_chars / len(times)
+
+
+def _result(op, times, target_ms):
+    p99 = round(percentile(times, 99), 4)
+    return {
+        "op": op,
+        "n": len(times),
+        "p50": round(percentile(times, 50), 4),
+        "p95": round(percentile(times, 95), 4),
+        "p99": p99,
+        "target": f"<{target_ms:g}ms" if target_ms else "baseline",
+        "passed": p99 < target_ms if target_ms else True,
+    }
+
+
+def run():
+    """Run reply latency benchmarks for full generation and SMS streaming."""
+    full_times, full_generated, full_sent = asyncio.run(_replay(None))
+    sms_times, sms_generated, sms_sent = asyncio.run(_replay("sms"))
+    print(f"{'Flow':<12} {'chars generated/turn':>21} {'chars sent/turn':>16} {'mean ms':>9}")
+    for name, generated, sent, times in (
+        ("full", full_generated, full_sent, full_times),
+        ("sms stream", sms_generated, sms_sent, sms_times),
+    ):
+        print(f"{name:<12} {generated:>21.0f} {sent:>16.0f} {sum(times) / len(times):>9.1f}")
+    return {
+        "sms_reply_full": _result("Bot reply, full generation", full_times, None),
+        "sms_reply_stream": _result("Bot reply, SMS-budgeted stream", sms_times, TARGET_MS),
+    }
+
+
+if __name__ == "__main__":
+    for name, r in run().items():
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"[{status}] {r['op']}: P50={r['p50']}ms P95={r['p95']}ms P99={r['p99']}ms")
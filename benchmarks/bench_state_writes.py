@@ -0,0 +1,142 @@
+"""Benchmark: Bytes written per conversation-state save.
+
+Replays a 40-turn seller conversation twice. The first run saves one blob per
+turn (the single-blob layout). The second saves changed hash fields plus new
+history entries (``ConversationStateStore``). Each write is encoded with
+the default Redis value codec, and its bytes are counted. The reported times
+are per save against an in-process backend, so they show the CPU cost of
+diffing, not network time. Uses synthetic data only.
+
+Target: <1ms per field-level save (P99).
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio  # noqa: E402
+
+from bots.shared.cache_codecs import ValueSerializer  # noqa: E402
+from bots.shared.cache_service import CacheService, MemoryCache  # noqa: E402
+from bots.shared.config import settings  # noqa: E402
+from bots.shared.conversation_state import HISTORY_LIMIT, ConversationStateStore  # noqa: E402
+
+TURNS = 40
+ROUNDS = 50
+TARGET_MS = 1.0
+
+
+def percentile(data, p):
+    k = (len(data) - 1) * p / 100
+    f = int(k)
+    c = f + 1 if f + 1 < len(data) else f
+    return data[f] + (k - f) * (data[c] - data[f])
+
+
+class ByteCountingCache(MemoryCache):
+    """MemoryCache that counts the encoded bytes a Redis backend would receive."""
+
+    def __init__(self):
+        super().__init__(max_entries=100_000)
+        self.serializer = ValueSerializer()
+        self.bytes_written = 0
+
+    async def set(self, key, value, ttl=300):
+        self.bytes_written += len(self.serializer.dumps(value))
+        return await super().set(key, value, ttl)
+
+    async def hset(self, key, mapping, ttl=None):
+        self.bytes_written += sum(len(self.serializer.dumps_field(v)) for v in mapping.values())
+        return await super().hset(key, mapping, ttl)
+
+    async def lpush_capped(self, key, values, max_length, ttl=None):
+        self.bytes_written += sum(len(self.serializer.dumps(v)) for v in values)
+        return await super().lpush_capped(key, values, max_length, ttl)
+
+
+def _service(backend):
+    service = object.__new__(CacheService)
+    service.backend = service.fallback_backend = backend
+    return service
+
+
+def _turns(contact_id):
+    """State dicts after each turn, as ``save_conversation_state`` builds them."""
+    started = datetime(2026, 3, 1, 9, 0, tzinfo=timezone.utc)
+    state = {
+        "contact_id": contact_id, "location_id": "loc_abc", "current_question": 0, "questions_answered": 0,
+        "is_qualified": False, "stage": "Q0", "condition": None, "price_expectation": None,
+        "motivation": None, "urgency": None, "offer_accepted": None, "timeline_acceptable": None,
+        "scheduling_offered": False, "appointment_booked": False, "appointment_id": None,
+        "conversation_history": [], "extracted_data": {}, "last_interaction": None,
+        "conversation_started": started.isoformat(),
+    }
+    for turn in range(TURNS):
+        state = dict(state)
+        history = list(state["conversation_history"])
+        history.append({
+            "question": state["current_question"],
+            "answer": f"We have a 3 bed 2 bath in Rancho Cucamonga, reply {turn}",
+            "bot_response": f"Got it. What price would you need to move on it? ({turn})",
+            "timestamp": (started + timedelta(minutes=turn)).isoformat(),
+            "extracted_data": {},
+        })
+        state["conversation_history"] = history[-HISTORY_LIMIT:]
+        if turn % 8 == 7 and state["current_question"] < 4:
+            state["current_question"] += 1
+            state["questions_answered"] = state["current_question"]
+            state["stage"] = f"Q{state['current_question']}"
+            state["extracted_data"] = {**state["extracted_data"], f"answer_{turn}": "yes"}
+        state["last_interaction"] = (started + timedelta(minutes=turn)).isoformat()
+        yield state
+
+
+async def _replay(fields_enabled):
+    backend = ByteCountingCache()
+    store = ConversationStateStore(_service(backend), "seller")
+    times = []
+    with patch.object(settings, "conversation_state_fields_enabled", fields_enabled):
+        for round_ in range(ROUNDS):
+            holder = SimpleNamespace()
+            for state_dict in _turns(f"contact_{round_}"):
+                start = time.perf_counter()
+                await store.save(state_dict["contact_id"], holder, state_dict)
+                times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times, backend.bytes_written / (ROUNDS * TURNS)
+
+
+def _result(op, times, target_ms):
+    p99 = round(percentile(times, 99), 4)
+    return {
+        "op": op,
+        "n": len(times),
+        "p50": round(percentile(times, 50), 4),
+        "p95": round(percentile(times, 95), 4),
+        "p99": p99,
+        "target": f"<{target_ms}ms" if target_ms else "baseline",
+        "passed": p99 < target_ms if target_ms else True,
+    }
+
+
+def run():
+    """Run conversation-state write benchmarks."""
+    blob_times, blob_bytes = asyncio.run(_replay(False))
+    field_times, field_bytes = asyncio.run(_replay(True))
+    print(f"{'Layout':<10} {'Bytes/save':>11}")
+    print(f"{'blob':<10} {blob_bytes:>11.0f}")
+    print(f"{'fields':<10} {field_bytes:>11.0f}")
+    return {
+        "state_writes_blob": _result("Seller state save, single blob", blob_times, None),
+        "state_writes_fields": _result("Seller state save, changed fields", field_times, TARGET_MS),
+    }
+
+
+if __name__ == "__main__":
+    for name, r in run().items():
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"[{status}] {r['op']}: P50={r['p50']}ms P95={r['p95']}ms P99={r['p99']}ms")
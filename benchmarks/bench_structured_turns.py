@@ -0,0 +1,147 @@
+"""Benchmark: End-to-end seller turn latency, structured turn vs reply + classification calls.
+
+Runs ``JorgeSellerBot._generate_response`` for Q1-Q4 answers, half of which
+miss the keyword pre-check. It runs against a real ``ClaudeClient`` whose API
+client only sleeps for a simulated model latency: the reply call takes
+REPLY_MS, and a Haiku classification or price call takes CLASSIFY_MS (about
+1/20 of production latencies). The current flow makes the reply call and
+then, on a keyword miss, a classification call. The structured flow makes
+one tool-use call that returns both. Memoization is off so every miss
+pays for its call. Uses synthetic data only.
+
+Target: structured P99 under 1.5x one reply call.
+"""
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bots.seller_bot.jorge_seller_bot import JorgeSellerBot, SellerQualificationState  # noqa: E402
+from bots.shared.claude_memo import response_memo  # noqa: E402
+from bots.shared.config import settings  # noqa: E402
+
+ROUNDS = 3
+REPLY_MS = 75
+CLASSIFY_MS = 25
+TARGET_MS = REPLY_MS * 1.5
+
+# (question, seller message, answer fields a structured turn returns)
+TURNS = [
+    (1, "It needs major work, the roof is shot", {"condition": "needs_major_repairs"}),
+    (1, "the roof leaks when it rains", {"condition": "needs_major_repairs"}),
+    (2, "I'd want $350k", {"price_expectation": 350000}),
+    (2, "around three fifty", {"price_expectation": 350000}),
+    (3, "Divorce, we need to split it", {"motivation": "divorce"}),
+    (3, "we want to be near the grandkids", {"motivation": "downsizing"}),
+    (4, "Yes let's do it", {"offer_accepted": True}),
+    (4, "let me talk to my wife first", {"offer_accepted": False}),
+]
+
+
+def percentile(data, p):
+    k = (len(data) - 1) * p / 100
+    f = int(k)
+    c = f + 1 if f + 1 < len(data) else f
+    return data[f] + (k - f) * (data[c] - data[f])
+
+
+class SimulatedMessages:
+    """``messages.create`` that sleeps like the API and answers like a cooperative model."""
+
+    def __init__(self):
+        self.fields = {}
+        self.calls = 0
+
+    async def create(self, **request):
+        self.calls += 1
+        if "tools" in request:
+            await asyncio.sleep(REPLY_MS / 1000)
+            block = SimpleNamespace(type="tool_use", name="respond", input={"message": "Got it.", **self.fields})
+        elif request["max_tokens"] <= 20:
+            await asyncio.sleep(CLASSIFY_MS / 1000)
+            block = SimpleNamespace(type="text", text=str(next(iter(self.fields.values()))).lower())
+        else:
+            await asyncio.sleep(REPLY_MS / 1000)
+            block = SimpleNamespace(type="text", text="Got it. Next question...")
+        return SimpleNamespace(content=[block], usage=_usage(), stop_reason="end_turn")
+
+    def stream(self, **request):
+        """Plain SMS replies are streamed (see ClaudeClient._acreate_sms)."""
+        self.calls += 1
+        return _SimulatedStream("Got it. Next question...")
+
+
+def _usage():
+    return SimpleNamespace(input_tokens=400, output_tokens=40, cache_creation_input_tokens=0,
+                           cache_read_input_tokens=0)
+
+
+class _SimulatedStream:
+    def __init__(self, text):
+        self.text = text
+        self.current_message_snapshot = SimpleNamespace(usage=_usage(), stop_reason="end_turn")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        await asyncio.sleep(REPLY_MS / 1000)
+        yield self.text
+
+
+async def _replay(structured):
+    bot = JorgeSellerBot()
+    messages = SimulatedMessages()
+    bot.claude_client._async_client = SimpleNamespace(messages=messages)
+    times = []
+    with patch.object(settings, "claude_structured_turns", structured), \
+            patch.object(response_memo, "ttl_seconds", 0):
+        for _ in range(ROUNDS):
+            for question, message, fields in TURNS:
+                messages.fields = fields
+                state = SellerQualificationState(contact_id="bench", location_id="loc", current_question=question)
+                start = time.perf_counter()
+                await bot._generate_response(state, message)
+                times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times, messages.calls / len(times)
+
+
+def _result(op, times, target_ms):
+    p99 = round(percentile(times, 99), 4)
+    return {
+        "op": op,
+        "n": len(times),
+        "p50": round(percentile(times, 50), 4),
+        "p95": round(percentile(times, 95), 4),
+        "p99": p99,
+        "target": f"<{target_ms:g}ms" if target_ms else "baseline",
+        "passed": p99 < target_ms if target_ms else True,
+    }
+
+
+def run():
+    """Run seller turn latency benchmarks for both flows."""
+    legacy_times, legacy_calls = asyncio.run(_replay(False))
+    structured_times, structured_calls = asyncio.run(_replay(True))
+    print(f"{'Flow':<12} {'Claude calls/turn':>18}")
+    print(f"{'current':<12} {legacy_calls:>18.2f}")
+    print(f"{'structured':<12} {structured_calls:>18.2f}")
+    return {
+        "structured_turns_current": _result("Seller turn, reply + classify calls", legacy_times, None),
+        "structured_turns_single": _result("Seller turn, one structured call", structured_times, TARGET_MS),
+    }
+
+
+if __name__ == "__main__":
+    for name, r in run().items():
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"[{status}] {r['op']}: P50={r['p50']}ms P95={r['p95']}ms P99={r['p99']}ms")
@@ -0,0 +1,116 @@
+"""Benchmark: Webhook admission latency.
+
+Compares the per-step webhook admission path (rate get/set, dedup get/set,
+lock get/set, assignment get/set -- one cache call each) against the single
+``admit_webhook`` call. Each cache call pays a simulated Redis round trip,
+so the numbers reflect round-trip count rather than Redis CPU time.
+Uses synthetic data only.
+
+Target: <5ms admission (P99) at 0.5ms simulated RTT.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bots.shared.cache_service import MemoryCache  # noqa: E402
+from bots.shared.token_bucket import BucketSpec  # noqa: E402
+from bots.shared.webhook_admission import admission_keys  # noqa: E402
+
+ITERATIONS = 500
+TARGET_MS = 5
+SIMULATED_RTT_S = 0.0005
+RATE_LIMIT = 1_000_000
+BUCKET = BucketSpec.per_minute(RATE_LIMIT)
+
+
+def percentile(data, p):
+    k = (len(data) - 1) * p / 100
+    f = int(k)
+    c = f + 1 if f + 1 < len(data) else f
+    return data[f] + (k - f) * (data[c] - data[f])
+
+
+class RoundTripCache:
+    """MemoryCache where every call costs one simulated network round trip."""
+
+    def __init__(self):
+        self.inner = MemoryCache()
+
+    async def get(self, key):
+        await asyncio.sleep(SIMULATED_RTT_S)
+        return await self.inner.get(key)
+
+    async def set(self, key, value, ttl=300):
+        await asyncio.sleep(SIMULATED_RTT_S)
+        return await self.inner.set(key, value, ttl)
+
+    async def admit_webhook(self, keys, bucket, bot_type="", lock_token=None, lock_ttl=30):
+        await asyncio.sleep(SIMULATED_RTT_S)
+        return await self.inner.admit_webhook(keys, bucket, bot_type, lock_token, lock_ttl)
+
+
+async def legacy_admission(cache, keys, bot_type):
+    """The pre-admission webhook path: eight sequential get/set calls."""
+    rate_val = await cache.get(keys.rate)
+    count = int(rate_val) if rate_val is not None else 0
+    if count >= RATE_LIMIT:
+        return
+    await cache.set(keys.rate, str(count + 1), ttl=60)
+
+    if await cache.get(keys.dedup):
+        return
+    await cache.set(keys.dedup, "1", ttl=300)
+
+    if await cache.get(keys.lock):
+        return
+    await cache.set(keys.lock, "1", ttl=30)
+
+    if not await cache.get(keys.assigned):
+        await cache.set(keys.assigned, bot_type, ttl=604_800)
+
+
+async def _measure(admit):
+    cache = RoundTripCache()
+    times = []
+    for i in range(ITERATIONS):
+        keys = admission_keys(f"contact_{i % 50}", f"msg_{i}")
+        start = time.perf_counter()
+        await admit(cache, keys)
+        times.append((time.perf_counter() - start) * 1000)
+        await cache.inner.delete(keys.lock)
+    times.sort()
+    return times
+
+
+def _result(op, times, target_ms):
+    p99 = round(percentile(times, 99), 4)
+    return {
+        "op": op,
+        "n": ITERATIONS,
+        "p50": round(percentile(times, 50), 4),
+        "p95": round(percentile(times, 95), 4),
+        "p99": p99,
+        "target": f"<{target_ms}ms" if target_ms else "baseline",
+        "passed": p99 < target_ms if target_ms else True,
+    }
+
+
+def run():
+    """Run webhook admission benchmarks."""
+    legacy = asyncio.run(_measure(lambda c, k: legacy_admission(c, k, "seller")))
+    single = asyncio.run(
+        _measure(lambda c, k: c.admit_webhook(k, BUCKET, "seller", lock_token="t"))
+    )
+    return {
+        "webhook_admission_legacy": _result("Webhook Admission, per-step (8 RTT)", legacy, None),
+        "webhook_admission": _result("Webhook Admission, single call (1 RTT)", single, TARGET_MS),
+    }
+
+
+if __name__ == "__main__":
+    for name, r in run().items():
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"[{status}] {r['op']}: P50={r['p50']}ms P95={r['p95']}ms P99={r['p99']}ms")
@@ -0,0 +1,103 @@
+"""Benchmark: Webhook signature verification cost.
+
+Compares the original verifier (PEM parsed on every webhook) against
+``WebhookSignatureVerifier`` with its cached keyring, and reports the CPU
+time each would spend per second of traffic at 500 webhooks/s.  Uses a
+freshly generated RSA-2048 key and synthetic payloads only.
+
+Target: <1ms verification (P99) with the cached keyring.
+"""
+import base64
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import padding, rsa  # noqa: E402
+
+from bots.shared.config import settings  # noqa: E402
+from bots.shared.webhook_signature import WebhookSignatureVerifier  # noqa: E402
+
+ITERATIONS = 500
+WEBHOOKS_PER_SECOND = 500
+TARGET_MS = 1
+
+
+def percentile(data, p):
+    k = (len(data) - 1) * p / 100
+    f = int(k)
+    c = f + 1 if f + 1 < len(data) else f
+    return data[f] + (k - f) * (data[c] - data[f])
+
+
+def _signed_payloads(private_key):
+    payloads = []
+    for i in range(ITERATIONS):
+        body = json.dumps({"contactId": f"contact_{i}", "message": "Looking to sell my house"}).encode()
+        sig = private_key.sign(body, padding.PKCS1v15(), hashes.SHA256())
+        payloads.append((body, base64.b64encode(sig).decode()))
+    return payloads
+
+
+def legacy_verify(pem: str, payload: bytes, signature: str) -> bool:
+    """The original verify_ghl_signature RSA path: parse the PEM on every call."""
+    public_key = serialization.load_pem_public_key(pem.encode())
+    public_key.verify(base64.b64decode(signature.strip()), payload, padding.PKCS1v15(), hashes.SHA256())
+    return True
+
+
+def _measure(verify, payloads):
+    times = []
+    for body, sig in payloads:
+        start = time.perf_counter()
+        assert verify(body, sig)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times
+
+
+def _result(op, times, target_ms):
+    p99 = round(percentile(times, 99), 4)
+    return {
+        "op": op,
+        "n": ITERATIONS,
+        "p50": round(percentile(times, 50), 4),
+        "p95": round(percentile(times, 95), 4),
+        "p99": p99,
+        "target": f"<{target_ms}ms" if target_ms else "baseline",
+        "passed": p99 < target_ms if target_ms else True,
+    }
+
+
+def run():
+    """Run webhook signature benchmarks."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    payloads = _signed_payloads(private_key)
+
+    original = settings.ghl_webhook_public_key
+    settings.ghl_webhook_public_key = pem
+    try:
+        verifier = WebhookSignatureVerifier()
+        legacy = _measure(lambda b, s: legacy_verify(pem, b, s), payloads)
+        cached = _measure(verifier.verify_sync, payloads)
+    finally:
+        settings.ghl_webhook_public_key = original
+
+    saved_ms = (sum(legacy) - sum(cached)) / ITERATIONS * WEBHOOKS_PER_SECOND
+    print(f"CPU saved at {WEBHOOKS_PER_SECOND} webhooks/s: {saved_ms:.1f} ms per second")
+    return {
+        "webhook_signature_legacy": _result("Webhook Signature, PEM parsed per call", legacy, None),
+        "webhook_signature": _result("Webhook Signature, cached keyring", cached, TARGET_MS),
+    }
+
+
+if __name__ == "__main__":
+    for name, r in run().items():
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"[{status}] {r['op']}: P50={r['p50']}ms P95={r['p95']}ms P99={r['p99']}ms")
@@ -8,6 +8,15 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from benchmarks.bench_bot_response import run as run_bot_response
 from benchmarks.bench_handoff import run as run_handoff
+from benchmarks.bench_webhook_admission import run as run_webhook_admission
+from benchmarks.bench_webhook_signature import run as run_webhook_signature
+from benchmarks.bench_cache_codecs import run as run_cache_codecs
+from benchmarks.bench_active_listing import run as run_active_listing
+from benchmarks.bench_cache_backends import run as run_cache_backends
+from benchmarks.bench_state_writes import run as run_state_writes
+from benchmarks.bench_structured_turns import run as run_structured_turns
+from benchmarks.bench_claude_hedging import run as run_claude_hedging
+from benchmarks.bench_sms_streaming import run as run_sms_streaming
 
 
 def main():
@@ -24,6 +33,42 @@ def main():
     handoff_results = run_handoff()
     all_results.update(handoff_results)
 
+    print("\n--- Webhook Admission Round Trips ---")
+    admission_results = run_webhook_admission()
+    all_results.update(admission_results)
+
+    print("\n--- Webhook Signature Verification ---")
+    signature_results = run_webhook_signature()
+    all_results.update(signature_results)
+
+    print("\n--- Cache Value Codecs ---")
+    codec_results = run_cache_codecs()
+    all_results.update(codec_results)
+
+    print("\n--- Active Conversation Listing ---")
+    listing_results = run_active_listing()
+    all_results.update(listing_results)
+
+    print("\n--- Cache Backends ---")
+    backend_results = run_cache_backends()
+    all_results.update(backend_results)
+
+    print("\n--- Conversation State Writes ---")
+    state_write_results = run_state_writes()
+    all_results.update(state_write_results)
+
+    print("\n--- Seller Turn Claude Calls ---")
+    structured_turn_results = run_structured_turns()
+    all_results.update(structured_turn_results)
+
+    print("\n--- Claude Reply Hedging ---")
+    hedging_results = run_claude_hedging()
+    all_results.update(hedging_results)
+
+    print("\n--- SMS Reply Streaming ---")
+    sms_streaming_results = run_sms_streaming()
+    all_results.update(sms_streaming_results)
+
     # Summary table
     print("\n" + "=" * 70)
     print(f"{'Benchmark':<50} {'P50':>8} {'P95':>8} {'P99':>8} {'Target':>10} {'Status':>8}")
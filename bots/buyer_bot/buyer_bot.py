@@ -10,15 +10,25 @@ from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from bots.buyer_bot.buyer_prompts import BUYER_QUESTIONS, BUYER_SYSTEM_PROMPT, JORGE_BUYER_PHRASES, build_buyer_prompt
+from bots.buyer_bot.buyer_prompts import (
+    BUYER_MOTIVATION_VALUES,
+    BUYER_QUESTIONS,
+    BUYER_SYSTEM_PROMPT,
+    BUYER_TURN_CONTEXT,
+    BUYER_TURN_SCHEMA,
+    JORGE_BUYER_PHRASES,
+    build_buyer_prompt,
+)
 from bots.shared.business_rules import JorgeBusinessRules
 from bots.shared.response_filter import sanitize_bot_response
 from bots.shared.cache_service import get_cache_service
 from bots.shared.calendar_booking_service import FALLBACK_MESSAGE, CalendarBookingService
-from bots.shared.claude_client import ClaudeClient
+from bots.shared.claude_client import ClaudeClient, structured_reply
 from bots.shared.config import settings
+from bots.shared.conversation_state import ConversationStateStore
 from bots.shared.ghl_client import GHLClient
 from bots.shared.logger import get_logger
+from bots.shared.redis_connection import contact_tag
 from database.repository import (
     fetch_conversation,
     fetch_properties,
@@ -108,6 +118,19 @@ class BuyerQualificationState:
         self.last_interaction = datetime.now(timezone.utc)
 
 
+# Keys of a cached state dict that map onto BuyerQualificationState
+_STATE_FIELDS = frozenset(f.name for f in fields(BuyerQualificationState))
+
+
+def _positive_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+
+
+def state_key(contact_id: str) -> str:
+    """Cache key of a contact's buyer state in the single-blob layout (see ConversationStateStore)."""
+    return f"buyer:state:{contact_tag(contact_id)}"
+
+
 @dataclass
 class BuyerResult:
     response_message: str
@@ -124,7 +147,7 @@ class JorgeBuyerBot:
     """Buyer bot for preference extraction and property matching."""
 
     def __init__(self, ghl_client: Optional[GHLClient] = None):
-        self.claude_client = ClaudeClient()
+        self.claude_client = ClaudeClient(usage_label="buyer")
         self.ghl_client = ghl_client or GHLClient()
         self.cache = get_cache_service()
         self.logger = get_logger(__name__)
@@ -163,6 +186,7 @@ class JorgeBuyerBot:
 
         # --- Slot selection intercept ---
         if state.scheduling_offered and not state.appointment_booked:
+            await self.calendar_service.load_pending_slots(contact_id)
             slot_index = self.calendar_service.detect_slot_selection(message, contact_id)
             if slot_index is not None:
                 booking = await self.calendar_service.book_appointment(
@@ -256,18 +280,28 @@ class JorgeBuyerBot:
             matches=state.matches,
         )
 
+    @property
+    def _state_store(self) -> ConversationStateStore:
+        return ConversationStateStore(self.cache, "buyer")
+
+    @staticmethod
+    def _state_from_cache(state_dict: Dict[str, Any]) -> BuyerQualificationState:
+        """Build a state from its cached dict (as written by ``save_conversation_state``)."""
+        state_data = state_dict.copy()
+        if state_data.get("last_interaction"):
+            state_data["last_interaction"] = datetime.fromisoformat(state_data["last_interaction"])
+        if state_data.get("conversation_started"):
+            state_data["conversation_started"] = datetime.fromisoformat(state_data["conversation_started"])
+        state_data = {k: v for k, v in state_data.items() if k in _STATE_FIELDS}
+        return BuyerQualificationState(**state_data)
+
     async def _get_or_create_state(self, contact_id: str, location_id: str) -> BuyerQualificationState:
-        key = f"buyer:state:{contact_id}"
-        state_dict = await self.cache.get(key)
+        store = self._state_store
+        state_dict = await store.load(contact_id)
         if state_dict:
-            state_dict = state_dict.copy()
-            if state_dict.get("last_interaction"):
-                state_dict["last_interaction"] = datetime.fromisoformat(state_dict["last_interaction"])
-            if state_dict.get("conversation_started"):
-                state_dict["conversation_started"] = datetime.fromisoformat(state_dict["conversation_started"])
-            valid_fields = {f.name for f in fields(BuyerQualificationState)}
-            state_dict = {k: v for k, v in state_dict.items() if k in valid_fields}
-            return BuyerQualificationState(**state_dict)
+            state = self._state_from_cache(state_dict)
+            store.remember(state, state_dict)
+            return state
 
         # Cache miss — try DB fallback (handles MemoryCache restart loss)
         try:
@@ -312,7 +346,6 @@ class JorgeBuyerBot:
         state: BuyerQualificationState,
         temperature: Optional[str] = None,
     ) -> None:
-        key = f"buyer:state:{contact_id}"
         state_dict = {
             "contact_id": state.contact_id,
             "location_id": state.location_id,
@@ -339,7 +372,7 @@ class JorgeBuyerBot:
             "appointment_booked": state.appointment_booked,
             "appointment_id": state.appointment_id,
         }
-        await self.cache.set(key, state_dict, ttl=604800)
+        await self._state_store.save(contact_id, state, state_dict)
         if hasattr(self.cache, "sadd"):
             try:
                 await self.cache.sadd("buyer:active_contacts", contact_id, ttl=604800)
@@ -418,26 +451,39 @@ class JorgeBuyerBot:
             if bot_reply:
                 history.append({"role": "assistant", "content": bot_reply})
 
+        # In structured mode the reply call also reads the answer, so keyword
+        # misses get a real value instead of a default
+        response_schema = BUYER_TURN_SCHEMA if settings.claude_structured_turns else None
+        model_fields = None
         try:
             llm_response = await self.claude_client.agenerate(
                 prompt=prompt,
                 system_prompt=BUYER_SYSTEM_PROMPT,
+                cached_context=BUYER_TURN_CONTEXT,
                 history=history,
                 max_tokens=400,
+                response_schema=response_schema,
+                deadline_seconds=settings.claude_reply_deadline_seconds,
+                hedge=True,
+                channel="sms",
             )
-            ai_message = llm_response.content
+            ai_message, model_fields = structured_reply(llm_response)
         except Exception as e:
             self.logger.error(f"Claude API error: {e}")
             ai_message = next_question_text
 
-        extracted_data = await self._extract_qualification_data(user_message, current_q)
+        extracted_data = await self._extract_qualification_data(user_message, current_q, model_fields)
         should_advance = self._should_advance_question(extracted_data, current_q)
 
         return {"message": ai_message, "extracted_data": extracted_data, "should_advance": should_advance}
 
-    async def _extract_qualification_data(self, user_message: str, question_num: int) -> Dict[str, Any]:
+    async def _extract_qualification_data(
+        self, user_message: str, question_num: int, model_fields: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Keyword/regex extraction; ``model_fields`` from a structured turn fill what it misses."""
         msg = user_message.lower()
         extracted: Dict[str, Any] = {}
+        model_fields = model_fields or {}
 
         if question_num == 1:
             import re
@@ -478,6 +524,20 @@ class JorgeBuyerBot:
                     extracted["preferred_location"] = area
                     break
 
+            for name in ("beds_min", "sqft_min", "price_min", "price_max"):
+                value = model_fields.get(name)
+                if name not in extracted and _positive_number(value):
+                    extracted[name] = int(value)
+            if "baths_min" not in extracted and _positive_number(model_fields.get("baths_min")):
+                extracted["baths_min"] = float(model_fields["baths_min"])
+            location = str(model_fields.get("preferred_location") or "").lower()
+            if "preferred_location" not in extracted and location:
+                # Only service areas, as with the keyword match
+                for area in JorgeBusinessRules.SERVICE_AREAS:
+                    if area.lower() in location:
+                        extracted["preferred_location"] = area
+                        break
+
         elif question_num == 2:
             if any(phrase in msg for phrase in [
                 "not approved", "not pre-approved", "not yet", "working on it",
@@ -491,9 +551,10 @@ class JorgeBuyerBot:
             elif any(word in msg for word in ["no", "nope"]):
                 extracted["preapproved"] = False
             else:
-                # Ambiguous answer (e.g. "still figuring it out") — treat as not approved,
-                # but always advance so the conversation never stalls at Q2.
-                extracted["preapproved"] = False
+                # Ambiguous answer (e.g. "still figuring it out") — treat as not approved
+                # unless the structured turn read a clear yes, and always advance so the
+                # conversation never stalls at Q2.
+                extracted["preapproved"] = model_fields.get("preapproved") is True
 
         elif question_num == 3:
             import re
@@ -531,6 +592,9 @@ class JorgeBuyerBot:
                     n = int(m.group(1))
                     if 1 <= n <= 730:
                         tl = n
+            if tl is None and _positive_number(model_fields.get("timeline_days")) \
+                    and model_fields["timeline_days"] <= 730:
+                tl = int(model_fields["timeline_days"])
             extracted["timeline_days"] = tl if tl is not None else 90
 
         elif question_num == 4:
@@ -569,7 +633,8 @@ class JorgeBuyerBot:
                     extracted["motivation"] = value
                     break
             if "motivation" not in extracted:
-                extracted["motivation"] = "other"
+                motivation = model_fields.get("motivation")
+                extracted["motivation"] = motivation if motivation in BUYER_MOTIVATION_VALUES else "other"
 
         return extracted
 
@@ -761,24 +826,23 @@ class JorgeBuyerBot:
             await self.save_conversation_state(contact_id, state, self._calculate_temperature(state))
         return state.matches
 
+    async def delete_conversation_state(self, contact_id: str) -> None:
+        await self._state_store.delete(contact_id)
+        if hasattr(self.cache, "srem"):
+            await self.cache.srem("buyer:active_contacts", contact_id)
+
     async def get_all_active_conversations(self) -> List[BuyerQualificationState]:
         states: List[BuyerQualificationState] = []
         if not hasattr(self.cache, "smembers"):
             return []
-        contact_ids = await self.cache.smembers("buyer:active_contacts")
-
-        for contact_id in contact_ids:
-            state_dict = await self.cache.get(f"buyer:state:{contact_id}")
-            if not state_dict:
-                continue
-            state_data = state_dict.copy()
-            if state_data.get("last_interaction"):
-                state_data["last_interaction"] = datetime.fromisoformat(state_data["last_interaction"])
-            if state_data.get("conversation_started"):
-                state_data["conversation_started"] = datetime.fromisoformat(state_data["conversation_started"])
-            valid_fields = {f.name for f in fields(BuyerQualificationState)}
-            state_data = {k: v for k, v in state_data.items() if k in valid_fields}
-            states.append(BuyerQualificationState(**state_data))
+        contact_ids = list(await self.cache.smembers("buyer:active_contacts"))
+
+        store = self._state_store
+        chunk_size = settings.cache_batch_size
+        for start in range(0, len(contact_ids), chunk_size):
+            chunk = contact_ids[start:start + chunk_size]
+            cached = await store.load_many(chunk)
+            states.extend(self._state_from_cache(cached[cid]) for cid in chunk if cached.get(cid))
 
         return states
 
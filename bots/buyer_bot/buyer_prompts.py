@@ -3,6 +3,8 @@ Prompts and templates for Jorge's Buyer Bot.
 """
 from __future__ import annotations
 
+from bots.shared.business_rules import JorgeBusinessRules
+
 # System prompt for all Claude calls in the buyer bot.
 # Locks Jorge's persona and blocks hallucination.
 BUYER_SYSTEM_PROMPT = (
@@ -40,16 +42,72 @@ BUYER_QUESTIONS = {
 }
 
 
-def build_buyer_prompt(current_question: int, user_message: str, next_question: str) -> str:
-    """Build Claude prompt for buyer response generation."""
-    return f"""You are Jorge, a real estate agent helping this buyer PURCHASE a home in the Inland Empire.
+BUYER_MOTIVATION_VALUES = [
+    "job_relocation", "growing_family", "investment", "school_district", "downsizing",
+    "upsizing", "first_time_buyer", "other",
+]
 
-BUYER QUALIFICATION SEQUENCE (follow strictly — DO NOT deviate or improvise new questions):
+_NULLABLE_INT = ["integer", "null"]
+
+# Fields of the buyer's answer returned with the reply in one structured
+# Claude call (see BUYER_TURN_SCHEMA); keyword matches still take precedence
+BUYER_ANSWER_FIELDS = {
+    1: {
+        "beds_min": {"type": _NULLABLE_INT, "description": "Minimum bedrooms; null if not given"},
+        "baths_min": {"type": ["number", "null"], "description": "Minimum bathrooms; null if not given"},
+        "sqft_min": {"type": _NULLABLE_INT, "description": "Minimum square feet; null if not given"},
+        "price_min": {"type": _NULLABLE_INT, "description": "Low end of the budget in US dollars; null if none"},
+        "price_max": {"type": _NULLABLE_INT, "description": "Budget (high end) in US dollars; null if none"},
+        "preferred_location": {"type": ["string", "null"], "description": "City or area wanted; null if none"},
+    },
+    2: {"preapproved": {
+        "type": ["boolean", "null"], "description": "True if pre-approved for a loan or paying cash",
+    }},
+    3: {"timeline_days": {"type": _NULLABLE_INT, "description": "Days until they want to buy; null if unclear"}},
+    4: {"motivation": {
+        "type": ["string", "null"], "enum": [*BUYER_MOTIVATION_VALUES, None],
+        "description": "Main reason for buying",
+    }},
+}
+
+
+# Structured response of every Q1-Q4 turn.  One schema for all questions
+# keeps the tool definition, which leads the cached prompt prefix, identical
+# from turn to turn.
+BUYER_TURN_SCHEMA = {
+    "type": "object",
+    "description": (
+        "Send Jorge's reply and record what the buyer's latest message answered. "
+        "Fill only the fields of the question just asked; leave the others null."
+    ),
+    "properties": {
+        "message": {"type": "string", "description": "Jorge's SMS reply to the buyer, under 300 characters"},
+        **{name: spec for fields in BUYER_ANSWER_FIELDS.values() for name, spec in fields.items()},
+    },
+    "required": ["message"],
+}
+
+# Stable instructions of every Q1-Q4 turn, sent as cached context after the
+# system prompt; per-turn details go in build_buyer_prompt
+BUYER_TURN_CONTEXT = f"""BUYER QUALIFICATION SEQUENCE (follow strictly — DO NOT deviate or improvise new questions):
 Q1: Property preferences (beds, baths, sqft, price range, area/city)
 Q2: Financial readiness (pre-approved or paying cash)
 Q3: Purchase timeline (0-30 days / 1-3 months / just browsing)
 Q4: Motivation to buy (new job, growing family, investment, first home)
 
+EXACT QUESTION WORDING:
+{chr(10).join(f"Q{num}: {text}" for num, text in BUYER_QUESTIONS.items())}
+
+BUSINESS RULES:
+- Service areas: {", ".join(JorgeBusinessRules.SERVICE_AREAS)}
+- Typical budget range: ${JorgeBusinessRules.MIN_BUDGET:,}-${JorgeBusinessRules.MAX_BUDGET:,}
+- Preferred purchase timeline: within 60 days; within 30 days is urgent"""
+
+
+def build_buyer_prompt(current_question: int, user_message: str, next_question: str) -> str:
+    """Build Claude prompt for buyer response generation."""
+    return f"""You are Jorge, a real estate agent helping this buyer PURCHASE a home in the Inland Empire.
+
 CURRENT QUESTION THAT WAS ASKED:
 "{BUYER_QUESTIONS.get(current_question, '')}"
 
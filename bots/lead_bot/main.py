@@ -9,9 +9,6 @@ Production enhancements from jorge_deployment_package/jorge_fastapi_lead_bot.py:
 - Background task processing
 - Additional analysis endpoints
 """
-import base64
-import hashlib
-import hmac
 import time
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
@@ -23,28 +20,35 @@ from sqlalchemy import text
 
 from bots.buyer_bot.buyer_bot import JorgeBuyerBot
 from bots.lead_bot.models import LeadAnalysisResponse, LeadMessage, PerformanceStatus
-from bots.lead_bot.routes_admin import router as admin_router, settings_load
+from bots.lead_bot.routes_admin import router as admin_router, settings_load, settings_sync
 from bots.lead_bot.routes_realtime import router as realtime_router
-from bots.lead_bot.routes_webhook import router as webhook_router
+from bots.lead_bot.routes_webhook import process_queued_webhook, router as webhook_router
 from bots.lead_bot.services.lead_analyzer import LeadAnalyzer
 from bots.lead_bot.websocket_manager import websocket_manager
 from bots.seller_bot.jorge_seller_bot import JorgeSellerBot
 from bots.shared.auth_middleware import get_current_active_user
-from bots.shared.cache_service import get_cache_service
+from bots.shared.cache_service import LEAD_INTEL_NAMESPACE, get_cache_service
+from bots.shared.claude_client import prompt_cache_stats
+from bots.shared.claude_hedge import claude_hedger
+from bots.shared.claude_memo import response_memo
+from bots.shared.claude_scheduler import claude_scheduler
 from bots.shared.config import settings
+from bots.shared.contact_lock import contact_locks
 from bots.shared.event_broker import event_broker
 from bots.shared.ghl_client import GHLClient
 from bots.shared.logger import get_logger, set_correlation_id
+from bots.shared.message_coalescer import message_coalescer
+from bots.shared.shared_counters import SharedCounters
+from bots.shared.webhook_queue import AbstractJobQueue, WebhookWorkerPool, create_webhook_queue
+from bots.shared.webhook_signature import signature_verifier
 
 logger = get_logger(__name__)
 
-# Performance tracking
-performance_stats = {
-    "total_requests": 0,
-    "total_response_time_ms": 0,
-    "cache_hits": 0,
-    "five_minute_violations": 0
-}
+# Performance tracking (summed across worker processes via the cache)
+performance_stats = SharedCounters(
+    "lead_bot:stats",
+    ["total_requests", "total_response_time_ms", "cache_hits", "five_minute_violations"],
+)
 
 # Initialize services on startup
 lead_analyzer = None
@@ -52,58 +56,20 @@ seller_bot_instance: Optional[JorgeSellerBot] = None
 buyer_bot_instance: Optional[JorgeBuyerBot] = None
 _ghl_client: Optional[GHLClient] = None
 _webhook_cache = None
+_webhook_queue: Optional[AbstractJobQueue] = None
+_webhook_workers: Optional[WebhookWorkerPool] = None
 
 
-def verify_ghl_signature(payload: bytes, signature: Optional[str]) -> bool:
-    """Verify GHL webhook signature using RSA public key or HMAC secret."""
-    # RSA signature with public key (current GHL webhook scheme)
-    if settings.ghl_webhook_public_key:
-        if not signature:
-            return False
-        try:
-            from cryptography.hazmat.primitives import hashes, serialization
-            from cryptography.hazmat.primitives.asymmetric import padding
-            public_key = serialization.load_pem_public_key(
-                settings.ghl_webhook_public_key.encode()
-            )
-            public_key.verify(
-                base64.b64decode(signature.strip()),
-                payload,
-                padding.PKCS1v15(),
-                hashes.SHA256(),
-            )
-            return True
-        except Exception as e:
-            logger.warning(f"Webhook signature verification failed: {e}")
-            return False
-
-    # HMAC signature with shared secret (legacy/optional)
-    if settings.ghl_webhook_secret:
-        if not signature:
-            return False
-        sig = signature.strip().replace("sha256=", "")
-        computed = hmac.new(
-            settings.ghl_webhook_secret.encode(),
-            payload,
-            hashlib.sha256,
-        ).hexdigest()
-        if hmac.compare_digest(computed, sig):
-            return True
-        # Try base64 format
-        computed_b64 = base64.b64encode(
-            hmac.new(settings.ghl_webhook_secret.encode(), payload, hashlib.sha256).digest()
-        ).decode()
-        return hmac.compare_digest(computed_b64, sig)
-
-    # No signature config set -- allow all requests (pass-through mode)
-    logger.debug("Webhook signature verification skipped: no secret configured")
-    return True
+async def verify_ghl_signature(payload: bytes, signature: Optional[str]) -> bool:
+    """Verify GHL webhook signature using RSA public key(s) or HMAC secret(s)."""
+    return await signature_verifier.verify(payload, signature)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle management for FastAPI app."""
     global lead_analyzer, seller_bot_instance, buyer_bot_instance, _ghl_client, _webhook_cache
+    global _webhook_queue, _webhook_workers
 
     logger.info("Starting Lead Bot...")
     logger.info(f"Environment: {settings.environment}")
@@ -111,9 +77,17 @@ async def lifespan(app: FastAPI):
 
     lead_analyzer = LeadAnalyzer()
     _webhook_cache = get_cache_service()
+    _webhook_cache.start_near_cache()
     logger.info("Webhook cache initialized")
     await settings_load(_webhook_cache)
     logger.info("Bot tone settings loaded from cache")
+    try:
+        # A deploy that changed the analysis prompt must not serve analyses cached under the old one
+        await _webhook_cache.ensure_namespace_fingerprint(
+            LEAD_INTEL_NAMESPACE, lead_analyzer.prompt_fingerprint()
+        )
+    except Exception as e:
+        logger.warning(f"Could not check lead analysis prompt fingerprint: {e}")
 
     try:
         seller_bot_instance = JorgeSellerBot()
@@ -135,12 +109,39 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize WebSocket manager: {e}")
 
+    if settings.webhook_fast_ack:
+        try:
+            _webhook_queue = await create_webhook_queue()
+            _webhook_workers = WebhookWorkerPool(_webhook_queue, process_queued_webhook)
+            await _webhook_workers.start()
+            logger.info("Fast-ack webhook mode enabled")
+        except Exception as e:
+            _webhook_queue = None
+            logger.error(f"Failed to start webhook job queue, processing inline: {e}")
+
     logger.info("Lead Bot ready!")
 
     yield
 
     logger.info("Shutting down Lead Bot...")
 
+    if _webhook_workers:
+        try:
+            await _webhook_workers.stop()
+            await _webhook_queue.close()
+            logger.info("Webhook worker pool shutdown")
+        except Exception as e:
+            logger.error(f"Webhook worker pool shutdown error: {e}")
+
+    signature_verifier.shutdown()
+    await performance_stats.flush()
+    await _webhook_cache.stop_near_cache()
+    await _webhook_cache.stop_circuit_breaker()
+    try:
+        _webhook_cache.close_backend()
+    except Exception as e:
+        logger.error(f"Cache backend close error: {e}")
+
     try:
         await websocket_manager.shutdown()
         logger.info("WebSocket manager shutdown")
@@ -193,12 +194,12 @@ async def performance_monitor(request: Request, call_next):
     response.headers["X-Timestamp"] = datetime.now().isoformat()
     response.headers["X-Correlation-ID"] = correlation_id
 
-    performance_stats["total_requests"] += 1
-    performance_stats["total_response_time_ms"] += process_time_ms
+    performance_stats.incr("total_requests")
+    performance_stats.incr("total_response_time_ms", round(process_time_ms))
 
     if "/webhook" in str(request.url):
         if process_time_ms > (settings.lead_response_timeout_seconds * 1000):
-            performance_stats["five_minute_violations"] += 1
+            performance_stats.incr("five_minute_violations")
             logger.error(
                 f"5-MINUTE RULE VIOLATED! "
                 f"Webhook took {process_time_ms/1000:.1f}s > {settings.lead_response_timeout_seconds}s"
@@ -209,6 +210,12 @@ async def performance_monitor(request: Request, call_next):
     if process_time_ms > 1000:
         logger.warning(f"Slow request: {request.url} took {process_time_ms:.1f}ms")
 
+    # Keep other workers' view of the stats and bot settings current
+    await performance_stats.maybe_flush()
+    if _webhook_cache is not None:
+        await settings_sync(_webhook_cache)
+        await _webhook_cache.maybe_publish_key_stats()
+
     return response
 
 
@@ -283,7 +290,7 @@ async def analyze_lead(lead_msg: LeadMessage, background_tasks: BackgroundTasks,
         )
 
         if metrics.cache_hit:
-            performance_stats["cache_hits"] += 1
+            performance_stats.incr("cache_hits")
 
         return LeadAnalysisResponse(
             success=True,
@@ -304,20 +311,21 @@ async def analyze_lead(lead_msg: LeadMessage, background_tasks: BackgroundTasks,
 @app.get("/performance", response_model=PerformanceStatus)
 async def get_performance(user=Depends(get_current_active_user())):
     """Get 5-minute rule compliance and performance metrics."""
-    total_requests = performance_stats["total_requests"]
+    stats = await performance_stats.snapshot()
+    total_requests = stats["total_requests"]
 
     avg_response_time = (
-        performance_stats["total_response_time_ms"] / total_requests
+        stats["total_response_time_ms"] / total_requests
         if total_requests > 0 else 0
     )
 
     cache_hit_rate = (
-        (performance_stats["cache_hits"] / total_requests * 100)
+        (stats["cache_hits"] / total_requests * 100)
         if total_requests > 0 else 0
     )
 
     five_minute_compliant = (
-        performance_stats["five_minute_violations"] == 0
+        stats["five_minute_violations"] == 0
         if total_requests > 0 else True
     )
 
@@ -332,22 +340,36 @@ async def get_performance(user=Depends(get_current_active_user())):
 @app.get("/metrics")
 async def metrics(user=Depends(get_current_active_user())):
     """Get Lead Bot metrics (legacy endpoint)."""
-    total_requests = performance_stats["total_requests"]
+    stats = await performance_stats.snapshot()
+    total_requests = stats["total_requests"]
 
     return {
         "leads_processed": total_requests,
         "avg_response_time_ms": (
-            performance_stats["total_response_time_ms"] / total_requests
+            stats["total_response_time_ms"] / total_requests
             if total_requests > 0 else 0
         ),
         "cache_hit_rate": (
-            (performance_stats["cache_hits"] / total_requests * 100)
+            (stats["cache_hits"] / total_requests * 100)
             if total_requests > 0 else 0
         ),
         "5_minute_compliance_rate": (
-            100.0 - (performance_stats["five_minute_violations"] / total_requests * 100)
+            100.0 - (stats["five_minute_violations"] / total_requests * 100)
             if total_requests > 0 else 100.0
         ),
+        "webhook_lock": contact_locks.get_metrics(),
+        "webhook_coalescing": message_coalescer.get_metrics(),
+        "webhook_queue": await _webhook_workers.get_metrics() if _webhook_workers else None,
+        "webhook_signature": signature_verifier.get_metrics(),
+        "memory_cache": get_cache_service().memory_stats(),
+        "near_cache": get_cache_service().near_cache_stats(),
+        "redis_breaker": get_cache_service().circuit_breaker_stats(),
+        "cache_key_stats": get_cache_service().key_stats_summary(),
+        "lead_analysis_cache": lead_analyzer.performance_cache.get_stats() if lead_analyzer else None,
+        "claude_memo": response_memo.get_stats(),
+        "claude_scheduler": claude_scheduler.get_stats(),
+        "claude_prompt_cache": prompt_cache_stats.get_stats(),
+        "claude_hedging": claude_hedger.get_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -355,10 +377,11 @@ async def metrics(user=Depends(get_current_active_user())):
 if __name__ == "__main__":
     import uvicorn
 
-    logger.info("Starting Lead Bot on port 8001...")
+    logger.info(f"Starting Lead Bot on port 8001 ({settings.lead_bot_workers} worker(s))...")
     uvicorn.run(
         "bots.lead_bot.main:app",
         host="0.0.0.0",
         port=8001,
-        reload=settings.debug
+        workers=settings.lead_bot_workers,
+        reload=settings.debug and settings.lead_bot_workers == 1
     )
@@ -1,15 +1,21 @@
 """Admin settings routes for Lead Bot — bot tone configuration."""
 
+import time
+
 from fastapi import APIRouter, Depends, HTTPException, Request
 
 from bots.shared.auth_middleware import get_admin_user
 from bots.shared.bot_settings import (
     get_all_overrides as _settings_get_all,
     get_override as _get_override,
+    reset as _settings_reset,
     update_settings as _settings_update,
     KNOWN_BOTS as _known_bots,
 )
+from bots.shared.cache_service import LEAD_INTEL_NAMESPACE, SELLER_CLASSIFY_NAMESPACE, get_cache_service
+from bots.shared.config import settings
 from bots.shared.logger import get_logger
+from bots.shared.webhook_admission import assigned_bot_key
 
 logger = get_logger(__name__)
 
@@ -17,6 +23,17 @@ router = APIRouter()
 
 _SETTINGS_CACHE_KEY = "admin:bot_settings"
 _SETTINGS_CACHE_TTL = 7_776_000  # 90 days
+# Bumped on every save so other workers know to reload the overrides
+_SETTINGS_VERSION_KEY = "admin:bot_settings:version"
+
+_settings_sync_state = {"version": 0, "checked_at": 0.0}
+
+# Cache namespaces holding AI output derived from each bot's prompts/settings;
+# invalidated whenever that bot's settings change (the buyer bot memoizes nothing)
+SETTINGS_NAMESPACES = {
+    "lead": (LEAD_INTEL_NAMESPACE,),
+    "seller": (SELLER_CLASSIFY_NAMESPACE,),
+}
 
 
 async def settings_load(cache) -> None:
@@ -37,10 +54,48 @@ async def settings_save(cache) -> None:
     """Persist all bot settings overrides to cache."""
     try:
         await cache.set(_SETTINGS_CACHE_KEY, _settings_get_all(), ttl=_SETTINGS_CACHE_TTL)
+        version = await cache.increment(_SETTINGS_VERSION_KEY, 1, ttl=_SETTINGS_CACHE_TTL)
+        _settings_sync_state["version"] = version
     except Exception as e:
         logger.warning(f"Could not persist bot settings to cache: {e}")
 
 
+async def invalidate_settings_namespaces(cache, bot: str) -> None:
+    """Drop cached AI output built with ``bot``'s previous settings."""
+    for namespace in SETTINGS_NAMESPACES.get(bot, ()):
+        try:
+            await cache.invalidate_namespace(namespace)
+        except Exception as e:
+            logger.warning(f"Could not invalidate cache namespace {namespace}: {e}")
+
+
+async def settings_sync(cache) -> None:
+    """
+    Reload overrides saved by another worker process.
+
+    Checks the version counter at most every ``shared_state_sync_seconds``
+    and re-reads the overrides only when it changed.
+    """
+    now = time.monotonic()
+    if now - _settings_sync_state["checked_at"] < settings.shared_state_sync_seconds:
+        return
+    _settings_sync_state["checked_at"] = now
+
+    try:
+        version = await cache.increment(_SETTINGS_VERSION_KEY, 0, ttl=_SETTINGS_CACHE_TTL)
+        if version == _settings_sync_state["version"]:
+            return
+        data = await cache.get(_SETTINGS_CACHE_KEY) or {}
+        _settings_reset()
+        for bot, overrides in data.items():
+            if overrides:
+                _settings_update(bot, overrides)
+        _settings_sync_state["version"] = version
+        logger.info(f"Reloaded bot settings (version {version})")
+    except Exception as e:
+        logger.warning(f"Could not sync bot settings from cache: {e}")
+
+
 @router.get("/admin/settings")
 async def admin_get_settings(user=Depends(get_admin_user())):
     """Return current effective settings -- bot defaults merged with any live overrides."""
@@ -92,8 +147,8 @@ async def admin_reassign_bot(request: Request, user=Depends(get_admin_user())):
 
     cache = _m._webhook_cache
     if cache:
-        await cache.delete(f"assigned_bot:{contact_id}")
-        await cache.set(f"assigned_bot:{contact_id}", new_bot_type, ttl=604_800)
+        await cache.delete(assigned_bot_key(contact_id))
+        await cache.set(assigned_bot_key(contact_id), new_bot_type, ttl=604_800)
 
     logger.info(f"Admin: reassigned contact {contact_id!r} to bot '{new_bot_type}'")
     return {"status": "ok", "contact_id": contact_id, "bot_type": new_bot_type}
@@ -113,5 +168,24 @@ async def admin_update_settings(bot: str, request: Request, user=Depends(get_adm
     body = await request.json()
     _settings_update(bot, body)
     await settings_save(_m._webhook_cache)
+    await invalidate_settings_namespaces(_m._webhook_cache, bot)
     logger.info(f"Admin: updated {bot} settings -- keys: {list(body)}")
     return {"status": "ok", "bot": bot, "updated_keys": list(body)}
+
+
+@router.get("/admin/cache/stats")
+async def admin_cache_stats(profile: bool = False, sample: int = 0, user=Depends(get_admin_user())):
+    """
+    Per-prefix cache hits, misses, sets, value sizes and latency, summed over workers.
+
+    ``?profile=true`` also samples the key space (``sample`` keys, default
+    ``CACHE_KEYSPACE_SAMPLE_SIZE``) for per-prefix key counts, sizes and TTLs.
+    """
+    cache = get_cache_service()
+    result = {
+        "key_stats": await cache.collect_key_stats(),
+        "local_key_stats": cache.key_stats_summary(),
+    }
+    if profile:
+        result["keyspace"] = await cache.profile_keyspace(min(sample, 10_000) or None)
+    return result
@@ -5,21 +5,27 @@ import hashlib
 import json
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
 
 from bots.shared.config import settings
+from bots.shared.contact_lock import contact_locks
 from bots.shared.logger import get_logger
+from bots.shared.message_coalescer import message_coalescer
 from bots.shared.response_filter import sanitize_bot_response
+from bots.shared.webhook_admission import (
+    ASSIGNED_BOT_TTL_SECONDS,
+    admit_webhook,
+    assigned_bot_key,
+    resolve_bot_assignment,
+)
+from bots.shared.webhook_queue import COMPLETED_JOB_TTL_SECONDS, WebhookJob, completed_job_key
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
-_ASSIGNED_BOT_TTL = 604_800  # 7 days
-
-
 async def _deferred_tag_apply(
     ghl_client: Any,
     contact_id: str,
@@ -57,7 +63,7 @@ async def handle_new_lead(request: Request):
     try:
         payload_bytes = await request.body()
         signature = request.headers.get("x-wh-signature") or request.headers.get("X-HighLevel-Signature")
-        if not state.verify_ghl_signature(payload_bytes, signature):
+        if not await state.verify_ghl_signature(payload_bytes, signature):
             raise HTTPException(status_code=401, detail="Invalid webhook signature")
 
         payload = json.loads(payload_bytes.decode("utf-8"))
@@ -72,7 +78,7 @@ async def handle_new_lead(request: Request):
         analysis_time_ms = (time.time() - analysis_start) * 1000
 
         if metrics.cache_hit:
-            state.performance_stats["cache_hits"] += 1
+            state.performance_stats.incr("cache_hits")
 
         if analysis_time_ms > settings.lead_analysis_timeout_ms:
             logger.warning(
@@ -120,7 +126,7 @@ async def unified_ghl_webhook(request: Request, background_tasks: BackgroundTask
     try:
         payload_bytes = await request.body()
         signature = request.headers.get("x-wh-signature") or request.headers.get("X-HighLevel-Signature")
-        if not state.verify_ghl_signature(payload_bytes, signature):
+        if not await state.verify_ghl_signature(payload_bytes, signature):
             raise HTTPException(status_code=401, detail="Invalid webhook signature")
         payload = json.loads(payload_bytes.decode("utf-8"))
 
@@ -145,181 +151,319 @@ async def unified_ghl_webhook(request: Request, background_tasks: BackgroundTask
             logger.warning(f"Long message truncated: contact={contact_id}, original_len={len(message_body)}")
             message_body = message_body[:2000]
 
-        # Per-minute rate limiting
+        custom_data: Dict = payload.get("customData") or {}
+        bot_type: str = (
+            custom_data.get("bot_type")
+            or custom_data.get("Bot Type")
+            or payload.get("bot_type")
+            or ""
+        )
+        contact_info = {
+            "name": payload.get("fullName") or custom_data.get("name"),
+            "email": payload.get("email") or custom_data.get("email"),
+            "phone": payload.get("phone") or custom_data.get("phone"),
+        }
+        # Explicit bot_type in the payload (vs. stored assignment / GHL API fallback)
+        _explicit_bot = bot_type.lower()
+        _fast_ack = settings.webhook_fast_ack and getattr(state, "_webhook_queue", None) is not None
         _webhook_cache = state._webhook_cache
-        if _webhook_cache:
-            rate_key = f"rate:webhook:{datetime.now().strftime('%Y%m%d%H%M')}"
-            rate_val = await _webhook_cache.get(rate_key)
-            count = int(rate_val) if rate_val is not None else 0
-            if count >= settings.rate_limit_per_minute:
-                logger.warning(f"Webhook rate limit exceeded: {count} req/min for contact={contact_id}")
-                return {"status": "throttled", "reason": "rate_limit"}
-            await _webhook_cache.set(rate_key, str(count + 1), ttl=60)
+        _coalesce = message_coalescer.enabled_for(_webhook_cache)
 
-        # Message deduplication (5-minute TTL)
+        # Admission: per-location token bucket, 5-minute dedup, processing lock and
+        # bot assignment in a single cache round trip
+        _lock_token: Optional[str] = None
+        _lock_acquired = False
+        _assigned_bot: Optional[str] = None
         if _webhook_cache:
-            dedup_key = f"dedup:{contact_id}:{hashlib.md5(message_body.encode()).hexdigest()}"
-            if await _webhook_cache.get(dedup_key):
+            # Fast-ack / coalescing: the lock is taken once the burst is claimed
+            _lock_token = None if (_fast_ack or _coalesce) else contact_locks.inline_token(contact_id)
+            admission = await admit_webhook(
+                _webhook_cache,
+                contact_id,
+                hashlib.md5(message_body.encode()).hexdigest(),
+                bot_type=_explicit_bot,
+                lock_token=_lock_token,
+                location_id=location_id,
+            )
+            if admission.throttled:
+                logger.warning(
+                    f"Webhook rate limit exceeded for location={location_id}, contact={contact_id}"
+                )
+                return {"status": "throttled", "reason": "rate_limit"}
+            if admission.duplicate:
                 logger.info(f"Duplicate message skipped: contact={contact_id}")
                 return {"status": "skipped", "reason": "duplicate"}
-            await _webhook_cache.set(dedup_key, "1", ttl=300)
 
-        # Per-contact processing lock (30s TTL, wait up to 10s)
-        _lock_acquired = False
-        lock_key = f"lock:{contact_id}"
-        if _webhook_cache:
-            for _ in range(10):
-                if not await _webhook_cache.get(lock_key):
-                    break
-                await asyncio.sleep(1)
-            else:
+            if admission.lock_acquired:
+                contact_locks.record_inline_acquire()
+                _lock_acquired = True
+                _assigned_bot = admission.bot_type
+
+        # Coalescing: buffer the message; only the last one of a burst runs the bot
+        _coalesce_position = 0
+        if _coalesce:
+            _coalesce_position = await message_coalescer.push(_webhook_cache, contact_id, message_body)
+
+        if _fast_ack:
+            job = WebhookJob(
+                contact_id=contact_id,
+                location_id=location_id,
+                message=message_body,
+                bot_type=bot_type,
+                contact_info=contact_info,
+                coalesce_position=_coalesce_position,
+            )
+            await state._webhook_queue.enqueue(job)
+            logger.info(f"Unified webhook: queued job {job.job_id} for contact={contact_id}")
+            return {"status": "queued", "job_id": job.job_id}
+
+        if _coalesce:
+            await message_coalescer.settle()
+
+        if _webhook_cache and not _lock_acquired:
+            # Contended: wait in the per-contact FIFO queue
+            _lock_token = await contact_locks.acquire(_webhook_cache, contact_id)
+            if _lock_token is None:
+                # A buffered burst stays put for the contact's next message
                 logger.warning(f"Processing lock held for contact={contact_id}, throttling")
                 return {"status": "throttled", "reason": "processing_lock"}
-            await _webhook_cache.set(lock_key, "1", ttl=30)
-            _lock_acquired = True
-
-        try:
-            # Determine bot type
-            custom_data: Dict = payload.get("customData") or {}
-            bot_type: str = (
-                custom_data.get("bot_type")
-                or custom_data.get("Bot Type")
-                or payload.get("bot_type")
-                or ""
+            _assigned_bot = await resolve_bot_assignment(
+                _webhook_cache, assigned_bot_key(contact_id), _explicit_bot
             )
-            # Track whether the payload explicitly specifies a bot (vs. GHL API fallback)
-            _bot_type_explicit = bool(bot_type)
-
-            if not bot_type and state._ghl_client:
-                try:
-                    contact_resp = await state._ghl_client.get_contact(contact_id)
-                    custom_fields = (
-                        contact_resp.get("contact", contact_resp).get("customFields", [])
-                    )
-                    for cf in custom_fields:
-                        key = (cf.get("fieldKey") or cf.get("name") or "").lower().replace(" ", "_")
-                        if key in ("bot_type", "bot type"):
-                            bot_type = cf.get("value") or ""
-                            break
-                except Exception as e:
-                    logger.warning(f"Could not fetch contact for bot_type lookup: {e}")
-
-            bot_type_lower = (bot_type or "lead").lower()
-
-            # Fix 3 — Bot exclusivity: one bot per contact (7-day assignment, explicit payload overrides)
-            _assigned_key = f"assigned_bot:{contact_id}"
-            if _webhook_cache:
-                _assigned_bot = await _webhook_cache.get(_assigned_key)
-                if _assigned_bot:
-                    if not _bot_type_explicit:
-                        # No explicit override in this webhook — honour the stored assignment
-                        bot_type_lower = _assigned_bot
-                    else:
-                        # Explicit bot_type in payload — update stored assignment
-                        await _webhook_cache.set(_assigned_key, bot_type_lower, ttl=_ASSIGNED_BOT_TTL)
-                else:
-                    await _webhook_cache.set(_assigned_key, bot_type_lower, ttl=_ASSIGNED_BOT_TTL)
-
-            contact_info = {
-                "name": payload.get("fullName") or custom_data.get("name"),
-                "email": payload.get("email") or custom_data.get("email"),
-                "phone": payload.get("phone") or custom_data.get("phone"),
-            }
 
-            logger.info(
-                f"Unified webhook: contact={contact_id}, bot_type={bot_type_lower!r}, "
-                f"msg={message_body[:60]!r}"
+        try:
+            if _coalesce:
+                # Drained under the lock, so the burst is never lost to a lock timeout
+                merged = await message_coalescer.claim(_webhook_cache, contact_id, _coalesce_position)
+                if merged is None:
+                    logger.info(f"Message coalesced into a later turn: contact={contact_id}")
+                    return {"status": "skipped", "reason": "coalesced"}
+                message_body = merged
+
+            return await _dispatch_message(
+                state,
+                contact_id=contact_id,
+                location_id=location_id,
+                message_body=message_body,
+                bot_type=bot_type,
+                assigned_bot=_assigned_bot,
+                contact_info=contact_info,
+                schedule=background_tasks.add_task,
             )
-
-            # Route to bot
-            response_message: Optional[str] = None
-            result_meta: Dict = {"bot_type": bot_type_lower}
-
-            if "seller" in bot_type_lower:
-                if not state.seller_bot_instance:
-                    logger.error("Seller bot not initialized")
-                    return {"status": "error", "detail": "seller bot unavailable"}
-                result = await state.seller_bot_instance.process_seller_message(
-                    contact_id=contact_id,
-                    location_id=location_id,
-                    message=message_body,
-                    contact_info=contact_info,
-                )
-                response_message = result.response_message
-                result_meta.update(
-                    {
-                        "temperature": result.seller_temperature,
-                        "questions_answered": result.questions_answered,
-                        "qualification_complete": result.qualification_complete,
-                    }
-                )
-                # Fix 4 — schedule tag application 30s after SMS is sent
-                _tag_actions = [
-                    a for a in result.actions_taken
-                    if a.get("type") in ("add_tag", "remove_tag")
-                ]
-                if _tag_actions and state._ghl_client:
-                    background_tasks.add_task(
-                        _deferred_tag_apply, state._ghl_client, contact_id, _tag_actions
-                    )
-
-            elif "buyer" in bot_type_lower:
-                if not state.buyer_bot_instance:
-                    logger.error("Buyer bot not initialized")
-                    return {"status": "error", "detail": "buyer bot unavailable"}
-                result = await state.buyer_bot_instance.process_buyer_message(
-                    contact_id=contact_id,
-                    location_id=location_id,
-                    message=message_body,
-                    contact_info=contact_info,
-                )
-                response_message = result.response_message
-                result_meta.update(
-                    {
-                        "temperature": result.buyer_temperature,
-                        "questions_answered": result.questions_answered,
-                        "qualification_complete": result.qualification_complete,
-                    }
-                )
-                # Fix 4 — schedule tag application 30s after SMS is sent
-                _tag_actions = [
-                    a for a in result.actions_taken
-                    if a.get("type") in ("add_tag", "remove_tag")
-                ]
-                if _tag_actions and state._ghl_client:
-                    background_tasks.add_task(
-                        _deferred_tag_apply, state._ghl_client, contact_id, _tag_actions
-                    )
-
-            else:
-                lead_data = {"id": contact_id, "message": message_body, **contact_info}
-                analysis, metrics = await state.lead_analyzer.analyze_lead(lead_data)
-                result_meta.update(
-                    {
-                        "score": analysis.get("score", 0),
-                        "temperature": analysis.get("temperature", "warm"),
-                        "jorge_priority": analysis.get("jorge_priority", "normal"),
-                    }
-                )
-                return {"status": "processed", **result_meta}
-
-            # Send reply via GHL SMS (seller / buyer bots)
-            response_message = sanitize_bot_response(response_message)
-            if response_message and state._ghl_client:
-                try:
-                    await state._ghl_client.send_message(contact_id, response_message, "SMS")
-                    logger.info(f"Reply sent to {contact_id} via GHL SMS")
-                except Exception as e:
-                    logger.error(f"Failed to send GHL reply to {contact_id}: {e}")
-
-            return {"status": "processed", **result_meta}
-
         finally:
-            if _lock_acquired and _webhook_cache:
-                await _webhook_cache.delete(lock_key)
+            if _lock_token and _webhook_cache:
+                await contact_locks.release(_webhook_cache, contact_id, _lock_token)
 
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Unified webhook unhandled error: {e}", exc_info=True)
         return {"status": "error", "detail": str(e)}
+
+
+async def _dispatch_message(
+    state: Any,
+    contact_id: str,
+    location_id: str,
+    message_body: str,
+    bot_type: str,
+    assigned_bot: Optional[str],
+    contact_info: Dict[str, Optional[str]],
+    schedule: Callable[..., Any],
+) -> Dict[str, Any]:
+    """
+    Route an admitted message to the Lead / Seller / Buyer bot and send the reply.
+
+    Caller must hold the contact's processing lock.  ``schedule`` runs
+    deferred work (tag updates) after the reply, e.g. BackgroundTasks.add_task.
+    """
+    _webhook_cache = state._webhook_cache
+
+    # Bot exclusivity: one bot per contact (7-day assignment, explicit payload
+    # overrides).  A stored assignment makes the GHL custom-field lookup moot.
+    if not bot_type and assigned_bot:
+        bot_type = assigned_bot
+
+    if not bot_type and state._ghl_client:
+        try:
+            contact_resp = await state._ghl_client.get_contact(contact_id)
+            custom_fields = (
+                contact_resp.get("contact", contact_resp).get("customFields", [])
+            )
+            for cf in custom_fields:
+                key = (cf.get("fieldKey") or cf.get("name") or "").lower().replace(" ", "_")
+                if key in ("bot_type", "bot type"):
+                    bot_type = cf.get("value") or ""
+                    break
+        except Exception as e:
+            logger.warning(f"Could not fetch contact for bot_type lookup: {e}")
+
+    bot_type_lower = (bot_type or "lead").lower()
+
+    if _webhook_cache and not assigned_bot:
+        # First message for this contact — store its assignment
+        await _webhook_cache.set(
+            assigned_bot_key(contact_id), bot_type_lower, ttl=ASSIGNED_BOT_TTL_SECONDS
+        )
+
+    logger.info(
+        f"Unified webhook: contact={contact_id}, bot_type={bot_type_lower!r}, "
+        f"msg={message_body[:60]!r}"
+    )
+
+    # Route to bot
+    response_message: Optional[str] = None
+    result_meta: Dict = {"bot_type": bot_type_lower}
+
+    if "seller" in bot_type_lower:
+        if not state.seller_bot_instance:
+            logger.error("Seller bot not initialized")
+            return {"status": "error", "detail": "seller bot unavailable"}
+        result = await state.seller_bot_instance.process_seller_message(
+            contact_id=contact_id,
+            location_id=location_id,
+            message=message_body,
+            contact_info=contact_info,
+        )
+        response_message = result.response_message
+        result_meta.update(
+            {
+                "temperature": result.seller_temperature,
+                "questions_answered": result.questions_answered,
+                "qualification_complete": result.qualification_complete,
+            }
+        )
+        # Fix 4 — schedule tag application 30s after SMS is sent
+        _tag_actions = [
+            a for a in result.actions_taken
+            if a.get("type") in ("add_tag", "remove_tag")
+        ]
+        if _tag_actions and state._ghl_client:
+            schedule(_deferred_tag_apply, state._ghl_client, contact_id, _tag_actions)
+
+    elif "buyer" in bot_type_lower:
+        if not state.buyer_bot_instance:
+            logger.error("Buyer bot not initialized")
+            return {"status": "error", "detail": "buyer bot unavailable"}
+        result = await state.buyer_bot_instance.process_buyer_message(
+            contact_id=contact_id,
+            location_id=location_id,
+            message=message_body,
+            contact_info=contact_info,
+        )
+        response_message = result.response_message
+        result_meta.update(
+            {
+                "temperature": result.buyer_temperature,
+                "questions_answered": result.questions_answered,
+                "qualification_complete": result.qualification_complete,
+            }
+        )
+        # Fix 4 — schedule tag application 30s after SMS is sent
+        _tag_actions = [
+            a for a in result.actions_taken
+            if a.get("type") in ("add_tag", "remove_tag")
+        ]
+        if _tag_actions and state._ghl_client:
+            schedule(_deferred_tag_apply, state._ghl_client, contact_id, _tag_actions)
+
+    else:
+        lead_data = {"id": contact_id, "message": message_body, **contact_info}
+        analysis, metrics = await state.lead_analyzer.analyze_lead(lead_data)
+        result_meta.update(
+            {
+                "score": analysis.get("score", 0),
+                "temperature": analysis.get("temperature", "warm"),
+                "jorge_priority": analysis.get("jorge_priority", "normal"),
+            }
+        )
+        return {"status": "processed", **result_meta}
+
+    # Send reply via GHL SMS (seller / buyer bots)
+    response_message = sanitize_bot_response(response_message)
+    if response_message and state._ghl_client:
+        try:
+            await state._ghl_client.send_message(contact_id, response_message, "SMS")
+            logger.info(f"Reply sent to {contact_id} via GHL SMS")
+        except Exception as e:
+            logger.error(f"Failed to send GHL reply to {contact_id}: {e}")
+
+    return {"status": "processed", **result_meta}
+
+
+# Deferred tag tasks started by queue workers (kept referenced until done)
+_worker_background_tasks: Set[asyncio.Task] = set()
+
+
+def _schedule_worker_task(func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+    task = asyncio.create_task(func(*args))
+    _worker_background_tasks.add(task)
+    task.add_done_callback(_worker_background_tasks.discard)
+
+
+async def process_queued_webhook(job: WebhookJob) -> Dict[str, Any]:
+    """
+    Worker-pool handler for fast-ack mode.
+
+    Raises on failure (including lock timeouts and unavailable bots) so the
+    pool retries the job and eventually dead-letters it.  A job that already
+    finished (redelivered after a failed ack or a worker crash) returns its
+    recorded result without running the bot or sending the SMS again.
+    """
+    state = _get_state()
+    _webhook_cache = state._webhook_cache
+    _lock_token: Optional[str] = None
+    _assigned_bot: Optional[str] = None
+    _coalesce = bool(job.coalesce_position and _webhook_cache)
+
+    if _coalesce:
+        # Window is measured from when the webhook arrived, not when the job ran
+        wait = job.enqueued_at + message_coalescer.window_seconds - time.time()
+        await message_coalescer.settle(wait_seconds=max(wait, 0))
+
+    if _webhook_cache:
+        _lock_token = await contact_locks.acquire(_webhook_cache, job.contact_id)
+        if _lock_token is None:
+            raise RuntimeError(f"processing lock timeout for contact={job.contact_id}")
+        _assigned_bot = await resolve_bot_assignment(
+            _webhook_cache, assigned_bot_key(job.contact_id), job.bot_type.lower()
+        )
+
+    try:
+        if _webhook_cache:
+            completed = await _webhook_cache.get(completed_job_key(job))
+            if completed is not None:
+                logger.info(f"Webhook job {job.job_id} already processed, skipping redelivery")
+                return completed
+
+        if _coalesce:
+            merged = await message_coalescer.claim(_webhook_cache, job.contact_id, job.coalesce_position)
+            if merged is None:
+                logger.info(f"Queued message coalesced into a later turn: contact={job.contact_id}")
+                return {"status": "skipped", "reason": "coalesced"}
+            # The buffer is drained now: retries of this job reuse the merged text
+            job.message, job.coalesce_position = merged, 0
+
+        result = await _dispatch_message(
+            state,
+            contact_id=job.contact_id,
+            location_id=job.location_id,
+            message_body=job.message,
+            bot_type=job.bot_type,
+            assigned_bot=_assigned_bot,
+            contact_info=job.contact_info,
+            schedule=_schedule_worker_task,
+        )
+        if _webhook_cache and result.get("status") != "error":
+            try:
+                await _webhook_cache.set(completed_job_key(job), result, ttl=COMPLETED_JOB_TTL_SECONDS)
+            except Exception as e:
+                # Must not fail the job: a retry would send the reply again
+                logger.error(f"Could not record webhook job {job.job_id} as processed: {e}")
+    finally:
+        if _lock_token and _webhook_cache:
+            await contact_locks.release(_webhook_cache, job.contact_id, _lock_token)
+
+    if result.get("status") == "error":
+        raise RuntimeError(result.get("detail", "bot dispatch failed"))
+    return result
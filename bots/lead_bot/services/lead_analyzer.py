@@ -5,7 +5,8 @@ AI-powered lead qualification using Claude with Jorge's business rules.
 Target: <500ms analysis time, >85% accuracy.
 
 Production enhancements from jorge_deployment_package:
-- PerformanceCache for <100ms cache hits
+- PerformanceCache for <100ms cache hits; Claude analyses are shared by
+  leads with the same PII-free content
 - PerformanceMetrics tracking for 5-minute rule compliance
 - Hybrid pattern + AI analysis approach
 - Jorge's business rules validation integration
@@ -17,16 +18,34 @@ from typing import Any, Dict, Optional, Tuple
 
 from bots.shared.business_rules import JorgeBusinessRules
 from bots.shared.cache_service import CacheService, PerformanceCache
-from bots.shared.claude_client import ClaudeClient, TaskComplexity
+from bots.shared.claude_client import ClaudeClient, RequestPriority, TaskComplexity
 from bots.shared.config import settings
 from bots.shared.event_broker import event_broker
 from bots.shared.ghl_client import GHLClient
-from bots.shared.logger import get_logger
+from bots.shared.logger import RedactionFilter, get_logger
 from bots.shared.models import PerformanceMetrics
 from database.repository import upsert_contact, upsert_lead
 
 logger = get_logger(__name__)
 
+# Fields of the parsed Claude response: the part of an analysis that is
+# shared across contacts with the same lead content
+_AI_FIELDS = ("score", "temperature", "reasoning", "action", "budget_estimate", "timeline_estimate")
+_PARSE_ERROR_REASONING = "Error parsing AI response"
+
+
+def _normalize_text(value: Any) -> str:
+    return " ".join(str(value).split()).lower()
+
+
+def _scrub_text(value: Any, name_tokens: Tuple[str, ...]) -> str:
+    """Whitespace/case-normalize and replace emails, phones and the lead's name."""
+    text = RedactionFilter.EMAIL_RE.sub("[email]", str(value))
+    text = RedactionFilter.PHONE_RE.sub("[phone]", text)
+    for token in name_tokens:
+        text = re.sub(rf"\b{re.escape(token)}\b", "[name]", text, flags=re.IGNORECASE)
+    return _normalize_text(text)
+
 
 class LeadAnalyzer:
     """
@@ -48,7 +67,7 @@ class LeadAnalyzer:
 
     def __init__(self):
         """Initialize Lead Analyzer with clients and performance cache."""
-        self.claude = ClaudeClient()
+        self.claude = ClaudeClient(usage_label="lead")
         self.ghl = GHLClient()
         self.cache = CacheService()
         self.performance_cache = PerformanceCache(ttl_seconds=300)  # 5-minute cache
@@ -81,9 +100,10 @@ class LeadAnalyzer:
         metrics = PerformanceMetrics(start_time=time.time())
         contact_id = lead_data.get("id")
 
-        # Create cache key from lead data
+        # Cache keys: PII-free lead content (shared across contacts) and,
+        # for repeat analyses of one contact, the content plus contact id
         message = self._extract_message_for_cache(lead_data)
-        context = {"contact_id": contact_id, "source": lead_data.get("source")}
+        context = {"contact_id": contact_id}
 
         logger.info(f"🔍 Analyzing lead: {contact_id}")
 
@@ -104,6 +124,8 @@ class LeadAnalyzer:
             logger.warning(f"Failed to publish lead analysis started event: {e}")
 
         try:
+            shared_analysis = None
+
             # Check performance cache first for <100ms responses
             if not force_ai:
                 cached_result = await self.performance_cache.get(message, context)
@@ -131,8 +153,23 @@ class LeadAnalyzer:
 
                     return cached_result, metrics
 
-            # Perform AI-powered analysis (existing logic)
-            analysis = await self._analyze_with_ai(lead_data, metrics)
+                # Another lead with the same content: reuse its Claude analysis
+                shared_analysis = await self.performance_cache.get(message, key_class="content")
+
+            if shared_analysis:
+                metrics.cache_hit = True
+                metrics.analysis_type = "content_cached"
+                analysis = await self._complete_analysis(contact_id, dict(shared_analysis), lead_data)
+            else:
+                # Perform AI-powered analysis (existing logic)
+                analysis = await self._analyze_with_ai(lead_data, metrics)
+                if analysis.get("reasoning") != _PARSE_ERROR_REASONING:
+                    await self.performance_cache.set(
+                        message,
+                        {field: analysis.get(field) for field in _AI_FIELDS},
+                        key_class="content",
+                        ttl_seconds=settings.lead_analysis_content_cache_ttl_seconds,
+                    )
 
             # Add Jorge's business rules validation
             analysis.update(self._add_jorge_validation(analysis))
@@ -167,7 +204,7 @@ class LeadAnalyzer:
                     estimated_commission=analysis.get("estimated_commission", 0.0),
                     meets_jorge_criteria=analysis.get("meets_jorge_criteria", False),
                     analysis_time_ms=metrics.total_time * 1000,
-                    cache_hit=False
+                    cache_hit=metrics.cache_hit
                 )
 
                 # Emit hot lead detected event if temperature is hot
@@ -213,28 +250,36 @@ class LeadAnalyzer:
             return fallback, metrics
 
     def _extract_message_for_cache(self, lead_data: Dict[str, Any]) -> str:
-        """Extract key message content for cache key generation."""
-        parts = []
-
-        if lead_data.get("name"):
-            parts.append(lead_data["name"])
-        if lead_data.get("email"):
-            parts.append(lead_data["email"])
-        if lead_data.get("phone"):
-            parts.append(lead_data["phone"])
-        if lead_data.get("tags"):
-            parts.append(",".join(lead_data["tags"]))
-
-        # Include custom fields that affect scoring
-        custom = lead_data.get("customField", {})
-        if custom.get("budget"):
-            parts.append(f"budget:{custom['budget']}")
-        if custom.get("timeline"):
-            parts.append(f"timeline:{custom['timeline']}")
-        if custom.get("location"):
-            parts.append(f"location:{custom['location']}")
-
-        return " | ".join(parts)
+        """Canonical text of the lead content (see ``_lead_content``), for cache keys."""
+        return json.dumps(self._lead_content(lead_data), sort_keys=True)
+
+    def _lead_content(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        PII-free view of a lead: everything the analysis prompt is built from.
+
+        The message and custom field values are whitespace/case-normalized
+        with emails, phone numbers and the lead's name replaced; for name,
+        email and phone only their presence is kept.  Leads with equal
+        content get the same Claude analysis, so it can be cached across
+        contacts.
+        """
+        name_tokens = tuple(
+            token for token in str(lead_data.get("name") or "").split() if len(token) > 1
+        )
+        custom_fields = lead_data.get("customField") or {}
+        return {
+            "message": _scrub_text(lead_data.get("message") or "", name_tokens),
+            "source": _normalize_text(lead_data.get("source") or "unknown"),
+            "tags": sorted({_normalize_text(tag) for tag in lead_data.get("tags") or [] if tag}),
+            "custom_fields": {
+                str(key): _scrub_text(value, name_tokens)
+                for key, value in sorted(custom_fields.items())
+                if value not in (None, "")
+            },
+            "contact_info": [
+                field for field in ("name", "email", "phone") if lead_data.get(field)
+            ],
+        }
 
     async def _analyze_with_ai(
         self,
@@ -249,14 +294,6 @@ class LeadAnalyzer:
         contact_id = lead_data.get("id")
         logger.info(f"Analyzing lead: {contact_id}")
 
-        # Extract relevant fields
-        name = lead_data.get("name", "Unknown")
-        email = lead_data.get("email", "")
-        phone = lead_data.get("phone", "")
-        source = lead_data.get("source", "Unknown")
-        tags = lead_data.get("tags", [])
-        custom_fields = lead_data.get("customField", {})
-
         # Build analysis prompt
         prompt = self._build_analysis_prompt(lead_data)
 
@@ -269,7 +306,10 @@ class LeadAnalyzer:
             complexity=TaskComplexity.COMPLEX,  # Lead qualification is complex
             max_tokens=500,
             temperature=0.3,  # Low temperature for consistent scoring
-            enable_caching=True  # Cache system prompt
+            enable_caching=True,  # Cache system prompt
+            priority=RequestPriority.ANALYSIS,  # Seller/buyer replies go first
+            deadline_seconds=settings.claude_analysis_deadline_seconds,  # Well inside the 5-minute rule
+            hedge=True,
         )
 
         metrics.claude_analysis_time = time.time() - ai_start
@@ -277,7 +317,15 @@ class LeadAnalyzer:
 
         # Parse response
         analysis = self._parse_claude_response(response.content)
+        return await self._complete_analysis(contact_id, analysis, lead_data)
 
+    async def _complete_analysis(
+        self,
+        contact_id: Optional[str],
+        analysis: Dict[str, Any],
+        lead_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Add this contact's details to a Claude analysis and act on it in GHL."""
         # Extract budget/location for Jorge validation
         analysis = self._extract_lead_details(analysis, lead_data)
 
@@ -355,6 +403,12 @@ class LeadAnalyzer:
             "service_area_match": jorge_validation["service_area_match"]
         }
 
+    def prompt_fingerprint(self) -> str:
+        """Hash of the system prompt and prompt template; cached analyses depend on both."""
+        import hashlib
+        prompts = self._get_system_prompt() + self._build_analysis_prompt({})
+        return hashlib.sha256(prompts.encode()).hexdigest()[:16]
+
     def _get_system_prompt(self) -> str:
         """
         Get system prompt for lead analysis.
@@ -414,26 +468,22 @@ class LeadAnalyzer:
 Be concise. Focus on actionable insights for Jorge."""
 
     def _build_analysis_prompt(self, lead_data: Dict[str, Any]) -> str:
-        """Build analysis prompt from lead data."""
-        name = lead_data.get("name", "Unknown")
-        email = lead_data.get("email", "")
-        phone = lead_data.get("phone", "")
-        source = lead_data.get("source", "Unknown")
-        tags = lead_data.get("tags", [])
-        custom_fields = lead_data.get("customField", {})
+        """Build analysis prompt from the PII-free lead content."""
+        content = self._lead_content(lead_data)
+        tags = content["tags"]
+        contact_info = content["contact_info"]
 
         prompt = f"""Analyze this lead:
 
-**Contact:**
-- Name: {name}
-- Email: {email}
-- Phone: {phone}
-- Source: {source}
+**Lead:**
+- Message: {content["message"] or 'None'}
+- Source: {content["source"]}
 - Tags: {', '.join(tags) if tags else 'None'}
+- Contact info provided: {', '.join(contact_info) if contact_info else 'None'}
 
 **Custom Fields:**
 """
-        for key, value in custom_fields.items():
+        for key, value in content["custom_fields"].items():
             prompt += f"- {key}: {value}\n"
 
         prompt += "\nProvide lead score, temperature, and recommended action in JSON format."
@@ -474,7 +524,7 @@ Be concise. Focus on actionable insights for Jorge."""
             return {
                 "score": 50,
                 "temperature": "warm",
-                "reasoning": "Error parsing AI response",
+                "reasoning": _PARSE_ERROR_REASONING,
                 "action": "Manual review required",
                 "budget_estimate": None,
                 "timeline_estimate": None
@@ -23,6 +23,7 @@ from bots.shared.config import settings
 from bots.shared.event_broker import event_broker
 from bots.shared.event_models import BaseEvent, create_event
 from bots.shared.logger import get_logger
+from bots.shared.redis_connection import cluster_enabled, create_pubsub_client, create_redis_client
 
 logger = get_logger(__name__)
 
@@ -48,6 +49,7 @@ class WebSocketManager:
 
         # Redis connection for pub/sub
         self.redis_client: Optional[redis.Redis] = None
+        self.pubsub_client: Optional[redis.Redis] = None
         self.pubsub = None
 
         # Background tasks
@@ -69,8 +71,13 @@ class WebSocketManager:
 
         try:
             # Initialize Redis connection
-            self.redis_client = redis.from_url(settings.redis_url)
+            self.redis_client = create_redis_client(settings.redis_url)
             await self.redis_client.ping()
+            # RedisCluster has no pub/sub: listen through one node
+            if cluster_enabled():
+                self.pubsub_client = create_pubsub_client(settings.redis_url)
+            else:
+                self.pubsub_client = self.redis_client
 
             # Start background tasks
             self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
@@ -103,6 +110,8 @@ class WebSocketManager:
         # Close Redis connection
         if self.pubsub:
             await self.pubsub.close()
+        if self.pubsub_client and self.pubsub_client is not self.redis_client:
+            await self.pubsub_client.close()
         if self.redis_client:
             await self.redis_client.close()
 
@@ -287,7 +296,7 @@ class WebSocketManager:
         while self._running:
             try:
                 # Subscribe to all event channels
-                pubsub = self.redis_client.pubsub()
+                pubsub = self.pubsub_client.pubsub()
                 await pubsub.subscribe(
                     "jorge:events:leads",
                     "jorge:events:ghl",
@@ -28,15 +28,70 @@ from typing import Any, Dict, List, Optional
 from bots.shared.business_rules import JorgeBusinessRules
 from bots.shared.response_filter import sanitize_bot_response
 from bots.shared.bot_settings import get_override as _get_bot_override
-from bots.shared.cache_service import get_cache_service
+from bots.shared.cache_service import SELLER_CLASSIFY_NAMESPACE, get_cache_service
 from bots.shared.calendar_booking_service import FALLBACK_MESSAGE, CalendarBookingService
-from bots.shared.claude_client import ClaudeClient, TaskComplexity
+from bots.shared.claude_client import ClaudeClient, TaskComplexity, structured_reply
+from bots.shared.config import settings
+from bots.shared.conversation_state import ConversationStateStore
 from bots.shared.ghl_client import GHLClient
 from bots.shared.logger import get_logger
+from bots.shared.redis_connection import contact_tag
 from database.repository import fetch_conversation, upsert_contact, upsert_conversation
 
 logger = get_logger(__name__)
 
+# Concurrent DB fallbacks when listing active conversations with cache misses
+_DB_RESTORE_CONCURRENCY = 10
+
+CONDITION_VALUES = ["needs_major_repairs", "needs_minor_repairs", "move_in_ready"]
+MOTIVATION_VALUES = [
+    "job_relocation", "divorce", "foreclosure", "financial_distress", "inheritance", "downsizing",
+    "upsizing", "medical_emergency", "retirement", "landlord_exit", "other",
+]
+
+# Fields of the seller's answer returned with the reply in one structured
+# Claude call (see TURN_SCHEMA); keyword matches still take precedence
+_ANSWER_FIELDS: Dict[int, Dict[str, Any]] = {
+    1: {"condition": {
+        "type": ["string", "null"], "enum": [*CONDITION_VALUES, None],
+        "description": "Condition of the home as the seller described it",
+    }},
+    2: {"price_expectation": {
+        "type": ["integer", "null"],
+        "description": "Price the seller wants, in US dollars (\"three fifty\" = 350000); null if none given",
+    }},
+    3: {"motivation": {
+        "type": ["string", "null"], "enum": [*MOTIVATION_VALUES, None],
+        "description": "Main reason the seller is selling",
+    }},
+    4: {"offer_accepted": {
+        "type": ["boolean", "null"],
+        "description": "True only if the seller accepted the cash offer",
+    }},
+}
+
+# Structured response of every Q1-Q4 turn: Jorge's reply plus the answer's
+# fields.  One schema for all questions keeps the tool definition, which
+# leads the cached prompt prefix, identical from turn to turn.
+TURN_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "description": (
+        "Send Jorge's reply and record what the seller's latest message answered. "
+        "Fill only the field of the question just asked; leave the others null."
+    ),
+    "properties": {
+        "message": {"type": "string", "description": "Jorge's SMS reply to the seller, under 300 characters"},
+        **{name: spec for fields_ in _ANSWER_FIELDS.values() for name, spec in fields_.items()},
+    },
+    "required": ["message"],
+}
+
+
+def _answer_choice(model_fields: Optional[Dict[str, Any]], name: str, values: List[str]) -> Optional[str]:
+    """``model_fields[name]`` if it is one of ``values``."""
+    value = (model_fields or {}).get(name)
+    return value if value in values else None
+
 # System prompt for all Claude calls in the seller bot.
 # Locks Jorge's persona and blocks hallucination.
 SELLER_SYSTEM_PROMPT = (
@@ -49,6 +104,15 @@ SELLER_SYSTEM_PROMPT = (
     "Stay in character. Under 100 words."
 )
 
+# Constant part of the seller turn instructions, sent as cached context
+# after the system prompt (see JorgeSellerBot._turn_context)
+SELLER_PERSONALITY = """PERSONALITY TRAITS:
+- Warm, professional, and easy to talk to
+- Genuinely helpful and focused on finding the best solution for the seller
+- Clear and straightforward without being pushy
+- Makes sellers feel heard and respected
+- Moves efficiently but never makes sellers feel rushed"""
+
 
 class SellerStatus(Enum):
     """Seller lead temperature categories"""
@@ -158,6 +222,15 @@ class SellerQualificationState:
         logger.debug(f"Recorded Q{question_num} answer: {extracted_data}")
 
 
+# Keys of a cached state dict that map onto SellerQualificationState
+_STATE_FIELDS = frozenset(f.name for f in fields(SellerQualificationState))
+
+
+def state_key(contact_id: str) -> str:
+    """Cache key of a contact's seller state in the single-blob layout (see ConversationStateStore)."""
+    return f"seller:state:{contact_tag(contact_id)}"
+
+
 @dataclass
 class SellerResult:
     """Result from seller bot processing"""
@@ -232,6 +305,28 @@ class JorgeSellerBot:
             return {int(k): v for k, v in raw.items()}
         return raw
 
+    def _turn_context(self) -> str:
+        """Stable instructions of every Q1-Q4 turn: personality, question script and rules.
+
+        Only changes with the seller bot settings, so Claude reads it from the
+        prompt cache; per-turn details stay in the prompt.
+        """
+        script = "\n".join(
+            f"Q{num}: " + str(text).replace("{offer_amount}", "[cash offer amount]")
+            for num, text in sorted(self._questions.items())
+        )
+        areas = ", ".join(JorgeBusinessRules.SERVICE_AREAS)
+        return f"""{SELLER_PERSONALITY}
+
+SELLER QUALIFICATION SEQUENCE (ask these in order, one per reply):
+{script}
+
+BUSINESS RULES:
+- Service areas: {areas}
+- Cash offers are 70-80% of the seller's price and close in 2-3 weeks with no repairs needed
+- Typical price range: ${JorgeBusinessRules.MIN_BUDGET:,}-${JorgeBusinessRules.MAX_BUDGET:,}
+- NEVER promise an offer amount other than the one given in the task"""
+
     def __init__(self, ghl_client: Optional[GHLClient] = None):
         """
         Initialize seller bot with Redis persistence.
@@ -239,7 +334,7 @@ class JorgeSellerBot:
         Args:
             ghl_client: Optional GHL client instance (creates default if not provided)
         """
-        self.claude_client = ClaudeClient()
+        self.claude_client = ClaudeClient(usage_label="seller")
         self.ghl_client = ghl_client or GHLClient()
         self.cache = get_cache_service()  # Redis cache for persistence
         self.logger = get_logger(__name__)
@@ -248,6 +343,10 @@ class JorgeSellerBot:
         # Note: No in-memory _states dict - all state now in Redis
         self.logger.info("Initialized JorgeSellerBot with Redis persistence")
 
+    @property
+    def _state_store(self) -> ConversationStateStore:
+        return ConversationStateStore(self.cache, "seller")
+
     async def get_conversation_state(
         self,
         contact_id: str
@@ -261,8 +360,8 @@ class JorgeSellerBot:
         Returns:
             SellerQualificationState if exists, None otherwise
         """
-        key = f"seller:state:{contact_id}"
-        state_dict = await self.cache.get(key)
+        store = self._state_store
+        state_dict = await store.load(contact_id)
 
         if not state_dict:
             # Cache miss — try DB fallback (handles MemoryCache restart loss)
@@ -296,6 +395,13 @@ class JorgeSellerBot:
                 self.logger.warning(f"DB conversation fallback failed for {contact_id}: {db_err}")
             return None
 
+        state = self._state_from_cache(state_dict)
+        store.remember(state, state_dict)
+        return state
+
+    @staticmethod
+    def _state_from_cache(state_dict: Dict[str, Any]) -> SellerQualificationState:
+        """Build a state from its cached dict (as written by ``save_conversation_state``)."""
         # Create a copy to avoid modifying the cached object in place
         state_dict = state_dict.copy()
 
@@ -309,8 +415,7 @@ class JorgeSellerBot:
                 state_dict['conversation_started']
             )
 
-        valid_fields = {f.name for f in fields(SellerQualificationState)}
-        state_dict = {k: v for k, v in state_dict.items() if k in valid_fields}
+        state_dict = {k: v for k, v in state_dict.items() if k in _STATE_FIELDS}
         return SellerQualificationState(**state_dict)
 
     async def save_conversation_state(
@@ -323,12 +428,13 @@ class JorgeSellerBot:
         """
         Save conversation state to Redis with 7-day TTL.
 
+        Only the fields that changed since the state was loaded are written
+        (see ConversationStateStore).
+
         Args:
             contact_id: GHL contact ID
             state: Current conversation state
         """
-        key = f"seller:state:{contact_id}"
-
         # Convert dataclass to dict and serialize datetime fields
         state_dict = {
             'contact_id': state.contact_id,
@@ -353,7 +459,7 @@ class JorgeSellerBot:
         }
 
         # Save to Redis with 7-day TTL (604,800 seconds)
-        await self.cache.set(key, state_dict, ttl=604800)
+        await self._state_store.save(contact_id, state, state_dict)
 
         # Add to active contacts set (if Redis Set support available)
         if hasattr(self.cache, 'sadd'):
@@ -410,16 +516,41 @@ class JorgeSellerBot:
             self.logger.warning("Redis Set operations not available, returning empty list")
             return []
 
-        # Load each state
-        for contact_id in contact_ids:
-            state = await self.get_conversation_state(contact_id)
-            if state:
-                states.append(state)
-            else:
-                try:
-                    await self.cache.srem("seller:active_contacts", contact_id)
-                except Exception as e:
-                    self.logger.warning(f"Could not remove stale active contact {contact_id}: {e}")
+        # Load states a chunk at a time: one batched cache read per chunk, and
+        # the single-contact path (DB fallback + cache re-warm) only for misses
+        contact_ids = list(contact_ids)
+        stale: List[str] = []
+        db_slots = asyncio.Semaphore(_DB_RESTORE_CONCURRENCY)
+
+        async def restore(contact_id: str) -> Optional[SellerQualificationState]:
+            async with db_slots:
+                return await self.get_conversation_state(contact_id)
+
+        store = self._state_store
+        chunk_size = settings.cache_batch_size
+        for start in range(0, len(contact_ids), chunk_size):
+            chunk = contact_ids[start:start + chunk_size]
+            cached = await store.load_many(chunk)
+
+            missing = []
+            for contact_id in chunk:
+                if cached.get(contact_id):
+                    states.append(self._state_from_cache(cached[contact_id]))
+                else:
+                    missing.append(contact_id)
+
+            restored = await asyncio.gather(*(restore(cid) for cid in missing))
+            for contact_id, state in zip(missing, restored):
+                if state:
+                    states.append(state)
+                else:
+                    stale.append(contact_id)
+
+        if stale:
+            try:
+                await self.cache.srem("seller:active_contacts", *stale)
+            except Exception as e:
+                self.logger.warning(f"Could not remove {len(stale)} stale active contacts: {e}")
 
         return states
 
@@ -430,8 +561,7 @@ class JorgeSellerBot:
         Args:
             contact_id: GHL contact ID
         """
-        key = f"seller:state:{contact_id}"
-        await self.cache.delete(key)
+        await self._state_store.delete(contact_id)
 
         # Remove from active contacts set
         if hasattr(self.cache, 'srem'):
@@ -496,6 +626,7 @@ class JorgeSellerBot:
             # If scheduling has been offered but appointment not yet booked,
             # check if the lead replied with a slot selection (digit, ordinal, or day name).
             if state.scheduling_offered and not state.appointment_booked:
+                await self.calendar_service.load_pending_slots(contact_id)
                 slot_index = self.calendar_service.detect_slot_selection(message, contact_id)
                 if slot_index is not None:
                     booking = await self.calendar_service.book_appointment(
@@ -720,16 +851,25 @@ class JorgeSellerBot:
             if bot_reply:
                 history.append({"role": "assistant", "content": bot_reply})
 
-        # Get AI response from Claude (system prompt may be overridden via admin settings)
+        # Get AI response from Claude (system prompt may be overridden via admin
+        # settings).  In structured mode the same call also extracts the answer,
+        # so keyword misses need no extra classification calls.
         system_prompt = _get_bot_override("seller").get("system_prompt", SELLER_SYSTEM_PROMPT)
+        response_schema = TURN_SCHEMA if settings.claude_structured_turns else None
+        model_fields = None
         try:
             llm_response = await self.claude_client.agenerate(
                 prompt=prompt,
                 system_prompt=system_prompt,
+                cached_context=self._turn_context(),
                 history=history,
-                max_tokens=500
+                max_tokens=500,
+                response_schema=response_schema,
+                deadline_seconds=settings.claude_reply_deadline_seconds,
+                hedge=True,
+                channel="sms",
             )
-            ai_message = llm_response.content
+            ai_message, model_fields = structured_reply(llm_response)
         except Exception as e:
             self.logger.error(f"Claude API error: {e}")
             ai_message = self._get_fallback_response(current_q, state)
@@ -737,7 +877,8 @@ class JorgeSellerBot:
         # Extract data from user's response
         extracted_data = await self._extract_qualification_data(
             user_message=user_message,
-            question_num=current_q
+            question_num=current_q,
+            model_fields=model_fields,
         )
 
         # Determine if we should advance
@@ -769,16 +910,9 @@ class JorgeSellerBot:
                 offer_amount=f"${offer_amount:,}"
             )
 
-        prompt = f"""You are Jorge, a friendly and consultative real estate professional and cash home buyer in Rancho Cucamonga.
-
-PERSONALITY TRAITS:
-- Warm, professional, and easy to talk to
-- Genuinely helpful and focused on finding the best solution for the seller
-- Clear and straightforward without being pushy
-- Makes sellers feel heard and respected
-- Moves efficiently but never makes sellers feel rushed
-
-CURRENT SITUATION:
+        # Persona, personality and question script come from the system
+        # prompt and the cached turn context (see _turn_context)
+        prompt = f"""CURRENT SITUATION:
 You just asked: "{self._questions.get(current_question, '')}"
 
 Seller responded: "{user_message}"
@@ -812,6 +946,7 @@ RESPONSE (keep under 100 words):"""
                 max_tokens=20,
                 temperature=0.0,
                 complexity=TaskComplexity.ROUTINE,
+                memo_namespace=SELLER_CLASSIFY_NAMESPACE,
             )
             result = response.content.strip().lower()
             if result in valid_values:
@@ -823,12 +958,15 @@ RESPONSE (keep under 100 words):"""
     async def _extract_qualification_data(
         self,
         user_message: str,
-        question_num: int
+        question_num: int,
+        model_fields: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Extract structured data from user's response.
 
-        Uses pattern matching + AI for robust extraction.
+        Uses pattern matching + AI for robust extraction.  Keyword matches
+        win; otherwise ``model_fields`` (returned with the reply by a
+        structured turn) are used before making a separate Claude call.
         """
         extracted = {}
         message_lower = user_message.lower()
@@ -856,10 +994,12 @@ RESPONSE (keep under 100 words):"""
             ]):
                 extracted["condition"] = "move_in_ready"
             else:
-                extracted["condition"] = await self._classify_with_claude(
+                extracted["condition"] = _answer_choice(
+                    model_fields, "condition", CONDITION_VALUES
+                ) or await self._classify_with_claude(
                     user_message,
                     "Classify this home condition description.",
-                    ["needs_major_repairs", "needs_minor_repairs", "move_in_ready"],
+                    CONDITION_VALUES,
                     "needs_minor_repairs"
                 )
 
@@ -886,7 +1026,14 @@ RESPONSE (keep under 100 words):"""
                         extracted["price_expectation"] = price
                     break
 
-            if "price_expectation" not in extracted:
+            model_price = (model_fields or {}).get("price_expectation")
+            if "price_expectation" not in extracted and model_fields is not None:
+                # No digit found — the structured turn read the price (or found none)
+                if isinstance(model_price, int) and not isinstance(model_price, bool) and model_price > 0:
+                    extracted["price_expectation"] = model_price * 1000 if model_price < 10000 else model_price
+                else:
+                    extracted["price_expectation"] = 300000
+            elif "price_expectation" not in extracted:
                 # No digit found — use Haiku to extract price from text like "around three fifty"
                 try:
                     haiku_prompt = (
@@ -900,6 +1047,7 @@ RESPONSE (keep under 100 words):"""
                         max_tokens=20,
                         temperature=0.0,
                         complexity=TaskComplexity.ROUTINE,
+                        memo_namespace=SELLER_CLASSIFY_NAMESPACE,
                     )
                     price = int(haiku_resp.content.strip().replace(",", "").replace("$", ""))
                     if price < 10000:
@@ -953,12 +1101,12 @@ RESPONSE (keep under 100 words):"""
                     break
 
             if "motivation" not in extracted:
-                extracted["motivation"] = await self._classify_with_claude(
+                extracted["motivation"] = _answer_choice(
+                    model_fields, "motivation", MOTIVATION_VALUES
+                ) or await self._classify_with_claude(
                     user_message,
                     "Classify the seller's motivation to sell their home.",
-                    ["job_relocation", "divorce", "foreclosure", "financial_distress",
-                     "inheritance", "downsizing", "upsizing", "medical_emergency",
-                     "retirement", "landlord_exit", "other"],
+                    MOTIVATION_VALUES,
                     "financial_distress"
                 )
 
@@ -983,7 +1131,8 @@ RESPONSE (keep under 100 words):"""
             ]):
                 extracted["offer_accepted"] = False
             else:
-                extracted["offer_accepted"] = False
+                # No keyword either way: trust an explicit yes from the structured turn
+                extracted["offer_accepted"] = (model_fields or {}).get("offer_accepted") is True
 
             # Timeline acceptance is independent — check for explicit pushback
             timeline_pushback = any(phrase in message_lower for phrase in [
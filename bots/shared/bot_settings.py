@@ -4,8 +4,9 @@ In-memory bot settings store.
 Only stores *overrides* — bots fall back to their own hardcoded defaults
 when no override is set, so there's no duplication or drift.
 
-Overrides apply at request time (no restart needed) but are lost on process
-restart; the dashboard re-saves them after any deployment.
+Overrides apply at request time (no restart needed).  The lead bot persists
+them to the cache on every admin update and each worker process reloads
+them when the stored version changes (see ``routes_admin.settings_sync``).
 """
 from __future__ import annotations
 
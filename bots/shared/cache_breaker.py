@@ -0,0 +1,169 @@
+"""
+Circuit breaker for the Redis cache backend.
+
+Without it, every cache call during a Redis outage waits for the socket
+timeout before ``CacheService`` falls back to memory.  After
+``cache_breaker_failure_threshold`` consecutive errors the breaker opens:
+
+- ``CacheService`` sends traffic straight to the memory backend.
+- A background probe reads Redis every ``cache_breaker_probe_interval_seconds``.
+- Writes and deletes of keys under ``cache_breaker_replay_prefixes``
+  (conversation state, bot assignment) are journaled while open.  When the
+  probe succeeds, the journal is replayed to Redis from the memory copies
+  before the breaker closes.  Replay is last-writer-wins, so it is limited to
+  keys this worker owns during a conversation turn.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+
+
+class CacheCircuitOpenError(Exception):
+    """The Redis circuit breaker is open; the call was not attempted."""
+
+
+class CacheCircuitBreaker:
+    """Consecutive-failure breaker with a background probe and write journal."""
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        probe_interval_seconds: Optional[float] = None,
+        replay_prefixes: Optional[Tuple[str, ...]] = None,
+        replay_max_keys: Optional[int] = None,
+    ):
+        if replay_prefixes is None:
+            replay_prefixes = tuple(
+                p.strip() for p in settings.cache_breaker_replay_prefixes.split(",") if p.strip()
+            )
+        self.failure_threshold = failure_threshold or settings.cache_breaker_failure_threshold
+        self.probe_interval_seconds = (
+            settings.cache_breaker_probe_interval_seconds
+            if probe_interval_seconds is None else probe_interval_seconds
+        )
+        self.replay_prefixes = tuple(replay_prefixes)
+        self.replay_max_keys = replay_max_keys or settings.cache_breaker_replay_max_keys
+        self.state = CLOSED
+        self.failure_count = 0
+        self.opened_at: Optional[float] = None
+        # key -> absolute expiry of the write, or None for a delete
+        self._journal: "OrderedDict[str, Optional[float]]" = OrderedDict()
+        self._probe_task: Optional[asyncio.Task] = None
+        self.trips = 0
+        self.replayed = 0
+        self.journal_dropped = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def check(self, op: str) -> None:
+        """Raise ``CacheCircuitOpenError`` instead of calling Redis while open."""
+        if self.state == OPEN:
+            raise CacheCircuitOpenError(f"Redis circuit open, skipped {op}")
+
+    def record_success(self) -> None:
+        self.failure_count = 0
+
+    def record_failure(
+        self,
+        probe: Callable[[], Awaitable[Any]],
+        replay: Callable[[Dict[str, Optional[float]]], Awaitable[None]],
+    ) -> None:
+        """Count an error; on the threshold, open and start probing Redis."""
+        self.failure_count += 1
+        if self.state == OPEN or self.failure_count < self.failure_threshold:
+            return
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.trips += 1
+        logger.warning(
+            f"Redis circuit breaker opened after {self.failure_count} failures; "
+            f"serving from memory"
+        )
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe(probe, replay))
+
+    # ---- write journal ---------------------------------------------------
+
+    def record_write(self, key: str, ttl: int) -> None:
+        self._record(key, time.time() + ttl)
+
+    def record_delete(self, key: str) -> None:
+        self._record(key, None)
+
+    def _record(self, key: str, expires_at: Optional[float]) -> None:
+        if self.state != OPEN or not self.replay_prefixes or not key.startswith(self.replay_prefixes):
+            return
+        self._journal.pop(key, None)
+        self._journal[key] = expires_at
+        if len(self._journal) > self.replay_max_keys:
+            self._journal.popitem(last=False)
+            self.journal_dropped += 1
+
+    # ---- recovery --------------------------------------------------------
+
+    async def _probe(
+        self,
+        probe: Callable[[], Awaitable[Any]],
+        replay: Callable[[Dict[str, Optional[float]]], Awaitable[None]],
+    ) -> None:
+        while self.state == OPEN:
+            await asyncio.sleep(self.probe_interval_seconds)
+            try:
+                await probe()
+                # Writes made while replaying are journaled too; loop until drained
+                while self._journal:
+                    await self._replay_journal(replay)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Redis still unavailable: {e}")
+                continue
+            outage = time.time() - (self.opened_at or time.time())
+            self.state = CLOSED
+            self.failure_count = 0
+            logger.info(f"Redis circuit breaker closed after {outage:.1f}s")
+
+    async def _replay_journal(
+        self, replay: Callable[[Dict[str, Optional[float]]], Awaitable[None]]
+    ) -> None:
+        journal, self._journal = self._journal, OrderedDict()
+        try:
+            await replay(dict(journal))
+        except BaseException:
+            # Put the batch back ahead of anything journaled since
+            for key, expires_at in self._journal.items():
+                journal.pop(key, None)
+                journal[key] = expires_at
+            self._journal = journal
+            raise
+        self.replayed += len(journal)
+
+    async def stop(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_count": self.failure_count,
+            "trips": self.trips,
+            "journaled": len(self._journal),
+            "replayed": self.replayed,
+            "journal_dropped": self.journal_dropped,
+        }
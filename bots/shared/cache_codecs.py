@@ -0,0 +1,253 @@
+"""
+Value codecs for RedisCache.
+
+Every value written to Redis is ``<tag byte><payload>``.  The low nibble of
+the tag names the codec, the high nibble the compression applied to the
+payload:
+
+    codec:        1 pickle, 2 orjson, 3 msgpack
+    compression:  0 none, 1 zlib, 2 zstd, 3 lz4
+
+Values written before codecs existed are bare pickles (first byte 0x80) and
+are still decoded, so switching ``CACHE_CODEC`` needs no migration.
+
+Values a codec cannot represent exactly (sets, int dict keys, datetimes,
+dataclasses, ...) are written with pickle instead; the tag tells the reader
+which codec to use.  orjson and msgpack store tuples as lists.
+
+orjson, msgpack, zstandard and lz4 are optional: a configured codec whose
+package is missing falls back to pickle (and zlib for compression).
+"""
+import pickle
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+PICKLE_CODEC = 1
+ORJSON_CODEC = 2
+MSGPACK_CODEC = 3
+
+NO_COMPRESSION = 0
+ZLIB_COMPRESSION = 1
+ZSTD_COMPRESSION = 2
+LZ4_COMPRESSION = 3
+
+_LEGACY_PICKLE_PREFIX = 0x80
+
+
+class Codec:
+    """Encodes values to bytes; ``encode`` raises TypeError/ValueError when it can't."""
+
+    name = ""
+    tag = 0
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class PickleCodec(Codec):
+    name = "pickle"
+    tag = PICKLE_CODEC
+
+    def encode(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+    tag = ORJSON_CODEC
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        # Hand these back to ``default`` (which rejects them) instead of
+        # silently turning them into strings/dicts
+        self._options = (
+            orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_SUBCLASS
+        )
+
+    def encode(self, value: Any) -> bytes:
+        return self._orjson.dumps(value, option=self._options)
+
+    def decode(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+    tag = MSGPACK_CODEC
+
+    def __init__(self):
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def encode(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+_CODECS: Dict[str, Tuple[int, Callable[[], Codec]]] = {
+    "pickle": (PICKLE_CODEC, PickleCodec),
+    "orjson": (ORJSON_CODEC, OrjsonCodec),
+    "msgpack": (MSGPACK_CODEC, MsgpackCodec),
+}
+
+
+def _zstd() -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    import zstandard
+
+    compressor = zstandard.ZstdCompressor(level=3)
+    decompressor = zstandard.ZstdDecompressor()
+    return compressor.compress, decompressor.decompress
+
+
+def _lz4() -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    import lz4.frame
+
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+def _zlib() -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    return (lambda data: zlib.compress(data, 1)), zlib.decompress
+
+
+_COMPRESSORS: Dict[str, Tuple[int, Callable[[], Tuple[Callable, Callable]]]] = {
+    "zlib": (ZLIB_COMPRESSION, _zlib),
+    "zstd": (ZSTD_COMPRESSION, _zstd),
+    "lz4": (LZ4_COMPRESSION, _lz4),
+}
+
+
+class ValueSerializer:
+    """Tagged encode/decode of cache values with optional compression."""
+
+    def __init__(
+        self,
+        codec: Optional[str] = None,
+        compression: Optional[str] = None,
+        compress_min_bytes: Optional[int] = None,
+    ):
+        codec = (codec or settings.cache_codec).lower()
+        compression = (compression or settings.cache_compression).lower()
+        self.compress_min_bytes = (
+            settings.cache_compress_min_bytes if compress_min_bytes is None else compress_min_bytes
+        )
+
+        self._pickle = PickleCodec()
+        self.codec: Codec = self._load_codec(codec)
+        self.compression_tag = NO_COMPRESSION
+        self._compress: Optional[Callable[[bytes], bytes]] = None
+        if compression not in ("", "none"):
+            self.compression_tag, self._compress = self._load_compressor(compression)
+
+        # Decoders are resolved lazily so a missing optional package only
+        # matters if a value actually uses it
+        self._decoders: Dict[int, Codec] = {PICKLE_CODEC: self._pickle, self.codec.tag: self.codec}
+        self._decompressors: Dict[int, Callable[[bytes], bytes]] = {}
+
+    def _load_codec(self, name: str) -> Codec:
+        if name not in _CODECS:
+            logger.warning(f"Unknown cache codec {name!r}, using pickle")
+            return self._pickle
+        try:
+            return _CODECS[name][1]()
+        except ImportError:
+            logger.warning(f"Cache codec {name!r} not installed, using pickle")
+            return self._pickle
+
+    @staticmethod
+    def _load_compressor(name: str) -> Tuple[int, Optional[Callable[[bytes], bytes]]]:
+        if name not in _COMPRESSORS:
+            logger.warning(f"Unknown cache compression {name!r}, compression disabled")
+            return NO_COMPRESSION, None
+        tag, factory = _COMPRESSORS[name]
+        try:
+            return tag, factory()[0]
+        except ImportError:
+            logger.warning(f"Cache compression {name!r} not installed, using zlib")
+            return ZLIB_COMPRESSION, _zlib()[0]
+
+    @property
+    def name(self) -> str:
+        return self.codec.name
+
+    def dumps(self, value: Any) -> bytes:
+        """Encode ``value`` as ``<tag><payload>``."""
+        codec = self.codec
+        try:
+            payload = codec.encode(value)
+        except (TypeError, ValueError, OverflowError):
+            codec = self._pickle
+            payload = codec.encode(value)
+
+        compression = NO_COMPRESSION
+        if self._compress is not None and len(payload) >= self.compress_min_bytes:
+            compressed = self._compress(payload)
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression_tag
+
+        return bytes((compression << 4 | codec.tag,)) + payload
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a value written by ``dumps`` (or a bare legacy pickle)."""
+        tag = data[0]
+        if tag == _LEGACY_PICKLE_PREFIX:
+            return pickle.loads(data)
+
+        payload = memoryview(data)[1:]
+        compression = tag >> 4
+        if compression:
+            payload = self._decompressor(compression)(payload)
+        return self._decoder(tag & 0x0F).decode(bytes(payload))
+
+    def dumps_field(self, value: Any) -> bytes:
+        """Encode a hash field: ints as plain decimal (so HINCRBY works), else ``dumps``."""
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value).encode("ascii")
+        return self.dumps(value)
+
+    def loads_field(self, data: bytes) -> Any:
+        """Decode a field written by ``dumps_field`` or HINCRBY.
+
+        Tagged values are never all digits: an lz4 tag (0x3X) is followed by
+        a binary frame header.
+        """
+        if data.isdigit() or (data[:1] == b"-" and data[1:].isdigit()):
+            return int(data)
+        return self.loads(data)
+
+    def _decoder(self, codec_tag: int) -> Codec:
+        if codec_tag not in self._decoders:
+            for tag, factory in _CODECS.values():
+                if tag == codec_tag:
+                    self._decoders[codec_tag] = factory()
+                    break
+            else:
+                raise ValueError(f"Unknown cache codec tag {codec_tag}")
+        return self._decoders[codec_tag]
+
+    def _decompressor(self, compression_tag: int) -> Callable[[bytes], bytes]:
+        if compression_tag not in self._decompressors:
+            for tag, factory in _COMPRESSORS.values():
+                if tag == compression_tag:
+                    self._decompressors[compression_tag] = factory()[1]
+                    break
+            else:
+                raise ValueError(f"Unknown cache compression tag {compression_tag}")
+        return self._decompressors[compression_tag]
@@ -6,17 +6,47 @@ Simplified version from EnterpriseHub focused on Jorge's needs.
 """
 from __future__ import annotations
 
+import asyncio
+import heapq
+import inspect
 import pickle
+import random
+import sys
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from bots.shared.cache_breaker import CacheCircuitBreaker, CacheCircuitOpenError
+from bots.shared.cache_codecs import ValueSerializer
+from bots.shared.cache_stats import CacheKeyStats, KeySample, collect_key_stats, profile_keyspace
+from bots.shared.computation_cache import COMPUTED, computation_cache
 from bots.shared.config import settings
 from bots.shared.event_broker import event_broker
 from bots.shared.logger import get_logger
+from bots.shared.near_cache import NearCache
+from bots.shared.redis_connection import create_pubsub_client, create_redis_client
+from bots.shared.token_bucket import BucketSpec, RateLimitDecision, decide, take_tokens_via_get_set
+from bots.shared.webhook_admission import (
+    ASSIGNED_BOT_TTL_SECONDS,
+    DEDUP_TTL_SECONDS,
+    AdmissionKeys,
+    WebhookAdmission,
+    admit_stepwise,
+)
 
 logger = get_logger(__name__)
 
+# Namespace generations (see CacheService.invalidate_namespace)
+NAMESPACE_GENERATION_PREFIX = "ns:gen:"
+_NAMESPACE_COUNTER_PREFIX = "ns:counter:"
+_NAMESPACE_FINGERPRINT_PREFIX = "ns:fingerprint:"
+_NAMESPACE_TTL_SECONDS = 7_776_000  # 90 days
+
+# AI output derived from bot prompts/settings (invalidated when they change)
+LEAD_INTEL_NAMESPACE = "lead_intel"
+SELLER_CLASSIFY_NAMESPACE = "seller_classify"  # memoized seller classifications
+
 
 class AbstractCache(ABC):
     """Abstract base class for cache backends."""
@@ -36,6 +66,21 @@ class AbstractCache(ABC):
         """Delete value from cache."""
         pass
 
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several keys at once; missing keys are left out of the result."""
+        pass
+
+    @abstractmethod
+    async def set_many(self, items: Dict[str, Any], ttl: int = 300) -> bool:
+        """Set several keys with the same TTL."""
+        pass
+
+    @abstractmethod
+    async def delete_many(self, keys: List[str]) -> int:
+        """Delete several keys; returns how many existed."""
+        pass
+
     @abstractmethod
     async def sadd(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
         """Add one or more values to a set."""
@@ -51,60 +96,404 @@ class AbstractCache(ABC):
         """Remove one or more values from a set."""
         pass
 
+    @abstractmethod
+    async def rpush(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
+        """Append values to a list. Returns the new list length."""
+        pass
+
+    @abstractmethod
+    async def drain_list(self, key: str, expected_length: int) -> Optional[List[str]]:
+        """Atomically return and delete a list, only if it has ``expected_length`` items."""
+        pass
+
+    @abstractmethod
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None) -> int:
+        """Set hash fields, each value encoded on its own. Returns how many fields were new.
+
+        With an empty mapping only the TTL of an existing hash is refreshed.
+        """
+        pass
+
+    @abstractmethod
+    async def hdel(self, key: str, *fields: str) -> int:
+        """Delete hash fields. Returns how many existed."""
+        pass
+
+    @abstractmethod
+    async def hgetall(self, key: str) -> Dict[str, Any]:
+        """All fields of a hash (empty if the key is missing)."""
+        pass
+
+    @abstractmethod
+    async def hgetall_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Several hashes at once; missing keys are left out of the result."""
+        pass
+
+    @abstractmethod
+    async def hincrby(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        """Atomically add ``amount`` to an integer hash field. Returns the new value."""
+        pass
+
+    @abstractmethod
+    async def lpush_capped(
+        self, key: str, values: List[Any], max_length: int, ttl: Optional[int] = None
+    ) -> int:
+        """Push encoded values onto the head of a list and trim it to ``max_length`` items.
+
+        The last value ends up first. With no values only the TTL is refreshed.
+        Returns the list length.
+        """
+        pass
+
+    @abstractmethod
+    async def lrange(self, key: str, start: int = 0, end: int = -1) -> List[Any]:
+        """Items ``start``..``end`` (inclusive) of a list written by ``lpush_capped``."""
+        pass
+
+    @abstractmethod
+    async def lrange_many(self, keys: List[str], start: int = 0, end: int = -1) -> Dict[str, List[Any]]:
+        """``lrange`` of several lists at once; empty lists are left out of the result."""
+        pass
+
+    @abstractmethod
+    async def take_tokens(self, key: str, bucket: BucketSpec, cost: int = 1) -> RateLimitDecision:
+        """Atomically take ``cost`` tokens from a token bucket."""
+        pass
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, token: str, ttl: int = 30) -> bool:
+        """Atomically claim a lock key for ``token`` if nobody holds it."""
+        pass
+
+    @abstractmethod
+    async def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock key, but only if it is still held by ``token``."""
+        pass
+
+    @abstractmethod
+    async def admit_webhook(
+        self,
+        keys: AdmissionKeys,
+        bucket: BucketSpec,
+        bot_type: str = "",
+        lock_token: Optional[str] = None,
+        lock_ttl: int = 30,
+    ) -> WebhookAdmission:
+        """Atomically run the webhook throttle/dedup/lock/assignment checks."""
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> int:
+        """Publish a message on a pub/sub channel; returns the receiver count."""
+        pass
+
+    @abstractmethod
+    async def subscribe(self, channel: str) -> "Subscription":
+        """Subscribe to a channel; iterate the result for messages (str)."""
+        pass
+
+    @abstractmethod
+    async def sample_keys(self, limit: int) -> Tuple[List[KeySample], int]:
+        """Up to ``limit`` random keys with size and TTL, plus the total key count."""
+        pass
+
+
+class Subscription:
+    """Async iterator over pub/sub messages; ``close()`` unsubscribes."""
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> str:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class _MemorySubscription(Subscription):
+    def __init__(self, subscribers: Dict[str, List[asyncio.Queue]], channel: str):
+        self._subscribers = subscribers
+        self._channel = channel
+        self._queue: asyncio.Queue = asyncio.Queue()
+        subscribers.setdefault(channel, []).append(self._queue)
+
+    async def __anext__(self) -> str:
+        return await self._queue.get()
+
+    async def close(self) -> None:
+        queues = self._subscribers.get(self._channel, [])
+        if self._queue in queues:
+            queues.remove(self._queue)
+
+
+class _RedisSubscription(Subscription):
+    """Wraps a redis-py PubSub.
+
+    redis-py silently reconnects and re-subscribes a dropped pub/sub
+    connection; messages published in between are lost, so a reconnect ends
+    the iteration with ConnectionError and subscribers start over.
+    """
+
+    def __init__(self, pubsub: Any):
+        self._pubsub = pubsub
+        self._messages = pubsub.listen()
+        self._connections = 0
+        connection = getattr(pubsub, "connection", None)
+        if connection is not None and hasattr(connection, "register_connect_callback"):
+            connection.register_connect_callback(self._on_connect)
+
+    def _on_connect(self, connection: Any) -> None:
+        self._connections += 1
+
+    async def __anext__(self) -> str:
+        while True:
+            message = await self._messages.__anext__()
+            if self._connections:
+                raise ConnectionError("pub/sub connection was re-established")
+            if message.get("type") == "message":
+                data = message["data"]
+                return data.decode("utf-8") if isinstance(data, bytes) else data
+
+    async def close(self) -> None:
+        await self._pubsub.reset()
+
+
+class _MemoryHash(dict):
+    """A MemoryCache hash (``hset``), as opposed to a dict stored with ``set``."""
+
+
+class _MemoryList(list):
+    """A MemoryCache list written by ``lpush_capped`` (newest item first)."""
+
 
 class MemoryCache(AbstractCache):
-    """In-memory cache fallback."""
+    """
+    In-memory cache fallback.
+
+    Bounded LRU: once ``max_entries`` or ``max_bytes`` (approximate pickled
+    size) is exceeded, expired entries are dropped first and then the least
+    recently used ones.  Expired keys are also removed by an incremental
+    sweep (at most ``sweep_batch`` keys, every ``sweep_interval`` seconds,
+    driven by writes) instead of only when the exact key is read again.
+    """
+
+    # Rough per-entry overhead of the dict slots, expiry and heap records
+    ENTRY_OVERHEAD_BYTES = 120
 
-    def __init__(self):
-        self._cache: Dict[str, Any] = {}
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sweep_interval: Optional[float] = None,
+        sweep_batch: Optional[int] = None,
+    ):
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
         self._expiry: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self.max_entries = max_entries or settings.memory_cache_max_entries
+        self.max_bytes = max_bytes or settings.memory_cache_max_mb * 1024 * 1024
+        self.sweep_interval = (
+            settings.memory_cache_sweep_interval_seconds if sweep_interval is None else sweep_interval
+        )
+        self.sweep_batch = sweep_batch or settings.memory_cache_sweep_batch
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+        self.evictions = 0
+        self.expirations = 0
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
         logger.info("Initialized MemoryCache")
 
+    # ---- bookkeeping -----------------------------------------------------
+
+    @staticmethod
+    def _payload_size(value: Any) -> int:
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return sys.getsizeof(value)
+
+    @staticmethod
+    def _item_size(item: Any) -> int:
+        """Approximate pickled size of one member inside a container."""
+        if isinstance(item, (str, bytes)):
+            return len(item) + 5
+        if isinstance(item, (int, float)):
+            return 9
+        # Drop the protocol/frame header that a standalone dump carries
+        return max(1, MemoryCache._payload_size(item) - 11)
+
+    @staticmethod
+    def _approx_size(key: str, value: Any) -> int:
+        return MemoryCache._payload_size(value) + len(key) + MemoryCache.ENTRY_OVERHEAD_BYTES
+
+    def _resized(self, key: str, reused: bool, empty: Any, added: Iterable = (), removed: Iterable = ()) -> int:
+        """
+        Size of a set/hash/list entry after a partial update, from its
+        previous size and only the items added/removed - re-pickling the
+        whole container on every ``sadd``/``srem`` would be O(n).
+        """
+        size = self._sizes.get(key, 0) if reused else self._approx_size(key, empty)
+        size += sum(map(self._item_size, added))
+        size -= sum(map(self._item_size, removed))
+        return size
+
+    def _store(
+        self, key: str, value: Any, expires_at: Optional[float] = None, size: Optional[int] = None
+    ) -> None:
+        """Insert/update an entry, refresh its LRU position and enforce the bounds."""
+        self._bytes -= self._sizes.get(key, 0)
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if size is None:
+            size = self._approx_size(key, value)
+        self._sizes[key] = size
+        self._bytes += size
+        if expires_at is not None:
+            self._expiry[key] = expires_at
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+        self._maybe_sweep()
+        self._enforce_bounds()
+
+    def _remove(self, key: str) -> None:
+        self._cache.pop(key, None)
+        self._expiry.pop(key, None)
+        self._bytes -= self._sizes.pop(key, 0)
+
+    def discard(self, key: str) -> bool:
+        """Synchronous delete, for callbacks outside a coroutine."""
+        if key in self._cache:
+            self._remove(key)
+            return True
+        return False
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._expiry.clear()
+        self._sizes.clear()
+        self._expiry_heap = []
+        self._bytes = 0
+
+    def _enforce_bounds(self) -> None:
+        if len(self._cache) <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+        self.sweep(self.sweep_batch)
+        while self._cache and (len(self._cache) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self.evictions += 1
+
+    def _maybe_sweep(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.sweep(self.sweep_batch)
+
+    def sweep(self, max_keys: Optional[int] = None) -> int:
+        """Remove up to ``max_keys`` expired entries (all of them if None)."""
+        now = time.time()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now and (max_keys is None or removed < max_keys):
+            expires_at, key = heapq.heappop(heap)
+            # Skip heap records superseded by a later write
+            if key in self._cache and self._expiry.get(key) == expires_at:
+                self._remove(key)
+                self.expirations += 1
+                removed += 1
+        # Drop stale heap records once they dominate the heap
+        if len(heap) > 2 * len(self._expiry) + 1024:
+            self._expiry_heap = [(exp, k) for k, exp in self._expiry.items()]
+            heapq.heapify(self._expiry_heap)
+        return removed
+
+    def _is_expired(self, key: str) -> bool:
+        if time.time() > self._expiry.get(key, 0):
+            if key in self._cache:
+                self._remove(key)
+                self.expirations += 1
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry count, approximate memory use and eviction/expiry counters."""
+        return {
+            "entries": len(self._cache),
+            "approx_bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    # ---- AbstractCache ---------------------------------------------------
+
     async def get(self, key: str) -> Optional[Any]:
         if key not in self._cache:
             return None
 
-        if time.time() > self._expiry.get(key, 0):
-            await self.delete(key)
+        if self._is_expired(key):
             return None
 
+        self._cache.move_to_end(key)
         return self._cache[key]
 
     async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        self._cache[key] = value
-        self._expiry[key] = time.time() + ttl
+        self._store(key, value, time.time() + ttl)
         return True
 
     async def delete(self, key: str) -> bool:
-        if key in self._cache:
-            del self._cache[key]
-            del self._expiry[key]
-            return True
-        return False
+        return self.discard(key)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        found = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = 300) -> bool:
+        expires_at = time.time() + ttl
+        for key, value in items.items():
+            self._store(key, value, expires_at)
+        return True
+
+    async def delete_many(self, keys: List[str]) -> int:
+        return sum(self.discard(key) for key in keys)
+
+    async def increment(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        current = await self.get(key)
+        value = int(current or 0) + amount
+        self._store(key, value, time.time() + (ttl or 86400) if current is None else None)
+        return value
 
     async def sadd(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
         if not values:
             return 0
 
-        current = self._cache.get(key)
-        if not isinstance(current, set):
+        current = await self.get(key)
+        reused = isinstance(current, set)
+        if not reused:
             current = set()
 
-        before_count = len(current)
-        current.update(values)
-        self._cache[key] = current
+        added = set(values) - current
+        current.update(added)
         if ttl:
-            self._expiry[key] = time.time() + ttl
+            expires_at = time.time() + ttl
         elif key not in self._expiry:
-            self._expiry[key] = time.time() + 86400
-        return len(current) - before_count
+            expires_at = time.time() + 86400
+        else:
+            expires_at = None
+        self._store(key, current, expires_at, self._resized(key, reused, set(), added=added))
+        return len(added)
 
     async def smembers(self, key: str) -> set[str]:
-        if time.time() > self._expiry.get(key, 0):
-            await self.delete(key)
+        if self._is_expired(key):
             return set()
 
-        value = self._cache.get(key)
+        value = await self.get(key)
         if isinstance(value, set):
             return set(value)
         return set()
@@ -113,39 +502,291 @@ class MemoryCache(AbstractCache):
         if not values:
             return 0
 
-        current = self._cache.get(key)
+        current = await self.get(key)
         if not isinstance(current, set):
             return 0
 
-        removed = 0
-        for value in values:
-            if value in current:
-                current.remove(value)
-                removed += 1
+        removed = current.intersection(values)
+        current.difference_update(removed)
 
         if current:
-            self._cache[key] = current
+            self._store(key, current, size=self._resized(key, True, set(), removed=removed))
         else:
             await self.delete(key)
 
-        return removed
+        return len(removed)
+
+    async def rpush(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
+        current = await self.get(key)
+        reused = isinstance(current, list)
+        if not reused:
+            current = []
+        current.extend(values)
+        if ttl:
+            expires_at = time.time() + ttl
+        elif key not in self._expiry:
+            expires_at = time.time() + 86400
+        else:
+            expires_at = None
+        self._store(key, current, expires_at, self._resized(key, reused, [], added=values))
+        return len(current)
+
+    async def drain_list(self, key: str, expected_length: int) -> Optional[List[str]]:
+        current = await self.get(key)
+        if not isinstance(current, list) or len(current) != expected_length:
+            return None
+        await self.delete(key)
+        return list(current)
+
+    def _write_expiry(self, key: str, ttl: Optional[int]) -> Optional[float]:
+        """Expiry for a write to a hash/list: ``ttl`` if given, else keep (or default) it."""
+        if ttl:
+            return time.time() + ttl
+        if key not in self._expiry:
+            return time.time() + 86400
+        return None
+
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None) -> int:
+        stored = await self.get(key)
+        reused = isinstance(stored, _MemoryHash)
+        if not reused and not mapping:
+            return 0
+        current = stored if isinstance(stored, _MemoryHash) else _MemoryHash()
+        new_fields = mapping.keys() - current.keys()
+        replaced = [current[field] for field in mapping.keys() & current.keys()]
+        size = self._resized(
+            key, reused, _MemoryHash(), added=[*new_fields, *mapping.values()], removed=replaced
+        )
+        current.update(mapping)
+        self._store(key, current, self._write_expiry(key, ttl), size)
+        return len(new_fields)
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        current = await self.get(key)
+        if not isinstance(current, _MemoryHash):
+            return 0
+        removed = [name for name in fields if name in current]
+        if not removed:
+            return 0
+        values = [current.pop(name) for name in removed]
+        size = self._resized(key, True, _MemoryHash(), removed=[*removed, *values])
+        if current:
+            self._store(key, current, size=size)
+        else:
+            self.discard(key)
+        return len(removed)
+
+    async def hgetall(self, key: str) -> Dict[str, Any]:
+        current = await self.get(key)
+        return dict(current) if isinstance(current, _MemoryHash) else {}
+
+    async def hgetall_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        for key in keys:
+            fields = await self.hgetall(key)
+            if fields:
+                found[key] = fields
+        return found
+
+    async def hincrby(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        current = await self.hgetall(key)
+        value = int(current.get(field, 0)) + amount
+        await self.hset(key, {field: value}, ttl)
+        return value
+
+    async def lpush_capped(
+        self, key: str, values: List[Any], max_length: int, ttl: Optional[int] = None
+    ) -> int:
+        stored = await self.get(key)
+        reused = isinstance(stored, _MemoryList)
+        if not reused and not values:
+            return 0
+        previous = stored if isinstance(stored, _MemoryList) else _MemoryList()
+        merged = [*reversed(values), *previous]
+        size = self._resized(key, reused, _MemoryList(), added=values, removed=merged[max_length:])
+        current = _MemoryList(merged[:max_length])
+        self._store(key, current, self._write_expiry(key, ttl), size)
+        return len(current)
+
+    async def lrange(self, key: str, start: int = 0, end: int = -1) -> List[Any]:
+        current = await self.get(key)
+        if not isinstance(current, _MemoryList):
+            return []
+        return current[start:None if end == -1 else end + 1]
+
+    async def lrange_many(self, keys: List[str], start: int = 0, end: int = -1) -> Dict[str, List[Any]]:
+        found = {}
+        for key in keys:
+            items = await self.lrange(key, start, end)
+            if items:
+                found[key] = items
+        return found
+
+    async def take_tokens(self, key: str, bucket: BucketSpec, cost: int = 1) -> RateLimitDecision:
+        return await take_tokens_via_get_set(self, key, bucket, cost)
+
+    async def acquire_lock(self, key: str, token: str, ttl: int = 30) -> bool:
+        # Single-threaded event loop: check-then-set cannot interleave here
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, token, ttl)
+        return True
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        if await self.get(key) != token:
+            return False
+        return await self.delete(key)
+
+    async def admit_webhook(
+        self,
+        keys: AdmissionKeys,
+        bucket: BucketSpec,
+        bot_type: str = "",
+        lock_token: Optional[str] = None,
+        lock_ttl: int = 30,
+    ) -> WebhookAdmission:
+        # None of the steps yield to the event loop, so this is atomic here
+        return await admit_stepwise(self, keys, bucket, bot_type, lock_token, lock_ttl)
+
+    async def publish(self, channel: str, message: str) -> int:
+        queues = self._subscribers.get(channel, [])
+        for queue in queues:
+            queue.put_nowait(message)
+        return len(queues)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        return _MemorySubscription(self._subscribers, channel)
+
+    async def sample_keys(self, limit: int) -> Tuple[List[KeySample], int]:
+        keys = list(self._cache)
+        total = len(keys)
+        if total > limit:
+            keys = random.sample(keys, limit)
+        now = time.time()
+        samples = []
+        for key in keys:
+            expires_at = self._expiry.get(key)
+            ttl = None if expires_at is None else max(0.0, expires_at - now)
+            samples.append(KeySample(key, self._sizes.get(key, 0), ttl))
+        return samples, total
+
+
+# Delete a lock key only if it still holds the caller's token
+_RELEASE_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Return and delete a list only if nothing was appended since the caller's push
+_DRAIN_LIST_LUA = """
+if redis.call('llen', KEYS[1]) ~= tonumber(ARGV[1]) then
+    return false
+end
+local items = redis.call('lrange', KEYS[1], 0, -1)
+redis.call('del', KEYS[1])
+return items
+"""
+
+# Token bucket stored as a hash {tokens, ts}; the caller supplies ``now`` so
+# the script stays deterministic.  Returns allowed (0/1) and tokens left.
+_TOKEN_BUCKET_LUA_FN = """
+local function take_tokens(key, capacity, rate, now, ttl, cost)
+    local state = redis.call('hmget', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < cost then
+        return 0, tokens
+    end
+    tokens = math.min(capacity, tokens - cost)
+    redis.call('hset', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('expire', key, ttl)
+    return 1, tokens
+end
+"""
+
+# KEYS: bucket; ARGV: capacity, refill_per_second, now, ttl, cost
+_TAKE_TOKENS_LUA = _TOKEN_BUCKET_LUA_FN + """
+local allowed, tokens = take_tokens(KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]),
+    tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5]))
+return {allowed, tostring(tokens)}
+"""
+
+# Dedup -> lock -> bot assignment for one contact, all keys in the contact's slot.
+# In cluster mode the location's rate bucket lives in another slot, so the
+# throttle runs first as its own _TAKE_TOKENS_LUA call.
+# KEYS: dedup, lock, assigned_bot
+# ARGV: dedup_value, dedup_ttl, lock_token, lock_ttl, bot_value, assigned_ttl
+# Returns {code, assigned_bot} with the codes of _ADMIT_WEBHOOK_LUA
+_ADMIT_CONTACT_LUA = """
+if not redis.call('set', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return {2, ''}
+end
+if ARGV[3] == '' or not redis.call('set', KEYS[2], ARGV[3], 'NX', 'EX', ARGV[4]) then
+    return {0, ''}
+end
+if ARGV[5] ~= '' then
+    redis.call('set', KEYS[3], ARGV[5], 'EX', ARGV[6])
+    return {3, ARGV[5]}
+end
+return {3, redis.call('get', KEYS[3]) or ''}
+"""
+
+# Webhook admission: throttle -> dedup -> lock -> bot assignment, one round trip.
+# KEYS: rate bucket, dedup, lock, assigned_bot
+# ARGV: capacity, refill_per_second, now, bucket_ttl, dedup_value, dedup_ttl,
+#       lock_token, lock_ttl, bot_value (encoded, '' if not explicit), assigned_ttl
+# Returns {code, assigned_bot}: 0 no lock requested/held, 1 throttled,
+# 2 duplicate, 3 lock acquired
+_ADMIT_WEBHOOK_LUA = _TOKEN_BUCKET_LUA_FN + """
+local allowed = take_tokens(KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]),
+    tonumber(ARGV[3]), tonumber(ARGV[4]), 1)
+if allowed == 0 then
+    return {1, ''}
+end
+if not redis.call('set', KEYS[2], ARGV[5], 'NX', 'EX', ARGV[6]) then
+    return {2, ''}
+end
+if ARGV[7] == '' or not redis.call('set', KEYS[3], ARGV[7], 'NX', 'EX', ARGV[8]) then
+    return {0, ''}
+end
+if ARGV[9] ~= '' then
+    redis.call('set', KEYS[4], ARGV[9], 'EX', ARGV[10])
+    return {3, ARGV[9]}
+end
+return {3, redis.call('get', KEYS[4]) or ''}
+"""
 
 
 class RedisCache(AbstractCache):
-    """Redis-based cache for production."""
+    """Redis-based cache for production.
+
+    Connection and timeout errors propagate; ``CacheService`` counts them
+    for its circuit breaker and falls back to memory.
+
+    With ``REDIS_CLUSTER_ENABLED`` the client is a ``RedisCluster``:
+    multi-key reads are split per slot, and webhook admission runs as two
+    scripts (location bucket, then the contact's hash-tagged keys).
+    """
 
-    def __init__(self, redis_url: str):
+    def __init__(self, redis_url: str, serializer: Optional[ValueSerializer] = None):
+        # Tagged codec for values (CACHE_CODEC / CACHE_COMPRESSION)
+        self.serializer = serializer or ValueSerializer()
+        self.cluster = settings.redis_cluster_enabled
         try:
-            import redis.asyncio as redis
-            self.redis = redis.from_url(
-                redis_url,
-                max_connections=settings.redis_max_connections,
-                socket_timeout=settings.redis_socket_timeout,
-                socket_connect_timeout=settings.redis_socket_connect_timeout,
-                decode_responses=False
-            )
+            self.redis = create_redis_client(redis_url)
+            # RedisCluster has no pub/sub: subscribe through one node
+            self._pubsub_redis = create_pubsub_client(redis_url) if self.cluster else self.redis
+            self._release_lock_script = self.redis.register_script(_RELEASE_LOCK_LUA)
+            self._admit_webhook_script = self.redis.register_script(_ADMIT_WEBHOOK_LUA)
+            self._drain_list_script = self.redis.register_script(_DRAIN_LIST_LUA)
+            self._take_tokens_script = self.redis.register_script(_TAKE_TOKENS_LUA)
+            self._admit_contact_script = self.redis.register_script(_ADMIT_CONTACT_LUA)
             self.enabled = True
-            logger.info(f"Initialized RedisCache: {redis_url}")
+            mode = "cluster" if self.cluster else "single node"
+            logger.info(f"Initialized RedisCache: {redis_url} ({mode}, codec: {self.serializer.name})")
         except ImportError:
             logger.error("Redis package not installed. Install with 'pip install redis'")
             self.enabled = False
@@ -154,89 +795,351 @@ class RedisCache(AbstractCache):
             self.enabled = False
 
     async def get(self, key: str) -> Optional[Any]:
+        """Errors propagate so CacheService can tell a miss from an outage."""
         if not self.enabled:
             return None
 
-        try:
-            data = await self.redis.get(key)
-            if data:
-                return pickle.loads(data)
-            return None
-        except Exception as e:
-            logger.error(f"Redis get error for key {key}: {e}")
-            return None
+        data = await self.redis.get(key)
+        if data:
+            return self.serializer.loads(data)
+        return None
 
     async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
         if not self.enabled:
             return False
 
-        try:
-            data = pickle.dumps(value)
-            await self.redis.set(key, data, ex=ttl)
-            return True
-        except Exception as e:
-            logger.error(f"Redis set error for key {key}: {e}")
-            return False
+        data = self.serializer.dumps(value)
+        await self.redis.set(key, data, ex=ttl)
+        return True
 
     async def delete(self, key: str) -> bool:
         if not self.enabled:
             return False
 
-        try:
-            result = await self.redis.delete(key)
-            return result > 0
-        except Exception as e:
-            logger.error(f"Redis delete error for key {key}: {e}")
+        result = await self.redis.delete(key)
+        return result > 0
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """One MGET (one per slot in a cluster); errors propagate for CacheService fallback."""
+        if not self.enabled or not keys:
+            return {}
+        if self.cluster:
+            values = await self.redis.mget_nonatomic(keys)
+        else:
+            values = await self.redis.mget(keys)
+        return {key: self.serializer.loads(data) for key, data in zip(keys, values) if data}
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = 300) -> bool:
+        """SET EX for every item in one non-transactional pipeline."""
+        if not self.enabled:
             return False
+        if not items:
+            return True
+        pipe = self.redis.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(key, self.serializer.dumps(value), ex=ttl)
+        await pipe.execute()
+        return True
+
+    async def delete_many(self, keys: List[str]) -> int:
+        if not self.enabled or not keys:
+            return 0
+        return int(await self.redis.delete(*keys))
 
     async def increment(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
         """Atomic increment operation with optional TTL."""
         if not self.enabled:
             return 0
 
-        try:
-            value = await self.redis.incrby(key, amount)
-            if ttl and value == amount:
-                await self.redis.expire(key, ttl)
-            return value
-        except Exception as e:
-            logger.error(f"Redis increment error for key {key}: {e}")
-            return 0
+        value = await self.redis.incrby(key, amount)
+        if ttl and value == amount:
+            await self.redis.expire(key, ttl)
+        return value
 
     async def sadd(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
         if not self.enabled or not values:
             return 0
-        try:
-            added = await self.redis.sadd(key, *values)
-            if ttl:
-                await self.redis.expire(key, ttl)
-            return int(added)
-        except Exception as e:
-            logger.error(f"Redis sadd error for key {key}: {e}")
-            return 0
+        added = await self.redis.sadd(key, *values)
+        if ttl:
+            await self.redis.expire(key, ttl)
+        return int(added)
 
     async def smembers(self, key: str) -> set[str]:
         if not self.enabled:
             return set()
-        try:
-            members = await self.redis.smembers(key)
-            return {
-                m.decode("utf-8") if isinstance(m, bytes) else str(m)
-                for m in members
-            }
-        except Exception as e:
-            logger.error(f"Redis smembers error for key {key}: {e}")
-            return set()
+        members = await self.redis.smembers(key)
+        return {
+            m.decode("utf-8") if isinstance(m, bytes) else str(m)
+            for m in members
+        }
 
     async def srem(self, key: str, *values: str) -> int:
         if not self.enabled or not values:
             return 0
-        try:
-            removed = await self.redis.srem(key, *values)
-            return int(removed)
-        except Exception as e:
-            logger.error(f"Redis srem error for key {key}: {e}")
+        removed = await self.redis.srem(key, *values)
+        return int(removed)
+
+    async def rpush(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
+        """RPUSH (+ EXPIRE) in one pipelined round trip; errors propagate."""
+        if not self.enabled or not values:
             return 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, *[v.encode("utf-8") for v in values])
+            if ttl:
+                pipe.expire(key, ttl)
+            results = await pipe.execute()
+        return int(results[0])
+
+    async def drain_list(self, key: str, expected_length: int) -> Optional[List[str]]:
+        if not self.enabled:
+            return None
+        items = await self._drain_list_script(keys=[key], args=[expected_length])
+        if items is None:
+            return None
+        return [i.decode("utf-8") if isinstance(i, bytes) else str(i) for i in items]
+
+    def _load_hash(self, raw: Dict[bytes, bytes]) -> Dict[str, Any]:
+        return {
+            (f.decode("utf-8") if isinstance(f, bytes) else f): self.serializer.loads_field(v)
+            for f, v in raw.items()
+        }
+
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None) -> int:
+        """HSET (+ EXPIRE) in one pipelined round trip; ints are stored as plain decimal."""
+        if not self.enabled or not (mapping or ttl):
+            return 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if mapping:
+                pipe.hset(key, mapping={f: self.serializer.dumps_field(v) for f, v in mapping.items()})
+            if ttl:
+                pipe.expire(key, ttl)
+            results = await pipe.execute()
+        return int(results[0]) if mapping else 0
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        if not self.enabled or not fields:
+            return 0
+        return int(await self.redis.hdel(key, *fields))
+
+    async def hgetall(self, key: str) -> Dict[str, Any]:
+        if not self.enabled:
+            return {}
+        return self._load_hash(await self.redis.hgetall(key))
+
+    async def hgetall_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """One HGETALL per key in a single non-transactional pipeline."""
+        if not self.enabled or not keys:
+            return {}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            results = await pipe.execute()
+        return {key: self._load_hash(raw) for key, raw in zip(keys, results) if raw}
+
+    async def hincrby(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        if not self.enabled:
+            return 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, field, amount)
+            if ttl:
+                pipe.expire(key, ttl)
+            results = await pipe.execute()
+        return int(results[0])
+
+    async def lpush_capped(
+        self, key: str, values: List[Any], max_length: int, ttl: Optional[int] = None
+    ) -> int:
+        """LPUSH + LTRIM (+ EXPIRE) in one pipelined round trip."""
+        if not self.enabled:
+            return 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if values:
+                pipe.lpush(key, *[self.serializer.dumps(v) for v in values])
+                pipe.ltrim(key, 0, max_length - 1)
+            if ttl:
+                pipe.expire(key, ttl)
+            pipe.llen(key)
+            results = await pipe.execute()
+        return int(results[-1])
+
+    async def lrange(self, key: str, start: int = 0, end: int = -1) -> List[Any]:
+        if not self.enabled:
+            return []
+        return [self.serializer.loads(item) for item in await self.redis.lrange(key, start, end)]
+
+    async def lrange_many(self, keys: List[str], start: int = 0, end: int = -1) -> Dict[str, List[Any]]:
+        """One LRANGE per key in a single non-transactional pipeline."""
+        if not self.enabled or not keys:
+            return {}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.lrange(key, start, end)
+            results = await pipe.execute()
+        return {
+            key: [self.serializer.loads(item) for item in items]
+            for key, items in zip(keys, results) if items
+        }
+
+    async def take_tokens(self, key: str, bucket: BucketSpec, cost: int = 1) -> RateLimitDecision:
+        """Token bucket update in one Lua call; errors propagate for fallback."""
+        if not self.enabled:
+            raise RuntimeError("Redis cache disabled")
+        allowed, tokens = await self._take_tokens_script(
+            keys=[key],
+            args=[bucket.capacity, bucket.refill_per_second, time.time(), bucket.ttl_seconds, cost],
+        )
+        return decide(float(tokens), bool(int(allowed)), bucket, cost)
+
+    async def acquire_lock(self, key: str, token: str, ttl: int = 30) -> bool:
+        """SET NX EX with an owner token.
+
+        Errors propagate so CacheService can fall back to the in-process lock
+        instead of treating an unreachable Redis as "lock held".
+        """
+        if not self.enabled:
+            return False
+        return bool(await self.redis.set(key, token.encode("utf-8"), nx=True, ex=ttl))
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        """Compare-and-delete so a request never frees a lock it no longer owns."""
+        if not self.enabled:
+            return False
+        return bool(await self._release_lock_script(keys=[key], args=[token.encode("utf-8")]))
+
+    async def admit_webhook(
+        self,
+        keys: AdmissionKeys,
+        bucket: BucketSpec,
+        bot_type: str = "",
+        lock_token: Optional[str] = None,
+        lock_ttl: int = 30,
+    ) -> WebhookAdmission:
+        """Single EVALSHA round trip; errors propagate for CacheService fallback.
+
+        The rate bucket is a hash updated in Lua; the dedup and assignment
+        values are encoded with the value serializer so ``get()`` reads them.
+        """
+        if not self.enabled:
+            raise RuntimeError("Redis cache disabled")
+        if self.cluster:
+            return await self._admit_webhook_cluster(keys, bucket, bot_type, lock_token, lock_ttl)
+        code, assigned = await self._admit_webhook_script(
+            keys=[keys.rate, keys.dedup, keys.lock, keys.assigned],
+            args=[
+                bucket.capacity,
+                bucket.refill_per_second,
+                time.time(),
+                bucket.ttl_seconds,
+                self.serializer.dumps("1"),
+                DEDUP_TTL_SECONDS,
+                (lock_token or "").encode("utf-8"),
+                lock_ttl,
+                self.serializer.dumps(bot_type) if bot_type else b"",
+                ASSIGNED_BOT_TTL_SECONDS,
+            ],
+        )
+        return self._admission_result(code, assigned)
+
+    async def _admit_webhook_cluster(
+        self,
+        keys: AdmissionKeys,
+        bucket: BucketSpec,
+        bot_type: str,
+        lock_token: Optional[str],
+        lock_ttl: int,
+    ) -> WebhookAdmission:
+        """Throttle on the location's slot, then dedup/lock/assign on the contact's."""
+        if not (await self.take_tokens(keys.rate, bucket)).allowed:
+            return WebhookAdmission(throttled=True)
+        code, assigned = await self._admit_contact_script(
+            keys=[keys.dedup, keys.lock, keys.assigned],
+            args=[
+                self.serializer.dumps("1"),
+                DEDUP_TTL_SECONDS,
+                (lock_token or "").encode("utf-8"),
+                lock_ttl,
+                self.serializer.dumps(bot_type) if bot_type else b"",
+                ASSIGNED_BOT_TTL_SECONDS,
+            ],
+        )
+        return self._admission_result(code, assigned)
+
+    def _admission_result(self, code: Any, assigned: Any) -> WebhookAdmission:
+        code = int(code)
+        if code == 1:
+            return WebhookAdmission(throttled=True)
+        if code == 2:
+            return WebhookAdmission(duplicate=True)
+        if code == 0:
+            return WebhookAdmission()
+        return WebhookAdmission(
+            lock_acquired=True,
+            bot_type=self.serializer.loads(assigned) if assigned else None,
+        )
+
+    async def publish(self, channel: str, message: str) -> int:
+        if not self.enabled:
+            raise RuntimeError("Redis cache disabled")
+        return int(await self.redis.publish(channel, message.encode("utf-8")))
+
+    async def subscribe(self, channel: str) -> Subscription:
+        """Dedicated pub/sub connection; errors propagate to the caller."""
+        if not self.enabled:
+            raise RuntimeError("Redis cache disabled")
+        pubsub = self._pubsub_redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+        except Exception:
+            await pubsub.reset()
+            raise
+        return _RedisSubscription(pubsub)
+
+    async def sample_keys(self, limit: int) -> Tuple[List[KeySample], int]:
+        """RANDOMKEY x ``limit``, then MEMORY USAGE + PTTL, in two pipelined round trips."""
+        if not self.enabled:
+            return [], 0
+        if self.cluster:
+            # Keyless commands: RANDOMKEY goes to a random primary, DBSIZE sums them all
+            total = await self.redis.dbsize()
+            found = await asyncio.gather(*(self.redis.randomkey() for _ in range(limit)))
+        else:
+            pipe = self.redis.pipeline(transaction=False)
+            for _ in range(limit):
+                pipe.randomkey()
+            pipe.dbsize()
+            *found, total = await pipe.execute()
+        keys = list(dict.fromkeys(k for k in found if k))
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.memory_usage(key)
+            pipe.pttl(key)
+        results = await pipe.execute()
+        samples = []
+        for key, size, pttl in zip(keys, results[0::2], results[1::2]):
+            if pttl == -2:  # expired since it was sampled
+                continue
+            name = key.decode("utf-8", "replace") if isinstance(key, bytes) else str(key)
+            samples.append(KeySample(name, int(size or 0), None if pttl < 0 else pttl / 1000))
+        return samples, int(total)
+
+
+def _log_backend_error(message: str, error: Exception) -> None:
+    # An open breaker is logged once when it trips, not on every skipped call
+    if not isinstance(error, CacheCircuitOpenError):
+        logger.error(message)
+
+
+def _unreplayed_head(local: List[Any], remote: List[Any]) -> List[Any]:
+    """Newest-first items of ``local`` not yet at the head of ``remote``.
+
+    ``local`` ends where it overlaps ``remote``'s head (the mirror saw the
+    older pushes too) or holds only newer items.
+    """
+    for cut in range(len(local) + 1):
+        overlap = local[cut:]
+        if remote[:len(overlap)] == overlap:
+            return local[:cut]
+    return local
 
 
 class CacheService:
@@ -244,12 +1147,16 @@ class CacheService:
     Unified cache service with automatic fallback.
 
     Features:
-    - Redis primary with memory fallback
+    - Redis primary with memory fallback (SQLite or memory without Redis)
+    - Coherent near cache for hot keys (see ``bots.shared.near_cache``)
     - Automatic circuit breaker for resilience
     - <500ms performance for lead analysis
     """
 
     _instance = None
+    near_cache: Optional[NearCache] = None
+    breaker: Optional[CacheCircuitBreaker] = None
+    key_stats: Optional[CacheKeyStats] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -274,59 +1181,329 @@ class CacheService:
             except Exception as e:
                 logger.warning(f"Failed to initialize Redis: {e}")
                 self.backend = self.fallback_backend
+        elif settings.cache_backend.lower() == "sqlite":
+            try:
+                from bots.shared.sqlite_cache import SQLiteCache
+
+                # Single node: no mirror, no near cache, no breaker
+                self.backend = self.fallback_backend = SQLiteCache()
+                logger.info("Using SQLiteCache (no Redis configured)")
+            except Exception as e:
+                logger.warning(f"Failed to open SQLite cache, using memory cache: {e}")
+                self.backend = self.fallback_backend
         else:
             self.backend = self.fallback_backend
             logger.info("Using MemoryCache (no Redis configured)")
 
+        if self.backend is not self.fallback_backend and settings.near_cache_enabled:
+            self.near_cache = NearCache()
+        if self.backend is not self.fallback_backend and settings.cache_breaker_enabled:
+            self.breaker = CacheCircuitBreaker()
+        if settings.cache_key_stats_enabled:
+            self.key_stats = CacheKeyStats()
+
+    def start_near_cache(self) -> None:
+        """Start the near cache's invalidation listener (needs a running loop).
+
+        Until it is subscribed the near cache serves nothing, so processes
+        that never call this always read through to Redis.
+        """
+        if self.near_cache is not None:
+            self.near_cache.start(self.backend)
+
+    async def stop_near_cache(self) -> None:
+        if self.near_cache is not None:
+            await self.near_cache.stop()
+
+    async def stop_circuit_breaker(self) -> None:
+        if self.breaker is not None:
+            await self.breaker.stop()
+
+    def close_backend(self) -> None:
+        """Flush and close a file-backed backend (SQLite); no-op for the others."""
+        close = getattr(self.backend, "close", None)
+        if callable(close):
+            close()
+
+    async def _primary(self, op: str, *args: Any, **kwargs: Any) -> Any:
+        """Call ``op`` on the primary backend through the circuit breaker.
+
+        While the breaker is open this raises ``CacheCircuitOpenError``
+        without touching Redis, so callers take their fallback path at once.
+        """
+        breaker = self.breaker
+        if breaker is None:
+            return await getattr(self.backend, op)(*args, **kwargs)
+        breaker.check(op)
+        try:
+            result = await getattr(self.backend, op)(*args, **kwargs)
+        except Exception:
+            breaker.record_failure(self._probe_backend, self._replay_outage_writes)
+            raise
+        breaker.record_success()
+        return result
+
+    async def _probe_backend(self) -> None:
+        await self.backend.get("cache:breaker:probe")
+
+    async def _replay_outage_writes(self, journal: Dict[str, Optional[float]]) -> None:
+        """Copy hot keys written while Redis was unreachable from memory back to Redis."""
+        now = time.time()
+        deleted = [key for key, expires_at in journal.items() if expires_at is None]
+        if deleted:
+            await self.backend.delete_many(deleted)
+        replayed = list(deleted)
+        for key, expires_at in journal.items():
+            if expires_at is None or expires_at <= now:
+                continue
+            value = await self.fallback_backend.get(key)
+            if value is None:
+                continue  # evicted from memory: nothing to replay
+            ttl = max(1, int(expires_at - now))
+            if isinstance(value, _MemoryHash):
+                # Merge: memory may hold only the fields written since it lost the key
+                await self.backend.hset(key, dict(value), ttl)
+            elif isinstance(value, _MemoryList):
+                # Append: memory may hold only the items pushed since it lost the
+                # key.  Untrimmed here; the owner's next push applies its cap
+                current = await self.backend.lrange(key)
+                fresh = _unreplayed_head(value, current)
+                if fresh:
+                    await self.backend.lpush_capped(key, fresh[::-1], len(fresh) + len(current), ttl)
+            else:
+                await self.backend.set(key, value, ttl)
+            replayed.append(key)
+        if replayed and self.near_cache is not None:
+            await self.near_cache.publish(self.backend, *replayed)
+        logger.info(f"Replayed {len(replayed)} cache writes made during the Redis outage")
+
+    def _journal_fallback_write(self, keys: List[str], ttl: Optional[int] = None) -> None:
+        """Remember writes (``ttl``) or deletes (``None``) that only reached memory."""
+        breaker = self.breaker
+        if breaker is None:
+            return
+        for key in keys:
+            if ttl is None:
+                breaker.record_delete(key)
+            else:
+                breaker.record_write(key, ttl)
+
+    def _near(self, key: str) -> Optional[NearCache]:
+        near = self.near_cache
+        return near if near is not None and near.covers(key) else None
+
+    async def _near_changed(self, key: str, value: Any = None, ttl: int = 0) -> None:
+        """Record a write (or delete, ``value=None``) of a hot key and notify other workers."""
+        await self._near_changed_many({key: value}, ttl)
+
+    async def _near_changed_many(self, changes: Dict[str, Any], ttl: int = 0) -> None:
+        near = self.near_cache
+        if near is None:
+            return
+        hot = [key for key in changes if near.covers(key)]
+        if not hot:
+            return
+        for key in hot:
+            if changes[key] is None:
+                await near.invalidate(key)
+            else:
+                await near.write(key, changes[key], ttl)
+        if self.breaker is None or not self.breaker.is_open:
+            await near.publish(self.backend, *hot)
+
+    async def _near_fence(self, lock_key: str) -> None:
+        # Lock keys end in the contact id (``lock:{contact_id}``)
+        if self.near_cache is not None:
+            await self.near_cache.fence(lock_key.rsplit(":", 1)[-1])
+
+    # ---- instrumented entry points (per-prefix stats, see cache_stats) ---
+
     async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache."""
+        if self.key_stats is None:
+            return await self._get(key)
+        start = time.perf_counter()
+        value = await self._get(key)
+        self.key_stats.record_read(key, value is not None, time.perf_counter() - start)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
+        """Set value in cache."""
+        if self.key_stats is None:
+            return await self._set(key, value, ttl)
+        start = time.perf_counter()
+        result = await self._set(key, value, ttl)
+        self.key_stats.record_write(key, value, time.perf_counter() - start)
+        return result
+
+    async def delete(self, key: str) -> bool:
+        """Delete value from cache."""
+        if self.key_stats is None:
+            return await self._delete(key)
+        start = time.perf_counter()
+        result = await self._delete(key)
+        self.key_stats.record_deletes([key], time.perf_counter() - start)
+        return result
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several keys in one backend round trip."""
+        if self.key_stats is None or not keys:
+            return await self._get_many(keys)
+        start = time.perf_counter()
+        found = await self._get_many(keys)
+        self.key_stats.record_reads(keys, found, time.perf_counter() - start)
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = 300) -> bool:
+        """Set several keys with one TTL in one backend round trip."""
+        if self.key_stats is None or not items:
+            return await self._set_many(items, ttl)
+        start = time.perf_counter()
+        result = await self._set_many(items, ttl)
+        self.key_stats.record_writes(items, time.perf_counter() - start)
+        return result
+
+    async def delete_many(self, keys: List[str]) -> int:
+        """Delete several keys in one backend round trip."""
+        if self.key_stats is None or not keys:
+            return await self._delete_many(keys)
+        start = time.perf_counter()
+        deleted = await self._delete_many(keys)
+        self.key_stats.record_deletes(keys, time.perf_counter() - start)
+        return deleted
+
+    async def _get(self, key: str) -> Optional[Any]:
         """Get value from cache.
 
-        Checks the primary backend first.  When it returns None (cache miss
-        **or** an internally-caught error such as a Redis connection failure)
-        the fallback backend is also consulted so that data written through
-        ``set()`` — which always saves to both backends — is still reachable.
+        Hot keys are served from the near cache when it holds a copy.
+        Otherwise the primary backend is read; only when it errors (e.g. a
+        Redis connection failure) is the fallback backend consulted, since
+        ``set()`` mirrors every value there.  A plain miss in Redis is a
+        miss: the local mirror may hold a value another worker has since
+        deleted.
         """
+        near = self._near(key)
+        if near is not None:
+            value = await near.get(key)
+            if value is not None:
+                return value
+            epoch = near.epoch
+
         try:
-            result = await self.backend.get(key)
-            if result is not None:
-                return result
+            result = await self._primary("get", key)
         except Exception as e:
-            logger.error(f"Cache get error: {e}")
+            _log_backend_error(f"Cache get error for key {key}: {e}", e)
+            if self.fallback_backend != self.backend:
+                return await self.fallback_backend.get(key)
+            return None
 
-        # Fallback: MemoryCache keeps a copy of every value written via set()
-        if self.fallback_backend != self.backend:
-            return await self.fallback_backend.get(key)
-        return None
+        if near is not None and result is not None:
+            await near.fill(key, result, near.ttl_seconds, epoch)
+        return result
 
-    async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """Set value in cache."""
+    async def _set(self, key: str, value: Any, ttl: int = 300) -> bool:
         try:
-            result = await self.backend.set(key, value, ttl)
+            result = await self._primary("set", key, value, ttl)
             # Also set in fallback if using Redis
             if self.fallback_backend != self.backend:
                 await self.fallback_backend.set(key, value, ttl)
+            await self._near_changed(key, value if result else None, ttl)
             return result
         except Exception as e:
-            logger.error(f"Cache set error: {e}")
+            _log_backend_error(f"Cache set error: {e}", e)
             if self.fallback_backend != self.backend:
+                self._journal_fallback_write([key], ttl)
                 return await self.fallback_backend.set(key, value, ttl)
             return False
 
-    async def delete(self, key: str) -> bool:
-        """Delete value from cache."""
+    async def _delete(self, key: str) -> bool:
         try:
-            result = await self.backend.delete(key)
+            result = await self._primary("delete", key)
             if self.fallback_backend != self.backend:
                 await self.fallback_backend.delete(key)
+            await self._near_changed(key)
+            return result
+        except Exception as e:
+            _log_backend_error(f"Cache delete error: {e}", e)
+            if self.fallback_backend != self.backend:
+                self._journal_fallback_write([key])
+                return await self.fallback_backend.delete(key)
+            return False
+
+    async def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several keys in one backend round trip (near cache first for hot keys).
+
+        Same fallback rule as ``get()``: the memory mirror is only read when
+        the primary backend errors.
+        """
+        found: Dict[str, Any] = {}
+        pending = list(keys)
+        near = self.near_cache
+        if near is not None:
+            epoch = near.epoch
+            pending = []
+            for key in keys:
+                value = await near.get(key) if near.covers(key) else None
+                if value is not None:
+                    found[key] = value
+                else:
+                    pending.append(key)
+        if not pending:
+            return found
+
+        try:
+            fetched = await self._primary("get_many", pending)
+        except Exception as e:
+            _log_backend_error(f"Cache get_many error ({len(pending)} keys): {e}", e)
+            if self.fallback_backend != self.backend:
+                found.update(await self.fallback_backend.get_many(pending))
+            return found
+
+        if near is not None:
+            for key, value in fetched.items():
+                if near.covers(key):
+                    await near.fill(key, value, near.ttl_seconds, epoch)
+        found.update(fetched)
+        return found
+
+    async def _set_many(self, items: Dict[str, Any], ttl: int = 300) -> bool:
+        try:
+            result = await self._primary("set_many", items, ttl)
+            if self.fallback_backend != self.backend:
+                await self.fallback_backend.set_many(items, ttl)
+            await self._near_changed_many(items if result else dict.fromkeys(items), ttl)
             return result
         except Exception as e:
-            logger.error(f"Cache delete error: {e}")
+            _log_backend_error(f"Cache set_many error: {e}", e)
+            if self.fallback_backend != self.backend:
+                self._journal_fallback_write(list(items), ttl)
+                return await self.fallback_backend.set_many(items, ttl)
             return False
 
+    async def _delete_many(self, keys: List[str]) -> int:
+        try:
+            deleted = await self._primary("delete_many", keys)
+            if self.fallback_backend != self.backend:
+                await self.fallback_backend.delete_many(keys)
+            await self._near_changed_many(dict.fromkeys(keys))
+            return deleted
+        except Exception as e:
+            _log_backend_error(f"Cache delete_many error: {e}", e)
+            if self.fallback_backend != self.backend:
+                self._journal_fallback_write(keys)
+                return await self.fallback_backend.delete_many(keys)
+            return 0
+
     async def increment(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
         """Atomic increment operation."""
         if hasattr(self.backend, 'increment'):
-            return await self.backend.increment(key, amount, ttl)
+            try:
+                return await self._primary("increment", key, amount, ttl)
+            except Exception as e:
+                _log_backend_error(f"Cache increment error for key {key}: {e}", e)
+                if self.fallback_backend != self.backend:
+                    return await self.fallback_backend.increment(key, amount, ttl)
+                return 0
         current = await self.get(key) or 0
         new_value = int(current) + amount
         await self.set(key, new_value, ttl or 300)
@@ -334,14 +1511,23 @@ class CacheService:
 
     async def sadd(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
         """Add one or more values to a set in cache backends."""
-        added = await self.backend.sadd(key, *values, ttl=ttl)
+        try:
+            added = await self._primary("sadd", key, *values, ttl=ttl)
+        except Exception as e:
+            _log_backend_error(f"Cache sadd error for key {key}: {e}", e)
+            added = None
         if self.fallback_backend != self.backend:
-            await self.fallback_backend.sadd(key, *values, ttl=ttl)
-        return added
+            mirrored = await self.fallback_backend.sadd(key, *values, ttl=ttl)
+            return mirrored if added is None else added
+        return added or 0
 
     async def smembers(self, key: str) -> set[str]:
         """Get all members from a set in cache backends."""
-        members = await self.backend.smembers(key)
+        try:
+            members = await self._primary("smembers", key)
+        except Exception as e:
+            _log_backend_error(f"Cache smembers error for key {key}: {e}", e)
+            members = set()
         if members:
             return members
         if self.fallback_backend != self.backend:
@@ -350,17 +1536,377 @@ class CacheService:
 
     async def srem(self, key: str, *values: str) -> int:
         """Remove one or more values from a set in cache backends."""
-        removed = await self.backend.srem(key, *values)
+        try:
+            removed = await self._primary("srem", key, *values)
+        except Exception as e:
+            _log_backend_error(f"Cache srem error for key {key}: {e}", e)
+            removed = None
+        if self.fallback_backend != self.backend:
+            mirrored = await self.fallback_backend.srem(key, *values)
+            return mirrored if removed is None else removed
+        return removed or 0
+
+    async def rpush(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
+        """Append values to a list; falls back to memory if the backend errors."""
+        try:
+            return await self._primary("rpush", key, *values, ttl=ttl)
+        except Exception as e:
+            _log_backend_error(f"Cache rpush error for key {key}: {e}", e)
+            if self.fallback_backend != self.backend:
+                return await self.fallback_backend.rpush(key, *values, ttl=ttl)
+            return 0
+
+    async def drain_list(self, key: str, expected_length: int) -> Optional[List[str]]:
+        """Atomically take a list if it still has exactly ``expected_length`` items."""
+        try:
+            return await self._primary("drain_list", key, expected_length)
+        except Exception as e:
+            _log_backend_error(f"Cache drain_list error for key {key}: {e}", e)
+            if self.fallback_backend != self.backend:
+                return await self.fallback_backend.drain_list(key, expected_length)
+            return None
+
+    # ---- hashes and capped lists -----------------------------------------
+
+    async def _structure_write(self, op: str, key: str, *args: Any, ttl: Optional[int] = None) -> int:
+        """Run a hash/list write on the primary and mirror it to memory.
+
+        As with ``set()``, a primary error sends the write to memory only and
+        journals it for replay.  The mirror only ever sees the fields/items
+        written through this worker, so it can hold a partial hash;
+        ``ConversationStateStore`` treats a hash missing fields as a miss.
+        """
+        try:
+            result = await self._primary(op, key, *args, ttl=ttl)
+        except Exception as e:
+            _log_backend_error(f"Cache {op} error for key {key}: {e}", e)
+            if self.fallback_backend == self.backend:
+                return 0
+            self._journal_fallback_write([key], ttl or 86400)
+            await self._near_dropped(key)
+            return await getattr(self.fallback_backend, op)(key, *args, ttl=ttl)
+        if self.fallback_backend != self.backend:
+            await getattr(self.fallback_backend, op)(key, *args, ttl=ttl)
+        # A partial write: drop the near copy rather than patch it
+        await self._near_changed(key)
+        return result
+
+    async def _near_dropped(self, key: str) -> None:
+        """Forget this worker's near copy of a key written only to memory."""
+        near = self._near(key)
+        if near is not None:
+            await near.invalidate(key)
+
+    @staticmethod
+    def _near_unwrap(cached: Any, span: Optional[Tuple[int, int]]) -> Any:
+        """A near copy of a hash (``span=None``), or of a list read with the same range."""
+        if cached is None or span is None:
+            return cached
+        cached_span, items = cached
+        return items if cached_span == span else None
+
+    async def _structure_read(
+        self, key: str, span: Optional[Tuple[int, int]], op: str, empty: Any, *args: Any
+    ) -> Any:
+        """Read a hash/list, through the near cache for hot keys.
+
+        As with ``get()``, memory is only read when the primary errors, and
+        what it returns is never put in the near cache (the mirror can hold
+        a partial hash).  List copies remember the range they were read
+        with and only serve that range; empty results are misses.
+        """
+        near = self._near(key)
+        if near is not None:
+            cached = self._near_unwrap(await near.get(key), span)
+            if cached is not None:
+                return cached
+            epoch = near.epoch
+        try:
+            result = await self._primary(op, *args)
+        except Exception as e:
+            _log_backend_error(f"Cache {op} error: {e}", e)
+            if self.fallback_backend != self.backend:
+                return await getattr(self.fallback_backend, op)(*args)
+            return empty
+        if near is not None and result:
+            await near.fill(key, result if span is None else (span, result), near.ttl_seconds, epoch)
+        return result
+
+    async def _structure_read_many(
+        self, keys: List[str], span: Optional[Tuple[int, int]], op: str, *args: Any
+    ) -> Dict[str, Any]:
+        """``_structure_read`` of several keys in one backend round trip."""
+        found: Dict[str, Any] = {}
+        pending = list(keys)
+        near = self.near_cache
+        if near is not None:
+            epoch = near.epoch
+            pending = []
+            for key in keys:
+                cached = self._near_unwrap(await near.get(key), span) if near.covers(key) else None
+                if cached is not None:
+                    found[key] = cached
+                else:
+                    pending.append(key)
+        if not pending:
+            return found
+        try:
+            fetched = await self._primary(op, pending, *args)
+        except Exception as e:
+            _log_backend_error(f"Cache {op} error ({len(pending)} keys): {e}", e)
+            if self.fallback_backend != self.backend:
+                found.update(await getattr(self.fallback_backend, op)(pending, *args))
+            return found
+        if near is not None:
+            for key, value in fetched.items():
+                if value and near.covers(key):
+                    await near.fill(key, value if span is None else (span, value), near.ttl_seconds, epoch)
+        found.update(fetched)
+        return found
+
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None) -> int:
+        """Set hash fields, each encoded separately. Returns how many fields were new."""
+        start = time.perf_counter()
+        added = await self._structure_write("hset", key, mapping, ttl=ttl)
+        if self.key_stats is not None and mapping:
+            self.key_stats.record_write(key, mapping, time.perf_counter() - start)
+        return added
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        """Delete hash fields. Returns how many existed."""
+        if not fields:
+            return 0
+        start = time.perf_counter()
+        try:
+            removed = await self._primary("hdel", key, *fields)
+        except Exception as e:
+            _log_backend_error(f"Cache hdel error for key {key}: {e}", e)
+            if self.fallback_backend == self.backend:
+                return 0
+            # Replay merges hashes: fields deleted only here can stay in Redis
+            self._journal_fallback_write([key], 86400)
+            await self._near_dropped(key)
+            return await self.fallback_backend.hdel(key, *fields)
         if self.fallback_backend != self.backend:
-            await self.fallback_backend.srem(key, *values)
+            await self.fallback_backend.hdel(key, *fields)
+        await self._near_changed(key)
+        if self.key_stats is not None:
+            self.key_stats.record_deletes([key], time.perf_counter() - start)
         return removed
 
+    async def hgetall(self, key: str) -> Dict[str, Any]:
+        """All fields of a hash (empty if missing); hot keys go through the near cache."""
+        start = time.perf_counter()
+        fields = await self._structure_read(key, None, "hgetall", {}, key)
+        if self.key_stats is not None:
+            self.key_stats.record_read(key, bool(fields), time.perf_counter() - start)
+        return fields
+
+    async def hgetall_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Several hashes in one backend round trip; missing keys are left out."""
+        if not keys:
+            return {}
+        start = time.perf_counter()
+        found = await self._structure_read_many(keys, None, "hgetall_many")
+        if self.key_stats is not None:
+            self.key_stats.record_reads(keys, found, time.perf_counter() - start)
+        return found
+
+    async def hincrby(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        """Atomically add to an integer hash field; memory mirrors the resulting value."""
+        try:
+            value = await self._primary("hincrby", key, field, amount, ttl=ttl)
+        except Exception as e:
+            _log_backend_error(f"Cache hincrby error for key {key}: {e}", e)
+            if self.fallback_backend == self.backend:
+                return 0
+            self._journal_fallback_write([key], ttl or 86400)
+            await self._near_dropped(key)
+            return await self.fallback_backend.hincrby(key, field, amount, ttl=ttl)
+        if self.fallback_backend != self.backend:
+            await self.fallback_backend.hset(key, {field: value}, ttl=ttl)
+        await self._near_changed(key)
+        return value
+
+    async def lpush_capped(
+        self, key: str, values: List[Any], max_length: int, ttl: Optional[int] = None
+    ) -> int:
+        """Push values onto the head of a list, trimmed to ``max_length`` items."""
+        start = time.perf_counter()
+        length = await self._structure_write("lpush_capped", key, values, max_length, ttl=ttl)
+        if self.key_stats is not None and values:
+            self.key_stats.record_write(key, values, time.perf_counter() - start)
+        return length
+
+    async def lrange(self, key: str, start: int = 0, end: int = -1) -> List[Any]:
+        """Items ``start``..``end`` (inclusive) of a list written by ``lpush_capped``."""
+        started = time.perf_counter()
+        items = await self._structure_read(key, (start, end), "lrange", [], key, start, end)
+        if self.key_stats is not None:
+            self.key_stats.record_read(key, bool(items), time.perf_counter() - started)
+        return items
+
+    async def lrange_many(self, keys: List[str], start: int = 0, end: int = -1) -> Dict[str, List[Any]]:
+        """``lrange`` of several lists in one backend round trip; empty lists are left out."""
+        if not keys:
+            return {}
+        started = time.perf_counter()
+        found = await self._structure_read_many(keys, (start, end), "lrange_many", start, end)
+        if self.key_stats is not None:
+            self.key_stats.record_reads(keys, found, time.perf_counter() - started)
+        return found
+
+    async def take_tokens(self, key: str, bucket: BucketSpec, cost: int = 1) -> RateLimitDecision:
+        """Take from a token bucket; a Redis failure falls back to a local bucket."""
+        try:
+            return await self._primary("take_tokens", key, bucket, cost)
+        except Exception as e:
+            _log_backend_error(f"Cache take_tokens error for key {key}: {e}", e)
+            if self.fallback_backend != self.backend:
+                return await self.fallback_backend.take_tokens(key, bucket, cost)
+            raise
+
+    async def acquire_lock(self, key: str, token: str, ttl: int = 30) -> bool:
+        """Atomically acquire a lock owned by ``token`` (SET NX semantics)."""
+        try:
+            acquired = await self._primary("acquire_lock", key, token, ttl)
+        except Exception as e:
+            _log_backend_error(f"Cache acquire_lock error for key {key}: {e}", e)
+            if self.fallback_backend != self.backend:
+                return await self.fallback_backend.acquire_lock(key, token, ttl)
+            return False
+        if acquired:
+            await self._near_fence(key)
+        return acquired
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock only if ``token`` still owns it."""
+        try:
+            released = await self._primary("release_lock", key, token)
+        except Exception as e:
+            _log_backend_error(f"Cache release_lock error for key {key}: {e}", e)
+            released = False
+        if self.fallback_backend != self.backend:
+            # Covers locks taken on the fallback while the primary was failing
+            released = await self.fallback_backend.release_lock(key, token) or released
+        return released
+
+    async def admit_webhook(
+        self,
+        keys: AdmissionKeys,
+        bucket: BucketSpec,
+        bot_type: str = "",
+        lock_token: Optional[str] = None,
+        lock_ttl: int = 30,
+    ) -> WebhookAdmission:
+        """Throttle, dedup, lock and bot-assignment checks in one backend call.
+
+        Unlike ``set()`` this is not mirrored into the memory fallback; it is
+        only used when the primary backend errors.
+        """
+        try:
+            admission = await self._primary("admit_webhook", keys, bucket, bot_type, lock_token, lock_ttl)
+        except Exception as e:
+            _log_backend_error(f"Cache admit_webhook error: {e}", e)
+            if self.fallback_backend != self.backend:
+                return await self.fallback_backend.admit_webhook(
+                    keys, bucket, bot_type, lock_token, lock_ttl
+                )
+            raise
+        if admission.lock_acquired:
+            await self._near_fence(keys.lock)
+            if bot_type:
+                # The script (re)wrote the assignment
+                await self._near_changed(keys.assigned, bot_type, ASSIGNED_BOT_TTL_SECONDS)
+        return admission
+
+    async def namespace_generation(self, namespace: str) -> int:
+        """Current generation of ``namespace`` (0 until first invalidated).
+
+        The generation key is small and read on every key build, so it is a
+        near cache prefix by default.
+        """
+        generation = await self.get(f"{NAMESPACE_GENERATION_PREFIX}{namespace}")
+        try:
+            return int(generation or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    async def namespaced_key(self, namespace: str, key: str) -> str:
+        """``<namespace>:g<generation>:<key>``; see ``invalidate_namespace``."""
+        return f"{namespace}:g{await self.namespace_generation(namespace)}:{key}"
+
+    async def invalidate_namespace(self, namespace: str) -> int:
+        """Invalidate every key built with ``namespaced_key(namespace, ...)`` in O(1).
+
+        Starts a new generation, so keys built from now on differ from all
+        existing ones; old entries are never read again and expire with
+        their TTL.  Returns the new generation.
+        """
+        generation = await self.increment(f"{_NAMESPACE_COUNTER_PREFIX}{namespace}", 1)
+        await self.set(f"{NAMESPACE_GENERATION_PREFIX}{namespace}", generation, ttl=_NAMESPACE_TTL_SECONDS)
+        logger.info(f"Cache namespace {namespace!r} invalidated (generation {generation})")
+        return generation
+
+    async def ensure_namespace_fingerprint(self, namespace: str, fingerprint: str) -> bool:
+        """Invalidate ``namespace`` if ``fingerprint`` (e.g. a prompt hash) changed.
+
+        Called at startup so a deploy with a new prompt doesn't serve
+        outputs cached under the old one.  Returns True if it invalidated.
+        """
+        key = f"{_NAMESPACE_FINGERPRINT_PREFIX}{namespace}"
+        if await self.get(key) == fingerprint:
+            return False
+        await self.invalidate_namespace(namespace)
+        await self.set(key, fingerprint, ttl=_NAMESPACE_TTL_SECONDS)
+        return True
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Size and eviction stats of the local backend (memory, or SQLite when selected)."""
+        return self.fallback_backend.get_stats()
+
+    def near_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Near cache hit/invalidation stats, or None when it is disabled."""
+        return self.near_cache.get_stats() if self.near_cache is not None else None
+
+    def key_stats_summary(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """This worker's per-prefix hit/miss/size/latency stats, or None when disabled."""
+        return self.key_stats.get_stats() if self.key_stats is not None else None
+
+    async def maybe_publish_key_stats(self) -> None:
+        """Share this worker's per-prefix stats with the others (rate limited)."""
+        if self.key_stats is not None:
+            await self.key_stats.maybe_publish(self)
+
+    async def collect_key_stats(self) -> Optional[Dict[str, Any]]:
+        """Per-prefix stats summed over all workers, or None when disabled."""
+        if self.key_stats is None:
+            return None
+        return await collect_key_stats(self, self.key_stats)
+
+    async def profile_keyspace(self, sample_size: Optional[int] = None) -> Dict[str, Any]:
+        """Sample the key space of the primary backend (and the memory mirror, if separate)."""
+        prefixer = self.key_stats.prefixer if self.key_stats is not None else None
+        try:
+            profile = {"primary": await profile_keyspace(self.backend, sample_size, prefixer)}
+        except Exception as e:
+            _log_backend_error(f"Key-space profile of the primary backend failed: {e}", e)
+            profile = {"primary": None}
+        if self.fallback_backend is not self.backend:
+            profile["memory"] = await profile_keyspace(self.fallback_backend, sample_size, prefixer)
+        return profile
+
+    def circuit_breaker_stats(self) -> Optional[Dict[str, Any]]:
+        """Redis circuit breaker state and replay counts, or None without Redis."""
+        return self.breaker.get_stats() if self.breaker is not None else None
+
     async def cached_computation(
         self,
         key: str,
         computation_func,
         ttl: int = 300,
         *args,
+        stale_ttl: int = 0,
         **kwargs
     ) -> Any:
         """
@@ -368,16 +1914,31 @@ class CacheService:
 
         Checks cache first, computes if miss, caches result.
         Critical for <500ms lead analysis performance.
-        """
-        import asyncio
 
+        Concurrent misses share one computation (a ``lease:<key>`` lock
+        covers other workers), and refreshes start early at random so they
+        don't line up on the TTL.  With ``stale_ttl`` an expired value is
+        still returned for that many seconds while it is refreshed in the
+        background.
+        """
         start_time = time.time()
 
-        # Check cache first
-        cached_result = await self.get(key)
-        if cached_result is not None:
-            elapsed_ms = (time.time() - start_time) * 1000
-            logger.debug(f"Cache HIT for {key} ({elapsed_ms:.1f}ms)")
+        async def compute() -> Any:
+            logger.debug(f"Cache MISS for {key}, computing...")
+            result = computation_func(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        try:
+            result, outcome = await computation_cache.lookup(self, key, compute, ttl, stale_ttl)
+        except Exception as e:
+            logger.error(f"Computation failed for key {key}: {e}")
+            raise
+
+        elapsed_ms = (time.time() - start_time) * 1000
+        if outcome != COMPUTED:
+            logger.debug(f"Cache {outcome.upper()} for {key} ({elapsed_ms:.1f}ms)")
 
             # Emit cache hit event
             try:
@@ -385,55 +1946,30 @@ class CacheService:
                     "cache.hit",
                     cache_key=key[:100],  # Truncate for privacy
                     response_time_ms=elapsed_ms,
-                    data_size_bytes=len(str(cached_result)) if cached_result else 0
+                    data_size_bytes=len(str(result)) if result else 0
                 )
             except Exception as e:
                 logger.warning(f"Failed to publish cache hit event: {e}")
 
-            return cached_result
-
-        # Compute result
-        logger.debug(f"Cache MISS for {key}, computing...")
+            return result
 
-        # Emit cache miss event
+        # Emit cache miss and set events
         try:
             await event_broker.publish_cache_event(
                 "cache.miss",
                 cache_key=key[:100]  # Truncate for privacy
             )
+            await event_broker.publish_cache_event(
+                "cache.set",
+                cache_key=key[:100],  # Truncate for privacy
+                ttl_seconds=ttl,
+                data_size_bytes=len(str(result)) if result else 0
+            )
         except Exception as e:
-            logger.warning(f"Failed to publish cache miss event: {e}")
-        compute_start = time.time()
+            logger.warning(f"Failed to publish cache miss/set events: {e}")
 
-        try:
-            if asyncio.iscoroutinefunction(computation_func):
-                result = await computation_func(*args, **kwargs)
-            else:
-                result = computation_func(*args, **kwargs)
-
-            compute_time_ms = (time.time() - compute_start) * 1000
-
-            # Cache the result
-            await self.set(key, result, ttl)
-
-            # Emit cache set event
-            try:
-                await event_broker.publish_cache_event(
-                    "cache.set",
-                    cache_key=key[:100],  # Truncate for privacy
-                    ttl_seconds=ttl,
-                    data_size_bytes=len(str(result)) if result else 0
-                )
-            except Exception as e:
-                logger.warning(f"Failed to publish cache set event: {e}")
-
-            total_time_ms = (time.time() - start_time) * 1000
-            logger.debug(f"Cached {key} (compute: {compute_time_ms:.1f}ms, total: {total_time_ms:.1f}ms)")
-
-            return result
-        except Exception as e:
-            logger.error(f"Computation failed for key {key}: {e}")
-            raise
+        logger.debug(f"Cached {key} (total: {elapsed_ms:.1f}ms)")
+        return result
 
 
 # Global cache instance
@@ -442,13 +1978,29 @@ def get_cache_service() -> CacheService:
     return CacheService()
 
 
+async def cache_get_many(cache: Any, keys: List[str]) -> Dict[str, Any]:
+    """``cache.get_many(keys)``, or one ``get`` per key for caches without it."""
+    if hasattr(cache, "get_many"):
+        return await cache.get_many(keys)
+    found = {}
+    for key in keys:
+        value = await cache.get(key)
+        if value is not None:
+            found[key] = value
+    return found
+
+
 class PerformanceCache:
     """
     High-performance caching for Claude AI lead intelligence responses.
 
     Specialized wrapper around CacheService for lead analysis with:
     - Message + context-based cache keys (MD5 hashing)
-    - TTL-based expiration (default 300s)
+    - Key classes: ``contact`` entries hold one contact's full analysis,
+      ``content`` entries hold the Claude-derived part keyed only by
+      PII-free lead content, so it is reused across contacts
+    - TTL-based expiration (default 300s, per key class overridable)
+    - Hit/miss counts per key class
     - Optimized for <100ms cache hits
     - Integrated with Redis + Memory backend
 
@@ -458,34 +2010,53 @@ class PerformanceCache:
     def __init__(self, ttl_seconds: int = 300):
         self.ttl_seconds = ttl_seconds
         self.cache_service = get_cache_service()
+        self.stats: Dict[str, Dict[str, int]] = {}
         logger.info(f"Initialized PerformanceCache with {ttl_seconds}s TTL")
 
-    def _get_cache_key(self, message: str, context: Dict = None) -> str:
-        """Generate cache key from message and context using MD5 hash"""
+    async def _get_cache_key(self, message: str, context: Dict = None, key_class: str = "contact") -> str:
+        """Generate cache key from message and context using MD5 hash.
+
+        Keys live in the ``lead_intel`` namespace, so a prompt change
+        invalidates them all at once.
+        """
         import hashlib
         content = message + str(context or {})
-        return f"lead_intel:{hashlib.md5(content.encode()).hexdigest()}"
+        return await self.cache_service.namespaced_key(
+            LEAD_INTEL_NAMESPACE, f"{key_class}:{hashlib.md5(content.encode()).hexdigest()}"
+        )
+
+    def _count(self, key_class: str, outcome: str) -> None:
+        counts = self.stats.setdefault(key_class, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
 
-    async def get(self, message: str, context: Dict = None) -> Optional[Dict]:
+    async def get(self, message: str, context: Dict = None, key_class: str = "contact") -> Optional[Dict]:
         """
         Get cached analysis if available and not expired.
 
         Returns cached lead intelligence analysis or None if cache miss.
         Optimized for <100ms response time.
         """
-        cache_key = self._get_cache_key(message, context)
-
         try:
+            cache_key = await self._get_cache_key(message, context, key_class)
             cached_data = await self.cache_service.get(cache_key)
             if cached_data:
+                self._count(key_class, "hits")
                 # Return just the analysis portion
                 return cached_data.get("analysis")
+            self._count(key_class, "misses")
             return None
         except Exception as e:
             logger.error(f"PerformanceCache get error: {e}")
             return None
 
-    async def set(self, message: str, analysis: Dict, context: Dict = None):
+    async def set(
+        self,
+        message: str,
+        analysis: Dict,
+        context: Dict = None,
+        key_class: str = "contact",
+        ttl_seconds: Optional[int] = None,
+    ):
         """
         Cache analysis result with TTL.
 
@@ -493,16 +2064,27 @@ class PerformanceCache:
         """
         import datetime
 
-        cache_key = self._get_cache_key(message, context)
-
-        cached_data = {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "analysis": analysis,
-            "message_hash": cache_key.split(":")[-1][:8]  # For debugging
-        }
+        ttl = ttl_seconds or self.ttl_seconds
 
         try:
-            await self.cache_service.set(cache_key, cached_data, self.ttl_seconds)
-            logger.debug(f"Cached lead analysis: {cache_key[:20]}... (TTL: {self.ttl_seconds}s)")
+            cache_key = await self._get_cache_key(message, context, key_class)
+            cached_data = {
+                "timestamp": datetime.datetime.now().isoformat(),
+                "analysis": analysis,
+                "message_hash": cache_key.split(":")[-1][:8]  # For debugging
+            }
+            await self.cache_service.set(cache_key, cached_data, ttl)
+            logger.debug(f"Cached lead analysis: {cache_key[:28]}... (TTL: {ttl}s)")
         except Exception as e:
             logger.error(f"PerformanceCache set error: {e}")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counts and hit rate (%) per key class."""
+        report = {}
+        for key_class, counts in self.stats.items():
+            total = counts["hits"] + counts["misses"]
+            report[key_class] = {
+                **counts,
+                "hit_rate": round(counts["hits"] / total * 100, 1) if total else 0.0,
+            }
+        return report
@@ -0,0 +1,322 @@
+"""
+Per-prefix cache instrumentation and key-space profiling.
+
+``CacheKeyStats`` is always on in ``CacheService``.  It groups keys into
+families and, for each family, counts hits, misses, sets and deletes and
+keeps a fixed-bucket latency histogram per operation.  A key's family is
+the longest matching prefix in ``cache_key_stats_prefixes``
+(``seller:state:``), or else its first ``:`` segment (``dedup:``).  After
+``cache_key_stats_max_prefixes`` families, new ones count as ``other``.
+Value sizes are measured on every ``cache_key_stats_size_sample_every``-th
+set of a family.  ``bytes_written`` is extrapolated from those samples.
+
+Each worker publishes its raw counters to the cache
+(``maybe_publish``), so ``collect_key_stats`` can report all workers.
+
+``profile_keyspace`` is a sampling profiler: it asks the backend for random
+keys with their size and remaining TTL, then reports per family the estimated
+key count, bytes and TTL distribution.
+"""
+import bisect
+import os
+import pickle
+import socket
+import sys
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; one overflow bucket follows
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+# (upper bound in seconds, label) for remaining-TTL buckets
+_TTL_BUCKETS = ((60, "<1m"), (3600, "<1h"), (86_400, "<1d"), (604_800, "<7d"))
+
+KEY_STATS_WORKERS_KEY = "cache:keystats:workers"
+_KEY_STATS_PREFIX = "cache:keystats:"
+_KEY_STATS_TTL_SECONDS = 300
+
+OTHER = "other"
+_COUNTERS = ("hits", "misses", "sets", "deletes", "sampled_sets", "sampled_bytes")
+_OPS = ("get", "set", "delete")
+
+
+class KeySample(NamedTuple):
+    """One sampled key: approximate stored size and remaining TTL (None: no expiry)."""
+
+    key: str
+    size_bytes: int
+    ttl_seconds: Optional[float]
+
+
+def value_size(value: Any) -> int:
+    """Approximate encoded size of a cache value."""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class KeyPrefixer:
+    """Maps keys to their family (configured prefix or first segment)."""
+
+    def __init__(self, prefixes: Optional[Iterable[str]] = None, max_families: Optional[int] = None):
+        if prefixes is None:
+            prefixes = (p.strip() for p in settings.cache_key_stats_prefixes.split(",") if p.strip())
+        self.prefixes = tuple(sorted(set(prefixes), key=len, reverse=True))
+        self.max_families = max_families or settings.cache_key_stats_max_prefixes
+        self._families: set = set(self.prefixes)
+
+    def __call__(self, key: str) -> str:
+        for prefix in self.prefixes:
+            if key.startswith(prefix):
+                return prefix
+        head, sep, _ = key.partition(":")
+        family = head + sep if sep else OTHER
+        if family in self._families:
+            return family
+        if len(self._families) >= self.max_families + len(self.prefixes):
+            return OTHER
+        self._families.add(family)
+        return family
+
+
+def _new_family() -> Dict[str, Any]:
+    family: Dict[str, Any] = dict.fromkeys(_COUNTERS, 0)
+    family["latency"] = {op: [0] * (len(LATENCY_BUCKETS_MS) + 1) for op in _OPS}
+    return family
+
+
+class CacheKeyStats:
+    """In-process per-family counters; see the module docstring."""
+
+    def __init__(
+        self,
+        prefixes: Optional[Iterable[str]] = None,
+        max_families: Optional[int] = None,
+        size_sample_every: Optional[int] = None,
+        publish_interval: Optional[float] = None,
+    ):
+        self.prefixer = KeyPrefixer(prefixes, max_families)
+        self.size_sample_every = size_sample_every or settings.cache_key_stats_size_sample_every
+        self.publish_interval = (
+            settings.shared_state_sync_seconds if publish_interval is None else publish_interval
+        )
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._families: Dict[str, Dict[str, Any]] = {}
+        self._last_publish = 0.0
+        self.started_at = time.time()
+
+    def _family(self, key: str) -> Dict[str, Any]:
+        name = self.prefixer(key)
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = _new_family()
+        return family
+
+    @staticmethod
+    def _observe(family: Dict[str, Any], op: str, elapsed: float) -> None:
+        family["latency"][op][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+
+    def _families_of(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return {key: self._family(key) for key in keys}
+
+    # ---- recording -------------------------------------------------------
+
+    def record_read(self, key: str, hit: bool, elapsed: float) -> None:
+        family = self._family(key)
+        family["hits" if hit else "misses"] += 1
+        self._observe(family, "get", elapsed)
+
+    def record_reads(self, keys: List[str], found: Dict[str, Any], elapsed: float) -> None:
+        """One batched read: per-key hits/misses, one latency sample per family."""
+        families = self._families_of(keys)
+        for key, family in families.items():
+            family["hits" if key in found else "misses"] += 1
+        for family in {id(f): f for f in families.values()}.values():
+            self._observe(family, "get", elapsed)
+
+    def record_write(self, key: str, value: Any, elapsed: float) -> None:
+        family = self._family(key)
+        self._count_set(family, value)
+        self._observe(family, "set", elapsed)
+
+    def record_writes(self, items: Dict[str, Any], elapsed: float) -> None:
+        families = self._families_of(items)
+        for key, family in families.items():
+            self._count_set(family, items[key])
+        for family in {id(f): f for f in families.values()}.values():
+            self._observe(family, "set", elapsed)
+
+    def _count_set(self, family: Dict[str, Any], value: Any) -> None:
+        if family["sets"] % self.size_sample_every == 0:
+            family["sampled_sets"] += 1
+            family["sampled_bytes"] += value_size(value)
+        family["sets"] += 1
+
+    def record_deletes(self, keys: List[str], elapsed: float) -> None:
+        families = self._families_of(keys)
+        for family in families.values():
+            family["deletes"] += 1
+        for family in {id(f): f for f in families.values()}.values():
+            self._observe(family, "delete", elapsed)
+
+    # ---- reporting -------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Raw counters of this worker (mergeable with ``merge_snapshots``)."""
+        return {
+            "worker_id": self.worker_id,
+            "started_at": self.started_at,
+            "families": {
+                name: {**{c: family[c] for c in _COUNTERS},
+                       "latency": {op: list(counts) for op, counts in family["latency"].items()}}
+                for name, family in self._families.items()
+            },
+        }
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Summary of this worker's counters, by family."""
+        return summarize(self.snapshot()["families"])
+
+    async def publish(self, cache: Any) -> None:
+        """Store this worker's counters where ``collect_key_stats`` finds them."""
+        self._last_publish = time.monotonic()
+        await cache.set(f"{_KEY_STATS_PREFIX}{self.worker_id}", self.snapshot(), ttl=_KEY_STATS_TTL_SECONDS)
+        await cache.sadd(KEY_STATS_WORKERS_KEY, self.worker_id, ttl=_KEY_STATS_TTL_SECONDS)
+
+    async def maybe_publish(self, cache: Any) -> None:
+        """Publish if the publish interval has elapsed since the last one."""
+        if self._families and time.monotonic() - self._last_publish >= self.publish_interval:
+            try:
+                await self.publish(cache)
+            except Exception as e:
+                logger.warning(f"Could not publish cache key stats: {e}")
+
+
+def _percentile_ms(counts: List[int], p: float) -> Optional[float]:
+    """Upper bound of the histogram bucket holding the p-th percentile."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = total * p / 100
+    seen = 0
+    for i, count in enumerate(counts):
+        seen += count
+        if seen >= rank:
+            return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+
+def summarize(families: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Hit rate, sizes and latency percentiles from raw family counters.
+
+    Percentiles are bucket upper bounds; None above the last bucket.
+    """
+    summary = {}
+    for name, family in sorted(families.items()):
+        reads = family["hits"] + family["misses"]
+        avg_size = family["sampled_bytes"] / family["sampled_sets"] if family["sampled_sets"] else 0
+        summary[name] = {
+            "hits": family["hits"],
+            "misses": family["misses"],
+            "hit_rate": round(family["hits"] / reads * 100, 1) if reads else 0.0,
+            "sets": family["sets"],
+            "deletes": family["deletes"],
+            "avg_value_bytes": round(avg_size),
+            "bytes_written": round(avg_size * family["sets"]),
+            "latency_ms": {
+                op: {
+                    "count": sum(counts),
+                    "p50": _percentile_ms(counts, 50),
+                    "p95": _percentile_ms(counts, 95),
+                    "p99": _percentile_ms(counts, 99),
+                }
+                for op, counts in family["latency"].items()
+                if sum(counts)
+            },
+        }
+    return summary
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Sum the raw family counters of several workers."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.get("families", {}).items():
+            total = merged.setdefault(name, _new_family())
+            for counter in _COUNTERS:
+                total[counter] += family.get(counter, 0)
+            for op, counts in family.get("latency", {}).items():
+                target = total["latency"].setdefault(op, [0] * len(counts))
+                for i, count in enumerate(counts[:len(target)]):
+                    target[i] += count
+    return merged
+
+
+async def collect_key_stats(cache: Any, local: Optional[CacheKeyStats] = None) -> Dict[str, Any]:
+    """Per-family stats summed over every worker that published recently."""
+    if local is not None:
+        await local.publish(cache)
+    workers = sorted(await cache.smembers(KEY_STATS_WORKERS_KEY))
+    found = await cache.get_many([f"{_KEY_STATS_PREFIX}{w}" for w in workers])
+    snapshots = list(found.values())
+    return {
+        "workers": [s.get("worker_id") for s in snapshots],
+        "families": summarize(merge_snapshots(snapshots)),
+    }
+
+
+def _ttl_bucket(ttl: Optional[float]) -> str:
+    if ttl is None:
+        return "none"
+    for bound, label in _TTL_BUCKETS:
+        if ttl < bound:
+            return label
+    return ">=7d"
+
+
+async def profile_keyspace(backend: Any, sample_size: Optional[int] = None,
+                           prefixer: Optional[KeyPrefixer] = None) -> Dict[str, Any]:
+    """Sample random keys from ``backend`` and summarize them by family.
+
+    Key counts and bytes are extrapolated from the sample to the backend's
+    total key count.
+    """
+    sample_size = sample_size or settings.cache_keyspace_sample_size
+    prefixer = prefixer or KeyPrefixer()
+    started = time.perf_counter()
+    samples, total_keys = await backend.sample_keys(sample_size)
+    scale = total_keys / len(samples) if samples else 0
+
+    grouped: Dict[str, List[KeySample]] = {}
+    for sample in samples:
+        grouped.setdefault(prefixer(sample.key), []).append(sample)
+
+    families = {}
+    for name, group in sorted(grouped.items(), key=lambda item: -len(item[1])):
+        sizes = sorted(s.size_bytes for s in group)
+        ttls: Dict[str, int] = {}
+        for s in group:
+            label = _ttl_bucket(s.ttl_seconds)
+            ttls[label] = ttls.get(label, 0) + 1
+        families[name] = {
+            "sampled": len(group),
+            "estimated_keys": round(len(group) * scale),
+            "estimated_bytes": round(sum(sizes) * scale),
+            "avg_bytes": round(sum(sizes) / len(sizes)),
+            "p95_bytes": sizes[min(len(sizes) - 1, int(len(sizes) * 0.95))],
+            "max_bytes": sizes[-1],
+            "ttl": ttls,
+        }
+    return {
+        "backend": type(backend).__name__,
+        "total_keys": total_keys,
+        "sampled": len(samples),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "families": families,
+    }
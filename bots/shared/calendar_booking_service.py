@@ -7,13 +7,16 @@ calendar is not configured or unavailable.
 """
 import re
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from bots.shared.config import settings
 from bots.shared.logger import get_logger
+from bots.shared.redis_connection import contact_tag
 
 logger = get_logger(__name__)
 
+PENDING_SLOTS_TTL_SECONDS = 86_400  # offered slots are stale after a day anyway
+
 # Shown when JORGE_CALENDAR_ID is unset or no slots are available
 FALLBACK_MESSAGE = (
     "I'd love to schedule a time to discuss your options in detail. "
@@ -24,16 +27,18 @@ FALLBACK_MESSAGE = (
 class CalendarBookingService:
     """Offer and book GHL calendar appointments for HOT leads via SMS."""
 
-    def __init__(self, ghl_client):
+    def __init__(self, ghl_client, cache: Any = None):
         """
         Args:
             ghl_client: A GHLClient instance (used for get_free_slots / create_appointment).
+            cache: Shared cache for offered slots (defaults to the global CacheService).
         """
         self.ghl_client = ghl_client
         self.calendar_id: str = settings.jorge_calendar_id or ""
         self.user_id: str = settings.jorge_user_id or ""
-        # In-process slot cache: {contact_id: [slot_dict, ...]}
-        # Cleared on server restart — handled gracefully in book_appointment.
+        self._cache = cache
+        # Offered slots live in the shared cache so any worker can book them;
+        # this dict is the copy last seen by this process: {contact_id: [slot_dict, ...]}
         self._pending_slots: Dict[str, List[Dict]] = {}
 
     # ------------------------------------------------------------------
@@ -72,6 +77,7 @@ class CalendarBookingService:
 
         selected = slots[:2]
         self._pending_slots[contact_id] = selected
+        await self._store_pending_slots(contact_id, selected)
         return {
             "message": self._format_slot_options(selected),
             "slots": selected,
@@ -95,7 +101,7 @@ class CalendarBookingService:
               - appointment: dict or None
               - message: str — confirmation or error SMS text
         """
-        slots = self._pending_slots.get(contact_id)
+        slots = await self.load_pending_slots(contact_id)
         if not slots:
             return {
                 "success": False,
@@ -138,6 +144,7 @@ class CalendarBookingService:
 
         if result.get("success"):
             self._pending_slots.pop(contact_id, None)
+            await self._store_pending_slots(contact_id, None)
             appointment = result.get("data", {})
             return {
                 "success": True,
@@ -151,9 +158,28 @@ class CalendarBookingService:
             "message": "I wasn't able to book that slot. Let me find other times for you.",
         }
 
-    def has_pending_slots(self, contact_id: str) -> bool:
-        """Return True if there are cached slots for this contact."""
-        return bool(self._pending_slots.get(contact_id))
+    async def load_pending_slots(self, contact_id: str) -> List[Dict]:
+        """
+        Return the slots offered to a contact by any worker.
+
+        The shared cache is authoritative: a miss means another worker
+        booked (or the offer expired), so this process's copy is dropped.
+        The local copy is only used when the cache read fails.
+        """
+        try:
+            slots = await self._get_cache().get(self._slots_key(contact_id))
+        except Exception as exc:
+            logger.warning(f"Pending slots lookup failed for {contact_id}: {exc}")
+            return self._pending_slots.get(contact_id, [])
+        if slots:
+            self._pending_slots[contact_id] = slots
+            return slots
+        self._pending_slots.pop(contact_id, None)
+        return []
+
+    async def has_pending_slots(self, contact_id: str) -> bool:
+        """Return True if there are pending slots for this contact (see ``load_pending_slots``)."""
+        return bool(await self.load_pending_slots(contact_id))
 
     def detect_slot_selection(self, message: str, contact_id: str = "") -> Optional[int]:
         """
@@ -165,7 +191,9 @@ class CalendarBookingService:
 
         Args:
             message: Raw SMS text from the lead.
-            contact_id: Used to look up pending slots for display-text matching.
+            contact_id: Used to look up pending slots for display-text matching
+                (call ``load_pending_slots`` first when another worker may have
+                offered them).
 
         Returns:
             0-based slot index or None if ambiguous.
@@ -197,6 +225,32 @@ class CalendarBookingService:
 
         return None
 
+    # ------------------------------------------------------------------
+    # Shared slot storage
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _slots_key(contact_id: str) -> str:
+        return f"calendar:pending_slots:{contact_tag(contact_id)}"
+
+    def _get_cache(self) -> Any:
+        if self._cache is None:
+            from bots.shared.cache_service import get_cache_service
+            self._cache = get_cache_service()
+        return self._cache
+
+    async def _store_pending_slots(self, contact_id: str, slots: Optional[List[Dict]]) -> None:
+        """Write (or with ``None`` clear) the shared copy of a contact's slots."""
+        try:
+            if slots:
+                await self._get_cache().set(
+                    self._slots_key(contact_id), slots, ttl=PENDING_SLOTS_TTL_SECONDS
+                )
+            else:
+                await self._get_cache().delete(self._slots_key(contact_id))
+        except Exception as exc:
+            logger.warning(f"Could not store pending slots for {contact_id}: {exc}")
+
     # ------------------------------------------------------------------
     # Formatting helpers
     # ------------------------------------------------------------------
@@ -4,14 +4,27 @@ Claude AI Client for Jorge's Real Estate Bots.
 Simplified version of EnterpriseHub's LLM client, focused on Claude only.
 Provides intelligent routing, prompt caching, and async support.
 """
+import json
+import re
+import threading
 from dataclasses import dataclass
 from enum import Enum
-from typing import AsyncGenerator, Dict, List, Optional
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from bots.shared.claude_hedge import claude_hedger, request_slot
+from bots.shared.claude_memo import ResponseMemo, response_memo
+from bots.shared.claude_scheduler import (
+    RequestPriority,
+    claude_scheduler,
+    estimate_input_tokens,
+    retry_after_seconds,
+)
 from bots.shared.config import settings
 from bots.shared.logger import get_logger
+from bots.shared.response_filter import SMS_MAX_LENGTH
 
 logger = get_logger(__name__)
 
@@ -34,6 +47,191 @@ try:
 except ImportError:
     _CLAUDE_RETRY_EXCEPTIONS = (Exception,)
 
+# Rate limited (429) and overloaded (529) responses tune the scheduler
+_RATE_LIMIT_STATUSES = (429, 529)
+
+_BACKOFF = wait_exponential(multiplier=1, min=2, max=15)
+
+
+def _error_headers(error: Optional[BaseException]):
+    return getattr(getattr(error, "response", None), "headers", None)
+
+
+def _retry_wait(retry_state) -> float:
+    """Wait as long as the server's retry-after asks, else back off exponentially."""
+    error = retry_state.outcome.exception() if retry_state.outcome else None
+    retry_after = retry_after_seconds(_error_headers(error))
+    return retry_after if retry_after is not None else _BACKOFF(retry_state)
+
+
+def _tool_input(response, tool_name: str) -> Dict[str, Any]:
+    """Arguments of the ``tool_name`` call in ``response``; ValueError if Claude didn't make it."""
+    for block in response.content:
+        if getattr(block, "type", None) == "tool_use" and getattr(block, "name", None) == tool_name:
+            if isinstance(block.input, dict):
+                return dict(block.input)
+    raise ValueError(f"Claude response has no {tool_name} tool call")
+
+
+def structured_reply(response: "LLMResponse", field: str = "message") -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Reply text and structured fields of a structured turn.
+
+    Responses without structured data (schema disabled, or a stand-in
+    client) give the plain ``content`` and None.  A structured turn without
+    a usable ``field`` - missing, null, blank, or tool input cut off at
+    ``max_tokens`` - raises ValueError: its ``content`` is the tool JSON,
+    which must never be sent as the reply.
+    """
+    structured = getattr(response, "structured", None)
+    if structured is None:
+        return response.content, None
+    if getattr(response, "finish_reason", None) == "max_tokens":
+        raise ValueError("Structured turn was truncated at max_tokens")
+    reply = structured.get(field) if isinstance(structured, dict) else None
+    if not isinstance(reply, str) or not reply.strip():
+        raise ValueError(f"Structured turn has no {field!r} text")
+    return reply, structured
+
+
+_EPHEMERAL = {"type": "ephemeral"}
+
+# Prices of cached input relative to uncached input: cache reads cost 10%,
+# cache writes 125% (5-minute ephemeral cache)
+_CACHE_READ_PRICE = 0.1
+_CACHE_WRITE_PRICE = 1.25
+
+
+def _with_history_breakpoint(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy of ``messages`` with a cache breakpoint on the last non-empty one.
+
+    The history is the stable part of a conversation: next turn it is resent
+    with this turn appended, so the prefix up to the breakpoint is read from
+    the prompt cache.  The caller's dicts are left untouched.
+    """
+    messages = list(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        content = messages[index].get("content")
+        if isinstance(content, str) and content.strip():
+            messages[index] = {
+                **messages[index],
+                "content": [{"type": "text", "text": content, "cache_control": _EPHEMERAL}],
+            }
+            break
+    return messages
+
+
+def _token_count(value: Any) -> int:
+    return value if isinstance(value, int) else 0
+
+
+# End of a sentence: punctuation (plus closing quotes/brackets) followed by space
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?=\s)")
+
+# Output tokens of an SMS reply: the longest SMS at ~3 characters per token.
+# A structured turn also needs room for the tool call's JSON (see
+# structured_overhead_tokens): the base covers the braces, the reply field
+# and escaping; each answer field adds its name (at ~2 characters per token,
+# underscores split words), punctuation and value.
+_SMS_REPLY_TOKENS = SMS_MAX_LENGTH // 3
+_STRUCTURED_BASE_TOKENS = 96
+_FIELD_PUNCTUATION_TOKENS = 6
+_FREE_TEXT_FIELD_TOKENS = 24
+_SCALAR_FIELD_TOKENS = 4
+
+
+def structured_overhead_tokens(schema: Dict[str, Any], reply_field: str = "message") -> int:
+    """Output tokens a structured turn needs besides its reply text.
+
+    Assumes every answer field gets filled, enums with their longest value,
+    so a reply near the channel cap cannot cut the tool input short.
+    """
+    tokens = _STRUCTURED_BASE_TOKENS
+    for name, spec in schema.get("properties", {}).items():
+        if name == reply_field:
+            continue
+        tokens += len(name) // 2 + _FIELD_PUNCTUATION_TOKENS
+        types = spec.get("type")
+        types = types if isinstance(types, list) else [types]
+        choices = [value for value in spec.get("enum", ()) if isinstance(value, str)]
+        if choices:
+            tokens += max(map(len, choices)) // 2 + 2
+        elif "string" in types:
+            tokens += _FREE_TEXT_FIELD_TOKENS
+        else:
+            tokens += _SCALAR_FIELD_TOKENS
+    return tokens
+
+def _sms_stop_index(text: str, soft_chars: int, hard_chars: int = SMS_MAX_LENGTH) -> Optional[int]:
+    """Where to cut a reply being streamed for SMS, or None to keep streaming.
+
+    Stops at the first sentence end past ``soft_chars``.  Text reaching
+    ``hard_chars`` is cut back to its last complete sentence (or to the
+    limit, for ``sanitize_bot_response`` to shorten at a word).
+    """
+    for match in _SENTENCE_END.finditer(text, 0, hard_chars + 1):
+        if match.end() >= soft_chars:
+            return match.end()
+    if len(text) < hard_chars:
+        return None
+    ends = [match.end() for match in _SENTENCE_END.finditer(text, 0, hard_chars + 1)]
+    return ends[-1] if ends else hard_chars
+
+
+def channel_max_tokens(channel: str, max_tokens: int, schema: Optional[Dict[str, Any]] = None) -> int:
+    """``max_tokens`` capped to what a reply on ``channel`` can use.
+
+    ``schema`` is the response schema of a structured turn; the cap grows by
+    what its tool call needs (see structured_overhead_tokens).
+    """
+    if channel == "sms":
+        cap = _SMS_REPLY_TOKENS + (structured_overhead_tokens(schema) if schema is not None else 0)
+        return min(max_tokens, cap)
+    return max_tokens
+
+
+class PromptCacheStats:
+    """Prompt cache usage of Claude calls, per usage label (seller, buyer, lead)."""
+
+    _FIELDS = ("calls", "input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels: Dict[str, Dict[str, int]] = {}
+
+    def record(self, label: str, usage: Any) -> None:
+        """Add one response's ``usage`` to ``label``'s totals."""
+        with self._lock:
+            totals = self._labels.setdefault(label, dict.fromkeys(self._FIELDS, 0))
+            totals["calls"] += 1
+            for name in self._FIELDS[1:]:
+                totals[name] += _token_count(getattr(usage, name, 0))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._labels.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Token totals, cache hit rate and input tokens saved per label.
+
+        ``saved_input_tokens`` is in uncached-input-token equivalents: what
+        cache reads saved minus the surcharge paid on cache writes.
+        """
+        with self._lock:
+            labels = {label: dict(totals) for label, totals in self._labels.items()}
+        for totals in labels.values():
+            read = totals["cache_read_input_tokens"]
+            written = totals["cache_creation_input_tokens"]
+            total_input = totals["input_tokens"] + read + written
+            totals["cache_hit_rate"] = round(read / total_input * 100, 1) if total_input else 0.0
+            totals["saved_input_tokens"] = round(
+                read * (1 - _CACHE_READ_PRICE) - written * (_CACHE_WRITE_PRICE - 1)
+            )
+        return labels
+
+
+# Shared by every ClaudeClient in the process
+prompt_cache_stats = PromptCacheStats()
+
 
 class TaskComplexity(Enum):
     """Task complexity for intelligent routing."""
@@ -52,6 +250,7 @@ class LLMResponse:
     cache_creation_input_tokens: Optional[int] = None
     cache_read_input_tokens: Optional[int] = None
     finish_reason: Optional[str] = None
+    structured: Optional[Dict[str, Any]] = None  # tool input when a response_schema was given
 
 
 class ClaudeClient:
@@ -60,19 +259,32 @@ class ClaudeClient:
 
     Features:
     - Intelligent model routing based on task complexity
-    - Prompt caching for repeated system prompts
+    - Prompt caching of the stable system prefix and conversation history,
+      with savings reported per usage label (see PromptCacheStats)
+    - Opt-in memoization of deterministic (temperature 0) calls
+    - Priority scheduling and per-model rate limits (see claude_scheduler)
+    - Per-call deadlines, hedging to Haiku and per-model circuit breakers
+      (see claude_hedge)
     - Async support for FastAPI integration
     - Streaming responses for real-time UI updates
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self, api_key: Optional[str] = None, scheduler=None, usage_label: str = "default", hedger=None
+    ):
         """
         Initialize Claude client.
 
         Args:
             api_key: Optional API key override
+            scheduler: Request scheduler (default: the process-wide one)
+            usage_label: Name prompt cache usage is reported under (the bot)
+            hedger: Deadline/hedging runner (default: the process-wide one)
         """
         self.api_key = api_key or settings.anthropic_api_key
+        self.scheduler = scheduler or claude_scheduler
+        self.usage_label = usage_label
+        self.hedger = hedger or claude_hedger
         self._client = None
         self._async_client = None
 
@@ -117,10 +329,67 @@ class ClaudeClient:
 
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=15),
+        wait=_retry_wait,
         retry=retry_if_exception_type(_CLAUDE_RETRY_EXCEPTIONS),
         reraise=True,
     )
+    async def _acreate(self, priority: RequestPriority, input_tokens: int, **request):
+        """``messages.create`` in a scheduler slot, retried on rate limits and server errors."""
+        model = request["model"]
+        async with request_slot(self.scheduler.slot(model, priority, input_tokens)):
+            try:
+                return await self._async_client.messages.create(**request)
+            except _CLAUDE_RETRY_EXCEPTIONS as e:
+                if getattr(e, "status_code", None) in _RATE_LIMIT_STATUSES:
+                    self.scheduler.observe_rate_limit(model, _error_headers(e))
+                raise
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_retry_wait,
+        retry=retry_if_exception_type(_CLAUDE_RETRY_EXCEPTIONS),
+        reraise=True,
+    )
+    async def _acreate_sms(self, priority: RequestPriority, input_tokens: int, soft_chars: int, **request):
+        """Stream a text reply and stop once it is long enough for an SMS.
+
+        Returns a ``messages.create``-like response; its stop_reason is
+        ``"sms_budget"`` when the stream was cut short.
+        """
+        model = request["model"]
+        async with request_slot(self.scheduler.slot(model, priority, input_tokens)):
+            try:
+                async with self._async_client.messages.stream(**request) as stream:
+                    text, cut = "", None
+                    async for chunk in stream.text_stream:
+                        text += chunk
+                        cut = _sms_stop_index(text, soft_chars)
+                        if cut is not None:
+                            break
+                    message = stream.current_message_snapshot
+            except _CLAUDE_RETRY_EXCEPTIONS as e:
+                if getattr(e, "status_code", None) in _RATE_LIMIT_STATUSES:
+                    self.scheduler.observe_rate_limit(model, _error_headers(e))
+                raise
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text[:cut].rstrip() if cut is not None else text)],
+            usage=getattr(message, "usage", None) or SimpleNamespace(input_tokens=None, output_tokens=None),
+            stop_reason="sms_budget" if cut is not None else getattr(message, "stop_reason", None),
+        )
+
+    @staticmethod
+    def _fallback_model(model: str) -> str:
+        """Model a call hedges to or is rerouted to: Haiku, or Sonnet for Haiku calls."""
+        if model == settings.claude_haiku_model:
+            return settings.claude_sonnet_model
+        return settings.claude_haiku_model
+
+    @staticmethod
+    def _priority_for(complexity: Optional[TaskComplexity]) -> RequestPriority:
+        if complexity == TaskComplexity.ROUTINE:
+            return RequestPriority.ROUTINE
+        return RequestPriority.INTERACTIVE
+
     async def agenerate(
         self,
         prompt: str,
@@ -130,6 +399,14 @@ class ClaudeClient:
         temperature: float = 0.7,
         complexity: Optional[TaskComplexity] = None,
         enable_caching: bool = True,
+        cached_context: Optional[str] = None,
+        memo_namespace: Optional[str] = None,
+        priority: Optional[RequestPriority] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        response_tool: str = "respond",
+        deadline_seconds: Optional[float] = None,
+        hedge: bool = False,
+        channel: Optional[str] = None,
         **kwargs
     ) -> LLMResponse:
         """
@@ -142,7 +419,29 @@ class ClaudeClient:
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
             complexity: Task complexity for model routing
-            enable_caching: Enable prompt caching for long system prompts
+            enable_caching: Cache the system prompt (with ``cached_context``)
+                and the history up to its last message, so the next turn of
+                the conversation reads them from the prompt cache
+            cached_context: Stable instructions sent after the system prompt,
+                e.g. a bot's question script and business rules.  Keep
+                per-turn details in ``prompt``: any change here invalidates
+                the cached prefix
+            memo_namespace: Reuse responses to identical calls, stored under
+                this cache namespace (temperature 0 only; see claude_memo)
+            priority: Scheduling class (default: ROUTINE for routine tasks,
+                else INTERACTIVE)
+            response_schema: JSON schema of a structured response.  Claude is
+                made to call tool ``response_tool`` with it; the arguments are
+                returned in ``structured`` (and as JSON in ``content``)
+            deadline_seconds: Raise ``ClaudeDeadlineExceeded`` if no answer
+                arrives in time, retries included.  Deadline calls skip
+                models whose circuit breaker is open
+            hedge: With a deadline, also send the request to the fallback
+                model once the primary is slower than its recent p95
+            channel: Delivery channel of the reply ("sms").  Caps
+                ``max_tokens`` to what the channel can send; text replies
+                are streamed and stopped at the first sentence end past
+                ``SMS_REPLY_CHAR_BUDGET`` characters
 
         Returns:
             LLMResponse with content and metadata
@@ -151,58 +450,120 @@ class ClaudeClient:
 
         # Route to appropriate model
         target_model = self._get_routed_model(complexity)
+        if channel:
+            max_tokens = channel_max_tokens(channel, max_tokens, schema=response_schema)
+        stream_sms = channel == "sms" and response_schema is None and settings.sms_reply_char_budget > 0
 
         # Truncate history to 20 messages (10 turns) to avoid context bloat
         if history and len(history) > 20:
             history = history[-20:]
 
+        memo_key = None
+        if memo_namespace and temperature == 0 and response_memo.enabled:
+            memo_key = await response_memo.key(memo_namespace, ResponseMemo.fingerprint(
+                target_model, system_prompt, prompt, history, max_tokens=max_tokens, temperature=temperature,
+                schema=response_schema, context=cached_context, channel=channel,
+            ))
+            memoized = await response_memo.get(memo_key) if memo_key else None
+            if memoized is not None:
+                return LLMResponse(**memoized)
+
         # Build messages
         messages = history.copy() if history else []
         messages.append({"role": "user", "content": prompt})
 
-        # Build system prompt with optional caching
-        system_blocks = []
-        if system_prompt:
-            # Cache long system prompts (>1024 chars ≈ 250 tokens)
-            if enable_caching and len(system_prompt) > 1024:
-                system_blocks.append({
-                    "type": "text",
-                    "text": system_prompt,
-                    "cache_control": {"type": "ephemeral"}
-                })
-                logger.debug(f"Prompt caching enabled for {len(system_prompt)} char system prompt")
-            else:
-                system_blocks.append({"type": "text", "text": system_prompt})
+        input_tokens_estimate = estimate_input_tokens(
+            system_prompt, cached_context, prompt, *(message.get("content") for message in messages[:-1])
+        )
+
+        # Build the system prompt: persona, then the stable bot context.  The
+        # breakpoint on the last block caches tools + system; the one on the
+        # last history message rolls forward with the conversation.  Prefixes
+        # under the model's minimum cacheable length are simply not cached.
+        system_blocks = [
+            {"type": "text", "text": text} for text in (system_prompt, cached_context) if text
+        ]
+        if enable_caching:
+            if system_blocks:
+                system_blocks[-1]["cache_control"] = _EPHEMERAL
+            if len(messages) > 1:
+                messages = _with_history_breakpoint(messages[:-1]) + messages[-1:]
+
+        tool_options: Dict[str, Any] = {}
+        if response_schema is not None:
+            tool_options = {
+                "tools": [{
+                    "name": response_tool,
+                    "description": response_schema.get("description", "Return the response in this structure."),
+                    "input_schema": response_schema,
+                }],
+                "tool_choice": {"type": "tool", "name": response_tool},
+            }
 
         try:
-            response = await self._async_client.messages.create(
-                model=target_model,
+            request_priority = priority if priority is not None else self._priority_for(complexity)
+            request = dict(
                 max_tokens=max_tokens,
                 temperature=temperature,
                 system=system_blocks if system_blocks else _FALLBACK_SYSTEM,
                 messages=messages,
-                extra_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
+                extra_headers={"anthropic-beta": "prompt-caching-2024-07-31"},
+                **tool_options
             )
+            def call(model: str):
+                if stream_sms:
+                    return self._acreate_sms(
+                        request_priority, input_tokens_estimate, settings.sms_reply_char_budget,
+                        model=model, **request
+                    )
+                return self._acreate(request_priority, input_tokens_estimate, model=model, **request)
+
+            if deadline_seconds:
+                response, target_model = await self.hedger.run(
+                    call,
+                    target_model,
+                    self._fallback_model(target_model),
+                    deadline_seconds,
+                    hedge=hedge,
+                )
+            else:
+                response = await call(target_model)
 
             # Extract metrics
             input_tokens = response.usage.input_tokens if hasattr(response, 'usage') else None
             output_tokens = response.usage.output_tokens if hasattr(response, 'usage') else None
-            cache_creation = getattr(response.usage, 'cache_creation_input_tokens', 0)
-            cache_read = getattr(response.usage, 'cache_read_input_tokens', 0)
+            cache_creation = _token_count(getattr(response.usage, 'cache_creation_input_tokens', 0))
+            cache_read = _token_count(getattr(response.usage, 'cache_read_input_tokens', 0))
 
             # Log cache performance
+            if hasattr(response, 'usage'):
+                prompt_cache_stats.record(self.usage_label, response.usage)
             if cache_read > 0:
-                savings_pct = (cache_read / (input_tokens or 1)) * 100
-                logger.info(f"Cache hit! Read {cache_read} tokens ({savings_pct:.1f}% savings)")
+                total_input = _token_count(input_tokens) + cache_read + cache_creation
+                logger.info(f"Cache hit! Read {cache_read} of {total_input} input tokens from the prompt cache")
+
+            structured = None
+            if response_schema is not None:
+                structured = _tool_input(response, response_tool)
+                content = json.dumps(structured)
+            else:
+                content = response.content[0].text
+            if memo_key and content.strip():
+                # Token counts are left out: a memoized response costs none
+                await response_memo.set(memo_key, {
+                    "content": content, "model": target_model, "finish_reason": response.stop_reason,
+                    "structured": structured,
+                })
 
             return LLMResponse(
-                content=response.content[0].text,
+                content=content,
                 model=target_model,
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
                 cache_creation_input_tokens=cache_creation,
                 cache_read_input_tokens=cache_read,
-                finish_reason=response.stop_reason
+                finish_reason=response.stop_reason,
+                structured=structured,
             )
 
         except Exception as e:
@@ -214,6 +575,7 @@ class ClaudeClient:
         prompt: str,
         system_prompt: Optional[str] = None,
         complexity: Optional[TaskComplexity] = None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
         **kwargs
     ) -> AsyncGenerator[str, None]:
         """
@@ -223,6 +585,7 @@ class ClaudeClient:
             prompt: User prompt
             system_prompt: System instructions
             complexity: Task complexity for model routing
+            priority: Scheduling class; the slot is held until the stream ends
 
         Yields:
             Response chunks as they're generated
@@ -231,14 +594,15 @@ class ClaudeClient:
 
         target_model = self._get_routed_model(complexity)
 
-        async with self._async_client.messages.stream(
-            model=target_model,
-            max_tokens=2048,
-            system=system_prompt or _FALLBACK_SYSTEM,
-            messages=[{"role": "user", "content": prompt}]
-        ) as stream:
-            async for text in stream.text_stream:
-                yield text
+        async with self.scheduler.slot(target_model, priority, estimate_input_tokens(system_prompt, prompt)):
+            async with self._async_client.messages.stream(
+                model=target_model,
+                max_tokens=2048,
+                system=system_prompt or _FALLBACK_SYSTEM,
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
 
     def generate(
         self,
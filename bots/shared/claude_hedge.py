@@ -0,0 +1,290 @@
+"""
+Deadlines, hedged requests and per-model circuit breakers for Claude calls.
+
+A ``ClaudeClient`` call made with a deadline runs through ``ClaudeHedger``:
+
+- the whole call, retries included, must finish within the deadline or it
+  raises ``ClaudeDeadlineExceeded`` (callers already fall back on errors);
+- with hedging on, if the primary model hasn't answered after its recent
+  p95 latency (``CLAUDE_HEDGE_PERCENTILE``; ``CLAUDE_HEDGE_DELAY_MS`` until
+  enough samples exist), the same request also goes to the fallback model
+  (Haiku).  The first good answer wins and the other request is cancelled.
+  A failed primary fires the hedge at once;
+- each model has a consecutive-failure breaker.  Server errors, connection
+  errors and deadline timeouts count; client errors and rate limits don't
+  (the scheduler handles those).  A timeout only counts against a model
+  whose request was at the API: attempts still queued in the local
+  scheduler or pausing for a retry-after (see ``request_slot``) are not the
+  model's fault.  While a model's breaker is open its calls
+  go straight to the fallback model.  After ``CLAUDE_BREAKER_COOLDOWN_SECONDS``
+  one trial request is let through; its outcome closes or re-opens it.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple, Type
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Latency samples kept per model, and needed before the percentile is used
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+try:
+    from anthropic import APIConnectionError as _APIConnectionError, InternalServerError as _InternalServerError
+    _DEGRADED_EXCEPTIONS: Tuple[Type[BaseException], ...] = (_APIConnectionError, _InternalServerError)
+except ImportError:
+    _DEGRADED_EXCEPTIONS = ()
+
+
+class ClaudeDeadlineExceeded(TimeoutError):
+    """A Claude call (and its hedge) did not answer within its deadline."""
+
+
+class _Attempt:
+    """Where one hedged attempt is: waiting locally, or with a request at the API.
+
+    Calls that never enter a ``request_slot`` don't report, and are always
+    treated as in flight.
+    """
+
+    def __init__(self):
+        self.reports = False
+        self.in_flight = False
+
+    @property
+    def at_api(self) -> bool:
+        return self.in_flight or not self.reports
+
+
+_current_attempt: ContextVar[Optional[_Attempt]] = ContextVar("claude_hedge_attempt", default=None)
+
+
+@asynccontextmanager
+async def request_slot(slot: AsyncContextManager[Any]) -> AsyncIterator[None]:
+    """Enter a scheduler ``slot``, marking the current hedged attempt in flight while it is held."""
+    attempt = _current_attempt.get()
+    if attempt is None:
+        async with slot:
+            yield
+        return
+    attempt.reports = True
+    async with slot:
+        attempt.in_flight = True
+        try:
+            yield
+        finally:
+            attempt.in_flight = False
+
+
+class ModelBreaker:
+    """Consecutive-failure breaker of one model, with a single half-open trial."""
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.cooldown_seconds = cooldown_seconds
+        self.state = CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """Whether a request may use this model now (claims the trial when half-open)."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            self.state = HALF_OPEN
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failure_count = 0
+
+    def release_trial(self) -> None:
+        """A half-open trial ended without a verdict (cancelled, client error): allow another."""
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+
+    def record_failure(self, model: str) -> None:
+        self.failure_count += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failure_count >= self.failure_threshold):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            logger.warning(f"Claude circuit breaker opened for {model} after {self.failure_count} failures")
+
+
+class _ModelHealth:
+    """Breaker, recent latencies and hedge counters of one model."""
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.breaker = ModelBreaker(failure_threshold, cooldown_seconds)
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.timeouts = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.rerouted = 0
+
+    def percentile_ms(self, percentile: float) -> Optional[float]:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * percentile / 100), len(ordered) - 1)]
+
+
+class ClaudeHedger:
+    """Runs deadline-bound Claude requests with hedging and per-model breakers."""
+
+    def __init__(
+        self,
+        hedge_delay_ms: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+    ):
+        self.hedge_delay_ms = settings.claude_hedge_delay_ms if hedge_delay_ms is None else hedge_delay_ms
+        self.hedge_percentile = hedge_percentile or settings.claude_hedge_percentile
+        self.failure_threshold = failure_threshold or settings.claude_breaker_failure_threshold
+        self.cooldown_seconds = (
+            settings.claude_breaker_cooldown_seconds if cooldown_seconds is None else cooldown_seconds
+        )
+        self._models: Dict[str, _ModelHealth] = {}
+
+    def _health(self, model: str) -> _ModelHealth:
+        health = self._models.get(model)
+        if health is None:
+            health = self._models[model] = _ModelHealth(self.failure_threshold, self.cooldown_seconds)
+        return health
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for ``model`` before hedging: its recent p95, or the configured delay."""
+        observed = self._health(model).percentile_ms(self.hedge_percentile)
+        return (observed if observed is not None else self.hedge_delay_ms) / 1000
+
+    async def run(
+        self,
+        call: Callable[[str], Awaitable[Any]],
+        model: str,
+        fallback_model: Optional[str],
+        deadline_seconds: float,
+        hedge: bool = True,
+    ) -> Tuple[Any, str]:
+        """``call(model)`` within ``deadline_seconds``; returns (result, model that answered)."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_seconds
+        if fallback_model == model:
+            fallback_model = None
+
+        # Route around a model whose breaker is open (unless both are)
+        if fallback_model and not self._health(model).breaker.allow() and self._health(fallback_model).breaker.allow():
+            self._health(model).rerouted += 1
+            model, fallback_model = fallback_model, None
+        # Never hedge onto a model whose breaker is open; a claimed half-open
+        # trial is handed back below if the hedge is not sent
+        hedge_model = None
+        if hedge and fallback_model and self._health(fallback_model).breaker.allow():
+            hedge_model = fallback_model
+
+        attempts: Dict[asyncio.Task, _Attempt] = {}
+
+        def start(attempt_model: str) -> None:
+            attempt = _Attempt()
+            task = asyncio.create_task(self._attempt(call, attempt_model, attempt))
+            tasks[task], attempts[task] = attempt_model, attempt
+
+        tasks: Dict[asyncio.Task, str] = {}
+        start(model)
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while tasks:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                timeout = remaining
+                if hedge_model and not hedged:
+                    # The hedge gets at least half of what is left of the budget
+                    timeout = min(self.hedge_delay(model), remaining / 2)
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    answered_by = tasks.pop(task)
+                    if task.exception() is None:
+                        if answered_by != model:
+                            self._health(model).hedges_won += 1
+                        return task.result(), answered_by
+                    error = task.exception()
+                if hedge_model and not hedged and (not done or not tasks):
+                    # Primary slow or failed: send the hedge
+                    hedged = True
+                    self._health(model).hedges_fired += 1
+                    start(hedge_model)
+            if error is not None and not tasks:
+                raise error
+
+            for task, pending_model in tasks.items():
+                health = self._health(pending_model)
+                health.timeouts += 1
+                if attempts[task].at_api:
+                    health.breaker.record_failure(pending_model)
+            raise ClaudeDeadlineExceeded(f"Claude {model} did not answer within {deadline_seconds:.1f}s")
+        finally:
+            if hedge_model and not hedged:
+                self._health(hedge_model).breaker.release_trial()
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _attempt(self, call: Callable[[str], Awaitable[Any]], model: str, attempt: _Attempt) -> Any:
+        _current_attempt.set(attempt)  # the task runs in its own context copy
+        health = self._health(model)
+        health.calls += 1
+        start = time.monotonic()
+        try:
+            result = await call(model)
+        except _DEGRADED_EXCEPTIONS:
+            health.breaker.record_failure(model)
+            raise
+        except BaseException:
+            health.breaker.release_trial()
+            raise
+        health.latencies.append((time.monotonic() - start) * 1000)
+        health.breaker.record_success()
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Breaker state, latency and hedge/timeout counters per model."""
+        models = {}
+        for model, health in self._models.items():
+            models[model] = {
+                "breaker": health.breaker.state,
+                "breaker_trips": health.breaker.trips,
+                "calls": health.calls,
+                "timeouts": health.timeouts,
+                "hedges_fired": health.hedges_fired,
+                "hedges_won": health.hedges_won,
+                "rerouted": health.rerouted,
+                "latency_p50_ms": _round(health.percentile_ms(50)),
+                "latency_p95_ms": _round(health.percentile_ms(95)),
+                "hedge_delay_ms": round(self.hedge_delay(model) * 1000, 1),
+            }
+        return {"models": models}
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+# Shared by every ClaudeClient in the process
+claude_hedger = ClaudeHedger()
@@ -0,0 +1,148 @@
+"""
+Memoized responses for deterministic Claude calls.
+
+Classification calls at temperature 0 (seller condition/motivation, the
+Q2 price fallback) return the same label for the same input, and sellers
+write the same things over and over ("needs a new roof", "inherited it").
+``ClaudeClient.agenerate(..., memo_namespace=...)`` looks such calls up here
+before calling the API.
+
+Entries are keyed by a SHA-256 of model, system prompt, normalized prompt
+(whitespace collapsed, case folded), history and generation options.  They
+live in two tiers:
+
+- a per-process LRU (``CLAUDE_MEMO_MAX_ENTRIES``) answering repeats without
+  any I/O;
+- the shared cache, under ``namespaced_key(memo_namespace, ...)``, so other
+  workers reuse the answer and invalidating the namespace (a bot settings
+  or prompt change) drops every memoized response at once.
+
+Both tiers expire entries after ``CLAUDE_MEMO_TTL_SECONDS`` (0 disables
+memoization).  Cache errors are logged and treated as misses; they never
+fail the Claude call.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResponseMemo:
+    """Two-tier (process LRU + shared cache) store of memoized Claude responses."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        cache: Any = None,
+    ):
+        self.ttl_seconds = settings.claude_memo_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.max_entries = max_entries or settings.claude_memo_max_entries
+        self._cache = cache
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @property
+    def cache(self) -> Any:
+        if self._cache is None:
+            from bots.shared.cache_service import get_cache_service
+
+            self._cache = get_cache_service()
+        return self._cache
+
+    @staticmethod
+    def fingerprint(
+        model: str,
+        system_prompt: Optional[str],
+        prompt: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        **options: Any,
+    ) -> str:
+        """Digest of everything that determines the response."""
+        normalized = " ".join(prompt.split()).casefold()
+        payload = json.dumps(
+            [model, system_prompt or "", normalized, history or [], options],
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def key(self, namespace: str, fingerprint: str) -> Optional[str]:
+        """Cache key of ``fingerprint`` in the current generation of ``namespace``."""
+        try:
+            return await self.cache.namespaced_key(namespace, f"claude:{fingerprint}")
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Claude memo key lookup failed: {e}")
+            return None
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._local.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                return entry[1]
+            del self._local[key]
+
+        try:
+            value = await self.cache.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Claude memo read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.shared_hits += 1
+        self._remember(key, value)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._remember(key, value)
+        try:
+            await self.cache.set(key, value, ttl=self.ttl_seconds)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Claude memo write failed: {e}")
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        self._local[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop the process-local tier (the shared tier expires on its own)."""
+        self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        hits = self.local_hits + self.shared_hits
+        return {
+            "enabled": self.enabled,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(hits / lookups * 100, 2) if lookups else 0.0,
+            "local_entries": len(self._local),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+# Shared by every ClaudeClient in the process
+response_memo = ResponseMemo()
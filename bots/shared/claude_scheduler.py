@@ -0,0 +1,259 @@
+"""
+Priority scheduling and rate limiting of Claude API requests.
+
+Every ``ClaudeClient`` request waits for a slot in its model's lane:
+
+- at most ``CLAUDE_MAX_CONCURRENCY`` requests per model run at once in a
+  process;
+- waiters are served by priority, then arrival: interactive seller/buyer
+  turns before lead analyses, and both before routine classification;
+- only the head of the queue takes budget from the model's request and
+  input-token buckets, and only when both allow it (a request token taken
+  before the input-token bucket denies is given back).  The buckets are
+  the shared token buckets of
+  ``token_bucket`` (atomic on Redis), so the limits hold across workers.
+  While the head waits for budget, a higher-priority arrival replaces it.
+
+Bucket sizes start from ``CLAUDE_REQUESTS_PER_MINUTE`` and
+``CLAUDE_INPUT_TOKENS_PER_MINUTE`` (0 = no limit) and are re-tuned from
+the ``anthropic-ratelimit-*`` headers of rate-limited responses.  A
+``retry-after`` header pauses the whole lane, so queued requests don't run
+into the same 429.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+from bots.shared.token_bucket import BucketSpec, TokenBucketLimiter
+
+logger = get_logger(__name__)
+
+# Longest pause taken from a retry-after header
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+
+class RequestPriority(IntEnum):
+    """Scheduling class of a Claude request (lower is served first)."""
+    INTERACTIVE = 0  # Seller/buyer replies a contact is waiting for
+    ANALYSIS = 1     # Lead analyses (webhooks, dashboard batches)
+    ROUTINE = 2      # Classification/extraction fallbacks
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds from a ``retry-after`` header, capped; None if absent or unparsable."""
+    if not headers:
+        return None
+    try:
+        value = float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+    return min(max(value, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+def estimate_input_tokens(*texts: Optional[str]) -> int:
+    """Rough input token count (4 characters per token)."""
+    return max(sum(len(text) for text in texts if text) // 4, 1)
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "tokens", "enqueued")
+
+    def __init__(self, priority: int, seq: int, tokens: int):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _ModelLane:
+    """Concurrency slots, priority queue and buckets of one model."""
+
+    def __init__(self, model: str, concurrency: int, requests_per_minute: int, tokens_per_minute: int):
+        self.model = model
+        self.loop = asyncio.get_running_loop()
+        self.concurrency = max(concurrency, 1)
+        self.request_bucket = BucketSpec.per_minute(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = BucketSpec.per_minute(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.active = 0
+        self.paused_until = 0.0
+        self.queue: List[_Ticket] = []
+        self.condition = asyncio.Condition()
+        self.rate_limited = 0
+        self.waits: Dict[str, Dict[str, float]] = {}
+
+    def record_wait(self, priority: int, waited_ms: float) -> None:
+        stats = self.waits.setdefault(RequestPriority(priority).name.lower(), {
+            "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+        })
+        stats["count"] += 1
+        stats["total_ms"] += waited_ms
+        stats["max_ms"] = max(stats["max_ms"], waited_ms)
+
+
+class ClaudeScheduler:
+    """Per-model priority lanes in front of the Claude API."""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        input_tokens_per_minute: Optional[int] = None,
+        limiter: Optional[TokenBucketLimiter] = None,
+    ):
+        self.concurrency = concurrency or settings.claude_max_concurrency
+        self.requests_per_minute = (
+            settings.claude_requests_per_minute if requests_per_minute is None else requests_per_minute
+        )
+        self.input_tokens_per_minute = (
+            settings.claude_input_tokens_per_minute if input_tokens_per_minute is None else input_tokens_per_minute
+        )
+        self.limiter = limiter or TokenBucketLimiter(prefix="claude")
+        self._lanes: Dict[str, _ModelLane] = {}
+        self._seq = itertools.count()
+
+    def _lane(self, model: str) -> _ModelLane:
+        lane = self._lanes.get(model)
+        # A lane's condition belongs to one event loop (tests run several)
+        if lane is None or lane.loop is not asyncio.get_running_loop():
+            lane = self._lanes[model] = _ModelLane(
+                model, self.concurrency, self.requests_per_minute, self.input_tokens_per_minute
+            )
+        return lane
+
+    @asynccontextmanager
+    async def slot(
+        self, model: str, priority: int = RequestPriority.INTERACTIVE, input_tokens: int = 1
+    ) -> AsyncIterator[None]:
+        """Hold one of ``model``'s concurrency slots for the duration of a request."""
+        lane = self._lane(model)
+        await self._acquire(lane, _Ticket(int(priority), next(self._seq), input_tokens))
+        try:
+            yield
+        finally:
+            async with lane.condition:
+                lane.active -= 1
+                lane.condition.notify_all()
+
+    async def _acquire(self, lane: _ModelLane, ticket: _Ticket) -> None:
+        async with lane.condition:
+            heapq.heappush(lane.queue, ticket)
+            try:
+                while True:
+                    if lane.queue[0] is not ticket or lane.active >= lane.concurrency:
+                        await lane.condition.wait()
+                        continue
+                    delay = await self._budget_delay(lane, ticket.tokens)
+                    if delay <= 0:
+                        heapq.heappop(lane.queue)
+                        lane.active += 1
+                        lane.record_wait(ticket.priority, (time.monotonic() - ticket.enqueued) * 1000)
+                        lane.condition.notify_all()
+                        return
+                    # Re-checked on each release, or once the budget has refilled
+                    try:
+                        await asyncio.wait_for(lane.condition.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if ticket in lane.queue:
+                    lane.queue.remove(ticket)
+                    heapq.heapify(lane.queue)
+                lane.condition.notify_all()
+                raise
+
+    async def _budget_delay(self, lane: _ModelLane, input_tokens: int) -> float:
+        """Seconds until the lane may start a request (0 once budget was taken)."""
+        paused = lane.paused_until - time.monotonic()
+        if paused > 0:
+            return paused
+        # Request bucket first: a denied check costs a single request token,
+        # refunded below, instead of a whole prompt's worth of input tokens
+        request_bucket, token_bucket = lane.request_bucket, lane.token_bucket
+        try:
+            if request_bucket is not None:
+                decision = await self.limiter.hit(f"{lane.model}:requests", request_bucket)
+                if not decision.allowed:
+                    return decision.retry_after
+            if token_bucket is not None:
+                cost = min(input_tokens, token_bucket.capacity)
+                decision = await self.limiter.hit(f"{lane.model}:input_tokens", token_bucket, cost)
+                if not decision.allowed:
+                    if request_bucket is not None:
+                        await self.limiter.refund(f"{lane.model}:requests", request_bucket)
+                    return decision.retry_after
+        except Exception as e:
+            # TokenBucketLimiter already falls back to a local bucket; this
+            # only guards against a broken limiter blocking every request
+            logger.warning(f"Claude rate limit check failed for {lane.model}: {e}")
+        return 0.0
+
+    def observe_rate_limit(self, model: str, headers: Optional[Mapping[str, str]]) -> Optional[float]:
+        """Tune ``model``'s lane from a rate-limited response; returns the retry-after pause."""
+        lane = self._lane(model)
+        lane.rate_limited += 1
+        headers = headers or {}
+        requests_limit = _int_header(headers, "anthropic-ratelimit-requests-limit")
+        if requests_limit:
+            lane.request_bucket = BucketSpec.per_minute(requests_limit)
+        tokens_limit = _int_header(headers, "anthropic-ratelimit-input-tokens-limit") or _int_header(
+            headers, "anthropic-ratelimit-tokens-limit"
+        )
+        if tokens_limit:
+            lane.token_bucket = BucketSpec.per_minute(tokens_limit)
+
+        pause = retry_after_seconds(headers)
+        if pause:
+            lane.paused_until = max(lane.paused_until, time.monotonic() + pause)
+            logger.warning(f"Claude {model} rate limited; pausing its queue for {pause:.1f}s")
+        return pause
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, running requests and wait times per model and priority."""
+        now = time.monotonic()
+        models = {}
+        for model, lane in self._lanes.items():
+            queued: Dict[str, int] = {}
+            for ticket in lane.queue:
+                name = RequestPriority(ticket.priority).name.lower()
+                queued[name] = queued.get(name, 0) + 1
+            models[model] = {
+                "active": lane.active,
+                "concurrency": lane.concurrency,
+                "queue_depth": len(lane.queue),
+                "queued": queued,
+                "paused_seconds": round(max(lane.paused_until - now, 0.0), 1),
+                "rate_limited": lane.rate_limited,
+                "requests_per_minute": round(lane.request_bucket.refill_per_second * 60)
+                if lane.request_bucket else None,
+                "input_tokens_per_minute": round(lane.token_bucket.refill_per_second * 60)
+                if lane.token_bucket else None,
+                "wait_ms": {
+                    name: {
+                        "count": int(stats["count"]),
+                        "avg": round(stats["total_ms"] / stats["count"], 2),
+                        "max": round(stats["max_ms"], 2),
+                    }
+                    for name, stats in lane.waits.items()
+                },
+            }
+        return {"models": models}
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+# Shared by every ClaudeClient in the process
+claude_scheduler = ClaudeScheduler()
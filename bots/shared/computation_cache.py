@@ -0,0 +1,235 @@
+"""
+Stampede-protected caching of expensive computations.
+
+When a popular key (``dashboard:complete_data``, metrics summaries) expires,
+every concurrent caller used to miss and recompute it.  ``get_or_compute``:
+
+- Single-flight: one computation per key per process; concurrent callers
+  await the same result.
+- Distributed lease: across processes, the caller holding
+  ``lease:<key>`` computes; the others poll the cache for its result
+  (up to ``computation_lease_wait_seconds``, then compute themselves).
+- Probabilistic early expiration (XFetch): each read may treat the value as
+  expired slightly early, more likely the closer expiry is and the longer
+  the computation took, so refreshes don't all line up on the TTL.
+- Stale-while-revalidate: with ``stale_ttl`` the value is kept that much
+  longer than ``ttl``; reads in that window get the stale value while one
+  background refresh runs.
+
+Values are stored as an envelope dict holding the value, its soft expiry
+and how long it took to compute.  Plain values written by other code are
+treated as fresh.
+"""
+import asyncio
+import inspect
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+_ENVELOPE_MARKER = "__computed__"
+_LEASE_POLL_SECONDS = 0.05
+
+# Outcomes reported by ``lookup``
+HIT = "hit"
+STALE = "stale"
+COMPUTED = "computed"
+
+
+def _supports_lease(cache: Any) -> bool:
+    # Test doubles that only mock get/set have no awaitable lock methods
+    return inspect.iscoroutinefunction(getattr(cache, "acquire_lock", None)) and \
+        inspect.iscoroutinefunction(getattr(cache, "release_lock", None))
+
+
+@dataclass
+class _Request:
+    cache: Any
+    key: str
+    compute: Callable[[], Awaitable[Any]]
+    ttl: int
+    stale_ttl: int
+    serialize: Optional[Callable[[Any], Any]]
+    deserialize: Optional[Callable[[Any], Any]]
+
+    def load(self, stored: Any) -> Any:
+        return self.deserialize(stored) if self.deserialize else stored
+
+
+class ComputationCache:
+    """Per-process single-flight state plus the cache protocol described above."""
+
+    def __init__(
+        self,
+        lease_seconds: Optional[int] = None,
+        lease_wait_seconds: Optional[float] = None,
+        beta: Optional[float] = None,
+    ):
+        self.lease_seconds = lease_seconds or settings.computation_lease_seconds
+        self.lease_wait_seconds = (
+            settings.computation_lease_wait_seconds if lease_wait_seconds is None else lease_wait_seconds
+        )
+        self.beta = settings.computation_early_expiry_beta if beta is None else beta
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+        self.stats = {"hits": 0, "stale_hits": 0, "computations": 0, "coalesced": 0, "lease_waits": 0}
+
+    # ---- envelope --------------------------------------------------------
+
+    @staticmethod
+    def _wrap(value: Any, ttl: int, delta: float) -> Dict[str, Any]:
+        return {_ENVELOPE_MARKER: 1, "value": value, "expires_at": time.time() + ttl, "delta": delta}
+
+    @staticmethod
+    def _unwrap(stored: Any) -> Tuple[Any, Optional[float], float]:
+        if isinstance(stored, dict) and stored.get(_ENVELOPE_MARKER) == 1:
+            return stored["value"], stored["expires_at"], stored["delta"]
+        return stored, None, 0.0
+
+    def _expired_early(self, expires_at: float, delta: float) -> bool:
+        """XFetch: ``now - delta * beta * ln(rand) >= expiry``."""
+        return time.time() - delta * self.beta * math.log(random.random() or 1e-12) >= expires_at
+
+    # ---- public API ------------------------------------------------------
+
+    async def get_or_compute(
+        self,
+        cache: Any,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = 300,
+        stale_ttl: int = 0,
+        serialize: Optional[Callable[[Any], Any]] = None,
+        deserialize: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """Return the cached value of ``key``, computing it at most once at a time.
+
+        Args:
+            cache: CacheService (or any cache with async get/set)
+            key: Cache key
+            compute: Zero-argument coroutine function producing the value
+            ttl: Seconds the value is fresh
+            stale_ttl: Extra seconds a stale value may be served while it is
+                refreshed in the background (0 disables stale-while-revalidate)
+            serialize: Applied to a computed value before it is cached
+            deserialize: Applied to a cached value before it is returned
+        """
+        value, _ = await self.lookup(cache, key, compute, ttl, stale_ttl, serialize, deserialize)
+        return value
+
+    async def lookup(
+        self,
+        cache: Any,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = 300,
+        stale_ttl: int = 0,
+        serialize: Optional[Callable[[Any], Any]] = None,
+        deserialize: Optional[Callable[[Any], Any]] = None,
+    ) -> Tuple[Any, str]:
+        """``get_or_compute`` that also reports HIT, STALE or COMPUTED."""
+        request = _Request(cache, key, compute, ttl, stale_ttl, serialize, deserialize)
+        stored = await cache.get(key)
+        if stored is not None:
+            value, expires_at, delta = self._unwrap(stored)
+            if expires_at is None or not self._expired_early(expires_at, delta):
+                self.stats["hits"] += 1
+                return request.load(value), HIT
+            if stale_ttl and time.time() < expires_at + stale_ttl:
+                self.stats["stale_hits"] += 1
+                self._refresh_in_background(request)
+                return request.load(value), STALE
+            # Early-expired without a stale window: this caller refreshes
+
+        return await self._single_flight(request), COMPUTED
+
+    # ---- computation -----------------------------------------------------
+
+    async def _single_flight(self, request: "_Request") -> Any:
+        pending = self._inflight.get(request.key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[request.key] = future
+        try:
+            result = await self._compute_with_lease(request)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved: no "never retrieved" warning without waiters
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(request.key, None)
+
+    async def _compute_with_lease(self, request: "_Request") -> Any:
+        cache = request.cache
+        if not _supports_lease(cache):
+            return await self._compute_and_store(request)
+
+        lease_key = f"lease:{request.key}"
+        token = uuid.uuid4().hex
+        if not await cache.acquire_lock(lease_key, token, ttl=self.lease_seconds):
+            # Another process is computing: wait for its result
+            self.stats["lease_waits"] += 1
+            deadline = time.monotonic() + self.lease_wait_seconds
+            while time.monotonic() < deadline:
+                await asyncio.sleep(_LEASE_POLL_SECONDS)
+                stored = await cache.get(request.key)
+                value, expires_at, _ = self._unwrap(stored)
+                if stored is not None and (expires_at is None or expires_at > time.time()):
+                    return request.load(value)
+            logger.warning(f"Lease wait for {request.key} timed out, computing locally")
+            return await self._compute_and_store(request)
+
+        try:
+            return await self._compute_and_store(request)
+        finally:
+            await cache.release_lock(lease_key, token)
+
+    async def _compute_and_store(self, request: "_Request") -> Any:
+        self.stats["computations"] += 1
+        start = time.monotonic()
+        result = await request.compute()
+        delta = time.monotonic() - start
+        stored = request.serialize(result) if request.serialize else result
+        await request.cache.set(
+            request.key, self._wrap(stored, request.ttl, delta), ttl=request.ttl + request.stale_ttl
+        )
+        return result
+
+    def _refresh_in_background(self, request: "_Request") -> None:
+        key = request.key
+        if key in self._refreshing or key in self._inflight:
+            return
+        self._refreshing.add(key)
+
+        async def refresh() -> None:
+            try:
+                await self._single_flight(request)
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "in_flight": len(self._inflight)}
+
+
+# Global instance
+computation_cache = ComputationCache()
@@ -33,6 +33,33 @@ class Settings(BaseSettings):
     claude_haiku_model: str = "claude-3-5-haiku-20241022"
     claude_opus_model: str = "claude-3-opus-20240229"
 
+    # Memoized temperature-0 calls (opt-in per call via memo_namespace; TTL 0 disables)
+    claude_memo_ttl_seconds: int = 86_400
+    claude_memo_max_entries: int = 2_000
+
+    # Request scheduler: concurrent requests per model (per process) and
+    # shared per-model budgets (0 = unlimited until a 429 reports the limit)
+    claude_max_concurrency: int = 8
+    claude_requests_per_minute: int = 0
+    claude_input_tokens_per_minute: int = 0
+
+    # Seller/buyer turns: one tool-use call returns the reply and the answer's fields
+    claude_structured_turns: bool = True
+
+    # Per-call deadlines (0 = none), hedging to Haiku after the primary model's
+    # recent p95 latency, and per-model circuit breakers (see claude_hedge)
+    claude_reply_deadline_seconds: float = 20.0
+    claude_analysis_deadline_seconds: float = 60.0
+    claude_hedge_delay_ms: float = 4000.0
+    claude_hedge_percentile: float = 95.0
+    claude_breaker_failure_threshold: int = 5
+    claude_breaker_cooldown_seconds: float = 30.0
+
+    # SMS replies: text replies are streamed and stopped at the first sentence
+    # end past this many characters (0 = no streaming); max_tokens is capped
+    # to the 480-character SMS limit
+    sms_reply_char_budget: int = 320
+
     # Default LLM Provider
     default_llm_provider: str = "claude"
 
@@ -50,11 +77,78 @@ class Settings(BaseSettings):
     redis_socket_timeout: int = 2
     redis_socket_connect_timeout: int = 2
     redis_health_check_interval: int = 30
+    # Treat REDIS_URL as a seed node of a Redis Cluster (per-node pools,
+    # hash-tagged per-contact keys)
+    redis_cluster_enabled: bool = False
+
+    # In-process MemoryCache (Redis fallback and write-through mirror) bounds
+    memory_cache_max_entries: int = 50_000
+    memory_cache_max_mb: int = 128
+    memory_cache_sweep_interval_seconds: float = 1.0
+    memory_cache_sweep_batch: int = 200
+
+    # Cache backend when REDIS_URL is empty: memory | sqlite (persists across
+    # restarts; single node only)
+    cache_backend: str = "memory"
+    sqlite_cache_path: str = "data/cache.sqlite3"
+    sqlite_cache_commit_interval_ms: int = 50
+    sqlite_cache_commit_max_writes: int = 1000
+    sqlite_cache_sweep_batch: int = 500
+    sqlite_cache_mmap_mb: int = 64
+
+    # Redis value encoding: orjson | msgpack | pickle; compression: none | zstd | lz4 | zlib
+    cache_codec: str = "orjson"
+    cache_compression: str = "none"
+    cache_compress_min_bytes: int = 2048
+
+    # Near cache: short-lived in-process copies of hot keys (comma-separated
+    # prefixes), invalidated across workers over Redis pub/sub
+    near_cache_enabled: bool = True
+    near_cache_ttl_seconds: int = 5
+    near_cache_max_entries: int = 5_000
+    near_cache_prefixes: str = "seller:state:,buyer:state:,assigned_bot:,ns:gen:"
+    near_cache_channel: str = "cache:invalidate"
+
+    # Per-prefix cache stats (hits, misses, sizes, latency) and key-space profiling.
+    # Keys are grouped by the longest listed prefix, else by their first ':' segment.
+    cache_key_stats_enabled: bool = True
+    cache_key_stats_prefixes: str = (
+        "seller:state:,buyer:state:,seller:active_contacts,buyer:active_contacts,"
+        "metrics:dashboard:,metrics:performance:,ns:gen:"
+    )
+    cache_key_stats_max_prefixes: int = 64
+    cache_key_stats_size_sample_every: int = 16
+    cache_keyspace_sample_size: int = 500
+
+    # Keys per get_many/set_many call in bulk paths (e.g. active-conversation listings)
+    cache_batch_size: int = 500
+
+    # Conversation state as a hash (one field per attribute) plus a capped
+    # history list, so each save writes only changed fields and new history
+    # entries; false keeps one blob per contact
+    conversation_state_fields_enabled: bool = True
+
+    # Redis circuit breaker: after N consecutive errors serve from memory and
+    # probe Redis in the background; writes of these prefixes made meanwhile
+    # are replayed to Redis on recovery ("" disables replay)
+    cache_breaker_enabled: bool = True
+    cache_breaker_failure_threshold: int = 3
+    cache_breaker_probe_interval_seconds: float = 1.0
+    cache_breaker_replay_prefixes: str = "seller:state:,buyer:state:,assigned_bot:"
+    cache_breaker_replay_max_keys: int = 10_000
+
+    # Stampede protection for cached computations (dashboards, metrics):
+    # one worker holds a lease and computes, the others wait for its result
+    computation_lease_seconds: int = 30
+    computation_lease_wait_seconds: float = 5.0
+    computation_early_expiry_beta: float = 1.0  # XFetch; 0 disables early refresh
 
     # ========== PERFORMANCE REQUIREMENTS ==========
     # 5-Minute Response Rule (NON-NEGOTIABLE)
     lead_response_timeout_seconds: int = 300  # 5 minutes = 10x conversion
     lead_analysis_timeout_ms: int = 500  # <500ms for lead analysis
+    # Claude analyses are shared by leads with the same PII-free content for this long
+    lead_analysis_content_cache_ttl_seconds: int = 3600
     cma_generation_timeout_seconds: int = 90  # <90 seconds for CMA
 
     # ========== JORGE'S BUSINESS RULES ==========
@@ -73,18 +167,50 @@ class Settings(BaseSettings):
     debug: bool = False
     cors_origins: list[str] = ["http://localhost:8501", "http://localhost:3000"]
 
+    # Lead bot worker processes; state shared between workers lives in the cache (Redis)
+    lead_bot_workers: int = 1
+    shared_state_sync_seconds: float = 2.0  # counter flush / settings refresh cadence
+
     # ========== SECURITY ==========
     jwt_secret: str = ""
     ghl_webhook_secret: Optional[str] = None
-    ghl_webhook_public_key: Optional[str] = None
+    ghl_webhook_public_key: Optional[str] = None  # may hold several PEM blocks during key rotation
+    ghl_webhook_previous_secret: Optional[str] = None  # still accepted while rotating the HMAC secret
 
     # API Rate Limiting
     rate_limit_per_minute: int = 60
     rate_limit_per_hour: int = 1000
 
+    # Webhook token bucket per GHL location (0 = rate_limit_per_minute)
+    webhook_rate_burst: int = 0
+    webhook_rate_per_minute: int = 0
+    webhook_rate_overrides: str = ""  # "locationId:burst:per_minute,..."
+
     # ========== WEBHOOK CONFIGURATION ==========
     base_url: str = "http://localhost:8000"
 
+    # Per-contact processing lock (FIFO queue, event-driven wake-ups)
+    webhook_lock_ttl_seconds: int = 30
+    webhook_lock_max_wait_seconds: float = 30.0
+    webhook_lock_recheck_ms: int = 250  # re-try cadence for locks held by other workers
+
+    # Merge a contact's texts arriving within this window into one bot turn (0 = off)
+    webhook_coalesce_window_ms: int = 0
+
+    # Fast-ack mode: verify + dedup + enqueue, reply from a worker pool
+    webhook_fast_ack: bool = False
+    webhook_queue_backend: str = "redis"  # redis | sqlite
+    webhook_queue_sqlite_path: str = "data/webhook_jobs.sqlite3"  # ":memory:" is not durable
+    webhook_queue_reclaim_interval_seconds: float = 30.0  # XAUTOCLAIM jobs of dead consumers
+    webhook_workers: int = 4
+    webhook_job_max_attempts: int = 3
+    webhook_job_retry_backoff_seconds: float = 2.0
+
+    # Signature verification: RSA runs in a thread pool for large payloads or bursts
+    webhook_verify_offload_bytes: int = 16384
+    webhook_verify_offload_per_second: int = 100
+    webhook_verify_threads: int = 2
+
     # ========== CALENDAR / SCHEDULING ==========
     jorge_calendar_id: Optional[str] = None   # JORGE_CALENDAR_ID env var
     jorge_user_id: Optional[str] = None       # JORGE_USER_ID env var
@@ -124,6 +250,18 @@ class Settings(BaseSettings):
         """Check if a price is in Jorge's target range."""
         return self.jorge_min_price <= price <= self.jorge_max_price
 
+    def get_webhook_rate_limit(self, location_id: str) -> tuple[int, int]:
+        """Get (burst, per_minute) for a GHL location's webhook token bucket."""
+        for item in self.webhook_rate_overrides.split(","):
+            parts = [p.strip() for p in item.split(":")]
+            if len(parts) == 3 and parts[0] == location_id:
+                try:
+                    return int(parts[1]), int(parts[2])
+                except ValueError:
+                    break
+        per_minute = self.webhook_rate_per_minute or self.rate_limit_per_minute
+        return self.webhook_rate_burst or per_minute, per_minute
+
 
 # Global settings instance
 settings = Settings()
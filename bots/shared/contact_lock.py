@@ -0,0 +1,135 @@
+"""
+Per-contact processing locks for the unified GHL webhook.
+
+Replaces the old get/set + 1-second polling loop with:
+- An atomic lock (SET NX with an owner token, compare-and-delete release)
+- A per-contact FIFO wait queue so back-to-back texts are processed in order
+- Immediate wake-up of the next waiter via asyncio.Event when the lock frees
+
+Locks held by another worker process are re-checked every
+``webhook_lock_recheck_ms`` while waiting, so cross-worker hand-off never
+waits a full second.  Wait times are recorded in a latency histogram.
+"""
+import asyncio
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from bots.shared.config import settings
+from bots.shared.latency_histogram import LatencyHistogram
+from bots.shared.logger import get_logger
+from bots.shared.redis_connection import contact_tag
+
+logger = get_logger(__name__)
+
+
+def lock_key(contact_id: str) -> str:
+    """Cache key holding the processing lock for a contact."""
+    return f"lock:{contact_tag(contact_id)}"
+
+
+class ContactLockManager:
+    """FIFO, event-driven per-contact lock on top of the shared cache."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[int] = None,
+        max_wait_seconds: Optional[float] = None,
+        recheck_interval_ms: Optional[int] = None,
+    ):
+        self.ttl_seconds = ttl_seconds or settings.webhook_lock_ttl_seconds
+        self.max_wait_seconds = (
+            max_wait_seconds if max_wait_seconds is not None else settings.webhook_lock_max_wait_seconds
+        )
+        self.recheck_interval = (recheck_interval_ms or settings.webhook_lock_recheck_ms) / 1000
+        self._waiters: Dict[str, Deque[asyncio.Event]] = {}
+        self.wait_histogram = LatencyHistogram("webhook_lock_wait")
+        self.timeouts = 0
+
+    async def acquire(self, cache: Any, contact_id: str) -> Optional[str]:
+        """
+        Wait (in arrival order) for the contact's lock.
+
+        Returns:
+            Owner token to pass to ``release``, or None if the lock could not
+            be obtained within ``max_wait_seconds``.
+        """
+        token = uuid.uuid4().hex
+        key = lock_key(contact_id)
+        start = time.monotonic()
+        deadline = start + self.max_wait_seconds
+
+        queue = self._waiters.setdefault(contact_id, deque())
+        event = asyncio.Event()
+        queue.append(event)
+        try:
+            while True:
+                # Clear before trying so a release notified during the awaited
+                # attempt is kept for the wait below.
+                event.clear()
+                if queue[0] is event and await cache.acquire_lock(key, token, ttl=self.ttl_seconds):
+                    self.wait_histogram.observe((time.monotonic() - start) * 1000)
+                    return token
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    logger.warning(
+                        f"Processing lock wait exceeded {self.max_wait_seconds}s for contact={contact_id}"
+                    )
+                    return None
+
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(self.recheck_interval, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            was_head = bool(queue) and queue[0] is event
+            queue.remove(event)
+            if not queue:
+                self._waiters.pop(contact_id, None)
+            elif was_head:
+                # Let the next message in line try straight away
+                queue[0].set()
+
+    async def release(self, cache: Any, contact_id: str, token: str) -> None:
+        """Release the lock (owner-checked) and wake the next queued message."""
+        try:
+            await cache.release_lock(lock_key(contact_id), token)
+        except Exception as e:
+            logger.error(f"Failed to release processing lock for contact={contact_id}: {e}")
+        queue = self._waiters.get(contact_id)
+        if queue:
+            queue[0].set()
+
+    def inline_token(self, contact_id: str) -> Optional[str]:
+        """
+        Owner token for claiming the lock inside another cache call
+        (e.g. webhook admission), or None when requests for this contact are
+        already queued in this process and must keep their FIFO turn.
+        """
+        if self._waiters.get(contact_id):
+            return None
+        return uuid.uuid4().hex
+
+    def record_inline_acquire(self) -> None:
+        """Count a lock claimed via ``inline_token`` as a zero-wait acquire."""
+        self.wait_histogram.observe(0.0)
+
+    def queue_depth(self, contact_id: str) -> int:
+        """Number of in-process requests waiting on (or holding the head of) a contact's queue."""
+        return len(self._waiters.get(contact_id, ()))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Lock wait histogram plus current queue state."""
+        return {
+            "wait_ms": self.wait_histogram.snapshot(),
+            "timeouts": self.timeouts,
+            "contacts_waiting": len(self._waiters),
+            "queued_requests": sum(len(q) for q in self._waiters.values()),
+        }
+
+
+# Global lock manager shared by all webhook requests in this process
+contact_locks = ContactLockManager()
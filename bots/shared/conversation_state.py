@@ -0,0 +1,197 @@
+"""
+Field-level storage of bot conversation state.
+
+With ``CONVERSATION_STATE_FIELDS_ENABLED`` a contact's state is split in two:
+
+- a hash, ``<bot>:state:fields:<contact>``, with every attribute encoded as
+  its own field;
+- a list, ``<bot>:state:history:<contact>``, holding ``conversation_history``
+  newest first and capped at ``HISTORY_LIMIT`` entries (LPUSH + LTRIM).
+
+``save`` compares the state with the copy it was loaded (or last saved)
+with, then writes only the changed fields and pushes only the new history
+entries.  A turn that moves ``stage`` and ``last_interaction`` writes two
+small fields, not the whole state and twenty history entries.
+
+States written by older workers as a single blob (``<bot>:state:<contact>``)
+are moved to the field layout the first time they are read.  Full writes
+(new, restored or migrated states) include every field, and partial writes
+never include ``contact_id`` because it never changes.  A hash without
+``contact_id`` therefore only saw partial writes, for example a memory
+mirror or a hash that expired mid-turn.  It counts as a miss, so the bot
+restores the state from the database.
+
+Caches other than ``CacheService`` (test doubles, benchmark stand-ins) and
+a disabled setting keep the single-blob layout.
+"""
+import asyncio
+import pickle
+from typing import Any, Dict, List, Optional, Tuple
+
+from bots.shared.cache_service import CacheService, cache_get_many
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+from bots.shared.redis_connection import contact_tag
+
+logger = get_logger(__name__)
+
+STATE_TTL_SECONDS = 604_800  # 7 days
+HISTORY_LIMIT = 20
+HISTORY_FIELD = "conversation_history"
+
+# Set by full writes only (see the module docstring)
+_COMPLETE_MARKER = "contact_id"
+
+# Attribute of a state object holding its state dict as last loaded/saved
+_SNAPSHOT_ATTR = "_cached_state"
+
+_MISSING = object()
+
+
+def history_delta(previous: List[Any], current: List[Any]) -> Tuple[List[Any], bool]:
+    """History entries to push since ``previous``, and whether to rewrite the list instead.
+
+    ``current`` may have dropped entries from the front (trimmed) and added
+    entries at the end.  Any other change, such as an edited entry, needs a
+    rewrite.
+    """
+    for shift in range(len(previous) + 1):
+        kept = previous[shift:]
+        if current[:len(kept)] == kept:
+            break
+    if previous and not kept:
+        return list(current), True
+    return current[len(kept):], False
+
+
+class ConversationStateStore:
+    """Loads and saves one bot's conversation states in ``cache``."""
+
+    def __init__(self, cache: Any, bot_type: str, ttl: int = STATE_TTL_SECONDS,
+                 history_limit: int = HISTORY_LIMIT):
+        self.cache = cache
+        self.bot_type = bot_type
+        self.ttl = ttl
+        self.history_limit = history_limit
+
+    @property
+    def uses_fields(self) -> bool:
+        return settings.conversation_state_fields_enabled and isinstance(self.cache, CacheService)
+
+    def blob_key(self, contact_id: str) -> str:
+        return f"{self.bot_type}:state:{contact_tag(contact_id)}"
+
+    def fields_key(self, contact_id: str) -> str:
+        return f"{self.bot_type}:state:fields:{contact_tag(contact_id)}"
+
+    def history_key(self, contact_id: str) -> str:
+        return f"{self.bot_type}:state:history:{contact_tag(contact_id)}"
+
+    def remember(self, state: Any, state_dict: Dict[str, Any]) -> None:
+        """Record ``state_dict`` as what is stored for ``state``; later saves diff against it."""
+        if self.uses_fields:
+            # Deep copy (history entries are edited in place); a pickle round
+            # trip is several times faster than copy.deepcopy for plain data
+            snapshot = pickle.loads(pickle.dumps(state_dict, protocol=pickle.HIGHEST_PROTOCOL))
+            setattr(state, _SNAPSHOT_ATTR, snapshot)
+
+    # ---- reads -----------------------------------------------------------
+
+    async def load(self, contact_id: str) -> Optional[Dict[str, Any]]:
+        """The contact's cached state dict, or None."""
+        if not self.uses_fields:
+            return await self.cache.get(self.blob_key(contact_id))
+
+        fields, history = await asyncio.gather(
+            self.cache.hgetall(self.fields_key(contact_id)),
+            self.cache.lrange(self.history_key(contact_id), 0, self.history_limit - 1),
+        )
+        if _COMPLETE_MARKER in fields:
+            fields[HISTORY_FIELD] = history[::-1]
+            return fields
+        return await self._migrate(contact_id, await self.cache.get(self.blob_key(contact_id)))
+
+    async def load_many(self, contact_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached state dicts by contact id (one batched read per structure)."""
+        if not self.uses_fields:
+            keys = {self.blob_key(contact_id): contact_id for contact_id in contact_ids}
+            cached = await cache_get_many(self.cache, list(keys))
+            return {contact_id: cached[key] for key, contact_id in keys.items() if cached.get(key)}
+
+        fields_keys = [self.fields_key(contact_id) for contact_id in contact_ids]
+        history_keys = [self.history_key(contact_id) for contact_id in contact_ids]
+        found, histories = await asyncio.gather(
+            self.cache.hgetall_many(fields_keys),
+            self.cache.lrange_many(history_keys, 0, self.history_limit - 1),
+        )
+        states: Dict[str, Dict[str, Any]] = {}
+        legacy: List[str] = []
+        for contact_id, fields_key, history_key in zip(contact_ids, fields_keys, history_keys):
+            fields = found.get(fields_key, {})
+            if _COMPLETE_MARKER in fields:
+                fields[HISTORY_FIELD] = histories.get(history_key, [])[::-1]
+                states[contact_id] = fields
+            else:
+                legacy.append(contact_id)
+
+        if legacy:
+            blobs = await self.cache.get_many([self.blob_key(contact_id) for contact_id in legacy])
+            for contact_id in legacy:
+                state_dict = await self._migrate(contact_id, blobs.get(self.blob_key(contact_id)))
+                if state_dict:
+                    states[contact_id] = state_dict
+        return states
+
+    async def _migrate(self, contact_id: str, state_dict: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Move a single-blob state to the field layout."""
+        if not state_dict:
+            return None
+        await self._write(contact_id, state_dict, None)
+        await self.cache.delete(self.blob_key(contact_id))
+        logger.debug(f"Moved {self.bot_type} state for {contact_id} to the field layout")
+        return state_dict
+
+    # ---- writes ----------------------------------------------------------
+
+    async def save(self, contact_id: str, state: Any, state_dict: Dict[str, Any]) -> None:
+        """Store ``state_dict`` (built from ``state``); only what changed is written."""
+        if not self.uses_fields:
+            await self.cache.set(self.blob_key(contact_id), state_dict, ttl=self.ttl)
+            return
+        await self._write(contact_id, state_dict, getattr(state, _SNAPSHOT_ATTR, None))
+        self.remember(state, state_dict)
+
+    async def _write(self, contact_id: str, state_dict: Dict[str, Any],
+                     previous: Optional[Dict[str, Any]]) -> None:
+        history = list(state_dict.get(HISTORY_FIELD) or [])
+        fields = {name: value for name, value in state_dict.items() if name != HISTORY_FIELD}
+        if previous is None:
+            changed, removed = fields, []
+            pushed, rewrite = history, True
+        else:
+            changed = {
+                name: value for name, value in fields.items()
+                if name != _COMPLETE_MARKER and previous.get(name, _MISSING) != value
+            }
+            removed = [name for name in previous if name != HISTORY_FIELD and name not in fields]
+            pushed, rewrite = history_delta(previous.get(HISTORY_FIELD) or [], history)
+
+        fields_key, history_key = self.fields_key(contact_id), self.history_key(contact_id)
+        if rewrite:
+            await self.cache.delete(history_key)
+        # Both calls also refresh the TTL when nothing in them changed
+        writes = [
+            self.cache.hset(fields_key, changed, ttl=self.ttl),
+            self.cache.lpush_capped(history_key, pushed[-self.history_limit:], self.history_limit, ttl=self.ttl),
+        ]
+        if removed:
+            writes.append(self.cache.hdel(fields_key, *removed))
+        await asyncio.gather(*writes)
+
+    async def delete(self, contact_id: str) -> None:
+        if not self.uses_fields:
+            await self.cache.delete(self.blob_key(contact_id))
+            return
+        await self.cache.delete_many(
+            [self.fields_key(contact_id), self.history_key(contact_id), self.blob_key(contact_id)]
+        )
@@ -17,6 +17,7 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy import Date, cast, func, select
 
 from bots.shared.cache_service import get_cache_service
+from bots.shared.computation_cache import computation_cache
 from bots.shared.dashboard_models import (
     ConversationFilters,
     ConversationStage,
@@ -31,6 +32,9 @@ from database.session import AsyncSessionFactory
 
 logger = get_logger(__name__)
 
+# How long expired complete dashboard data may still be served while it refreshes
+_COMPLETE_DATA_STALE_SECONDS = 30
+
 
 class DashboardDataService:
     """
@@ -63,52 +67,42 @@ class DashboardDataService:
 
         Cache TTL: 30 seconds (for full page loads)
         """
-        cache_key = "dashboard:complete_data"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Complete dashboard data served from cache")
-                return cached
-
-            # Fetch all data concurrently for performance
-            metrics_task = self.metrics_service.get_dashboard_summary()
-            conversations_task = self.get_active_conversations()
-            hero_data_task = self._get_hero_dashboard_data()
-
-            # Await all tasks
-            metrics_summary, conversations, hero_data = await asyncio.gather(
-                metrics_task,
-                conversations_task,
-                hero_data_task,
-                return_exceptions=True
+            # Fresh for 30 seconds, then served stale for up to
+            # _COMPLETE_DATA_STALE_SECONDS while one background refresh runs
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "dashboard:complete_data",
+                self._build_complete_dashboard_data,
+                ttl=30,
+                stale_ttl=_COMPLETE_DATA_STALE_SECONDS,
             )
 
-            # Build complete dashboard data
-            dashboard_data = {
-                'metrics': metrics_summary if not isinstance(metrics_summary, Exception) else None,
-                'active_conversations': asdict(conversations) if not isinstance(conversations, Exception) else None,
-                'hero_data': hero_data if not isinstance(hero_data, Exception) else None,
-                'generated_at': datetime.now().isoformat(),
-                'refresh_interval': 30,  # Seconds
-                'status': 'success'
-            }
-
-            # Cache for 30 seconds
-            await self.cache_service.set(
-                cache_key,
-                dashboard_data,
-                ttl=30
-            )
-
-            logger.debug("Complete dashboard data generated and cached")
-            return dashboard_data
-
         except Exception as e:
             logger.exception(f"Error getting complete dashboard data: {e}")
             return self._get_fallback_dashboard_data()
 
+    async def _build_complete_dashboard_data(self) -> Dict[str, Any]:
+        # Fetch all data concurrently for performance
+        metrics_summary, conversations, hero_data = await asyncio.gather(
+            self.metrics_service.get_dashboard_summary(),
+            self.get_active_conversations(),
+            self._get_hero_dashboard_data(),
+            return_exceptions=True
+        )
+
+        # Build complete dashboard data
+        dashboard_data = {
+            'metrics': metrics_summary if not isinstance(metrics_summary, Exception) else None,
+            'active_conversations': asdict(conversations) if not isinstance(conversations, Exception) else None,
+            'hero_data': hero_data if not isinstance(hero_data, Exception) else None,
+            'generated_at': datetime.now().isoformat(),
+            'refresh_interval': 30,  # Seconds
+            'status': 'success'
+        }
+        logger.debug("Complete dashboard data generated")
+        return dashboard_data
+
     async def get_dashboard_data(self) -> 'DashboardData':
         """
         Get complete dashboard data as structured DashboardData object.
@@ -212,25 +206,16 @@ class DashboardDataService:
         cache_key = f"dashboard:conversations:p{page}s{page_size}{filter_key}"
 
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Active conversations served from cache")
-                return PaginatedConversations(**cached)
-
-            # Generate fresh conversation data
-            conversations = await self._fetch_active_conversations(filters, page, page_size)
-
             # Cache for 1 minute
-            await self.cache_service.set(
+            return await computation_cache.get_or_compute(
+                self.cache_service,
                 cache_key,
-                asdict(conversations),
-                ttl=60
+                lambda: self._fetch_active_conversations(filters, page, page_size),
+                ttl=60,
+                serialize=asdict,
+                deserialize=lambda cached: PaginatedConversations(**cached),
             )
 
-            logger.debug("Active conversations generated and cached")
-            return conversations
-
         except Exception as e:
             logger.exception(f"Error getting active conversations: {e}")
             return await self._get_fallback_conversations()
@@ -244,28 +229,15 @@ class DashboardDataService:
 
         Cache TTL: 2 minutes (summary data is relatively stable)
         """
-        cache_key = "dashboard:conversations:summary"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Conversation summary served from cache")
-                return cached
-
-            # Generate fresh summary
-            summary = await self._calculate_conversation_summary()
-
             # Cache for 2 minutes
-            await self.cache_service.set(
-                cache_key,
-                summary,
-                ttl=120
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "dashboard:conversations:summary",
+                self._calculate_conversation_summary,
+                ttl=120,
             )
 
-            logger.debug("Conversation summary generated and cached")
-            return summary
-
         except Exception as e:
             logger.exception(f"Error getting conversation summary: {e}")
             return self._get_fallback_conversation_summary()
@@ -283,28 +255,15 @@ class DashboardDataService:
 
         Cache TTL: 5 minutes (hero data updates less frequently)
         """
-        cache_key = "dashboard:hero_metrics"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Hero metrics served from cache")
-                return cached
-
-            # Generate fresh hero metrics
-            hero_data = await self._get_hero_dashboard_data()
-
             # Cache for 5 minutes
-            await self.cache_service.set(
-                cache_key,
-                hero_data,
-                ttl=300
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "dashboard:hero_metrics",
+                self._get_hero_dashboard_data,
+                ttl=300,
             )
 
-            logger.debug("Hero metrics generated and cached")
-            return hero_data
-
         except Exception as e:
             logger.exception(f"Error getting hero metrics: {e}")
             return self._get_fallback_hero_metrics()
@@ -322,48 +281,59 @@ class DashboardDataService:
 
         Cache TTL: 1 minute (performance data needs to be fresh)
         """
-        cache_key = "dashboard:performance_analytics"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Performance analytics served from cache")
-                return cached
+            # Cache for 1 minute
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "dashboard:performance_analytics",
+                self._build_performance_analytics_data,
+                ttl=60,
+            )
 
-            # Fetch performance data concurrently
-            metrics_task = self.metrics_service.get_performance_metrics()
-            cache_stats_task = self.metrics_service.get_cache_statistics()
-            cost_savings_task = self.metrics_service.get_cost_savings()
+        except Exception as e:
+            logger.exception(f"Error getting performance analytics: {e}")
+            return self._get_fallback_performance_analytics()
 
-            metrics, cache_stats, cost_savings = await asyncio.gather(
-                metrics_task,
-                cache_stats_task,
-                cost_savings_task,
-                return_exceptions=True
-            )
+    async def _build_performance_analytics_data(self) -> Dict[str, Any]:
+        # Fetch performance data concurrently
+        metrics, cache_stats, cost_savings = await asyncio.gather(
+            self.metrics_service.get_performance_metrics(),
+            self.metrics_service.get_cache_statistics(),
+            self.metrics_service.get_cost_savings(),
+            return_exceptions=True
+        )
 
-            # Build analytics data structure
-            analytics_data = {
-                'performance_metrics': asdict(metrics) if not isinstance(metrics, Exception) else None,
-                'cache_statistics': asdict(cache_stats) if not isinstance(cache_stats, Exception) else None,
-                'cost_savings': asdict(cost_savings) if not isinstance(cost_savings, Exception) else None,
-                'generated_at': datetime.now().isoformat(),
-            }
+        # Build analytics data structure
+        analytics_data = {
+            'performance_metrics': asdict(metrics) if not isinstance(metrics, Exception) else None,
+            'cache_statistics': asdict(cache_stats) if not isinstance(cache_stats, Exception) else None,
+            'cost_savings': asdict(cost_savings) if not isinstance(cost_savings, Exception) else None,
+            'generated_at': datetime.now().isoformat(),
+        }
+        logger.debug("Performance analytics generated")
+        return analytics_data
 
-            # Cache for 1 minute
-            await self.cache_service.set(
-                cache_key,
-                analytics_data,
-                ttl=60
-            )
+    # =================================================================
+    # Cache Key-Space Data
+    # =================================================================
 
-            logger.debug("Performance analytics generated and cached")
-            return analytics_data
+    async def get_cache_key_stats(self, profile: bool = True) -> Dict[str, Any]:
+        """
+        Per-prefix cache traffic from every bot worker, plus a key-space sample.
 
+        Not cached: the numbers are about the cache itself.
+        """
+        try:
+            result = {
+                'key_stats': await self.cache_service.collect_key_stats(),
+                'generated_at': datetime.now().isoformat(),
+            }
+            if profile:
+                result['keyspace'] = await self.cache_service.profile_keyspace()
+            return result
         except Exception as e:
-            logger.exception(f"Error getting performance analytics: {e}")
-            return self._get_fallback_performance_analytics()
+            logger.exception(f"Error getting cache key stats: {e}")
+            return {'key_stats': None, 'keyspace': None, 'generated_at': datetime.now().isoformat()}
 
     # =================================================================
     # Private Data Fetching Methods
@@ -17,11 +17,11 @@ from datetime import datetime, timedelta
 from typing import Any, Callable, Dict, List, Optional, Set
 
 import redis.asyncio as redis
-from redis.asyncio import ConnectionPool
 
 from bots.shared.config import settings
 from bots.shared.event_models import BaseEvent, create_event, get_event_channel, get_event_stream
 from bots.shared.logger import get_logger
+from bots.shared.redis_connection import cluster_enabled, create_pubsub_client, create_redis_client
 
 logger = get_logger(__name__)
 
@@ -105,7 +105,6 @@ class EventBroker:
         if not EventBroker._initialized:
             # Redis connection configuration
             self.redis_url = settings.redis_url
-            self.connection_pool: Optional[ConnectionPool] = None
             self.redis_client: Optional[redis.Redis] = None
             self.pubsub_client: Optional[redis.Redis] = None
 
@@ -136,19 +135,14 @@ class EventBroker:
             return
 
         try:
-            # Create connection pool
-            self.connection_pool = ConnectionPool.from_url(
-                self.redis_url,
-                max_connections=50,
-                decode_responses=False,
-                socket_timeout=2,
-                socket_connect_timeout=2,
-                health_check_interval=30
-            )
-
-            # Create Redis clients
-            self.redis_client = redis.Redis(connection_pool=self.connection_pool)
-            self.pubsub_client = redis.Redis(connection_pool=self.connection_pool)
+            # One client (a pool per node in cluster mode) for commands; it is
+            # shared for pub/sub on a single node, RedisCluster has no pub/sub
+            options = dict(max_connections=50, socket_timeout=2, socket_connect_timeout=2, health_check_interval=30)
+            self.redis_client = create_redis_client(self.redis_url, **options)
+            if cluster_enabled():
+                self.pubsub_client = create_pubsub_client(self.redis_url, **options)
+            else:
+                self.pubsub_client = self.redis_client
 
             # Test connection
             await self.redis_client.ping()
@@ -173,15 +167,11 @@ class EventBroker:
             except asyncio.CancelledError:
                 pass
 
-        if self.pubsub_client:
+        if self.pubsub_client and self.pubsub_client is not self.redis_client:
             await self.pubsub_client.close()
-
         if self.redis_client:
             await self.redis_client.close()
 
-        if self.connection_pool:
-            await self.connection_pool.disconnect()
-
         logger.info("EventBroker shutdown complete")
 
     @asynccontextmanager
@@ -233,8 +223,8 @@ class EventBroker:
         event_data = event.model_dump(mode='json')
         event_json = json.dumps(event_data)
 
-        # Use pipeline for atomic operation
-        async with self.redis_client.pipeline() as pipeline:
+        # Atomic on a single node; a cluster can't MULTI a keyless PUBLISH with the XADD
+        async with self.redis_client.pipeline(transaction=not cluster_enabled()) as pipeline:
             # Publish to channel for real-time subscribers
             pipeline.publish(channel, event_json)
 
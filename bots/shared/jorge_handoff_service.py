@@ -9,14 +9,20 @@ When Bot A determines the contact should be handled by Bot B, it:
 4. Logs the handoff event via analytics_service
 
 The next inbound message routes to Bot B via existing tag-based routing.
+
+Per-contact handoff history and the concurrent-handoff lock are kept in the
+shared cache so circular/rate-limit checks hold across worker processes.
 """
 
 import logging
 import re
 import time
+import uuid
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
+from bots.shared.redis_connection import contact_tag
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,9 +61,7 @@ class JorgeHandoffService:
     DAY_SECONDS = 86400
     HANDOFF_LOCK_TIMEOUT = 30  # seconds before a handoff lock expires
 
-    _handoff_history: Dict[str, List[Dict[str, Any]]] = {}
     _handoff_outcomes: Dict[str, List[Dict[str, Any]]] = {}
-    _active_handoffs: Dict[str, float] = {}
     _analytics: Dict[str, Any] = {
         "total_handoffs": 0,
         "successful_handoffs": 0,
@@ -95,30 +99,43 @@ class JorgeHandoffService:
         r"\bsell\s+first\b",
     ]
 
-    def __init__(self, analytics_service=None):
+    def __init__(self, analytics_service=None, cache=None):
         self.analytics_service = analytics_service
+        self._cache = cache
 
-    @classmethod
-    def _cleanup_old_entries(cls, max_age: float = 86400) -> None:
-        now = time.time()
-        cutoff = now - max_age
-        contacts_to_remove = []
-        for contact_id, entries in cls._handoff_history.items():
-            cls._handoff_history[contact_id] = [
-                e for e in entries if e["timestamp"] > cutoff
-            ]
-            if not cls._handoff_history[contact_id]:
-                contacts_to_remove.append(contact_id)
-        for contact_id in contacts_to_remove:
-            del cls._handoff_history[contact_id]
+    def _get_cache(self):
+        if self._cache is None:
+            from bots.shared.cache_service import get_cache_service
+            self._cache = get_cache_service()
+        return self._cache
+
+    @staticmethod
+    def _history_key(contact_id: str) -> str:
+        return f"handoff:history:{contact_tag(contact_id)}"
+
+    @staticmethod
+    def _lock_key(contact_id: str) -> str:
+        return f"handoff:lock:{contact_tag(contact_id)}"
+
+    async def _load_history(
+        self, contact_id: str, max_age: float = 86400
+    ) -> List[Dict[str, Any]]:
+        """Handoff entries for a contact from the last ``max_age`` seconds."""
+        cutoff = time.time() - max_age
+        entries = await self._get_cache().get(self._history_key(contact_id)) or []
+        return [e for e in entries if e["timestamp"] > cutoff]
 
     @classmethod
     def _check_circular_handoff(
-        cls, contact_id: str, source_bot: str, target_bot: str
+        cls,
+        entries: List[Dict[str, Any]],
+        contact_id: str,
+        source_bot: str,
+        target_bot: str,
     ) -> Optional[str]:
         now = time.time()
         cutoff = now - cls.CIRCULAR_WINDOW_SECONDS
-        for entry in cls._handoff_history.get(contact_id, []):
+        for entry in entries:
             if (
                 entry["from"] == source_bot
                 and entry["to"] == target_bot
@@ -131,9 +148,10 @@ class JorgeHandoffService:
         return None
 
     @classmethod
-    def _check_rate_limit(cls, contact_id: str) -> Optional[str]:
+    def _check_rate_limit(
+        cls, entries: List[Dict[str, Any]], contact_id: str
+    ) -> Optional[str]:
         now = time.time()
-        entries = cls._handoff_history.get(contact_id, [])
         hourly_count = sum(
             1 for e in entries if e["timestamp"] > now - cls.HOUR_SECONDS
         )
@@ -152,38 +170,39 @@ class JorgeHandoffService:
             )
         return None
 
-    @classmethod
-    def _record_handoff(
-        cls, contact_id: str, source_bot: str, target_bot: str
+    async def _record_handoff(
+        self,
+        entries: List[Dict[str, Any]],
+        contact_id: str,
+        source_bot: str,
+        target_bot: str,
     ) -> None:
-        if contact_id not in cls._handoff_history:
-            cls._handoff_history[contact_id] = []
-        cls._handoff_history[contact_id].append({
+        """Append a handoff to the contact's history (caller holds the handoff lock)."""
+        entries = entries + [{
             "from": source_bot,
             "to": target_bot,
             "timestamp": time.time(),
-        })
+        }]
+        await self._get_cache().set(
+            self._history_key(contact_id), entries, ttl=self.DAY_SECONDS
+        )
 
-    @classmethod
-    def _acquire_handoff_lock(cls, contact_id: str) -> bool:
+    async def _acquire_handoff_lock(self, contact_id: str) -> Optional[str]:
         """Acquire a handoff lock for the given contact.
 
-        Returns False if the contact already has an active handoff
-        (within HANDOFF_LOCK_TIMEOUT seconds). Otherwise sets the lock
-        timestamp and returns True.
+        Returns None if the contact already has an active handoff on any
+        worker (the lock expires after HANDOFF_LOCK_TIMEOUT seconds).
+        Otherwise returns the owner token needed to release it.
         """
-        now = time.time()
-        if contact_id in cls._active_handoffs:
-            lock_time = cls._active_handoffs[contact_id]
-            if now - lock_time < cls.HANDOFF_LOCK_TIMEOUT:
-                return False
-        cls._active_handoffs[contact_id] = now
-        return True
+        token = uuid.uuid4().hex
+        acquired = await self._get_cache().acquire_lock(
+            self._lock_key(contact_id), token, ttl=self.HANDOFF_LOCK_TIMEOUT
+        )
+        return token if acquired else None
 
-    @classmethod
-    def _release_handoff_lock(cls, contact_id: str) -> None:
-        """Remove the handoff lock for the given contact."""
-        cls._active_handoffs.pop(contact_id, None)
+    async def _release_handoff_lock(self, contact_id: str, token: str) -> None:
+        """Remove the handoff lock for the given contact if we still own it."""
+        await self._get_cache().release_lock(self._lock_key(contact_id), token)
 
     @classmethod
     def _record_analytics(
@@ -261,7 +280,6 @@ class JorgeHandoffService:
             "blocked_by_rate_limit": 0,
             "blocked_by_circular": 0,
         }
-        cls._active_handoffs = {}
 
     async def evaluate_handoff(
         self,
@@ -344,7 +362,8 @@ class JorgeHandoffService:
         route = f"{decision.source_bot}->{decision.target_bot}"
 
         # Conflict resolution: prevent concurrent handoffs for the same contact
-        if not self._acquire_handoff_lock(contact_id):
+        lock_token = await self._acquire_handoff_lock(contact_id)
+        if not lock_token:
             return [
                 {
                     "handoff_executed": False,
@@ -353,10 +372,10 @@ class JorgeHandoffService:
             ]
 
         try:
-            self._cleanup_old_entries()
+            history = await self._load_history(contact_id)
 
             circular_reason = self._check_circular_handoff(
-                contact_id, decision.source_bot, decision.target_bot
+                history, contact_id, decision.source_bot, decision.target_bot
             )
             if circular_reason:
                 logger.warning(circular_reason)
@@ -365,7 +384,7 @@ class JorgeHandoffService:
                 )
                 return [{"handoff_executed": False, "reason": circular_reason}]
 
-            rate_reason = self._check_rate_limit(contact_id)
+            rate_reason = self._check_rate_limit(history, contact_id)
             if rate_reason:
                 logger.warning(rate_reason)
                 self._record_analytics(
@@ -421,14 +440,14 @@ class JorgeHandoffService:
                 f"reason={decision.reason})"
             )
 
-            self._record_handoff(
-                contact_id, decision.source_bot, decision.target_bot
+            await self._record_handoff(
+                history, contact_id, decision.source_bot, decision.target_bot
             )
             self._record_analytics(route, start_time, success=True)
 
             return actions
         finally:
-            self._release_handoff_lock(contact_id)
+            await self._release_handoff_lock(contact_id, lock_token)
 
     @classmethod
     def extract_intent_signals(cls, message: str) -> Dict[str, Any]:
@@ -0,0 +1,69 @@
+"""
+Fixed-bucket latency histograms for hot-path instrumentation.
+
+Recording is one bisect plus two integer adds, so it is cheap enough to run
+on every webhook.  Snapshots are plain dicts that FastAPI endpoints can
+return directly.
+"""
+import bisect
+from typing import Any, Dict, List, Sequence
+
+# Bucket upper bounds in milliseconds (an implicit +Inf bucket follows)
+DEFAULT_BUCKETS_MS: Sequence[float] = (
+    1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000,
+)
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with approximate percentiles."""
+
+    def __init__(self, name: str, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.name = name
+        self.buckets_ms: List[float] = sorted(buckets_ms)
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded observations."""
+        self._counts: List[int] = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        """Record a single observation in milliseconds."""
+        value_ms = max(0.0, value_ms)
+        self._counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, pct: float) -> float:
+        """Return the bucket upper bound containing the given percentile."""
+        if self.count == 0:
+            return 0.0
+        target = self.count * pct / 100
+        running = 0
+        for i, bucket_count in enumerate(self._counts):
+            running += bucket_count
+            if running >= target:
+                if i < len(self.buckets_ms):
+                    return float(min(self.buckets_ms[i], self.max_ms))
+                return self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable view of the histogram."""
+        buckets = {f"le_{b:g}": c for b, c in zip(self.buckets_ms, self._counts)}
+        buckets["le_inf"] = self._counts[-1]
+        return {
+            "name": self.name,
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "avg_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets,
+        }
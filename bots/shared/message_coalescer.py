@@ -0,0 +1,109 @@
+"""
+Message coalescing for rapid-fire SMS bursts.
+
+Leads often send several short texts in a row ("hi" / "I want to sell" /
+"house needs work").  Instead of one bot turn (and Claude generation) per
+text, every message is appended to a per-contact buffer in the shared
+cache and only the *last* message of a burst runs the bot, with the whole
+buffer merged into one turn:
+
+1. ``push`` appends the message and returns its position in the buffer.
+2. After the window (``settle``), ``claim`` atomically drains the buffer
+   only if no newer message was appended; otherwise it returns None and
+   that request is dropped as "coalesced" -- the newer message will carry
+   its text.  Callers claim while holding the contact's processing lock,
+   so a lock timeout leaves the buffer for a retry or the next message.
+
+Because the buffer and the drain live in the cache, this works across
+worker processes.  A window of 0 disables coalescing.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+from bots.shared.redis_connection import contact_tag
+
+logger = get_logger(__name__)
+
+MAX_MERGED_LENGTH = 2000
+
+
+def buffer_key(contact_id: str) -> str:
+    """Cache key holding a contact's not-yet-processed messages."""
+    return f"coalesce:{contact_tag(contact_id)}"
+
+
+class MessageCoalescer:
+    """Debounces a contact's messages into a single bot turn."""
+
+    def __init__(self, window_ms: Optional[int] = None):
+        self._window_ms = window_ms
+
+        # Metrics (per process)
+        self.turns = 0
+        self.messages_coalesced = 0
+
+    @property
+    def window_seconds(self) -> float:
+        window_ms = self._window_ms if self._window_ms is not None else settings.webhook_coalesce_window_ms
+        return max(window_ms, 0) / 1000
+
+    def enabled_for(self, cache: Any) -> bool:
+        return self.window_seconds > 0 and cache is not None and hasattr(cache, "drain_list")
+
+    async def push(self, cache: Any, contact_id: str, message: str) -> int:
+        """Buffer a message; returns its 1-based position in the contact's burst."""
+        # TTL comfortably outlives the window so an abandoned buffer still expires
+        ttl = int(self.window_seconds * 10) + 60
+        return await cache.rpush(buffer_key(contact_id), message, ttl=ttl)
+
+    async def collect(
+        self, cache: Any, contact_id: str, position: int, wait_seconds: Optional[float] = None
+    ) -> Optional[str]:
+        """Wait out the window, then claim the burst (``settle`` + ``claim``)."""
+        await self.settle(wait_seconds)
+        return await self.claim(cache, contact_id, position)
+
+    async def settle(self, wait_seconds: Optional[float] = None) -> None:
+        """Wait out the window (or ``wait_seconds``) for later messages of the burst."""
+        wait = self.window_seconds if wait_seconds is None else wait_seconds
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def claim(self, cache: Any, contact_id: str, position: int) -> Optional[str]:
+        """
+        Drain the burst if message ``position`` is still its last one.
+
+        Returns:
+            The merged message text if this was the last message of the
+            burst, or None if a newer message will handle it.
+        """
+        messages = await cache.drain_list(buffer_key(contact_id), position)
+        if messages is None:
+            return None
+
+        self.turns += 1
+        if len(messages) > 1:
+            self.messages_coalesced += len(messages) - 1
+            logger.info(f"Coalesced {len(messages)} messages into one turn for contact={contact_id}")
+        return merge_messages(messages)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Coalescing counters. Each coalesced message skips one bot turn,
+        i.e. at least one Claude generation."""
+        return {
+            "window_ms": int(self.window_seconds * 1000),
+            "turns": self.turns,
+            "messages_coalesced": self.messages_coalesced,
+            "claude_calls_saved": self.messages_coalesced,
+        }
+
+
+def merge_messages(messages: List[str]) -> str:
+    """Join a burst into one message, oldest first, within the input cap."""
+    return "\n".join(m.strip() for m in messages if m.strip())[:MAX_MERGED_LENGTH]
+
+
+# Global coalescer shared by the webhook route and queue workers
+message_coalescer = MessageCoalescer()
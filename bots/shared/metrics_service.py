@@ -17,6 +17,7 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy import func, select
 
 from bots.shared.cache_service import get_cache_service
+from bots.shared.computation_cache import computation_cache
 from bots.shared.dashboard_models import (
     BudgetDistribution,
     BudgetRange,
@@ -35,13 +36,16 @@ from database.session import AsyncSessionFactory
 
 logger = get_logger(__name__)
 
+# How long an expired dashboard summary may still be served while it refreshes
+_SUMMARY_STALE_SECONDS = 30
+
 
 class MetricsService:
     """
     Aggregates and caches dashboard metrics for high-performance display.
 
     Features:
-    - Multi-tier caching (30s/5min/1hr TTL)
+    - Multi-tier caching (30s/5min/1hr TTL), stampede-protected
     - Async aggregation from multiple data sources
     - Error handling with graceful fallbacks
     - Cost savings tracking
@@ -66,28 +70,17 @@ class MetricsService:
 
         Cache TTL: 30 seconds (real-time dashboard updates)
         """
-        cache_key = "metrics:dashboard:performance"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Performance metrics served from cache")
-                return PerformanceDashboardMetrics(**cached)
-
-            # Generate fresh metrics
-            metrics = await self.performance_tracker.get_performance_metrics()
-
             # Cache for 30 seconds
-            await self.cache_service.set(
-                cache_key,
-                asdict(metrics),
-                ttl=30
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "metrics:dashboard:performance",
+                self.performance_tracker.get_performance_metrics,
+                ttl=30,
+                serialize=asdict,
+                deserialize=lambda cached: PerformanceDashboardMetrics(**cached),
             )
 
-            logger.debug("Performance metrics generated and cached")
-            return metrics
-
         except Exception as e:
             logger.exception(f"Error getting performance metrics: {e}")
             return self._get_fallback_performance_metrics()
@@ -101,28 +94,17 @@ class MetricsService:
 
         Cache TTL: 5 minutes (moderate freshness)
         """
-        cache_key = "metrics:dashboard:cache_stats"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Cache statistics served from cache")
-                return CacheStatistics(**cached)
-
-            # Generate fresh statistics
-            stats = await self.performance_tracker.get_cache_statistics()
-
             # Cache for 5 minutes
-            await self.cache_service.set(
-                cache_key,
-                asdict(stats),
-                ttl=300
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "metrics:dashboard:cache_stats",
+                self.performance_tracker.get_cache_statistics,
+                ttl=300,
+                serialize=asdict,
+                deserialize=lambda cached: CacheStatistics(**cached),
             )
 
-            logger.debug("Cache statistics generated and cached")
-            return stats
-
         except Exception as e:
             logger.exception(f"Error getting cache statistics: {e}")
             return self._get_fallback_cache_statistics()
@@ -136,28 +118,17 @@ class MetricsService:
 
         Cache TTL: 1 hour (historical data)
         """
-        cache_key = "metrics:dashboard:cost_savings"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Cost savings served from cache")
-                return CostSavingsMetrics(**cached)
-
-            # Generate fresh savings data
-            savings = await self.performance_tracker.get_cost_savings()
-
             # Cache for 1 hour
-            await self.cache_service.set(
-                cache_key,
-                asdict(savings),
-                ttl=3600
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "metrics:dashboard:cost_savings",
+                self.performance_tracker.get_cost_savings,
+                ttl=3600,
+                serialize=asdict,
+                deserialize=lambda cached: CostSavingsMetrics(**cached),
             )
 
-            logger.debug("Cost savings generated and cached")
-            return savings
-
         except Exception as e:
             logger.exception(f"Error getting cost savings: {e}")
             return self._get_fallback_cost_savings()
@@ -175,28 +146,17 @@ class MetricsService:
 
         Cache TTL: 5 minutes (lead data changes frequently)
         """
-        cache_key = "metrics:dashboard:budget_distribution"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Budget distribution served from cache")
-                return BudgetDistribution(**cached)
-
-            # Generate fresh distribution data
-            distribution = await self._calculate_budget_distribution()
-
             # Cache for 5 minutes
-            await self.cache_service.set(
-                cache_key,
-                asdict(distribution),
-                ttl=300
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "metrics:dashboard:budget_distribution",
+                self._calculate_budget_distribution,
+                ttl=300,
+                serialize=asdict,
+                deserialize=lambda cached: BudgetDistribution(**cached),
             )
 
-            logger.debug("Budget distribution generated and cached")
-            return distribution
-
         except Exception as e:
             logger.exception(f"Error getting budget distribution: {e}")
             return self._get_fallback_budget_distribution()
@@ -210,28 +170,17 @@ class MetricsService:
 
         Cache TTL: 5 minutes (lead data changes frequently)
         """
-        cache_key = "metrics:dashboard:timeline_distribution"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Timeline distribution served from cache")
-                return TimelineDistribution(**cached)
-
-            # Generate fresh distribution data
-            distribution = await self._calculate_timeline_distribution()
-
             # Cache for 5 minutes
-            await self.cache_service.set(
-                cache_key,
-                asdict(distribution),
-                ttl=300
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "metrics:dashboard:timeline_distribution",
+                self._calculate_timeline_distribution,
+                ttl=300,
+                serialize=asdict,
+                deserialize=lambda cached: TimelineDistribution(**cached),
             )
 
-            logger.debug("Timeline distribution generated and cached")
-            return distribution
-
         except Exception as e:
             logger.exception(f"Error getting timeline distribution: {e}")
             return self._get_fallback_timeline_distribution()
@@ -245,28 +194,17 @@ class MetricsService:
 
         Cache TTL: 10 minutes (commission data is relatively stable)
         """
-        cache_key = "metrics:dashboard:commission_metrics"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Commission metrics served from cache")
-                return CommissionMetrics(**cached)
-
-            # Generate fresh commission metrics
-            metrics = await self._calculate_commission_metrics()
-
             # Cache for 10 minutes
-            await self.cache_service.set(
-                cache_key,
-                asdict(metrics),
-                ttl=600
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "metrics:dashboard:commission_metrics",
+                self._calculate_commission_metrics,
+                ttl=600,
+                serialize=asdict,
+                deserialize=lambda cached: CommissionMetrics(**cached),
             )
 
-            logger.debug("Commission metrics generated and cached")
-            return metrics
-
         except Exception as e:
             logger.exception(f"Error getting commission metrics: {e}")
             return self._get_fallback_commission_metrics()
@@ -284,56 +222,44 @@ class MetricsService:
 
         Cache TTL: 30 seconds (for dashboard page loads)
         """
-        cache_key = "metrics:dashboard:full_summary"
-
         try:
-            # Try cache first
-            cached = await self.cache_service.get(cache_key)
-            if cached:
-                logger.debug("Dashboard summary served from cache")
-                return cached
-
-            # Fetch all metrics concurrently for performance
-            performance_task = self.get_performance_metrics()
-            budget_task = self.get_budget_distribution()
-            timeline_task = self.get_timeline_distribution()
-            commission_task = self.get_commission_metrics()
-            cost_savings_task = self.get_cost_savings()
-
-            # Await all tasks
-            performance, budget, timeline, commission, cost_savings = await asyncio.gather(
-                performance_task,
-                budget_task,
-                timeline_task,
-                commission_task,
-                cost_savings_task,
-                return_exceptions=True
-            )
-
-            # Build summary (handle any exceptions)
-            summary = {
-                'performance': asdict(performance) if not isinstance(performance, Exception) else None,
-                'budget_distribution': asdict(budget) if not isinstance(budget, Exception) else None,
-                'timeline_distribution': asdict(timeline) if not isinstance(timeline, Exception) else None,
-                'commission_metrics': asdict(commission) if not isinstance(commission, Exception) else None,
-                'cost_savings': asdict(cost_savings) if not isinstance(cost_savings, Exception) else None,
-                'generated_at': datetime.now().isoformat(),
-            }
-
-            # Cache for 30 seconds
-            await self.cache_service.set(
-                cache_key,
-                summary,
-                ttl=30
+            # Fresh for 30 seconds, then served stale for up to
+            # _SUMMARY_STALE_SECONDS while one background refresh runs
+            return await computation_cache.get_or_compute(
+                self.cache_service,
+                "metrics:dashboard:full_summary",
+                self._build_dashboard_summary,
+                ttl=30,
+                stale_ttl=_SUMMARY_STALE_SECONDS,
             )
 
-            logger.debug("Dashboard summary generated and cached")
-            return summary
-
         except Exception as e:
             logger.exception(f"Error getting dashboard summary: {e}")
             return self._get_fallback_dashboard_summary()
 
+    async def _build_dashboard_summary(self) -> Dict[str, Any]:
+        # Fetch all metrics concurrently for performance
+        performance, budget, timeline, commission, cost_savings = await asyncio.gather(
+            self.get_performance_metrics(),
+            self.get_budget_distribution(),
+            self.get_timeline_distribution(),
+            self.get_commission_metrics(),
+            self.get_cost_savings(),
+            return_exceptions=True
+        )
+
+        # Build summary (handle any exceptions)
+        summary = {
+            'performance': asdict(performance) if not isinstance(performance, Exception) else None,
+            'budget_distribution': asdict(budget) if not isinstance(budget, Exception) else None,
+            'timeline_distribution': asdict(timeline) if not isinstance(timeline, Exception) else None,
+            'commission_metrics': asdict(commission) if not isinstance(commission, Exception) else None,
+            'cost_savings': asdict(cost_savings) if not isinstance(cost_savings, Exception) else None,
+            'generated_at': datetime.now().isoformat(),
+        }
+        logger.debug("Dashboard summary generated")
+        return summary
+
     # =================================================================
     # Private Calculation Methods
     # =================================================================
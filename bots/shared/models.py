@@ -24,7 +24,7 @@ class PerformanceMetrics:
     claude_analysis_time: Optional[float] = None
     total_time: Optional[float] = None
     cache_hit: bool = False
-    analysis_type: str = "unknown"  # "cached", "pattern", "hybrid", "fallback"
+    analysis_type: str = "unknown"  # "cached", "content_cached", "ai", "pattern", "hybrid", "fallback"
     five_minute_rule_compliant: bool = True
 
     def to_dict(self):
@@ -0,0 +1,197 @@
+"""
+Coherent in-process near cache for hot Redis keys.
+
+``CacheService`` serves reads of hot keys (seller/buyer conversation state,
+including its field hash and history list, bot assignments) from a small
+in-process copy instead of a Redis round trip.
+Coherence across worker processes:
+
+- Every write or delete of a hot key through ``CacheService`` publishes the
+  key on a Redis pub/sub channel; other workers drop their copy.  Partial
+  hash/list writes (``hset``, ``lpush_capped``, ...) drop the local copy too.
+- Copies expire after ``near_cache_ttl_seconds`` even if an invalidation is
+  lost.
+- The near cache only serves while its subscription is live.  It is emptied
+  on every (re)subscribe, so invalidations missed while disconnected can't
+  leave stale copies behind.
+- A read that raced with an invalidation does not store what it fetched.
+- ``fence(contact_id)`` drops a contact's copies when its processing lock is
+  taken, so a conversation turn always starts from the state in Redis, even
+  if another worker's invalidation is still in flight.
+
+Values are stored encoded, so callers that mutate a returned dict never
+modify the cached copy.
+"""
+import asyncio
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from bots.shared.cache_codecs import ValueSerializer
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+_RESUBSCRIBE_MIN_SECONDS = 0.5
+_RESUBSCRIBE_MAX_SECONDS = 30.0
+
+# Per-contact keys under a hot prefix: the state blob ``<prefix><contact>`` and
+# the ``ConversationStateStore`` field hash / history list
+_CONTACT_KEY_PARTS = ("", "fields:", "history:")
+
+
+class NearCache:
+    """Short-TTL in-process copies of hot keys, invalidated over pub/sub."""
+
+    def __init__(
+        self,
+        prefixes: Optional[Tuple[str, ...]] = None,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        channel: Optional[str] = None,
+    ):
+        # Imported here: cache_service imports this module
+        from bots.shared.cache_service import MemoryCache
+
+        if prefixes is None:
+            prefixes = tuple(p.strip() for p in settings.near_cache_prefixes.split(",") if p.strip())
+        self.prefixes = tuple(prefixes)
+        self.ttl_seconds = ttl_seconds or settings.near_cache_ttl_seconds
+        self.channel = channel or settings.near_cache_channel
+        self.origin = uuid.uuid4().hex
+        self._store = MemoryCache(max_entries=max_entries or settings.near_cache_max_entries)
+        self._serializer = ValueSerializer(codec="pickle", compression="none")
+        # Bumped on every invalidation; a fill started under an older epoch is dropped
+        self._epoch = 0
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.resubscribes = 0
+
+    def covers(self, key: str) -> bool:
+        return key.startswith(self.prefixes)
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    # ---- reads / fills -------------------------------------------------
+
+    async def get(self, key: str) -> Optional[Any]:
+        if not self.connected:
+            return None
+        data = await self._store.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._serializer.loads(data)
+
+    async def fill(self, key: str, value: Any, ttl: int, epoch: int) -> None:
+        """Store a value read from Redis unless an invalidation happened since ``epoch``."""
+        if self.connected and epoch == self._epoch and value is not None:
+            await self._store.set(key, self._serializer.dumps(value), min(ttl, self.ttl_seconds))
+
+    async def write(self, key: str, value: Any, ttl: int) -> None:
+        """Record this worker's own write (Redis already holds ``value``)."""
+        self._epoch += 1
+        if self.connected:
+            await self._store.set(key, self._serializer.dumps(value), min(ttl, self.ttl_seconds))
+
+    # ---- invalidation --------------------------------------------------
+
+    async def invalidate(self, key: str) -> None:
+        self._epoch += 1
+        await self._store.delete(key)
+
+    async def fence(self, contact_id: str) -> None:
+        """Drop every hot key of a contact (``<prefix>[fields:|history:]<contact_id>``)."""
+        self._epoch += 1
+        for prefix in self.prefixes:
+            for part in _CONTACT_KEY_PARTS:
+                await self._store.delete(f"{prefix}{part}{contact_id}")
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._store.clear()
+
+    async def publish(self, bus: Any, *keys: str) -> None:
+        """Tell other workers to drop ``keys``; failures only shorten coherence to the TTL."""
+        try:
+            await bus.publish(self.channel, f"{self.origin}|" + "\n".join(keys))
+        except Exception as e:
+            logger.warning(f"Near cache invalidation publish failed for {keys[0]}: {e}")
+
+    def _on_message(self, message: str) -> None:
+        """``<origin>|<key>[\n<key>...]``; messages from this worker are ignored."""
+        origin, _, keys = message.partition("|")
+        if origin == self.origin or not keys:
+            return
+        self._epoch += 1
+        self.invalidations += 1
+        for key in keys.split("\n"):
+            self._store.discard(key)
+
+    # ---- subscription --------------------------------------------------
+
+    def start(self, bus: Any) -> None:
+        """Start the invalidation listener (idempotent; needs a running loop)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen(bus))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+        self.clear()
+
+    async def _listen(self, bus: Any) -> None:
+        delay = _RESUBSCRIBE_MIN_SECONDS
+        while True:
+            try:
+                subscription = await bus.subscribe(self.channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Near cache subscribe failed, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _RESUBSCRIBE_MAX_SECONDS)
+                continue
+
+            # Anything cached before this point may have missed an invalidation
+            self.clear()
+            self.connected = True
+            self.resubscribes += 1
+            delay = _RESUBSCRIBE_MIN_SECONDS
+            logger.info(f"Near cache subscribed to {self.channel}")
+            try:
+                async for message in subscription:
+                    self._on_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Near cache subscription lost: {e}")
+            finally:
+                self.connected = False
+                self.clear()
+                try:
+                    await subscription.close()
+                except Exception:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "entries": self._store.get_stats()["entries"],
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "resubscribes": self.resubscribes,
+        }
@@ -0,0 +1,110 @@
+"""
+Redis client factory for a single node or a Redis Cluster.
+
+Every Redis user (``RedisCache``, ``EventBroker``, ``WebSocketManager``, the
+webhook job queue) builds its client here.  With ``REDIS_CLUSTER_ENABLED``
+the client is a ``RedisCluster`` seeded from ``REDIS_URL``.  It discovers
+the other nodes, routes each command to the node owning the key's slot, and
+keeps one connection pool per node (``redis_max_connections`` connections
+each).
+
+In a cluster, every key touched by one Lua script or multi-key command must
+hash to the same slot.  Per-contact keys therefore wrap the contact id in a
+hash tag (``seller:state:{c1}``, ``lock:{c1}``, ``assigned_bot:{c1}``; see
+``contact_tag``), so everything about one contact lives on one node.  On a
+single node the keys keep their untagged names, and existing deployments
+need no key migration.
+
+The asyncio ``RedisCluster`` client has no pub/sub.  Subscribers use
+``create_pubsub_client`` instead: in cluster mode a plain client to the seed
+node, which receives every ``PUBLISH`` since the cluster forwards classic
+(unsharded) messages to all nodes.
+"""
+from typing import Any, Dict, Optional
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def cluster_enabled() -> bool:
+    return settings.redis_cluster_enabled
+
+
+def contact_tag(contact_id: str) -> str:
+    """The contact id as used in per-contact keys (hash-tagged in cluster mode)."""
+    return f"{{{contact_id}}}" if settings.redis_cluster_enabled else contact_id
+
+
+def key_slot(key: str) -> int:
+    """Cluster slot of ``key`` (honours ``{hash tags}``)."""
+    from redis.crc import key_slot as _key_slot
+
+    return _key_slot(key.encode("utf-8"))
+
+
+def _client_options(
+    max_connections: Optional[int],
+    socket_timeout: Optional[float],
+    socket_connect_timeout: Optional[float],
+    decode_responses: bool,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    return dict(
+        max_connections=max_connections or settings.redis_max_connections,
+        socket_timeout=settings.redis_socket_timeout if socket_timeout is None else socket_timeout,
+        socket_connect_timeout=(
+            settings.redis_socket_connect_timeout if socket_connect_timeout is None else socket_connect_timeout
+        ),
+        decode_responses=decode_responses,
+        **kwargs,
+    )
+
+
+def create_redis_client(
+    url: Optional[str] = None,
+    *,
+    max_connections: Optional[int] = None,
+    socket_timeout: Optional[float] = None,
+    socket_connect_timeout: Optional[float] = None,
+    decode_responses: bool = False,
+    **kwargs: Any,
+) -> Any:
+    """An asyncio Redis (or RedisCluster) client for ``url`` (default ``REDIS_URL``).
+
+    Raises ImportError if the ``redis`` package is missing.
+    """
+    url = url or settings.redis_url
+    options = _client_options(max_connections, socket_timeout, socket_connect_timeout, decode_responses, **kwargs)
+    if settings.redis_cluster_enabled:
+        from redis.asyncio.cluster import RedisCluster
+
+        # max_connections applies to each node's pool
+        return RedisCluster.from_url(url, **options)
+
+    import redis.asyncio as redis
+
+    return redis.from_url(url, **options)
+
+
+def create_pubsub_client(
+    url: Optional[str] = None,
+    *,
+    max_connections: Optional[int] = None,
+    socket_timeout: Optional[float] = None,
+    socket_connect_timeout: Optional[float] = None,
+    decode_responses: bool = False,
+    **kwargs: Any,
+) -> Any:
+    """A single-node asyncio Redis client for ``SUBSCRIBE`` (see the module docstring).
+
+    Same options as ``create_redis_client``; in cluster mode the client
+    only talks to the ``url`` node.  Raises ImportError if the ``redis``
+    package is missing.
+    """
+    import redis.asyncio as redis
+
+    url = url or settings.redis_url
+    options = _client_options(max_connections, socket_timeout, socket_connect_timeout, decode_responses, **kwargs)
+    return redis.from_url(url, **options)
@@ -32,7 +32,8 @@ _COMPETITOR_PATTERN = re.compile(
     re.IGNORECASE,
 )
 
-_MAX_LENGTH = 480
+# Longest reply sent by SMS (three 160-character segments)
+SMS_MAX_LENGTH = 480
 
 
 def _truncate_at_word_boundary(text: str, max_len: int) -> str:
@@ -61,7 +62,7 @@ def sanitize_bot_response(text: Optional[str]) -> str:
     text = _COMPETITOR_PATTERN.sub("", text)
 
     # 4. Truncation
-    text = _truncate_at_word_boundary(text, _MAX_LENGTH)
+    text = _truncate_at_word_boundary(text, SMS_MAX_LENGTH)
 
     # 5. Clean double spaces
     text = re.sub(r"  +", " ", text).strip()
@@ -0,0 +1,85 @@
+"""
+Counters shared by every worker process of a bot.
+
+``incr`` only touches process memory, so it is cheap enough for the request
+middleware.  Pending deltas are pushed to the cache with atomic INCRBY on
+``flush`` (``maybe_flush`` does so at most every ``shared_state_sync_seconds``),
+and ``snapshot`` flushes before reading the totals, so any worker reports
+the same numbers.  With no Redis configured the cache is the in-process
+MemoryCache and the counters behave like the old module dict.
+"""
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+COUNTER_TTL_SECONDS = 30 * 86_400
+
+
+class SharedCounters:
+    """Named integer counters summed across workers through the cache."""
+
+    def __init__(
+        self,
+        namespace: str,
+        fields: Iterable[str],
+        cache: Any = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.namespace = namespace
+        self.fields = list(fields)
+        self._cache = cache
+        self.flush_interval = (
+            settings.shared_state_sync_seconds if flush_interval is None else flush_interval
+        )
+        self._pending: Dict[str, int] = {}
+        self._last_flush = time.monotonic()
+
+    def _get_cache(self) -> Any:
+        if self._cache is None:
+            from bots.shared.cache_service import get_cache_service
+            self._cache = get_cache_service()
+        return self._cache
+
+    def _key(self, field: str) -> str:
+        return f"{self.namespace}:{field}"
+
+    def incr(self, field: str, amount: int = 1) -> None:
+        """Add ``amount`` to a counter (applied to the cache on the next flush)."""
+        self._pending[field] = self._pending.get(field, 0) + int(amount)
+
+    async def flush(self) -> None:
+        """Push pending deltas to the cache."""
+        pending, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+        cache = self._get_cache()
+        for field, amount in pending.items():
+            if not amount:
+                continue
+            try:
+                await cache.increment(self._key(field), amount, ttl=COUNTER_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"Could not flush counter {self._key(field)}: {e}")
+                self._pending[field] = self._pending.get(field, 0) + amount
+
+    async def maybe_flush(self) -> None:
+        """Flush if the flush interval has elapsed since the last one."""
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+    async def snapshot(self) -> Dict[str, int]:
+        """Totals across all workers, including this worker's pending deltas."""
+        await self.flush()
+        cache = self._get_cache()
+        totals: Dict[str, int] = {}
+        for field in self.fields:
+            try:
+                # INCRBY 0 reads the raw integer (values are not pickled)
+                totals[field] = int(await cache.increment(self._key(field), 0, ttl=COUNTER_TTL_SECONDS))
+            except Exception as e:
+                logger.warning(f"Could not read counter {self._key(field)}: {e}")
+                totals[field] = 0
+        return totals
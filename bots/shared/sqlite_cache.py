@@ -0,0 +1,459 @@
+"""
+SQLite-backed cache for single-node deployments without Redis.
+
+With ``CACHE_BACKEND=sqlite`` and no Redis, ``CacheService`` uses this
+instead of ``MemoryCache``, so seller/buyer state, bot assignments and
+cached analyses survive a restart.
+
+- One WAL-mode database file (``SQLITE_CACHE_PATH``), values encoded with
+  the same tagged ``ValueSerializer`` as Redis.  Sets live in their own
+  table, one row per member; hashes and lists are one row each.
+- Writes join an open transaction that is committed at most
+  ``sqlite_cache_commit_interval_ms`` later (or after
+  ``sqlite_cache_commit_max_writes`` writes), so a burst of cache writes
+  costs one fsync.  A crash can lose that window, never corrupt the file.
+- Reads filter on ``expires_at``; expired rows are deleted in batches of
+  ``sqlite_cache_sweep_batch`` on the commit timer.
+- Calls run synchronously on the event loop thread.  Each is a few
+  microseconds against the page cache, and since none of them yield,
+  check-then-set sequences (locks, token buckets, webhook admission) are
+  atomic exactly as they are in ``MemoryCache``.
+
+Pub/sub is in-process only: one node, one process.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from bots.shared.cache_codecs import ValueSerializer
+from bots.shared.cache_service import AbstractCache, Subscription, _MemorySubscription
+from bots.shared.cache_stats import KeySample
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+from bots.shared.token_bucket import BucketSpec, RateLimitDecision, take_tokens_via_get_set
+from bots.shared.webhook_admission import AdmissionKeys, WebhookAdmission, admit_stepwise
+
+logger = get_logger(__name__)
+
+# Default expiry for sets, lists and counters created without a TTL (as MemoryCache)
+_DEFAULT_TTL_SECONDS = 86400
+
+# Stay under SQLITE_MAX_VARIABLE_NUMBER on old builds (999)
+_MAX_PARAMS = 900
+
+# Live keys of both tables: (key, approximate stored bytes, expires_at)
+_LIVE_KEYS = """
+SELECT key, length(key) + length(value), expires_at FROM kv WHERE expires_at > ?1
+UNION ALL
+SELECT key, length(key) + SUM(length(member)), MAX(expires_at) FROM members
+WHERE expires_at > ?1 GROUP BY key
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (expires_at);
+CREATE TABLE IF NOT EXISTS members (
+    key TEXT NOT NULL,
+    member TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (key, member)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS members_expires_at ON members (expires_at);
+"""
+
+
+def _chunks(items: List[str], size: int = _MAX_PARAMS) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class SQLiteCache(AbstractCache):
+    """Persistent cache on a WAL-mode SQLite file with batched commits."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        commit_interval_ms: Optional[int] = None,
+        commit_max_writes: Optional[int] = None,
+        sweep_batch: Optional[int] = None,
+        serializer: Optional[ValueSerializer] = None,
+    ):
+        self.path = path or settings.sqlite_cache_path
+        self.commit_interval = (
+            settings.sqlite_cache_commit_interval_ms if commit_interval_ms is None else commit_interval_ms
+        ) / 1000
+        self.commit_max_writes = commit_max_writes or settings.sqlite_cache_commit_max_writes
+        self.sweep_batch = sweep_batch or settings.sqlite_cache_sweep_batch
+        self.serializer = serializer or ValueSerializer()
+
+        directory = os.path.dirname(self.path)
+        if directory and self.path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly in _write()
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={settings.sqlite_cache_mmap_mb * 1024 * 1024}")
+        self._conn.executescript(_SCHEMA)
+
+        self._pending_writes = 0
+        self._commit_handle: Optional[asyncio.TimerHandle] = None
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self.commits = 0
+        self.expirations = 0
+        logger.info(f"Initialized SQLiteCache: {self.path}")
+
+    # ---- transactions and expiry -------------------------------------------
+
+    def _write(self, sql: str, params: Any = ()) -> sqlite3.Cursor:
+        """Run a statement inside the open batch, starting one if needed."""
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+        cursor = self._conn.execute(sql, params)
+        self._wrote()
+        return cursor
+
+    def _write_many(self, sql: str, rows: List[Any]) -> None:
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+        self._conn.executemany(sql, rows)
+        self._wrote(len(rows))
+
+    def _wrote(self, count: int = 1) -> None:
+        self._pending_writes += count
+        if self._pending_writes >= self.commit_max_writes:
+            self.commit()
+            return
+        if self._commit_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.commit()
+                return
+            self._commit_handle = loop.call_later(self.commit_interval, self._on_commit_timer)
+
+    def _on_commit_timer(self) -> None:
+        self._commit_handle = None
+        try:
+            self.sweep(self.sweep_batch)
+            self.commit()
+        except sqlite3.Error as e:
+            logger.error(f"SQLite cache commit failed: {e}")
+
+    def commit(self) -> None:
+        """Commit the open batch now."""
+        if self._commit_handle is not None:
+            self._commit_handle.cancel()
+            self._commit_handle = None
+        if self._conn.in_transaction:
+            self._conn.commit()
+            self.commits += 1
+        self._pending_writes = 0
+
+    def sweep(self, max_keys: Optional[int] = None) -> int:
+        """Delete up to ``max_keys`` expired keys and set members (all if None)."""
+        now = time.time()
+        limit = -1 if max_keys is None else max_keys
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+        removed = self._conn.execute(
+            "DELETE FROM kv WHERE key IN "
+            "(SELECT key FROM kv WHERE expires_at <= ? LIMIT ?)",
+            (now, limit),
+        ).rowcount
+        removed += self._conn.execute(
+            "DELETE FROM members WHERE (key, member) IN "
+            "(SELECT key, member FROM members WHERE expires_at <= ? LIMIT ?)",
+            (now, limit),
+        ).rowcount
+        self.expirations += removed
+        return removed
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        self.commit()
+        self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Row counts, file size and commit/expiry counters."""
+        (entries,) = self._conn.execute("SELECT COUNT(*) FROM kv").fetchone()
+        (members,) = self._conn.execute("SELECT COUNT(*) FROM members").fetchone()
+        try:
+            file_bytes = os.path.getsize(self.path)
+        except OSError:
+            file_bytes = 0
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": entries,
+            "set_members": members,
+            "file_bytes": file_bytes,
+            "pending_writes": self._pending_writes,
+            "commits": self.commits,
+            "expirations": self.expirations,
+        }
+
+    # ---- AbstractCache ---------------------------------------------------
+
+    async def get(self, key: str) -> Optional[Any]:
+        row = self._conn.execute(
+            "SELECT value FROM kv WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return self.serializer.loads(row[0]) if row else None
+
+    async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
+        self._write(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, self.serializer.dumps(value), time.time() + ttl),
+        )
+        return True
+
+    async def delete(self, key: str) -> bool:
+        return await self.delete_many([key]) > 0
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        found: Dict[str, Any] = {}
+        now = time.time()
+        for chunk in _chunks(list(dict.fromkeys(keys))):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, value FROM kv WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*chunk, now),
+            )
+            for key, data in rows:
+                found[key] = self.serializer.loads(data)
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = 300) -> bool:
+        if not items:
+            return True
+        expires_at = time.time() + ttl
+        self._write_many(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            [(key, self.serializer.dumps(value), expires_at) for key, value in items.items()],
+        )
+        return True
+
+    async def delete_many(self, keys: List[str]) -> int:
+        if not keys:
+            return 0
+        now = time.time()
+        deleted = 0
+        for chunk in _chunks(list(dict.fromkeys(keys))):
+            placeholders = ",".join("?" * len(chunk))
+            # Count only live keys, like Redis DEL
+            (live,) = self._conn.execute(
+                f"SELECT COUNT(*) FROM kv WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*chunk, now),
+            ).fetchone()
+            (live_sets,) = self._conn.execute(
+                f"SELECT COUNT(DISTINCT key) FROM members WHERE key IN ({placeholders}) "
+                f"AND expires_at > ?",
+                (*chunk, now),
+            ).fetchone()
+            self._write(f"DELETE FROM kv WHERE key IN ({placeholders})", chunk)
+            self._write(f"DELETE FROM members WHERE key IN ({placeholders})", chunk)
+            deleted += live + live_sets
+        return deleted
+
+    async def increment(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        current = await self.get(key)
+        value = int(current or 0) + amount
+        if current is None:
+            await self.set(key, value, ttl or _DEFAULT_TTL_SECONDS)
+        else:
+            self._write("UPDATE kv SET value = ? WHERE key = ?", (self.serializer.dumps(value), key))
+        return value
+
+    def _set_expiry(self, key: str, ttl: Optional[int]) -> float:
+        """Expiry for a write to set ``key``: ``ttl`` if given, else keep the current one."""
+        now = time.time()
+        if ttl:
+            return now + ttl
+        row = self._conn.execute(
+            "SELECT expires_at FROM members WHERE key = ? AND expires_at > ? LIMIT 1", (key, now)
+        ).fetchone()
+        return row[0] if row else now + _DEFAULT_TTL_SECONDS
+
+    async def sadd(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
+        if not values:
+            return 0
+        expires_at = self._set_expiry(key, ttl)
+        self._write("DELETE FROM members WHERE key = ? AND expires_at <= ?", (key, time.time()))
+        before = self._conn.total_changes
+        self._write_many(
+            "INSERT OR IGNORE INTO members (key, member, expires_at) VALUES (?, ?, ?)",
+            [(key, str(value), expires_at) for value in dict.fromkeys(values)],
+        )
+        added = self._conn.total_changes - before
+        self._write("UPDATE members SET expires_at = ? WHERE key = ?", (expires_at, key))
+        return added
+
+    async def smembers(self, key: str) -> set[str]:
+        rows = self._conn.execute(
+            "SELECT member FROM members WHERE key = ? AND expires_at > ?", (key, time.time())
+        )
+        return {member for (member,) in rows}
+
+    async def srem(self, key: str, *values: str) -> int:
+        if not values:
+            return 0
+        now = time.time()
+        removed = 0
+        for chunk in _chunks([str(v) for v in dict.fromkeys(values)]):
+            placeholders = ",".join("?" * len(chunk))
+            removed += self._write(
+                f"DELETE FROM members WHERE key = ? AND member IN ({placeholders}) AND expires_at > ?",
+                (key, *chunk, now),
+            ).rowcount
+        return removed
+
+    def _read_value(self, key: str) -> Tuple[Any, Optional[float]]:
+        """A live kv value and its expiry, or (None, None)."""
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM kv WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return (self.serializer.loads(row[0]), row[1]) if row else (None, None)
+
+    def _rewrite_value(self, key: str, value: Any, ttl: Optional[int], expires_at: Optional[float]) -> None:
+        """Store a modified list/hash: ``ttl`` if given, else keep (or default) its expiry."""
+        if ttl:
+            expires_at = time.time() + ttl
+        elif expires_at is None:
+            expires_at = time.time() + _DEFAULT_TTL_SECONDS
+        self._write(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, self.serializer.dumps(value), expires_at),
+        )
+
+    async def rpush(self, key: str, *values: str, ttl: Optional[int] = None) -> int:
+        current, expires_at = self._read_value(key)
+        if not isinstance(current, list):
+            current = []
+        current.extend(values)
+        self._rewrite_value(key, current, ttl, expires_at)
+        return len(current)
+
+    async def drain_list(self, key: str, expected_length: int) -> Optional[List[str]]:
+        current = await self.get(key)
+        if not isinstance(current, list) or len(current) != expected_length:
+            return None
+        await self.delete(key)
+        return list(current)
+
+    # Hashes and capped lists are one kv row each (a dict / a newest-first
+    # list), rewritten whole on every change: a local file has no network
+    # bytes to save
+
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None) -> int:
+        current, expires_at = self._read_value(key)
+        if not isinstance(current, dict):
+            if not mapping:
+                return 0
+            current = {}
+        added = len(mapping.keys() - current.keys())
+        current.update(mapping)
+        self._rewrite_value(key, current, ttl, expires_at)
+        return added
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        current, expires_at = self._read_value(key)
+        if not isinstance(current, dict):
+            return 0
+        removed = [name for name in fields if name in current]
+        for name in removed:
+            del current[name]
+        if removed:
+            if current:
+                self._rewrite_value(key, current, None, expires_at)
+            else:
+                await self.delete(key)
+        return len(removed)
+
+    async def hgetall(self, key: str) -> Dict[str, Any]:
+        current, _ = self._read_value(key)
+        return current if isinstance(current, dict) else {}
+
+    async def hgetall_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = await self.get_many(keys)
+        return {key: value for key, value in found.items() if isinstance(value, dict) and value}
+
+    async def hincrby(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        current = await self.hgetall(key)
+        value = int(current.get(field, 0)) + amount
+        await self.hset(key, {field: value}, ttl)
+        return value
+
+    async def lpush_capped(
+        self, key: str, values: List[Any], max_length: int, ttl: Optional[int] = None
+    ) -> int:
+        current, expires_at = self._read_value(key)
+        if not isinstance(current, list):
+            if not values:
+                return 0
+            current = []
+        current = [*reversed(values), *current][:max_length]
+        self._rewrite_value(key, current, ttl, expires_at)
+        return len(current)
+
+    async def lrange(self, key: str, start: int = 0, end: int = -1) -> List[Any]:
+        current, _ = self._read_value(key)
+        if not isinstance(current, list):
+            return []
+        return current[start:None if end == -1 else end + 1]
+
+    async def lrange_many(self, keys: List[str], start: int = 0, end: int = -1) -> Dict[str, List[Any]]:
+        found = await self.get_many(keys)
+        return {
+            key: value[start:None if end == -1 else end + 1]
+            for key, value in found.items() if isinstance(value, list) and value
+        }
+
+    async def take_tokens(self, key: str, bucket: BucketSpec, cost: int = 1) -> RateLimitDecision:
+        return await take_tokens_via_get_set(self, key, bucket, cost)
+
+    async def acquire_lock(self, key: str, token: str, ttl: int = 30) -> bool:
+        # No awaits yield here, so check-then-set cannot interleave
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, token, ttl)
+        return True
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        if await self.get(key) != token:
+            return False
+        return await self.delete(key)
+
+    async def admit_webhook(
+        self,
+        keys: AdmissionKeys,
+        bucket: BucketSpec,
+        bot_type: str = "",
+        lock_token: Optional[str] = None,
+        lock_ttl: int = 30,
+    ) -> WebhookAdmission:
+        return await admit_stepwise(self, keys, bucket, bot_type, lock_token, lock_ttl)
+
+    async def publish(self, channel: str, message: str) -> int:
+        queues = self._subscribers.get(channel, [])
+        for queue in queues:
+            queue.put_nowait(message)
+        return len(queues)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        return _MemorySubscription(self._subscribers, channel)
+
+    async def sample_keys(self, limit: int) -> Tuple[List[KeySample], int]:
+        now = time.time()
+        (total,) = self._conn.execute(f"SELECT COUNT(*) FROM ({_LIVE_KEYS})", (now,)).fetchone()
+        rows = self._conn.execute(
+            f"SELECT * FROM ({_LIVE_KEYS}) ORDER BY random() LIMIT ?2", (now, limit)
+        )
+        return [KeySample(key, size, expires_at - now) for key, size, expires_at in rows], total
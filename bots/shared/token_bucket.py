@@ -0,0 +1,136 @@
+"""
+Token-bucket rate limiting shared by the webhook admission path and
+RateLimitMiddleware.
+
+A bucket holds up to ``capacity`` tokens and refills continuously at
+``refill_per_second``; each request takes one token.  Compared with the old
+fixed minute window this allows short bursts up to ``capacity`` but never
+2x the limit across a minute boundary, and buckets are keyed per tenant
+(GHL location) or per client IP so one noisy caller cannot starve others.
+
+Bucket state is ``{"tokens": float, "ts": float}``.  Redis updates it
+atomically in Lua (see cache_service); MemoryCache and plain get/set caches
+use ``take_tokens_via_get_set``.
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    """Bucket size and refill rate."""
+
+    capacity: int
+    refill_per_second: float
+
+    @classmethod
+    def per_minute(cls, per_minute: int, burst: Optional[int] = None) -> "BucketSpec":
+        return cls(capacity=max(burst or per_minute, 1), refill_per_second=max(per_minute, 1) / 60)
+
+    @property
+    def ttl_seconds(self) -> int:
+        """How long an idle bucket must be kept before it is full again anyway."""
+        return int(math.ceil(self.capacity / self.refill_per_second)) + 1
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of taking from a bucket."""
+
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until a token is available (0 if allowed)
+    reset_after: float  # seconds until the bucket is full again
+
+
+def decide(tokens_left: float, allowed: bool, spec: BucketSpec, cost: int = 1) -> RateLimitDecision:
+    """Build a decision from the token count left after the take attempt."""
+    missing = 0.0 if allowed else max(cost - tokens_left, 0.0)
+    return RateLimitDecision(
+        allowed=allowed,
+        remaining=max(int(tokens_left), 0),
+        retry_after=missing / spec.refill_per_second,
+        reset_after=max(spec.capacity - tokens_left, 0.0) / spec.refill_per_second,
+    )
+
+
+def refill(state: Optional[Dict[str, float]], spec: BucketSpec, now: float) -> float:
+    """Tokens available at ``now`` for a stored bucket state (new buckets start full)."""
+    if not state:
+        return float(spec.capacity)
+    elapsed = max(now - state["ts"], 0.0)
+    return min(float(spec.capacity), state["tokens"] + elapsed * spec.refill_per_second)
+
+
+async def take_tokens_via_get_set(
+    cache: Any, key: str, spec: BucketSpec, cost: int = 1, now: Optional[float] = None
+) -> RateLimitDecision:
+    """
+    Bucket update over plain get/set.
+
+    Atomic on MemoryCache (nothing here yields to the event loop); only
+    best-effort on remote caches, which should implement ``take_tokens``.
+    """
+    now = time.time() if now is None else now
+    tokens = refill(await cache.get(key), spec, now)
+    if tokens < cost:
+        return decide(tokens, False, spec, cost)
+    tokens = min(float(spec.capacity), tokens - cost)  # a negative cost refunds
+    await cache.set(key, {"tokens": tokens, "ts": now}, ttl=spec.ttl_seconds)
+    return decide(tokens, True, spec, cost)
+
+
+def webhook_bucket_for(location_id: str) -> BucketSpec:
+    """Webhook bucket for a GHL location, honouring per-tenant overrides."""
+    burst, per_minute = settings.get_webhook_rate_limit(location_id)
+    return BucketSpec.per_minute(per_minute, burst)
+
+
+class TokenBucketLimiter:
+    """
+    Takes tokens from cache-backed buckets.
+
+    Uses the shared CacheService (atomic on Redis); if that raises, a
+    process-local MemoryCache keeps limiting instead of failing open.
+    """
+
+    def __init__(self, cache: Any = None, prefix: str = "tb"):
+        self._cache = cache
+        self.prefix = prefix
+        self._local = None
+
+    def _get_cache(self) -> Any:
+        if self._cache is None:
+            from bots.shared.cache_service import get_cache_service
+            self._cache = get_cache_service()
+        return self._cache
+
+    def _get_local(self) -> Any:
+        if self._local is None:
+            from bots.shared.cache_service import MemoryCache
+            self._local = MemoryCache()
+        return self._local
+
+    async def hit(self, key: str, spec: BucketSpec, cost: int = 1) -> RateLimitDecision:
+        """Take ``cost`` tokens from bucket ``key``."""
+        full_key = f"{self.prefix}:{key}"
+        try:
+            cache = self._get_cache()
+            if hasattr(cache, "take_tokens"):
+                return await cache.take_tokens(full_key, spec, cost)
+            return await take_tokens_via_get_set(cache, full_key, spec, cost)
+        except Exception as e:
+            logger.warning(f"Rate limit cache unavailable, using local bucket: {e}")
+            return await self._get_local().take_tokens(full_key, spec, cost)
+
+    async def refund(self, key: str, spec: BucketSpec, cost: int = 1) -> None:
+        """Give back tokens taken by ``hit`` for work that did not happen (capped at capacity)."""
+        await self.hit(key, spec, -cost)
+
@@ -0,0 +1,125 @@
+"""
+Single-call admission checks for the unified GHL webhook.
+
+Before a message reaches a bot the webhook needs four decisions:
+per-location throttle (token bucket), duplicate message, per-contact
+processing lock and which bot owns the contact.  Doing them as separate
+get/set calls costs ~8 cache round trips; ``admit_webhook`` asks the cache for all of them at
+once (a Lua script on Redis, an equivalent in-process step list on
+MemoryCache).
+
+Caches without an ``admit_webhook`` method (e.g. lightweight test doubles)
+are handled by ``admit_stepwise``, which issues the individual calls.
+"""
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from bots.shared.config import settings
+from bots.shared.contact_lock import lock_key
+from bots.shared.redis_connection import contact_tag
+from bots.shared.token_bucket import BucketSpec, take_tokens_via_get_set, webhook_bucket_for
+
+DEDUP_TTL_SECONDS = 300
+ASSIGNED_BOT_TTL_SECONDS = 604_800  # 7 days
+
+
+@dataclass
+class WebhookAdmission:
+    """Outcome of the admission checks, evaluated in order.
+
+    ``bot_type`` is only resolved when the lock was acquired in the same
+    call: the explicit bot_type when one was given (stored as the new
+    assignment), otherwise the stored assignment (None if there is none).
+    """
+
+    throttled: bool = False
+    duplicate: bool = False
+    lock_acquired: bool = False
+    bot_type: Optional[str] = None
+
+
+@dataclass
+class AdmissionKeys:
+    """Cache keys touched by a single admission call."""
+
+    rate: str
+    dedup: str
+    lock: str
+    assigned: str
+
+
+def admission_keys(contact_id: str, message_hash: str, location_id: str = "") -> AdmissionKeys:
+    """Build the rate / dedup / lock / assignment keys for one webhook."""
+    return AdmissionKeys(
+        rate=f"rate:webhook:{location_id or 'default'}",
+        dedup=f"dedup:{contact_tag(contact_id)}:{message_hash}",
+        lock=lock_key(contact_id),
+        assigned=assigned_bot_key(contact_id),
+    )
+
+
+def assigned_bot_key(contact_id: str) -> str:
+    """Cache key holding the bot a contact is assigned to."""
+    return f"assigned_bot:{contact_tag(contact_id)}"
+
+
+async def resolve_bot_assignment(cache: Any, assigned_key: str, bot_type: str) -> Optional[str]:
+    """Store an explicit bot_type as the assignment, or return the stored one."""
+    if bot_type:
+        await cache.set(assigned_key, bot_type, ttl=ASSIGNED_BOT_TTL_SECONDS)
+        return bot_type
+    return await cache.get(assigned_key)
+
+
+async def admit_stepwise(
+    cache: Any,
+    keys: AdmissionKeys,
+    bucket: BucketSpec,
+    bot_type: str = "",
+    lock_token: Optional[str] = None,
+    lock_ttl: int = 30,
+) -> WebhookAdmission:
+    """Reference implementation using plain get/set/acquire_lock calls."""
+    if not (await take_tokens_via_get_set(cache, keys.rate, bucket)).allowed:
+        return WebhookAdmission(throttled=True)
+
+    if await cache.get(keys.dedup):
+        return WebhookAdmission(duplicate=True)
+    await cache.set(keys.dedup, "1", ttl=DEDUP_TTL_SECONDS)
+
+    if not lock_token or not await cache.acquire_lock(keys.lock, lock_token, ttl=lock_ttl):
+        return WebhookAdmission()
+
+    return WebhookAdmission(
+        lock_acquired=True,
+        bot_type=await resolve_bot_assignment(cache, keys.assigned, bot_type),
+    )
+
+
+async def admit_webhook(
+    cache: Any,
+    contact_id: str,
+    message_hash: str,
+    bot_type: str = "",
+    lock_token: Optional[str] = None,
+    location_id: str = "",
+) -> WebhookAdmission:
+    """
+    Run the webhook admission checks in a single cache call where supported.
+
+    Args:
+        cache: CacheService (or any cache exposing get/set/acquire_lock)
+        contact_id: GHL contact id
+        message_hash: Hash of the message body, used for deduplication
+        bot_type: Explicit bot_type from the payload ("" if not given)
+        lock_token: Owner token for the processing lock; None skips the lock
+            step (e.g. when other requests for the contact are already queued)
+        location_id: GHL location (tenant) whose token bucket is charged
+    """
+    keys = admission_keys(contact_id, message_hash, location_id)
+    bucket = webhook_bucket_for(location_id)
+    lock_ttl = settings.webhook_lock_ttl_seconds
+
+    if hasattr(cache, "admit_webhook"):
+        return await cache.admit_webhook(keys, bucket, bot_type, lock_token, lock_ttl)
+    return await admit_stepwise(cache, keys, bucket, bot_type, lock_token, lock_ttl)
@@ -0,0 +1,490 @@
+"""
+Durable job queue and worker pool for fast-ack GHL webhooks.
+
+With ``WEBHOOK_FAST_ACK=true`` the unified webhook only verifies, dedups and
+enqueues the message, then returns 200.  A worker pool consumes the queue
+and runs the normal bot pipeline (including the GHL SMS reply).
+
+Backends:
+- RedisStreamQueue: Redis Streams consumer group.  Un-acked entries left by
+  a crashed worker are reclaimed (XAUTOCLAIM) on start-up and then every
+  ``webhook_queue_reclaim_interval_seconds`` by the worker pool.
+- SQLiteJobQueue: single-node stand-in (a file path, or ``:memory:`` for
+  tests).  Jobs still marked "processing" after a restart are re-queued.
+
+Ordering: jobs are routed to workers by contact id, so each contact's
+messages are handled one at a time, in queue order, within a process.
+Across processes the per-contact processing lock still serialises them.
+
+Failed jobs are retried with exponential backoff and moved to a
+dead-letter stream/table after ``webhook_job_max_attempts``.  Delivery is
+at-least-once, so the handler records finished jobs (see
+``completed_job_key``) and skips them when they are delivered again.
+"""
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from bots.shared.config import settings
+from bots.shared.logger import get_logger
+from bots.shared.redis_connection import contact_tag
+
+logger = get_logger(__name__)
+
+# How long a finished job is remembered, so a redelivery after a crash or a
+# failed ack doesn't run the bot (and send the SMS) again
+COMPLETED_JOB_TTL_SECONDS = 86400
+
+
+@dataclass
+class WebhookJob:
+    """A verified, deduplicated inbound message waiting for a bot."""
+
+    contact_id: str
+    location_id: str
+    message: str
+    bot_type: str = ""
+    contact_info: Dict[str, Optional[str]] = field(default_factory=dict)
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    enqueued_at: float = field(default_factory=time.time)
+    attempts: int = 0
+    coalesce_position: int = 0  # position in the contact's coalescing buffer (0 = not buffered)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: str) -> "WebhookJob":
+        return cls(**json.loads(data))
+
+
+def completed_job_key(job: WebhookJob) -> str:
+    """Cache key recording that ``job`` was handled (its reply already sent)."""
+    return f"webhook_job_done:{contact_tag(job.contact_id)}:{job.job_id}"
+
+
+class AbstractJobQueue(ABC):
+    """Abstract base class for webhook job queues."""
+
+    name = "abstract"
+
+    @abstractmethod
+    async def initialize(self) -> None:
+        """Create streams/tables and recover jobs orphaned by a crash."""
+        pass
+
+    @abstractmethod
+    async def enqueue(self, job: WebhookJob) -> str:
+        """Durably append a job. Returns the queue entry id."""
+        pass
+
+    @abstractmethod
+    async def read(self, count: int, block_ms: int) -> List[Tuple[str, WebhookJob]]:
+        """Claim up to ``count`` jobs, waiting up to ``block_ms`` for new ones."""
+        pass
+
+    @abstractmethod
+    async def ack(self, entry_id: str) -> None:
+        """Mark a job as done."""
+        pass
+
+    @abstractmethod
+    async def dead_letter(self, entry_id: str, job: WebhookJob, error: str) -> None:
+        """Move a job that exhausted its retries to the dead-letter store."""
+        pass
+
+    @abstractmethod
+    async def pending(self) -> int:
+        """Number of jobs enqueued or in flight but not yet acked."""
+        pass
+
+    async def reclaim(self) -> int:
+        """Take over jobs claimed by consumers that died; returns how many."""
+        return 0
+
+    async def close(self) -> None:
+        """Release connections."""
+        pass
+
+
+class RedisStreamQueue(AbstractJobQueue):
+    """Redis Streams queue with a consumer group and a dead-letter stream."""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        redis_url: str,
+        stream: str = "webhook:jobs",
+        group: str = "webhook-workers",
+        max_length: int = 100_000,
+        claim_idle_ms: int = 60_000,
+    ):
+        from bots.shared.redis_connection import create_redis_client
+
+        self.redis = create_redis_client(redis_url, decode_responses=True)
+        self.stream = stream
+        self.dead_stream = f"{stream}:dead"
+        self.group = group
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.max_length = max_length
+        self.claim_idle_ms = claim_idle_ms
+        self._reclaimed: List[Tuple[str, WebhookJob]] = []
+
+    async def initialize(self) -> None:
+        from redis.exceptions import ResponseError
+
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        await self.reclaim()
+
+    async def reclaim(self) -> int:
+        # Take over entries delivered to consumers that died before acking
+        response = await self.redis.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=100,
+        )
+        queued = {entry_id for entry_id, _ in self._reclaimed}
+        claimed = [entry for entry in self._decode(response[1]) if entry[0] not in queued]
+        self._reclaimed.extend(claimed)
+        if claimed:
+            logger.warning(f"Reclaimed {len(claimed)} unacked webhook jobs")
+        return len(claimed)
+
+    async def enqueue(self, job: WebhookJob) -> str:
+        return await self.redis.xadd(
+            self.stream, {"job": job.to_json()}, maxlen=self.max_length, approximate=True
+        )
+
+    async def read(self, count: int, block_ms: int) -> List[Tuple[str, WebhookJob]]:
+        if self._reclaimed:
+            reclaimed, self._reclaimed = self._reclaimed[:count], self._reclaimed[count:]
+            return reclaimed
+
+        response = await self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"}, count=count, block=block_ms
+        )
+        entries: List[Tuple[str, WebhookJob]] = []
+        for _, messages in response or []:
+            entries.extend(self._decode(messages))
+        return entries
+
+    async def ack(self, entry_id: str) -> None:
+        await self.redis.xack(self.stream, self.group, entry_id)
+
+    async def dead_letter(self, entry_id: str, job: WebhookJob, error: str) -> None:
+        await self.redis.xadd(
+            self.dead_stream,
+            {"job": job.to_json(), "error": error[:500], "entry_id": entry_id},
+            maxlen=self.max_length,
+            approximate=True,
+        )
+        await self.ack(entry_id)
+
+    async def pending(self) -> int:
+        info = await self.redis.xpending(self.stream, self.group)
+        return int(info.get("pending", 0)) + len(self._reclaimed)
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+    def _decode(self, messages) -> List[Tuple[str, WebhookJob]]:
+        entries = []
+        for entry_id, fields in messages:
+            try:
+                entries.append((entry_id, WebhookJob.from_json(fields["job"])))
+            except Exception as e:
+                logger.error(f"Dropping malformed webhook job {entry_id}: {e}")
+        return entries
+
+
+class SQLiteJobQueue(AbstractJobQueue):
+    """
+    Single-node stand-in for Redis Streams.
+
+    ``path=":memory:"`` keeps jobs in-process only; a file path survives
+    restarts.  SQLite calls run in a thread so they never block the loop.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db_lock = threading.Lock()
+        self._new_job = asyncio.Event()
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _claim(self, count: int) -> List[tuple]:
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT id, job FROM webhook_jobs WHERE status = 'pending' ORDER BY id LIMIT ?",
+                (count,),
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE webhook_jobs SET status = 'processing', updated_at = ? WHERE id = ?",
+                    [(time.time(), row[0]) for row in rows],
+                )
+            return rows
+
+    async def initialize(self) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "CREATE TABLE IF NOT EXISTS webhook_jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, job TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', updated_at REAL)",
+        )
+        await asyncio.to_thread(
+            self._execute,
+            "CREATE TABLE IF NOT EXISTS webhook_dead_letters ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, job TEXT NOT NULL, "
+            "error TEXT, failed_at REAL)",
+        )
+        # Jobs that were mid-flight when the process stopped
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE webhook_jobs SET status = 'pending' WHERE status = 'processing'",
+        )
+
+    async def enqueue(self, job: WebhookJob) -> str:
+        def _insert() -> str:
+            with self._db_lock:
+                cursor = self._conn.execute(
+                    "INSERT INTO webhook_jobs (job, updated_at) VALUES (?, ?)",
+                    (job.to_json(), time.time()),
+                )
+                return str(cursor.lastrowid)
+
+        entry_id = await asyncio.to_thread(_insert)
+        self._new_job.set()
+        return entry_id
+
+    async def read(self, count: int, block_ms: int) -> List[Tuple[str, WebhookJob]]:
+        deadline = time.monotonic() + block_ms / 1000
+        while True:
+            self._new_job.clear()
+            rows = await asyncio.to_thread(self._claim, count)
+            if rows:
+                return [(str(row_id), WebhookJob.from_json(data)) for row_id, data in rows]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            try:
+                await asyncio.wait_for(self._new_job.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return []
+
+    async def ack(self, entry_id: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM webhook_jobs WHERE id = ?", (int(entry_id),))
+
+    async def dead_letter(self, entry_id: str, job: WebhookJob, error: str) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO webhook_dead_letters (job, error, failed_at) VALUES (?, ?, ?)",
+            (job.to_json(), error[:500], time.time()),
+        )
+        await self.ack(entry_id)
+
+    async def pending(self) -> int:
+        rows = await asyncio.to_thread(self._execute, "SELECT COUNT(*) FROM webhook_jobs")
+        return int(rows[0][0])
+
+    async def dead_letters(self) -> List[Dict[str, Any]]:
+        """Dead-lettered jobs, oldest first (for inspection/replay)."""
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT job, error, failed_at FROM webhook_dead_letters ORDER BY id"
+        )
+        return [{"job": WebhookJob.from_json(j), "error": e, "failed_at": t} for j, e, t in rows]
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._conn.close)
+
+
+async def create_webhook_queue() -> AbstractJobQueue:
+    """Build and initialise the configured queue, falling back to SQLite."""
+    if settings.webhook_queue_backend == "redis" and settings.redis_url:
+        try:
+            queue = RedisStreamQueue(settings.redis_url)
+            await queue.initialize()
+            logger.info("Webhook job queue: Redis Streams")
+            return queue
+        except Exception as e:
+            logger.warning(f"Redis Streams unavailable for webhook queue, using SQLite: {e}")
+
+    queue = SQLiteJobQueue(settings.webhook_queue_sqlite_path)
+    await queue.initialize()
+    logger.info(f"Webhook job queue: SQLite ({settings.webhook_queue_sqlite_path})")
+    return queue
+
+
+class WebhookWorkerPool:
+    """
+    Consumes a job queue with a fixed number of workers.
+
+    A single reader claims jobs and routes each one to a worker chosen by
+    contact id, so one contact's jobs never run concurrently or out of order.
+    It also reclaims jobs stranded by dead consumers every
+    ``reclaim_interval_seconds``.
+    """
+
+    def __init__(
+        self,
+        queue: AbstractJobQueue,
+        handler: Callable[[WebhookJob], Awaitable[Any]],
+        workers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff_seconds: Optional[float] = None,
+        reclaim_interval_seconds: Optional[float] = None,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers or settings.webhook_workers
+        self.max_attempts = max_attempts or settings.webhook_job_max_attempts
+        self.retry_backoff_seconds = (
+            retry_backoff_seconds
+            if retry_backoff_seconds is not None
+            else settings.webhook_job_retry_backoff_seconds
+        )
+        self.reclaim_interval_seconds = (
+            reclaim_interval_seconds
+            if reclaim_interval_seconds is not None
+            else settings.webhook_queue_reclaim_interval_seconds
+        )
+        self._partitions: List[asyncio.Queue] = []
+        self._active: Set[str] = set()  # entry ids handed to a worker and not finished
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+        # Metrics
+        self.processed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.in_flight = 0
+        self.reclaimed = 0
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._partitions = [asyncio.Queue(maxsize=16) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._worker(p)) for p in self._partitions]
+        self._tasks.append(asyncio.create_task(self._reader()))
+        logger.info(f"Webhook worker pool started ({self.workers} workers, {self.queue.name} queue)")
+
+    async def stop(self) -> None:
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Webhook worker pool stopped")
+
+    def partition_for(self, contact_id: str) -> int:
+        return zlib.crc32(contact_id.encode("utf-8")) % self.workers
+
+    async def _reader(self) -> None:
+        next_reclaim = time.monotonic() + self.reclaim_interval_seconds
+        while self._running:
+            if time.monotonic() >= next_reclaim:
+                next_reclaim = time.monotonic() + self.reclaim_interval_seconds
+                try:
+                    self.reclaimed += await self.queue.reclaim()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Webhook queue reclaim failed: {e}")
+            try:
+                entries = await self.queue.read(count=self.workers * 4, block_ms=1000)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook queue read failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            for entry_id, job in entries:
+                if entry_id in self._active:
+                    continue  # our own slow job, reclaimed while still running
+                self._active.add(entry_id)
+                await self._partitions[self.partition_for(job.contact_id)].put((entry_id, job))
+
+    async def _worker(self, partition: asyncio.Queue) -> None:
+        while True:
+            entry_id, job = await partition.get()
+            self.in_flight += 1
+            try:
+                await self._run(entry_id, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook job {job.job_id} bookkeeping failed: {e}")
+            finally:
+                self.in_flight -= 1
+                self._active.discard(entry_id)
+                partition.task_done()
+
+    async def _run(self, entry_id: str, job: WebhookJob) -> None:
+        error = ""
+        while job.attempts < self.max_attempts:
+            job.attempts += 1
+            try:
+                await self.handler(job)
+                await self.queue.ack(entry_id)
+                self.processed += 1
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                logger.warning(
+                    f"Webhook job {job.job_id} for contact={job.contact_id} failed "
+                    f"(attempt {job.attempts}/{self.max_attempts}): {error}"
+                )
+                if job.attempts < self.max_attempts:
+                    self.retried += 1
+                    await asyncio.sleep(self.retry_backoff_seconds * 2 ** (job.attempts - 1))
+
+        await self.queue.dead_letter(entry_id, job, error)
+        self.dead_lettered += 1
+        logger.error(f"Webhook job {job.job_id} dead-lettered for contact={job.contact_id}: {error}")
+
+    async def drain(self) -> None:
+        """Wait until every job handed to a worker has finished (tests/shutdown)."""
+        for partition in self._partitions:
+            await partition.join()
+
+    async def get_metrics(self) -> Dict[str, Any]:
+        try:
+            pending = await self.queue.pending()
+        except Exception as e:
+            logger.error(f"Webhook queue pending count failed: {e}")
+            pending = -1
+        return {
+            "backend": self.queue.name,
+            "workers": self.workers,
+            "pending": pending,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "reclaimed": self.reclaimed,
+        }
@@ -0,0 +1,210 @@
+"""
+GHL webhook signature verification.
+
+Keys are parsed once and cached; the cache is rebuilt only when the
+configured key material changes, so rotating a key via settings takes
+effect without a restart.  Several keys can be active at once:
+
+- RSA: ``GHL_WEBHOOK_PUBLIC_KEY`` may contain multiple PEM blocks
+  (new + old key during a rotation).  The key that verified last is tried
+  first.
+- HMAC: ``GHL_WEBHOOK_SECRET`` plus an optional
+  ``GHL_WEBHOOK_PREVIOUS_SECRET``.  The digest is computed once per secret
+  and compared in both hex and base64 form.
+
+RSA verification is CPU-bound (~0.1-0.5 ms per call); large payloads, or
+bursts above ``webhook_verify_offload_per_second``, are verified in a small
+thread pool so the event loop keeps serving requests.
+"""
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from bots.shared.config import settings
+from bots.shared.latency_histogram import LatencyHistogram
+from bots.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+_PEM_BLOCK = re.compile(
+    r"-----BEGIN PUBLIC KEY-----.+?-----END PUBLIC KEY-----", re.DOTALL
+)
+
+
+class WebhookSignatureVerifier:
+    """Verifies GHL webhook signatures against a cached keyring."""
+
+    def __init__(
+        self,
+        offload_bytes: Optional[int] = None,
+        offload_per_second: Optional[int] = None,
+        threads: Optional[int] = None,
+    ):
+        self.offload_bytes = offload_bytes or settings.webhook_verify_offload_bytes
+        self.offload_per_second = offload_per_second or settings.webhook_verify_offload_per_second
+        self.threads = threads or settings.webhook_verify_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self._keyring_source: Optional[Tuple[Any, ...]] = None
+        self._public_keys: List[Any] = []
+        self._secrets: List[bytes] = []
+
+        # Verifications started in the current one-second window
+        self._window_start = 0.0
+        self._window_count = 0
+
+        # Metrics
+        self.latency = LatencyHistogram("webhook_signature_verify")
+        self.accepted = 0
+        self.rejected = 0
+        self.offloaded = 0
+        self.key_reloads = 0
+
+    # ---- keyring ---------------------------------------------------------
+
+    def _refresh_keyring(self) -> None:
+        """Re-parse keys only when the configured key material changed."""
+        source = (
+            settings.ghl_webhook_public_key,
+            settings.ghl_webhook_secret,
+            getattr(settings, "ghl_webhook_previous_secret", None),
+        )
+        if source == self._keyring_source:
+            return
+
+        public_pem, secret, previous_secret = source
+        public_keys = []
+        if public_pem:
+            from cryptography.hazmat.primitives import serialization
+
+            blocks = _PEM_BLOCK.findall(public_pem) or [public_pem]
+            for block in blocks:
+                try:
+                    public_keys.append(serialization.load_pem_public_key(block.encode()))
+                except Exception as e:
+                    logger.error(f"Ignoring unparseable GHL webhook public key: {e}")
+
+        self._public_keys = public_keys
+        self._secrets = [s.encode() for s in (secret, previous_secret) if s]
+        self._keyring_source = source
+        self.key_reloads += 1
+        logger.info(
+            f"Webhook keyring loaded: {len(self._public_keys)} public key(s), "
+            f"{len(self._secrets)} HMAC secret(s)"
+        )
+
+    # ---- verification ----------------------------------------------------
+
+    def _verify_rsa(self, payload: bytes, signature: bytes) -> bool:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        keys = self._public_keys
+        for index, key in enumerate(keys):
+            try:
+                key.verify(signature, payload, padding.PKCS1v15(), hashes.SHA256())
+            except (InvalidSignature, ValueError, TypeError):
+                continue
+            if index:
+                # Keep the key that is actually in use at the front
+                self._public_keys = [key] + [k for k in keys if k is not key]
+            return True
+        return False
+
+    def _verify_hmac(self, payload: bytes, signature: str) -> bool:
+        sig = signature.strip().replace("sha256=", "")
+        for secret in self._secrets:
+            digest = hmac.new(secret, payload, hashlib.sha256).digest()
+            if hmac.compare_digest(digest.hex(), sig):
+                return True
+            # GHL may also send the base64 form
+            if hmac.compare_digest(base64.b64encode(digest).decode(), sig):
+                return True
+        return False
+
+    def _should_offload(self, payload: bytes) -> bool:
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._window_start = now
+            self._window_count = 0
+        self._window_count += 1
+        return len(payload) >= self.offload_bytes or self._window_count > self.offload_per_second
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.threads, thread_name_prefix="webhook-verify"
+            )
+        return self._executor
+
+    def _record(self, ok: bool, start: float) -> bool:
+        self.latency.observe((time.perf_counter() - start) * 1000)
+        if ok:
+            self.accepted += 1
+        else:
+            self.rejected += 1
+        return ok
+
+    def verify_sync(self, payload: bytes, signature: Optional[str]) -> bool:
+        """Verify on the calling thread."""
+        start = time.perf_counter()
+        self._refresh_keyring()
+
+        if self._public_keys or settings.ghl_webhook_public_key:
+            raw = self._decode_rsa_signature(signature)
+            return self._record(raw is not None and self._verify_rsa(payload, raw), start)
+
+        if self._secrets:
+            return self._record(bool(signature) and self._verify_hmac(payload, signature), start)
+
+        # No signature config set -- allow all requests (pass-through mode)
+        logger.debug("Webhook signature verification skipped: no secret configured")
+        return True
+
+    async def verify(self, payload: bytes, signature: Optional[str]) -> bool:
+        """Verify a webhook, moving RSA work off the event loop when it would block it."""
+        self._refresh_keyring()
+        if not self._public_keys or not self._should_offload(payload):
+            return self.verify_sync(payload, signature)
+
+        self.offloaded += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.verify_sync, payload, signature)
+
+    @staticmethod
+    def _decode_rsa_signature(signature: Optional[str]) -> Optional[bytes]:
+        if not signature:
+            return None
+        try:
+            return base64.b64decode(signature.strip())
+        except (binascii.Error, ValueError) as e:
+            logger.warning(f"Webhook signature verification failed: {e}")
+            return None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Verification latency histogram and outcome counters."""
+        return {
+            "latency_ms": self.latency.snapshot(),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "offloaded": self.offloaded,
+            "key_reloads": self.key_reloads,
+            "public_keys": len(self._public_keys),
+            "hmac_secrets": len(self._secrets),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global verifier (keeps the parsed keyring and thread pool)
+signature_verifier = WebhookSignatureVerifier()
@@ -0,0 +1,71 @@
+"""
+Cache Key-Space Component for Jorge Real Estate AI Dashboard.
+
+Shows which cache key families dominate traffic, misses and memory:
+per-prefix counters from every bot worker and a sampled key-space profile.
+"""
+from typing import Any, Dict, List
+
+import pandas as pd
+import streamlit as st
+
+
+def _traffic_rows(families: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    rows = []
+    for prefix, stats in families.items():
+        latency = stats.get("latency_ms", {})
+        rows.append({
+            "Prefix": prefix,
+            "Hits": stats["hits"],
+            "Misses": stats["misses"],
+            "Hit Rate %": stats["hit_rate"],
+            "Sets": stats["sets"],
+            "Avg Value (B)": stats["avg_value_bytes"],
+            "Bytes Written": stats["bytes_written"],
+            "Get P95 (ms)": latency.get("get", {}).get("p95"),
+            "Set P95 (ms)": latency.get("set", {}).get("p95"),
+        })
+    return sorted(rows, key=lambda r: r["Hits"] + r["Misses"] + r["Sets"], reverse=True)
+
+
+def _keyspace_rows(profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "Prefix": prefix,
+            "Est. Keys": stats["estimated_keys"],
+            "Est. Bytes": stats["estimated_bytes"],
+            "Avg (B)": stats["avg_bytes"],
+            "P95 (B)": stats["p95_bytes"],
+            "TTL": ", ".join(f"{label}: {count}" for label, count in stats["ttl"].items()),
+        }
+        for prefix, stats in profile["families"].items()
+    ]
+
+
+def render_cache_key_stats(data: Dict[str, Any]) -> None:
+    """
+    Render per-prefix cache traffic and key-space tables.
+
+    Args:
+        data: Result of DashboardDataService.get_cache_key_stats()
+    """
+    st.subheader("Cache Key Space")
+
+    key_stats = data.get("key_stats")
+    if not key_stats:
+        st.info("Cache key stats are disabled or unavailable.")
+    else:
+        st.caption(f"Traffic since worker start, {len(key_stats['workers'])} worker(s) reporting")
+        rows = _traffic_rows(key_stats["families"])
+        if rows:
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+    for name, profile in (data.get("keyspace") or {}).items():
+        if not profile:
+            st.warning(f"Could not sample the {name} cache backend.")
+            continue
+        st.caption(
+            f"{name.title()} backend ({profile['backend']}): {profile['total_keys']:,} keys, "
+            f"{profile['sampled']} sampled in {profile['elapsed_ms']}ms"
+        )
+        st.dataframe(pd.DataFrame(_keyspace_rows(profile)), hide_index=True, use_container_width=True)
@@ -23,6 +23,7 @@ from command_center.components.auth_component import (
     render_user_menu,
     require_permission,
 )
+from command_center.components.cache_key_stats import render_cache_key_stats
 from command_center.components.commission_tracking import CommissionTrackingComponent
 from command_center.components.export_manager import ExportManager
 from command_center.components.field_access_dashboard import create_field_access_dashboard, get_sample_sync_queue
@@ -136,7 +137,7 @@ def render_pipeline(location_id: str) -> None:
 
 def render_analytics(location_id: str) -> None:
     st.subheader("Analytics")
-    tab1, tab2, tab3 = st.tabs(["⚡ Performance", "💰 Commission", "🧠 Lead Intelligence"])
+    tab1, tab2, tab3, tab4 = st.tabs(["⚡ Performance", "💰 Commission", "🧠 Lead Intelligence", "🗄️ Cache"])
 
     with tab1:
         PerformanceAnalyticsComponent().render()
@@ -148,6 +149,9 @@ def render_analytics(location_id: str) -> None:
         lead_location = location_id or "default"
         LeadIntelligenceDashboard().render_lead_intelligence_section(lead_location)
 
+    with tab4:
+        render_cache_key_stats(asyncio.run(DashboardDataService().get_cache_key_stats()))
+
 
 def render_integrations(location_id: str) -> None:
     st.subheader("Integrations")
@@ -50,7 +50,8 @@ _LEAD_PORT = os.environ.get("PORT", "8001")
 SERVICES = [
     {
         "name": "Lead Bot",
-        "command": ["python", "-m", "uvicorn", "bots.lead_bot.main:app", "--host", "0.0.0.0", "--port", _LEAD_PORT],
+        "command": ["python", "-m", "uvicorn", "bots.lead_bot.main:app", "--host", "0.0.0.0", "--port", _LEAD_PORT,
+                    "--workers", os.environ.get("LEAD_BOT_WORKERS", "1")],
         "port": int(_LEAD_PORT),
         "health_url": f"http://localhost:{_LEAD_PORT}/health",
         "enabled": True
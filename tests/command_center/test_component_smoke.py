@@ -158,3 +158,25 @@ def test_hero_metrics_ui_render_smoke(monkeypatch):
         component.render_hero_metrics_section("loc_1")
         assert cards.called
         assert actions.called
+
+
+def test_cache_key_stats_render_smoke(monkeypatch):
+    module = import_component(monkeypatch, "command_center.components.cache_key_stats")
+    families = {
+        "seller:state:": {
+            "hits": 3, "misses": 1, "hit_rate": 75.0, "sets": 2, "deletes": 0,
+            "avg_value_bytes": 900, "bytes_written": 1800,
+            "latency_ms": {"get": {"count": 4, "p50": 0.5, "p95": 1, "p99": 1}},
+        },
+    }
+    profile = {
+        "backend": "MemoryCache", "total_keys": 10, "sampled": 10, "elapsed_ms": 0.2,
+        "families": {"seller:state:": {
+            "sampled": 10, "estimated_keys": 10, "estimated_bytes": 9000,
+            "avg_bytes": 900, "p95_bytes": 950, "max_bytes": 990, "ttl": {"<1d": 10},
+        }},
+    }
+    module.render_cache_key_stats({
+        "key_stats": {"workers": ["w1"], "families": families},
+        "keyspace": {"primary": profile, "memory": None},
+    })
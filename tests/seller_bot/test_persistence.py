@@ -20,6 +20,7 @@ def mock_cache_service():
     cache.get = AsyncMock(return_value=None)
     cache.set = AsyncMock(return_value=True)
     cache.delete = AsyncMock(return_value=True)
+    cache.get_many = AsyncMock(return_value={})
     return cache
 
 
@@ -272,3 +273,22 @@ class TestSellerBotPersistence:
         contact_ids = {conv.contact_id for conv in conversations}
         assert contact_ids == {"contact_1", "contact_3"}
         assert "contact_2" not in contact_ids
+
+    @pytest.mark.asyncio
+    async def test_get_all_active_conversations_batches_cache_reads(self, seller_bot_service, mock_cache_service):
+        """Cached states come from one get_many per chunk; only misses use the single-contact path."""
+        mock_cache_service.smembers = AsyncMock(return_value={"contact_1", "contact_2", "contact_3"})
+        mock_cache_service.get_many = AsyncMock(return_value={
+            f"seller:state:{cid}": {"contact_id": cid, "location_id": "loc", "stage": "Q1"}
+            for cid in ("contact_1", "contact_3")
+        })
+        mock_cache_service.srem = AsyncMock(return_value=1)
+        seller_bot_service.get_conversation_state = AsyncMock(return_value=None)
+
+        with patch("bots.seller_bot.jorge_seller_bot.settings.cache_batch_size", 2):
+            conversations = await seller_bot_service.get_all_active_conversations()
+
+        assert {conv.contact_id for conv in conversations} == {"contact_1", "contact_3"}
+        assert mock_cache_service.get_many.await_count == 2
+        seller_bot_service.get_conversation_state.assert_awaited_once_with("contact_2")
+        mock_cache_service.srem.assert_awaited_once_with("seller:active_contacts", "contact_2")
@@ -149,9 +149,9 @@ async def test_cold_seller_gets_no_scheduling(bot):
 async def test_slot_reply_books_appointment(bot, mock_ghl):
     state = _hot_state()
     state.scheduling_offered = True
-    bot.calendar_service._pending_slots["contact-1"] = [
+    await bot.calendar_service._store_pending_slots("contact-1", [
         {"start": "2026-03-01T17:00:00Z", "end": "2026-03-01T17:30:00Z"},
-    ]
+    ])
 
     with (
         patch.object(bot, "_get_or_create_state", AsyncMock(return_value=state)),
@@ -168,9 +168,9 @@ async def test_slot_reply_books_appointment(bot, mock_ghl):
 async def test_booking_failure_gives_retry_message(bot, mock_ghl):
     state = _hot_state()
     state.scheduling_offered = True
-    bot.calendar_service._pending_slots["contact-1"] = [
+    await bot.calendar_service._store_pending_slots("contact-1", [
         {"start": "2026-03-01T17:00:00Z", "end": "2026-03-01T17:30:00Z"},
-    ]
+    ])
     mock_ghl.create_appointment = AsyncMock(
         return_value={"success": False, "error": "unavailable"}
     )
@@ -0,0 +1,55 @@
+"""Tests for get_many/set_many/delete_many across cache backends."""
+
+from __future__ import annotations
+
+import pytest
+
+from bots.shared.cache_service import CacheService, MemoryCache, cache_get_many
+
+
+class FailingBackend:
+    async def get_many(self, keys):
+        raise ConnectionError("redis down")
+
+    async def set_many(self, items, ttl=300):
+        return False
+
+
+def _service(backend) -> CacheService:
+    service = object.__new__(CacheService)
+    service.backend = backend
+    service.fallback_backend = MemoryCache()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_batch_round_trip() -> None:
+    cache = MemoryCache()
+
+    assert await cache.set_many({"a": 1, "b": {"stage": "Q2"}}, ttl=60)
+    assert await cache.get_many(["a", "b", "missing"]) == {"a": 1, "b": {"stage": "Q2"}}
+    assert await cache.delete_many(["a", "missing"]) == 1
+    assert await cache.get_many(["a", "b"]) == {"b": {"stage": "Q2"}}
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_are_mirrored_and_read_back_when_primary_fails() -> None:
+    service = _service(FailingBackend())
+
+    await service.set_many({"seller:state:c1": {"stage": "Q1"}}, ttl=60)
+
+    assert await service.get_many(["seller:state:c1", "seller:state:c2"]) == {
+        "seller:state:c1": {"stage": "Q1"}
+    }
+
+
+@pytest.mark.asyncio
+async def test_cache_get_many_falls_back_to_single_gets() -> None:
+    class GetOnly:
+        def __init__(self):
+            self.data = {"k1": "v1"}
+
+        async def get(self, key):
+            return self.data.get(key)
+
+    assert await cache_get_many(GetOnly(), ["k1", "k2"]) == {"k1": "v1"}
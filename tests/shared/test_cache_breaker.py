@@ -0,0 +1,151 @@
+"""Redis circuit breaker in CacheService: fail fast to memory, replay on recovery."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bots.shared.cache_breaker import CacheCircuitBreaker
+from bots.shared.cache_service import CacheService, MemoryCache
+
+STATE_KEY = "seller:state:c1"
+
+
+class FlakyRedis:
+    """A MemoryCache stand-in for Redis that can be taken down."""
+
+    def __init__(self) -> None:
+        self.inner = MemoryCache()
+        self.calls = 0
+        self.down = False
+
+    def __getattr__(self, name):
+        op = getattr(self.inner, name)
+
+        async def call(*args, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(0)
+            if self.down:
+                raise ConnectionError("redis down")
+            return await op(*args, **kwargs)
+
+        return call
+
+
+def _service(redis: FlakyRedis) -> CacheService:
+    service = object.__new__(CacheService)
+    service.backend = redis
+    service.fallback_backend = MemoryCache()
+    service.breaker = CacheCircuitBreaker(
+        failure_threshold=3,
+        probe_interval_seconds=0.01,
+        replay_prefixes=("seller:state:", "assigned_bot:"),
+        replay_max_keys=100,
+    )
+    return service
+
+
+async def _wait_closed(service: CacheService) -> None:
+    for _ in range(100):
+        if not service.breaker.is_open:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("breaker did not close")
+
+
+@pytest.fixture
+async def outage():
+    redis = FlakyRedis()
+    service = _service(redis)
+    yield redis, service
+    await service.stop_circuit_breaker()
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_consecutive_failures_and_skips_redis(outage) -> None:
+    redis, service = outage
+    service.breaker.probe_interval_seconds = 60
+    await service.set("k", "v")
+    redis.down = True
+
+    for _ in range(3):
+        assert await service.get("k") == "v"
+    assert service.breaker.is_open
+
+    calls = redis.calls
+    for _ in range(20):
+        assert await service.get("k") == "v"
+        await service.set("other", 1)
+    assert redis.calls == calls
+
+
+@pytest.mark.asyncio
+async def test_hot_key_writes_during_outage_are_replayed(outage) -> None:
+    redis, service = outage
+    await service.set(STATE_KEY, {"current_question": 1}, ttl=3600)
+    await service.set("assigned_bot:c2", "buyer", ttl=3600)
+    redis.down = True
+    for _ in range(3):
+        await service.get("anything")
+
+    await service.set(STATE_KEY, {"current_question": 2}, ttl=3600)
+    await service.delete("assigned_bot:c2")
+    await service.set("dashboard:complete_data", {"status": "success"}, ttl=30)
+
+    redis.down = False
+    await _wait_closed(service)
+
+    assert await redis.inner.get(STATE_KEY) == {"current_question": 2}
+    assert await redis.inner.get("assigned_bot:c2") is None
+    assert await redis.inner.get("dashboard:complete_data") is None  # not a replay prefix
+    assert service.circuit_breaker_stats()["replayed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_replay_keeps_the_journal(outage) -> None:
+    redis, service = outage
+    redis.down = True
+    for _ in range(3):
+        await service.get("anything")
+    await service.set(STATE_KEY, {"current_question": 3}, ttl=3600)
+
+    original_set = redis.inner.set
+    attempts = []
+
+    async def fail_once(key, value, ttl=300):
+        attempts.append(key)
+        if len(attempts) == 1:
+            raise ConnectionError("dropped during replay")
+        return await original_set(key, value, ttl)
+
+    redis.inner.set = fail_once
+    redis.down = False
+    await _wait_closed(service)
+
+    assert attempts == [STATE_KEY, STATE_KEY]
+    assert await redis.inner.get(STATE_KEY) == {"current_question": 3}
+
+
+@pytest.mark.asyncio
+async def test_successes_reset_the_failure_count(outage) -> None:
+    redis, service = outage
+    for _ in range(5):
+        redis.down = True
+        await service.get("k")
+        await service.get("k")
+        redis.down = False
+        await service.get("k")
+
+    assert not service.breaker.is_open
+
+
+@pytest.mark.asyncio
+async def test_set_operations_fall_back_when_redis_is_down(outage) -> None:
+    redis, service = outage
+    redis.down = True
+
+    assert await service.sadd("seller:active_contacts", "c1", "c2") == 2
+    assert await service.smembers("seller:active_contacts") == {"c1", "c2"}
+    assert await service.srem("seller:active_contacts", "c1") == 1
+    assert await service.increment("counter", 5) == 5
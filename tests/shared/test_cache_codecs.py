@@ -0,0 +1,94 @@
+"""Tests for tagged cache value codecs."""
+
+from __future__ import annotations
+
+import pickle
+from datetime import datetime
+
+import pytest
+
+from bots.shared.cache_codecs import (
+    ORJSON_CODEC,
+    PICKLE_CODEC,
+    ZLIB_COMPRESSION,
+    ValueSerializer,
+)
+
+STATE = {
+    "contact_id": "c1",
+    "current_question": 2,
+    "is_qualified": False,
+    "price_expectation": 650000.0,
+    "conversation_history": [{"role": "user", "content": "I want to sell"}] * 20,
+    "extracted_data": {"condition": "move-in ready"},
+    "last_interaction": "2026-03-01T17:00:00",
+}
+
+
+def test_orjson_round_trip_is_tagged() -> None:
+    serializer = ValueSerializer(codec="orjson", compression="none")
+
+    data = serializer.dumps(STATE)
+
+    assert data[0] == ORJSON_CODEC
+    assert serializer.loads(data) == STATE
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"contacts": {"c1", "c2"}},
+        {0: 1, 1: 5},  # int keys, e.g. handoffs_by_hour
+        {"at": datetime(2026, 3, 1, 17, 0)},
+    ],
+)
+def test_values_json_cannot_represent_fall_back_to_pickle(value) -> None:
+    serializer = ValueSerializer(codec="orjson", compression="none")
+
+    data = serializer.dumps(value)
+
+    assert data[0] == PICKLE_CODEC
+    assert serializer.loads(data) == value
+
+
+def test_legacy_bare_pickles_are_still_readable() -> None:
+    serializer = ValueSerializer(codec="orjson")
+
+    assert serializer.loads(pickle.dumps(STATE)) == STATE
+
+
+def test_mixed_codecs_decode_during_migration() -> None:
+    old = ValueSerializer(codec="pickle", compression="none")
+    new = ValueSerializer(codec="orjson", compression="none")
+
+    assert new.loads(old.dumps(STATE)) == STATE
+    assert old.loads(new.dumps(STATE)) == STATE
+
+
+def test_compression_only_above_threshold() -> None:
+    serializer = ValueSerializer(codec="orjson", compression="zlib", compress_min_bytes=512)
+
+    small = serializer.dumps({"stage": "Q1"})
+    large = serializer.dumps(STATE)
+
+    assert small[0] >> 4 == 0
+    assert large[0] >> 4 == ZLIB_COMPRESSION
+    assert len(large) < len(ValueSerializer(codec="orjson", compression="none").dumps(STATE))
+    assert serializer.loads(large) == STATE
+
+
+def test_missing_optional_codec_falls_back_to_pickle(monkeypatch) -> None:
+    import builtins
+
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name == "msgpack":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    serializer = ValueSerializer(codec="msgpack", compression="none")
+
+    assert serializer.name == "pickle"
+    assert serializer.loads(serializer.dumps(STATE)) == STATE
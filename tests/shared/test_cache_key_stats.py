@@ -0,0 +1,100 @@
+"""Per-prefix cache instrumentation and key-space profiling."""
+
+from __future__ import annotations
+
+import pytest
+
+from bots.shared.cache_service import CacheService, MemoryCache
+from bots.shared.cache_stats import CacheKeyStats, KeyPrefixer, profile_keyspace
+from bots.shared.sqlite_cache import SQLiteCache
+
+
+def _service(shared: MemoryCache) -> CacheService:
+    service = object.__new__(CacheService)
+    service.backend = shared
+    service.fallback_backend = MemoryCache()
+    service.key_stats = CacheKeyStats(prefixes=["seller:state:"], size_sample_every=2)
+    return service
+
+
+def test_keys_group_by_listed_prefix_then_first_segment() -> None:
+    prefixer = KeyPrefixer(["seller:state:", "seller:"], max_families=2)
+
+    assert prefixer("seller:state:c1") == "seller:state:"
+    assert prefixer("seller:active_contacts") == "seller:"
+    assert prefixer("dedup:c1:abc") == "dedup:"
+    assert prefixer("rate:webhook:default") == "rate:"
+    assert prefixer("lock:c1") == "other"  # family cap reached
+    assert prefixer("nocolon") == "other"
+
+
+@pytest.mark.asyncio
+async def test_service_counts_hits_misses_sets_and_sizes() -> None:
+    service = _service(MemoryCache())
+    state = {"current_question": 2, "history": ["x" * 200]}
+
+    await service.set("seller:state:c1", state, ttl=60)
+    await service.set("seller:state:c2", state, ttl=60)
+    await service.get("seller:state:c1")
+    await service.get("seller:state:missing")
+    await service.get_many(["seller:state:c2", "dedup:c1:h1"])
+    await service.set_many({"dedup:c1:h1": "1", "dedup:c1:h2": "1"}, ttl=60)
+    await service.delete_many(["dedup:c1:h1"])
+
+    stats = service.key_stats_summary()
+    seller = stats["seller:state:"]
+    assert (seller["hits"], seller["misses"], seller["sets"]) == (2, 1, 2)
+    assert seller["hit_rate"] == 66.7
+    assert seller["avg_value_bytes"] > 200
+    assert seller["bytes_written"] == seller["avg_value_bytes"] * 2
+    assert seller["latency_ms"]["get"]["count"] == 3  # get_many: one sample per prefix
+    dedup = stats["dedup:"]
+    assert (dedup["misses"], dedup["sets"], dedup["deletes"]) == (1, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_stats_are_summed_across_workers() -> None:
+    shared = MemoryCache()
+    a, b = _service(shared), _service(shared)
+    b.key_stats.worker_id = "other-worker"
+    await a.get("seller:state:c1")
+    await b.get("seller:state:c1")
+    await b.key_stats.publish(b)
+
+    collected = await a.collect_key_stats()
+
+    assert sorted(collected["workers"]) == sorted([a.key_stats.worker_id, "other-worker"])
+    assert collected["families"]["seller:state:"]["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_keyspace_profile_reports_sizes_and_ttls() -> None:
+    cache = MemoryCache()
+    for i in range(30):
+        await cache.set(f"seller:state:c{i}", {"history": ["x" * 100]}, ttl=3600 * 2)
+    for i in range(10):
+        await cache.set(f"dedup:c{i}:h", "1", ttl=30)
+
+    profile = await profile_keyspace(cache, sample_size=1000, prefixer=KeyPrefixer(["seller:state:"]))
+
+    assert (profile["total_keys"], profile["sampled"]) == (40, 40)
+    seller, dedup = profile["families"]["seller:state:"], profile["families"]["dedup:"]
+    assert seller["estimated_keys"] == 30 and seller["ttl"] == {"<1d": 30}
+    assert dedup["ttl"] == {"<1m": 10}
+    assert seller["avg_bytes"] > dedup["avg_bytes"]
+
+
+@pytest.mark.asyncio
+async def test_sampled_profile_extrapolates_to_the_whole_key_space(tmp_path) -> None:
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    try:
+        await cache.set_many({f"seller:state:c{i}": {"q": i} for i in range(200)}, ttl=600)
+        await cache.sadd("seller:active_contacts", *[f"c{i}" for i in range(200)])
+
+        profile = await profile_keyspace(cache, sample_size=50, prefixer=KeyPrefixer(["seller:state:"]))
+    finally:
+        cache.close()
+
+    assert (profile["total_keys"], profile["sampled"]) == (201, 50)
+    estimated = sum(f["estimated_keys"] for f in profile["families"].values())
+    assert abs(estimated - 201) <= 2
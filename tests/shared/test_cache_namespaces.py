@@ -0,0 +1,80 @@
+"""Generation-based cache namespace invalidation."""
+
+from __future__ import annotations
+
+import pytest
+
+from bots.lead_bot.routes_admin import invalidate_settings_namespaces
+from bots.shared.cache_service import CacheService, MemoryCache, PerformanceCache
+
+
+def _service(shared: MemoryCache) -> CacheService:
+    service = object.__new__(CacheService)
+    service.backend = shared
+    service.fallback_backend = MemoryCache()
+    return service
+
+
+def _performance_cache(service: CacheService) -> PerformanceCache:
+    cache = object.__new__(PerformanceCache)
+    cache.ttl_seconds = 300
+    cache.cache_service = service
+    cache.stats = {}
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_invalidating_a_namespace_hides_its_entries() -> None:
+    service = _service(MemoryCache())
+    key = await service.namespaced_key("lead_intel", "content:abc")
+    await service.set(key, {"score": 70})
+
+    assert await service.invalidate_namespace("lead_intel") == 1
+
+    new_key = await service.namespaced_key("lead_intel", "content:abc")
+    assert new_key != key
+    assert await service.get(new_key) is None
+
+
+@pytest.mark.asyncio
+async def test_generation_is_shared_by_workers() -> None:
+    shared = MemoryCache()
+    a, b = _service(shared), _service(shared)
+    cache_a, cache_b = _performance_cache(a), _performance_cache(b)
+    await cache_a.set("lead content", {"score": 80}, key_class="content")
+    assert await cache_b.get("lead content", key_class="content") == {"score": 80}
+
+    await a.invalidate_namespace("lead_intel")
+
+    assert await cache_b.get("lead content", key_class="content") is None
+
+
+@pytest.mark.asyncio
+async def test_other_namespaces_are_untouched() -> None:
+    service = _service(MemoryCache())
+    key = await service.namespaced_key("seller_classify", "q1:yes")
+    await service.set(key, "yes")
+
+    await service.invalidate_namespace("lead_intel")
+
+    assert await service.get(await service.namespaced_key("seller_classify", "q1:yes")) == "yes"
+
+
+@pytest.mark.asyncio
+async def test_prompt_fingerprint_change_invalidates_once() -> None:
+    service = _service(MemoryCache())
+
+    assert await service.ensure_namespace_fingerprint("lead_intel", "prompt-v1")
+    assert not await service.ensure_namespace_fingerprint("lead_intel", "prompt-v1")
+    assert await service.ensure_namespace_fingerprint("lead_intel", "prompt-v2")
+    assert await service.namespace_generation("lead_intel") == 2
+
+
+@pytest.mark.asyncio
+async def test_settings_update_bumps_the_bots_namespaces() -> None:
+    service = _service(MemoryCache())
+
+    await invalidate_settings_namespaces(service, "seller")
+
+    assert await service.namespace_generation("seller_classify") == 1
+    assert await service.namespace_generation("lead_intel") == 0
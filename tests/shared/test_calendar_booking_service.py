@@ -11,6 +11,7 @@ from bots.shared.calendar_booking_service import (
     FALLBACK_MESSAGE,
     CalendarBookingService,
 )
+from bots.shared.cache_service import MemoryCache
 
 
 @pytest.fixture
@@ -29,7 +30,7 @@ def service(mock_ghl_client):
     ) as mock_settings:
         mock_settings.jorge_calendar_id = "cal-abc"
         mock_settings.jorge_user_id = "user-xyz"
-        svc = CalendarBookingService(mock_ghl_client)
+        svc = CalendarBookingService(mock_ghl_client, cache=MemoryCache())
     return svc
 
 
@@ -107,7 +108,7 @@ async def test_offer_slots_caches_pending(service):
 
     await service.offer_appointment_slots("contact-1", "seller")
 
-    assert service.has_pending_slots("contact-1")
+    assert await service.has_pending_slots("contact-1")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -116,7 +117,7 @@ async def test_offer_slots_caches_pending(service):
 
 @pytest.mark.asyncio
 async def test_book_appointment_success(service):
-    service._pending_slots["contact-1"] = SAMPLE_SLOTS
+    await service._store_pending_slots("contact-1", SAMPLE_SLOTS)
     service.ghl_client.create_appointment = AsyncMock(
         return_value={"success": True, "data": {"id": "appt-99"}}
     )
@@ -127,7 +128,7 @@ async def test_book_appointment_success(service):
     assert result["appointment"] == {"id": "appt-99"}
     assert "booked" in result["message"].lower()
     # Pending slots cleared after booking
-    assert not service.has_pending_slots("contact-1")
+    assert not await service.has_pending_slots("contact-1")
 
 
 @pytest.mark.asyncio
@@ -140,7 +141,7 @@ async def test_book_appointment_no_pending_slots(service):
 
 @pytest.mark.asyncio
 async def test_book_appointment_invalid_index(service):
-    service._pending_slots["contact-1"] = SAMPLE_SLOTS
+    await service._store_pending_slots("contact-1", SAMPLE_SLOTS)
 
     result = await service.book_appointment("contact-1", 5, "seller")
 
@@ -150,7 +151,7 @@ async def test_book_appointment_invalid_index(service):
 
 @pytest.mark.asyncio
 async def test_book_appointment_api_failure(service):
-    service._pending_slots["contact-1"] = SAMPLE_SLOTS
+    await service._store_pending_slots("contact-1", SAMPLE_SLOTS)
     service.ghl_client.create_appointment = AsyncMock(
         return_value={"success": False, "error": "timeout"}
     )
@@ -163,7 +164,7 @@ async def test_book_appointment_api_failure(service):
 
 @pytest.mark.asyncio
 async def test_book_appointment_api_exception(service):
-    service._pending_slots["contact-1"] = SAMPLE_SLOTS
+    await service._store_pending_slots("contact-1", SAMPLE_SLOTS)
     service.ghl_client.create_appointment = AsyncMock(side_effect=RuntimeError("boom"))
 
     result = await service.book_appointment("contact-1", 0, "seller")
@@ -173,7 +174,7 @@ async def test_book_appointment_api_exception(service):
 
 @pytest.mark.asyncio
 async def test_book_appointment_uses_lead_type_for_title(service):
-    service._pending_slots["contact-buyer"] = SAMPLE_SLOTS
+    await service._store_pending_slots("contact-buyer", SAMPLE_SLOTS)
     captured: dict = {}
 
     async def capture(data):
@@ -241,10 +242,19 @@ def test_natural_language_slot_selection(service):
 # has_pending_slots
 # ─────────────────────────────────────────────────────────────────────────────
 
-def test_has_pending_slots_false_when_empty(service):
-    assert not service.has_pending_slots("contact-x")
+@pytest.mark.asyncio
+async def test_has_pending_slots_false_when_empty(service):
+    assert not await service.has_pending_slots("contact-x")
+
+
+@pytest.mark.asyncio
+async def test_has_pending_slots_true_after_caching(service):
+    await service._store_pending_slots("contact-x", SAMPLE_SLOTS)
+    assert await service.has_pending_slots("contact-x")
 
 
-def test_has_pending_slots_true_after_caching(service):
+@pytest.mark.asyncio
+async def test_local_slots_are_dropped_when_the_shared_copy_is_gone(service):
     service._pending_slots["contact-x"] = SAMPLE_SLOTS
-    assert service.has_pending_slots("contact-x")
+    assert not await service.has_pending_slots("contact-x")
+    assert "contact-x" not in service._pending_slots
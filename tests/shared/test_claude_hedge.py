@@ -0,0 +1,199 @@
+"""Claude call deadlines: hedging to the fallback model and per-model breakers."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from bots.shared.cache_service import MemoryCache
+from bots.shared.claude_client import ClaudeClient
+from bots.shared.claude_hedge import CLOSED, HALF_OPEN, OPEN, ClaudeDeadlineExceeded, ClaudeHedger, request_slot
+from bots.shared.claude_scheduler import ClaudeScheduler
+from bots.shared.config import settings
+from bots.shared.token_bucket import TokenBucketLimiter
+
+PRIMARY = "sonnet"
+FALLBACK = "haiku"
+
+
+def _hedger(**kwargs) -> ClaudeHedger:
+    kwargs.setdefault("hedge_delay_ms", 20)
+    kwargs.setdefault("hedge_percentile", 95)
+    kwargs.setdefault("failure_threshold", 2)
+    kwargs.setdefault("cooldown_seconds", 60)
+    return ClaudeHedger(**kwargs)
+
+
+def _server_error() -> Exception:
+    anthropic = pytest.importorskip("anthropic")
+    return anthropic.InternalServerError(
+        message="overloaded", response=MagicMock(status_code=500, headers={}), body={},
+    )
+
+
+def _call(latencies: dict, errors: dict = None, started: list = None):
+    async def call(model: str) -> str:
+        if started is not None:
+            started.append(model)
+        await asyncio.sleep(latencies.get(model, 0))
+        if errors and model in errors:
+            raise errors[model]
+        return f"answer from {model}"
+    return call
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_the_hedge_wins() -> None:
+    hedger = _hedger()
+    started: list = []
+
+    result, model = await hedger.run(
+        _call({PRIMARY: 5, FALLBACK: 0.01}, started=started), PRIMARY, FALLBACK, deadline_seconds=2,
+    )
+
+    assert (result, model) == ("answer from haiku", FALLBACK)
+    assert started == [PRIMARY, FALLBACK]
+    stats = hedger.get_stats()["models"][PRIMARY]
+    assert stats["hedges_fired"] == 1 and stats["hedges_won"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged() -> None:
+    hedger = _hedger()
+    started: list = []
+
+    result, model = await hedger.run(_call({}, started=started), PRIMARY, FALLBACK, deadline_seconds=2)
+
+    assert model == PRIMARY and started == [PRIMARY]
+    assert hedger.get_stats()["models"][PRIMARY]["hedges_fired"] == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_the_call_and_counts_timeouts() -> None:
+    hedger = _hedger()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    with pytest.raises(ClaudeDeadlineExceeded):
+        await hedger.run(_call({PRIMARY: 5, FALLBACK: 5}), PRIMARY, FALLBACK, deadline_seconds=0.1)
+
+    assert loop.time() - start < 0.5
+    stats = hedger.get_stats()["models"]
+    assert stats[PRIMARY]["timeouts"] == stats[FALLBACK]["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_hedges_at_once_and_errors_without_a_fallback() -> None:
+    hedger = _hedger(hedge_delay_ms=10_000)
+    errors = {PRIMARY: ValueError("bad request")}
+
+    _, model = await asyncio.wait_for(
+        hedger.run(_call({}, errors), PRIMARY, FALLBACK, deadline_seconds=20), timeout=1,
+    )
+    assert model == FALLBACK
+
+    with pytest.raises(ValueError):
+        await hedger.run(_call({}, errors), PRIMARY, None, deadline_seconds=20)
+    # Client errors don't count against the model
+    assert hedger.get_stats()["models"][PRIMARY]["breaker"] == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_routes_around_a_degraded_model_then_retries_it() -> None:
+    hedger = _hedger(hedge_delay_ms=10_000)
+    failing = _call({}, {PRIMARY: _server_error()})
+    for _ in range(2):
+        await hedger.run(failing, PRIMARY, FALLBACK, deadline_seconds=2)
+    assert hedger.get_stats()["models"][PRIMARY]["breaker"] == OPEN
+
+    started: list = []
+    _, model = await hedger.run(_call({}, started=started), PRIMARY, FALLBACK, deadline_seconds=2)
+    assert model == FALLBACK and started == [FALLBACK]
+    assert hedger.get_stats()["models"][PRIMARY]["rerouted"] == 1
+
+    breaker = hedger._health(PRIMARY).breaker
+    breaker.opened_at -= 60  # cooldown over: one trial goes to the primary
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    breaker.release_trial()
+    _, model = await hedger.run(_call({}), PRIMARY, FALLBACK, deadline_seconds=2)
+    assert model == PRIMARY and breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_to_a_fallback_whose_breaker_is_open() -> None:
+    hedger = _hedger()
+    fallback = hedger._health(FALLBACK).breaker
+    for _ in range(2):
+        fallback.record_failure(FALLBACK)
+    started: list = []
+
+    _, model = await hedger.run(_call({PRIMARY: 0.1}, started=started), PRIMARY, FALLBACK, deadline_seconds=2)
+
+    assert model == PRIMARY and started == [PRIMARY]
+    assert hedger.get_stats()["models"][PRIMARY]["hedges_fired"] == 0
+
+    # A half-open trial claimed for a hedge that was never sent is handed back
+    fallback.opened_at -= 60
+    await hedger.run(_call({}), PRIMARY, FALLBACK, deadline_seconds=2)
+    assert fallback.state == OPEN and fallback.allow()
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_observed_latency() -> None:
+    hedger = _hedger(hedge_delay_ms=4000)
+    assert hedger.hedge_delay(PRIMARY) == 4.0
+
+    hedger._health(PRIMARY).latencies.extend([100.0] * 19 + [900.0])
+
+    assert hedger.hedge_delay(PRIMARY) == 0.9
+    assert hedger.get_stats()["models"][PRIMARY]["latency_p50_ms"] == 100.0
+
+
+@pytest.mark.asyncio
+async def test_client_deadline_call_returns_the_hedge_models_answer() -> None:
+    client = ClaudeClient(api_key="test-key", hedger=_hedger())
+
+    async def create(**request):
+        slow = request["model"] == settings.claude_sonnet_model
+        await asyncio.sleep(5 if slow else 0)
+        response = MagicMock()
+        response.content = [MagicMock(text="from haiku")]
+        response.usage.input_tokens = 10
+        response.usage.output_tokens = 3
+        response.usage.cache_creation_input_tokens = 0
+        response.usage.cache_read_input_tokens = 0
+        response.stop_reason = "end_turn"
+        return response
+
+    client._async_client = AsyncMock()
+    client._async_client.messages.create = AsyncMock(side_effect=create)
+
+    response = await asyncio.wait_for(
+        client.agenerate(prompt="What's it worth?", deadline_seconds=2, hedge=True), timeout=1,
+    )
+
+    assert response.content == "from haiku"
+    assert response.model == settings.claude_haiku_model
+
+
+@pytest.mark.asyncio
+async def test_deadline_spent_queued_locally_does_not_trip_the_breaker() -> None:
+    hedger = _hedger(failure_threshold=1)
+    scheduler = ClaudeScheduler(
+        limiter=TokenBucketLimiter(cache=MemoryCache(), prefix="claude"),
+        concurrency=1, requests_per_minute=0, input_tokens_per_minute=0,
+    )
+
+    async def call(model: str) -> str:
+        async with request_slot(scheduler.slot(model)):
+            await asyncio.sleep(5)
+        return model
+
+    async with scheduler.slot(PRIMARY):  # local backpressure: the primary never gets a slot
+        with pytest.raises(ClaudeDeadlineExceeded):
+            await hedger.run(call, PRIMARY, FALLBACK, deadline_seconds=0.1)
+
+    stats = hedger.get_stats()["models"]
+    assert stats[PRIMARY]["timeouts"] == 1 and stats[PRIMARY]["breaker"] == CLOSED
+    # The hedge got its slot and was at the API when time ran out
+    assert stats[FALLBACK]["timeouts"] == 1 and stats[FALLBACK]["breaker"] == OPEN
@@ -0,0 +1,114 @@
+"""Memoized temperature-0 Claude calls: keys, tiers, invalidation and stats."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from bots.shared.cache_service import CacheService, MemoryCache
+from bots.shared.claude_client import ClaudeClient, TaskComplexity
+from bots.shared.claude_memo import ResponseMemo
+
+
+def _service() -> CacheService:
+    service = object.__new__(CacheService)
+    service.backend = service.fallback_backend = MemoryCache()
+    return service
+
+
+def _client(text: str = "move_in_ready") -> ClaudeClient:
+    client = ClaudeClient(api_key="test-key")
+    response = MagicMock()
+    response.content = [MagicMock(text=text)]
+    response.usage.input_tokens = 40
+    response.usage.output_tokens = 3
+    response.usage.cache_creation_input_tokens = 0
+    response.usage.cache_read_input_tokens = 0
+    response.stop_reason = "end_turn"
+    client._async_client = AsyncMock()
+    client._async_client.messages.create = AsyncMock(return_value=response)
+    return client
+
+
+async def _classify(client: ClaudeClient, message: str, **overrides):
+    kwargs = dict(
+        system_prompt="Respond with ONLY the label.", max_tokens=20, temperature=0.0,
+        complexity=TaskComplexity.ROUTINE, memo_namespace="seller_classify",
+    )
+    kwargs.update(overrides)
+    return await client.agenerate(prompt=f"Classify: {message}", **kwargs)
+
+
+@pytest.fixture
+def memo():
+    memo = ResponseMemo(ttl_seconds=600, max_entries=10, cache=_service())
+    with patch("bots.shared.claude_client.response_memo", memo):
+        yield memo
+
+
+@pytest.mark.asyncio
+async def test_repeated_classification_skips_the_api(memo) -> None:
+    client = _client()
+
+    first = await _classify(client, "It needs a new  roof")
+    second = await _classify(client, "it needs a new roof ")
+
+    assert client._async_client.messages.create.await_count == 1
+    assert second.content == first.content == "move_in_ready"
+    assert second.input_tokens is None
+    assert memo.get_stats()["local_hits"] == 1
+    assert memo.get_stats()["hit_rate"] == 50.0
+
+
+@pytest.mark.asyncio
+async def test_other_workers_hit_the_shared_tier(memo) -> None:
+    await _classify(_client(), "inherited it from my mom")
+    memo.clear()
+    client = _client()
+
+    await _classify(client, "inherited it from my mom")
+
+    client._async_client.messages.create.assert_not_awaited()
+    assert memo.get_stats()["shared_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_only_opted_in_temperature_zero_calls_are_memoized(memo) -> None:
+    client = _client()
+
+    await _classify(client, "around three fifty", temperature=0.7)
+    await _classify(client, "around three fifty", temperature=0.7)
+    await _classify(client, "around three fifty", memo_namespace=None)
+    await _classify(client, "around three fifty", memo_namespace=None)
+
+    assert client._async_client.messages.create.await_count == 4
+    assert memo.get_stats()["misses"] == 0
+
+
+@pytest.mark.asyncio
+async def test_namespace_invalidation_and_options_change_the_key(memo) -> None:
+    client = _client()
+    await _classify(client, "needs a new roof")
+    await _classify(client, "needs a new roof", max_tokens=30)
+    await memo.cache.invalidate_namespace("seller_classify")
+    await _classify(client, "needs a new roof")
+
+    assert client._async_client.messages.create.await_count == 3
+
+
+def test_local_tier_is_bounded() -> None:
+    memo = ResponseMemo(ttl_seconds=600, max_entries=2, cache=_service())
+    for key in ("a", "b", "c"):
+        memo._remember(key, {"content": key, "model": "m", "finish_reason": None})
+
+    assert list(memo._local) == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_cache_errors_fall_through_to_the_api(memo) -> None:
+    memo._cache = MagicMock(namespaced_key=AsyncMock(side_effect=ConnectionError("down")))
+    client = _client()
+
+    response = await _classify(client, "needs a new roof")
+
+    assert response.content == "move_in_ready"
+    assert memo.get_stats()["errors"] == 1
@@ -0,0 +1,149 @@
+"""Claude request scheduler: priority order, shared buckets and 429 handling."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from bots.shared.cache_service import MemoryCache
+from bots.shared.claude_client import ClaudeClient, TaskComplexity
+from bots.shared.claude_scheduler import ClaudeScheduler, RequestPriority, retry_after_seconds
+from bots.shared.token_bucket import BucketSpec, TokenBucketLimiter
+
+MODEL = "claude-test"
+
+
+def _scheduler(**kwargs) -> ClaudeScheduler:
+    kwargs.setdefault("requests_per_minute", 0)
+    kwargs.setdefault("input_tokens_per_minute", 0)
+    return ClaudeScheduler(limiter=TokenBucketLimiter(cache=MemoryCache(), prefix="claude"), **kwargs)
+
+
+async def _run(scheduler: ClaudeScheduler, priority: RequestPriority, order: list) -> None:
+    async with scheduler.slot(MODEL, priority):
+        order.append(priority)
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_priority() -> None:
+    scheduler = _scheduler(concurrency=1)
+    order: list = []
+
+    async with scheduler.slot(MODEL, RequestPriority.ANALYSIS):
+        tasks = [
+            asyncio.create_task(_run(scheduler, priority, order))
+            for priority in (RequestPriority.ROUTINE, RequestPriority.ANALYSIS, RequestPriority.INTERACTIVE)
+        ]
+        await asyncio.sleep(0)
+        stats = scheduler.get_stats()["models"][MODEL]
+        assert stats["queue_depth"] == 3
+        assert stats["active"] == 1
+    await asyncio.gather(*tasks)
+
+    assert order == [RequestPriority.INTERACTIVE, RequestPriority.ANALYSIS, RequestPriority.ROUTINE]
+    waits = scheduler.get_stats()["models"][MODEL]["wait_ms"]
+    assert waits["routine"]["count"] == 1 and waits["analysis"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_overtakes_a_head_waiting_for_budget() -> None:
+    scheduler = _scheduler()
+    await _run(scheduler, RequestPriority.ANALYSIS, [])  # create the lane
+    scheduler._lanes[MODEL].request_bucket = BucketSpec(capacity=1, refill_per_second=20)
+    order: list = []
+
+    await _run(scheduler, RequestPriority.ANALYSIS, order)  # drains the bucket
+    routine = asyncio.create_task(_run(scheduler, RequestPriority.ROUTINE, order))
+    await asyncio.sleep(0.01)
+    interactive = asyncio.create_task(_run(scheduler, RequestPriority.INTERACTIVE, order))
+    await asyncio.wait_for(asyncio.gather(routine, interactive), timeout=2)
+
+    assert order == [RequestPriority.ANALYSIS, RequestPriority.INTERACTIVE, RequestPriority.ROUTINE]
+
+
+@pytest.mark.asyncio
+async def test_denied_checks_do_not_drain_the_other_bucket() -> None:
+    scheduler = _scheduler(requests_per_minute=1, input_tokens_per_minute=10_000)
+    lane = scheduler._lane(MODEL)
+
+    async def remaining(bucket: str, spec: BucketSpec) -> int:
+        return (await scheduler.limiter.hit(f"{MODEL}:{bucket}", spec, 0)).remaining
+
+    assert await scheduler._budget_delay(lane, 1000) == 0
+    for _ in range(5):
+        assert await scheduler._budget_delay(lane, 1000) > 0
+    assert await remaining("input_tokens", lane.token_bucket) >= 9000
+
+    # Room for the request but not its prompt: the request token is given back
+    lane.request_bucket = BucketSpec(capacity=2, refill_per_second=0.001)
+    lane.token_bucket = BucketSpec(capacity=100, refill_per_second=0.001)
+    scheduler.limiter = TokenBucketLimiter(cache=MemoryCache(), prefix="claude")
+    assert await scheduler._budget_delay(lane, 100) == 0
+    assert await scheduler._budget_delay(lane, 100) > 0
+    assert await remaining("requests", lane.request_bucket) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue() -> None:
+    scheduler = _scheduler(concurrency=1)
+
+    async with scheduler.slot(MODEL):
+        waiter = asyncio.create_task(_run(scheduler, RequestPriority.ROUTINE, []))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+    await asyncio.wait_for(_run(scheduler, RequestPriority.ROUTINE, []), timeout=1)
+
+    assert scheduler.get_stats()["models"][MODEL]["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_headers_tune_buckets_and_pause_the_lane() -> None:
+    scheduler = _scheduler()
+
+    pause = scheduler.observe_rate_limit(MODEL, {
+        "retry-after": "7",
+        "anthropic-ratelimit-requests-limit": "50",
+        "anthropic-ratelimit-input-tokens-limit": "40000",
+    })
+
+    stats = scheduler.get_stats()["models"][MODEL]
+    assert pause == 7.0
+    assert stats["requests_per_minute"] == 50
+    assert stats["input_tokens_per_minute"] == 40000
+    assert 6 < stats["paused_seconds"] <= 7
+    assert stats["rate_limited"] == 1
+    assert retry_after_seconds({"retry-after": "3600"}) == 60.0
+    assert retry_after_seconds({"retry-after": "soon"}) is None
+
+
+@pytest.mark.asyncio
+async def test_client_waits_for_retry_after_and_defaults_priority() -> None:
+    try:
+        from anthropic import RateLimitError
+    except ImportError:
+        pytest.skip("anthropic not installed")
+
+    scheduler = _scheduler()
+    client = ClaudeClient(api_key="test-key", scheduler=scheduler)
+    response = MagicMock()
+    response.content = [MagicMock(text="ok")]
+    response.usage.cache_read_input_tokens = 0
+    error = RateLimitError(
+        message="rate limited",
+        response=MagicMock(headers={"retry-after": "0.05"}, status_code=429),
+        body={},
+    )
+    client._async_client = AsyncMock()
+    client._async_client.messages.create = AsyncMock(side_effect=[error, response])
+
+    # tenacity binds asyncio.sleep when the decorator is built, so patch its copy.
+    with patch.object(ClaudeClient._acreate.retry, "sleep", new_callable=AsyncMock) as sleep:
+        result = await client.agenerate(prompt="Classify", complexity=TaskComplexity.ROUTINE)
+
+    assert result.content == "ok"
+    sleep.assert_awaited_once_with(0.05)
+    stats = scheduler.get_stats()["models"][client._get_routed_model(TaskComplexity.ROUTINE)]
+    assert stats["rate_limited"] == 1
+    assert stats["wait_ms"]["routine"]["count"] == 2
@@ -0,0 +1,146 @@
+"""Stampede protection and stale-while-revalidate for cached computations."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from bots.shared.cache_service import CacheService, MemoryCache
+from bots.shared.computation_cache import COMPUTED, HIT, STALE, ComputationCache
+
+KEY = "dashboard:complete_data"
+
+
+def _service(shared: MemoryCache) -> CacheService:
+    service = object.__new__(CacheService)
+    service.backend = shared
+    service.fallback_backend = MemoryCache()
+    return service
+
+
+class SlowComputation:
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"version": self.calls}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once() -> None:
+    service = _service(MemoryCache())
+    computations = ComputationCache(beta=0)
+    compute = SlowComputation()
+
+    results = await asyncio.gather(
+        *(computations.get_or_compute(service, KEY, compute, ttl=30) for _ in range(20))
+    )
+
+    assert compute.calls == 1
+    assert results == [{"version": 1}] * 20
+    assert computations.get_stats()["coalesced"] == 19
+
+
+@pytest.mark.asyncio
+async def test_other_worker_waits_for_the_lease_holder() -> None:
+    shared = MemoryCache()
+    worker_a, worker_b = _service(shared), _service(shared)
+    compute_a, compute_b = SlowComputation(0.1), SlowComputation(0.1)
+    cache_a = ComputationCache(beta=0)
+    cache_b = ComputationCache(beta=0, lease_wait_seconds=2)
+
+    first = asyncio.create_task(cache_a.get_or_compute(worker_a, KEY, compute_a, ttl=30))
+    await asyncio.sleep(0.01)
+    second = await cache_b.get_or_compute(worker_b, KEY, compute_b, ttl=30)
+
+    assert await first == second == {"version": 1}
+    assert (compute_a.calls, compute_b.calls) == (1, 0)
+    assert cache_b.get_stats()["lease_waits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_value_is_served_while_refreshing_in_background() -> None:
+    service = _service(MemoryCache())
+    computations = ComputationCache(beta=0)
+    compute = SlowComputation()
+    await computations.get_or_compute(service, KEY, compute, ttl=30, stale_ttl=30)
+
+    envelope = await service.get(KEY)
+    envelope["expires_at"] = time.time() - 1
+    await service.set(KEY, envelope, ttl=30)
+
+    value, outcome = await computations.lookup(service, KEY, compute, ttl=30, stale_ttl=30)
+    assert (value, outcome) == ({"version": 1}, STALE)
+
+    await asyncio.sleep(0.1)
+    value, outcome = await computations.lookup(service, KEY, compute, ttl=30, stale_ttl=30)
+    assert (value, outcome) == ({"version": 2}, HIT)
+    assert compute.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_value_without_stale_window_is_recomputed() -> None:
+    service = _service(MemoryCache())
+    computations = ComputationCache(beta=0)
+    compute = SlowComputation(0)
+    await computations.get_or_compute(service, KEY, compute, ttl=30)
+
+    envelope = await service.get(KEY)
+    envelope["expires_at"] = time.time() - 1
+    await service.set(KEY, envelope, ttl=30)
+
+    assert await computations.lookup(service, KEY, compute, ttl=30) == ({"version": 2}, COMPUTED)
+
+
+def test_early_expiry_grows_with_compute_time() -> None:
+    computations = ComputationCache(beta=1.0)
+    expires_at = time.time() + 1
+
+    cheap = sum(computations._expired_early(expires_at, 0.001) for _ in range(1000))
+    expensive = sum(computations._expired_early(expires_at, 1.0) for _ in range(1000))
+
+    assert cheap == 0
+    assert 250 < expensive < 500  # P(-ln U >= 1) = 1/e
+
+
+@pytest.mark.asyncio
+async def test_failed_computation_is_not_cached_and_releases_the_lease() -> None:
+    service = _service(MemoryCache())
+    computations = ComputationCache(beta=0)
+
+    async def broken() -> dict:
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        await computations.get_or_compute(service, KEY, broken, ttl=30)
+
+    assert await service.get(KEY) is None
+    assert await service.acquire_lock(f"lease:{KEY}", "next")
+
+
+@pytest.mark.asyncio
+async def test_plain_cached_values_are_treated_as_fresh() -> None:
+    service = _service(MemoryCache())
+    await service.set(KEY, {"status": "success"}, ttl=30)
+    compute = SlowComputation(0)
+
+    assert await ComputationCache().get_or_compute(service, KEY, compute) == {"status": "success"}
+    assert compute.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_computation_shares_one_computation() -> None:
+    service = _service(MemoryCache())
+    compute = SlowComputation()
+
+    results = await asyncio.gather(
+        *(service.cached_computation("analysis:c1", compute, 60) for _ in range(5))
+    )
+
+    assert compute.calls == 1
+    assert results == [{"version": 1}] * 5
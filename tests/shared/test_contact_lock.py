@@ -0,0 +1,122 @@
+"""Tests for the per-contact FIFO webhook lock."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from bots.shared.cache_service import MemoryCache
+from bots.shared.contact_lock import ContactLockManager, lock_key
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_lock_is_owner_checked() -> None:
+    cache = MemoryCache()
+
+    assert await cache.acquire_lock("lock:c1", "owner-a", ttl=30) is True
+    assert await cache.acquire_lock("lock:c1", "owner-b", ttl=30) is False
+    assert await cache.release_lock("lock:c1", "owner-b") is False
+    assert await cache.release_lock("lock:c1", "owner-a") is True
+    assert await cache.acquire_lock("lock:c1", "owner-b", ttl=30) is True
+
+
+@pytest.mark.asyncio
+async def test_waiters_acquire_in_arrival_order() -> None:
+    cache = MemoryCache()
+    locks = ContactLockManager(ttl_seconds=30, max_wait_seconds=5, recheck_interval_ms=1000)
+    order: list[int] = []
+
+    async def handle(i: int) -> None:
+        token = await locks.acquire(cache, "c1")
+        assert token is not None
+        order.append(i)
+        await asyncio.sleep(0.01)
+        await locks.release(cache, "c1", token)
+
+    tasks = []
+    for i in range(5):
+        tasks.append(asyncio.create_task(handle(i)))
+        await asyncio.sleep(0)  # enqueue in a deterministic order
+    await asyncio.gather(*tasks)
+
+    assert order == [0, 1, 2, 3, 4]
+    assert locks.queue_depth("c1") == 0
+    assert await cache.get(lock_key("c1")) is None
+
+
+@pytest.mark.asyncio
+async def test_release_wakes_next_waiter_without_polling_delay() -> None:
+    cache = MemoryCache()
+    # Recheck interval far above the expected hand-off time
+    locks = ContactLockManager(ttl_seconds=30, max_wait_seconds=5, recheck_interval_ms=5000)
+
+    first = await locks.acquire(cache, "c1")
+    waiter = asyncio.create_task(locks.acquire(cache, "c1"))
+    await asyncio.sleep(0)
+
+    start = time.monotonic()
+    await locks.release(cache, "c1", first)
+    second = await asyncio.wait_for(waiter, timeout=1)
+
+    assert second is not None and second != first
+    assert time.monotonic() - start < 0.5
+    assert locks.get_metrics()["wait_ms"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_acquire_times_out_when_lock_held_elsewhere() -> None:
+    cache = MemoryCache()
+    locks = ContactLockManager(ttl_seconds=30, max_wait_seconds=0.05, recheck_interval_ms=10)
+
+    # Simulate another worker holding the lock
+    await cache.acquire_lock(lock_key("c1"), "other-worker", ttl=30)
+
+    assert await locks.acquire(cache, "c1") is None
+    assert locks.timeouts == 1
+    assert locks.queue_depth("c1") == 0
+
+
+@pytest.mark.asyncio
+async def test_recheck_picks_up_lock_freed_by_other_worker() -> None:
+    cache = MemoryCache()
+    locks = ContactLockManager(ttl_seconds=30, max_wait_seconds=2, recheck_interval_ms=10)
+    await cache.acquire_lock(lock_key("c1"), "other-worker", ttl=30)
+
+    waiter = asyncio.create_task(locks.acquire(cache, "c1"))
+    await asyncio.sleep(0.03)
+    await cache.release_lock(lock_key("c1"), "other-worker")
+
+    assert await asyncio.wait_for(waiter, timeout=1) is not None
+
+
+class _SlowAcquireCache(MemoryCache):
+    """MemoryCache whose lock attempts stall until ``gate`` opens."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate: asyncio.Event | None = None
+
+    async def acquire_lock(self, key: str, token: str, ttl: int) -> bool:
+        acquired = await super().acquire_lock(key, token, ttl=ttl)
+        if self.gate is not None:
+            gate, self.gate = self.gate, None
+            await gate.wait()
+        return acquired
+
+
+@pytest.mark.asyncio
+async def test_release_during_acquire_attempt_is_not_lost() -> None:
+    cache = _SlowAcquireCache()
+    locks = ContactLockManager(ttl_seconds=30, max_wait_seconds=10, recheck_interval_ms=5000)
+    first = await locks.acquire(cache, "c1")
+
+    cache.gate = asyncio.Event()
+    gate = cache.gate
+    waiter = asyncio.create_task(locks.acquire(cache, "c1"))
+    await asyncio.sleep(0.01)  # waiter's attempt has failed and is still in flight
+    await locks.release(cache, "c1", first)
+    gate.set()
+
+    assert await asyncio.wait_for(waiter, timeout=1) is not None
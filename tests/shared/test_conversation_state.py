@@ -0,0 +1,173 @@
+"""Field-level conversation state: hash/list primitives and dirty-field saves."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from bots.seller_bot.jorge_seller_bot import JorgeSellerBot, SellerQualificationState
+from bots.shared.cache_breaker import CacheCircuitBreaker
+from bots.shared.cache_codecs import ValueSerializer
+from bots.shared.cache_service import CacheService, MemoryCache
+from bots.shared.conversation_state import ConversationStateStore, history_delta
+from bots.shared.logger import get_logger
+from bots.shared.sqlite_cache import SQLiteCache
+
+FIELDS_KEY = "seller:state:fields:c1"
+HISTORY_KEY = "seller:state:history:c1"
+
+
+class RecordingCache(MemoryCache):
+    """MemoryCache that records hash fields and list items written."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fields_written: list[str] = []
+        self.items_pushed = 0
+
+    async def hset(self, key, mapping, ttl=None):
+        self.fields_written.extend(mapping)
+        return await super().hset(key, mapping, ttl)
+
+    async def lpush_capped(self, key, values, max_length, ttl=None):
+        self.items_pushed += len(values)
+        return await super().lpush_capped(key, values, max_length, ttl)
+
+
+def _service(backend) -> CacheService:
+    service = object.__new__(CacheService)
+    service.backend = backend
+    service.fallback_backend = MemoryCache()
+    return service
+
+
+def _seller_bot(cache) -> JorgeSellerBot:
+    bot = JorgeSellerBot.__new__(JorgeSellerBot)
+    bot.cache = cache
+    bot.logger = get_logger(__name__)
+    return bot
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+async def test_hash_and_capped_list_primitives(backend, tmp_path) -> None:
+    cache = MemoryCache() if backend == "memory" else SQLiteCache(str(tmp_path / "cache.sqlite3"))
+
+    assert await cache.hset("h", {"stage": "Q1", "data": {"a": 1}}, ttl=60) == 2
+    assert await cache.hset("h", {"stage": "Q2", "count": 1}) == 1
+    assert await cache.hincrby("h", "count", 4) == 5
+    assert await cache.hgetall("h") == {"stage": "Q2", "data": {"a": 1}, "count": 5}
+    assert await cache.hgetall_many(["h", "missing"]) == {"h": await cache.hgetall("h")}
+
+    await cache.lpush_capped("l", [1, 2, 3], max_length=4, ttl=60)
+    assert await cache.lpush_capped("l", [4, 5], max_length=4) == 4
+    assert await cache.lrange("l") == [5, 4, 3, 2]
+    assert await cache.lrange("l", 0, 1) == [5, 4]
+    assert await cache.lpush_capped("missing", [], max_length=4, ttl=60) == 0
+    assert await cache.lrange_many(["l", "missing"]) == {"l": [5, 4, 3, 2]}
+
+
+def test_hash_fields_keep_ints_as_plain_decimal() -> None:
+    serializer = ValueSerializer(codec="pickle", compression="lz4", compress_min_bytes=1)
+
+    assert serializer.dumps_field(42) == b"42"
+    assert serializer.loads_field(b"-7") == -7
+    for value in (True, "42", {"history": ["x" * 500]}, None):
+        assert serializer.loads_field(serializer.dumps_field(value)) == value
+
+
+def test_history_delta_pushes_appended_entries_only() -> None:
+    assert history_delta([], [1, 2]) == ([1, 2], False)
+    assert history_delta([1, 2], [1, 2, 3]) == ([3], False)
+    assert history_delta([1, 2, 3], [2, 3, 4]) == ([4], False)  # trimmed at the front
+    assert history_delta([1, 2], [1, 2]) == ([], False)
+    assert history_delta([1, 2], [1, 9]) == ([1, 9], True)  # edited entry
+
+
+@pytest.mark.asyncio
+async def test_second_save_writes_only_changed_fields_and_new_history() -> None:
+    backend = RecordingCache()
+    bot = _seller_bot(_service(backend))
+    state = SellerQualificationState(contact_id="c1", location_id="loc1")
+    await bot.save_conversation_state("c1", state)
+    assert "contact_id" in backend.fields_written
+
+    loaded = await bot.get_conversation_state("c1")
+    backend.fields_written.clear()
+    loaded.advance_question()
+    loaded.record_answer(1, "needs a new roof", {"condition": "needs_work"})
+    await bot.save_conversation_state("c1", loaded)
+
+    assert set(backend.fields_written) == {
+        "current_question", "questions_answered", "stage", "condition", "extracted_data", "last_interaction",
+    }
+    assert backend.items_pushed == 1
+    reloaded = await bot.get_conversation_state("c1")
+    assert reloaded.condition == "needs_work"
+    assert reloaded.conversation_history == loaded.conversation_history
+    assert await bot.cache.get("seller:state:c1") is None
+
+
+@pytest.mark.asyncio
+async def test_single_blob_state_is_moved_to_fields_on_read() -> None:
+    cache = _service(MemoryCache())
+    legacy = {"contact_id": "c1", "location_id": "loc1", "stage": "Q2", "current_question": 2,
+              "conversation_history": [{"answer": "hi"}], "unknown_future_field": 1}
+    await cache.set("seller:state:c1", legacy, ttl=600)
+
+    states = await ConversationStateStore(cache, "seller").load_many(["c1", "c2"])
+
+    assert states == {"c1": legacy}
+    assert await cache.get("seller:state:c1") is None
+    assert (await cache.hgetall(FIELDS_KEY))["stage"] == "Q2"
+    assert await cache.lrange(HISTORY_KEY) == [{"answer": "hi"}]
+
+
+@pytest.mark.asyncio
+async def test_partial_hash_counts_as_miss() -> None:
+    cache = _service(MemoryCache())
+    await cache.hset(FIELDS_KEY, {"stage": "Q3"}, ttl=600)
+
+    assert await ConversationStateStore(cache, "seller").load("c1") is None
+
+
+@pytest.mark.asyncio
+async def test_outage_replay_merges_hash_fields() -> None:
+    service = _service(MemoryCache())
+    service.breaker = CacheCircuitBreaker(replay_prefixes=("seller:state:",))
+    await service.backend.hset(FIELDS_KEY, {"contact_id": "c1", "stage": "Q1"}, ttl=600)
+    await service.fallback_backend.hset(FIELDS_KEY, {"stage": "Q2"}, ttl=600)
+    await service.fallback_backend.lpush_capped(HISTORY_KEY, ["a", "b"], max_length=20, ttl=600)
+    await service.backend.lpush_capped(HISTORY_KEY, ["stale"], max_length=20, ttl=600)
+
+    await service._replay_outage_writes({FIELDS_KEY: 2e9, HISTORY_KEY: 2e9})
+
+    assert await service.backend.hgetall(FIELDS_KEY) == {"contact_id": "c1", "stage": "Q2"}
+    assert await service.backend.lrange(HISTORY_KEY) == ["b", "a", "stale"]
+
+
+@pytest.mark.asyncio
+async def test_outage_replay_appends_only_new_history() -> None:
+    service = _service(MemoryCache())
+    await service.backend.lpush_capped(HISTORY_KEY, ["a", "b", "c"], max_length=20, ttl=600)
+    # The mirror saw the last two pushes before the outage, then one more
+    await service.fallback_backend.lpush_capped(HISTORY_KEY, ["b", "c", "d"], max_length=20, ttl=600)
+
+    await service._replay_outage_writes({HISTORY_KEY: 2e9})
+
+    assert await service.backend.lrange(HISTORY_KEY) == ["d", "c", "b", "a"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+async def test_dropped_field_is_deleted_from_the_hash(backend, tmp_path) -> None:
+    cache = MemoryCache() if backend == "memory" else SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    store = ConversationStateStore(_service(cache), "seller")
+    state = SimpleNamespace()
+    await store.save("c1", state, {"contact_id": "c1", "stage": "Q1", "motivation": "divorce"})
+
+    await store.save("c1", state, {"contact_id": "c1", "stage": "Q2"})
+
+    assert await store.load("c1") == {"contact_id": "c1", "stage": "Q2", "conversation_history": []}
+    assert await cache.hdel(FIELDS_KEY, "stage", "missing") == 1
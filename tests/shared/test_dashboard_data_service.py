@@ -102,10 +102,10 @@ class TestDashboardDataService:
             mock_conversations.assert_called_once()
             mock_hero.assert_called_once()
 
-            # Verify cache set
+            # Verify cache set (30 sec TTL plus the 30 sec stale window)
             mock_cache_service.set.assert_called_once()
             call_args = mock_cache_service.set.call_args
-            assert call_args[1]['ttl'] == 30
+            assert call_args[1]['ttl'] == 60
 
             # Verify result structure
             assert isinstance(result, dict)
@@ -0,0 +1,119 @@
+"""Lead analyses cached by PII-free content and reused across contacts."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from bots.lead_bot.services.lead_analyzer import LeadAnalyzer
+from bots.shared.cache_service import CacheService, MemoryCache, PerformanceCache
+
+CLAUDE_JSON = (
+    '{"score": 72, "temperature": "warm", "reasoning": "Motivated seller in area", '
+    '"action": "Call within 24h", "budget_estimate": "$500K-$600K", "timeline_estimate": "60"}'
+)
+
+
+def _lead(contact_id: str, name: str, email: str, phone: str, message: str) -> dict:
+    return {
+        "id": contact_id,
+        "name": name,
+        "email": email,
+        "phone": phone,
+        "source": "Website Form",
+        "tags": ["Seller", "Rancho Cucamonga"],
+        "message": message,
+    }
+
+
+@pytest.fixture
+def analyzer():
+    cache = object.__new__(CacheService)
+    cache.backend = MemoryCache()
+    cache.fallback_backend = cache.backend
+
+    performance_cache = object.__new__(PerformanceCache)
+    performance_cache.ttl_seconds = 300
+    performance_cache.cache_service = cache
+    performance_cache.stats = {}
+
+    service = object.__new__(LeadAnalyzer)
+    service.cache = cache
+    service.performance_cache = performance_cache
+    service.claude = SimpleNamespace(agenerate=AsyncMock(return_value=SimpleNamespace(content=CLAUDE_JSON)))
+    service.ghl = SimpleNamespace(
+        update_lead_score=AsyncMock(return_value={"success": True}),
+        send_immediate_followup=AsyncMock(return_value={"success": True}),
+    )
+    with patch("bots.lead_bot.services.lead_analyzer.event_broker") as broker, \
+         patch.object(LeadAnalyzer, "_persist_lead", AsyncMock()):
+        broker.publish_lead_event = AsyncMock()
+        yield service
+
+
+def test_content_ignores_pii_whitespace_and_case(analyzer) -> None:
+    a = _lead("c1", "Maria Lopez", "maria@example.com", "909-555-0101",
+              "Interested in selling my home in  Rancho Cucamonga. Maria, 909-555-0101")
+    b = _lead("c2", "Dan Smith", "dan@example.com", "(626) 555-0199",
+              "interested in selling my home in Rancho Cucamonga. dan, 626.555.0199")
+
+    assert analyzer._extract_message_for_cache(a) == analyzer._extract_message_for_cache(b)
+    prompt = analyzer._build_analysis_prompt(a)
+    assert "Maria" not in prompt and "maria@example.com" not in prompt and "0101" not in prompt
+
+
+@pytest.mark.asyncio
+async def test_second_contact_with_same_content_reuses_claude_analysis(analyzer) -> None:
+    message = "Interested in selling my home in Rancho Cucamonga"
+    first, first_metrics = await analyzer.analyze_lead(
+        _lead("c1", "Maria Lopez", "maria@example.com", "909-555-0101", message)
+    )
+    second, second_metrics = await analyzer.analyze_lead(
+        _lead("c2", "Dan Smith", "dan@example.com", "626-555-0199", message)
+    )
+
+    assert analyzer.claude.agenerate.await_count == 1
+    assert (first_metrics.analysis_type, second_metrics.analysis_type) == ("ai", "content_cached")
+    assert second["score"] == first["score"] == 72
+    assert second["budget_max"] == 600000  # recombined per contact
+    assert "jorge_validation" in second
+
+    # Per-contact side effects still run for the second contact
+    assert analyzer.ghl.update_lead_score.await_args_list[-1].args[0] == "c2"
+    assert analyzer.ghl.send_immediate_followup.await_args_list[-1].args[0] == "c2"
+
+    stats = analyzer.performance_cache.get_stats()
+    assert stats["content"] == {"hits": 1, "misses": 1, "hit_rate": 50.0}
+    assert stats["contact"]["hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_repeat_analysis_of_one_contact_uses_contact_entry(analyzer) -> None:
+    lead = _lead("c1", "Maria Lopez", "maria@example.com", "909-555-0101", "Want to sell")
+    await analyzer.analyze_lead(lead)
+
+    result, metrics = await analyzer.analyze_lead(lead)
+
+    assert metrics.analysis_type == "cached"
+    assert analyzer.ghl.update_lead_score.await_count == 1
+    assert analyzer.performance_cache.get_stats()["contact"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_different_content_is_not_shared(analyzer) -> None:
+    await analyzer.analyze_lead(_lead("c1", "Maria Lopez", "m@example.com", "", "Want to sell"))
+    await analyzer.analyze_lead(_lead("c2", "Dan Smith", "d@example.com", "", "Want to buy"))
+
+    assert analyzer.claude.agenerate.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_unparseable_claude_response_is_not_shared(analyzer) -> None:
+    analyzer.claude.agenerate.return_value = SimpleNamespace(content="not json")
+    message = "Want to sell"
+    await analyzer.analyze_lead(_lead("c1", "Maria Lopez", "m@example.com", "", message))
+    await analyzer.analyze_lead(_lead("c2", "Dan Smith", "d@example.com", "", message))
+
+    assert analyzer.claude.agenerate.await_count == 2
@@ -0,0 +1,103 @@
+"""Tests for the bounded LRU/TTL MemoryCache."""
+
+from __future__ import annotations
+
+import pickle
+from unittest.mock import patch
+
+import pytest
+
+from bots.shared.cache_service import MemoryCache
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted_at_capacity() -> None:
+    cache = MemoryCache(max_entries=3)
+    for key in ("a", "b", "c"):
+        await cache.set(key, key)
+
+    await cache.get("a")  # "b" is now the least recently used
+    await cache.set("d", "d")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "a"
+    assert cache.get_stats()["entries"] == 3
+    assert cache.get_stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_evicted_before_live_ones() -> None:
+    cache = MemoryCache(max_entries=2)
+    await cache.set("old", "x", ttl=-1)
+    await cache.set("live", "y")
+
+    await cache.set("new", "z")
+
+    assert await cache.get("live") == "y"
+    stats = cache.get_stats()
+    assert stats["evictions"] == 0
+    assert stats["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_bounds_memory() -> None:
+    cache = MemoryCache(max_bytes=20_000)
+    for i in range(100):
+        await cache.set(f"state:{i}", "x" * 1_000)
+
+    stats = cache.get_stats()
+    assert stats["approx_bytes"] <= 20_000
+    assert stats["entries"] < 100
+    assert await cache.get("state:99") == "x" * 1_000
+
+
+@pytest.mark.asyncio
+async def test_sweep_removes_expired_keys_nobody_reads() -> None:
+    cache = MemoryCache(sweep_interval=3600)
+    for i in range(10):
+        await cache.set(f"dedup:{i}", "1", ttl=-1)
+    await cache.set("keep", "1")
+
+    assert cache.sweep(max_keys=4) == 4
+    assert cache.sweep() == 6
+    assert cache.get_stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rewritten_key_is_not_swept_by_its_old_expiry() -> None:
+    cache = MemoryCache(sweep_interval=3600)
+    await cache.set("k", "old", ttl=-1)
+    await cache.set("k", "new", ttl=300)
+
+    assert cache.sweep() == 0
+    assert await cache.get("k") == "new"
+
+
+@pytest.mark.asyncio
+async def test_byte_accounting_follows_in_place_updates() -> None:
+    cache = MemoryCache()
+    await cache.rpush("coalesce:c1", "a" * 500)
+    one = cache.get_stats()["approx_bytes"]
+    await cache.rpush("coalesce:c1", "b" * 500)
+    assert cache.get_stats()["approx_bytes"] > one
+
+    await cache.delete("coalesce:c1")
+    assert cache.get_stats()["approx_bytes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_collection_updates_are_sized_incrementally() -> None:
+    cache = MemoryCache()
+    await cache.sadd("active", *(f"contact-{i}" for i in range(1000)))
+    await cache.hset("state", {"stage": "Q1", "notes": "x" * 200})
+    await cache.hset("state", {"stage": "Q2"})
+    await cache.lpush_capped("history", [f"turn-{i}" for i in range(30)], max_length=20)
+
+    with patch("bots.shared.cache_service.pickle.dumps", wraps=pickle.dumps) as dumps:
+        await cache.sadd("active", "contact-new")
+        await cache.srem("active", "contact-0", "contact-1")
+    dumps.assert_not_called()  # string members are sized without re-pickling the set
+
+    for key in ("active", "state", "history"):
+        exact = MemoryCache._approx_size(key, cache._cache[key])
+        assert abs(cache._sizes[key] - exact) <= exact * 0.25
@@ -0,0 +1,71 @@
+"""Tests for rapid-fire SMS coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bots.shared.cache_service import MemoryCache
+from bots.shared.message_coalescer import MessageCoalescer, buffer_key
+
+
+async def _send(coalescer: MessageCoalescer, cache: MemoryCache, contact_id: str, text: str):
+    position = await coalescer.push(cache, contact_id, text)
+    return await coalescer.collect(cache, contact_id, position)
+
+
+@pytest.mark.asyncio
+async def test_burst_is_merged_into_last_message_turn() -> None:
+    cache = MemoryCache()
+    coalescer = MessageCoalescer(window_ms=50)
+
+    tasks = []
+    for text in ("hi", "I want to sell", "house needs work"):
+        tasks.append(asyncio.create_task(_send(coalescer, cache, "c1", text)))
+        await asyncio.sleep(0.01)
+    results = await asyncio.gather(*tasks)
+
+    assert results[:2] == [None, None]
+    assert results[2] == "hi\nI want to sell\nhouse needs work"
+    assert await cache.get(buffer_key("c1")) is None
+
+    metrics = coalescer.get_metrics()
+    assert metrics["turns"] == 1
+    assert metrics["claude_calls_saved"] == 2
+
+
+@pytest.mark.asyncio
+async def test_single_message_passes_through() -> None:
+    cache = MemoryCache()
+    coalescer = MessageCoalescer(window_ms=10)
+
+    assert await _send(coalescer, cache, "c1", "  hello  ") == "hello"
+    assert coalescer.get_metrics()["claude_calls_saved"] == 0
+
+
+@pytest.mark.asyncio
+async def test_contacts_are_buffered_independently() -> None:
+    cache = MemoryCache()
+    coalescer = MessageCoalescer(window_ms=30)
+
+    a, b = await asyncio.gather(
+        _send(coalescer, cache, "c1", "from one"),
+        _send(coalescer, cache, "c2", "from two"),
+    )
+
+    assert (a, b) == ("from one", "from two")
+
+
+@pytest.mark.asyncio
+async def test_message_after_drain_starts_a_new_burst() -> None:
+    cache = MemoryCache()
+    coalescer = MessageCoalescer(window_ms=10)
+
+    assert await _send(coalescer, cache, "c1", "first") == "first"
+    assert await _send(coalescer, cache, "c1", "second") == "second"
+
+
+def test_disabled_when_window_is_zero() -> None:
+    assert MessageCoalescer(window_ms=0).enabled_for(MemoryCache()) is False
+    assert MessageCoalescer(window_ms=100).enabled_for(None) is False
@@ -391,10 +391,10 @@ class TestMetricsService:
             mock_commission.assert_called_once()
             mock_savings.assert_called_once()
 
-            # Verify cache set with 30 sec TTL
+            # Verify cache set with 30 sec TTL plus the 30 sec stale window
             mock_cache_service.set.assert_called_once()
             call_args = mock_cache_service.set.call_args
-            assert call_args[1]['ttl'] == 30
+            assert call_args[1]['ttl'] == 60
 
             # Verify result structure
             assert isinstance(result, dict)
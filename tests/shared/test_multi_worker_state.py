@@ -0,0 +1,137 @@
+"""Several lead-bot workers sharing one Redis stand-in must agree on state."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from bots.lead_bot import routes_admin
+from bots.shared import bot_settings
+from bots.shared.cache_service import CacheService, MemoryCache
+from bots.shared.calendar_booking_service import CalendarBookingService
+from bots.shared.jorge_handoff_service import HandoffDecision, JorgeHandoffService
+from bots.shared.shared_counters import SharedCounters
+
+WORKERS = 4
+
+SLOTS = [
+    {"start": "2026-03-01T17:00:00Z", "end": "2026-03-01T17:30:00Z"},
+    {"start": "2026-03-03T22:00:00Z", "end": "2026-03-03T22:30:00Z"},
+]
+
+
+class RedisStandIn:
+    """One MemoryCache shared by all workers; every command yields like a network call."""
+
+    def __init__(self) -> None:
+        self.inner = MemoryCache()
+
+    def __getattr__(self, name):
+        op = getattr(self.inner, name)
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(0)
+            return await op(*args, **kwargs)
+
+        return call
+
+
+def _worker_cache(redis: RedisStandIn) -> CacheService:
+    """A CacheService as each worker process would build it: shared primary, own fallback."""
+    service = object.__new__(CacheService)
+    service.backend = redis
+    service.fallback_backend = MemoryCache()
+    return service
+
+
+@pytest.fixture
+def workers():
+    redis = RedisStandIn()
+    return [_worker_cache(redis) for _ in range(WORKERS)]
+
+
+def _ghl_client():
+    client = MagicMock()
+    client.location_id = "loc-1"
+    client.get_free_slots = AsyncMock(return_value=SLOTS)
+    client.create_appointment = AsyncMock(return_value={"success": True, "data": {"id": "appt-1"}})
+    return client
+
+
+@pytest.mark.asyncio
+async def test_performance_counters_sum_across_workers(workers) -> None:
+    counters = [
+        SharedCounters("lead_bot:stats", ["total_requests", "cache_hits"], cache=c, flush_interval=0)
+        for c in workers
+    ]
+
+    async def serve(stats: SharedCounters) -> None:
+        for i in range(250):
+            stats.incr("total_requests")
+            if i % 5 == 0:
+                stats.incr("cache_hits")
+            await stats.maybe_flush()
+
+    await asyncio.gather(*(serve(s) for s in counters))
+
+    snapshots = [await s.snapshot() for s in counters]
+    assert all(snap == {"total_requests": 1000, "cache_hits": 200} for snap in snapshots)
+
+
+@pytest.mark.asyncio
+async def test_slots_offered_on_one_worker_are_booked_on_another(workers) -> None:
+    ghl = _ghl_client()
+    offering, booking, late = (CalendarBookingService(ghl, cache=c) for c in workers[:3])
+    offering.calendar_id = booking.calendar_id = late.calendar_id = "cal-1"
+
+    await offering.offer_appointment_slots("contact-1", "seller")
+
+    await booking.load_pending_slots("contact-1")
+    assert booking.detect_slot_selection("the second one", "contact-1") == 1
+    result = await booking.book_appointment("contact-1", 1, "seller")
+    assert result["success"] is True
+
+    # Booked slots are gone for every other worker, including the one that
+    # offered them and still holds a local copy
+    assert (await late.book_appointment("contact-1", 0, "seller"))["success"] is False
+    assert offering._pending_slots["contact-1"]
+    assert (await offering.book_appointment("contact-1", 0, "seller"))["success"] is False
+    assert not await offering.has_pending_slots("contact-1")
+    ghl.create_appointment.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_handoffs_execute_once_across_workers(workers) -> None:
+    services = [JorgeHandoffService(cache=c) for c in workers]
+    decision = HandoffDecision("lead", "buyer", "buyer_intent_detected", 0.9)
+
+    results = await asyncio.gather(
+        *(s.execute_handoff(decision, "contact-1") for s in services)
+    )
+
+    executed = [r for r in results if not (r and r[0].get("handoff_executed") is False)]
+    assert len(executed) == 1
+    # The circular-handoff history is shared too
+    again = await services[-1].execute_handoff(decision, "contact-1")
+    assert again[0]["handoff_executed"] is False
+
+
+@pytest.mark.asyncio
+async def test_bot_settings_saved_on_one_worker_reach_the_others(workers, monkeypatch) -> None:
+    monkeypatch.setattr(routes_admin.settings, "shared_state_sync_seconds", 0)
+    monkeypatch.setattr(routes_admin, "_settings_sync_state", {"version": 0, "checked_at": 0.0})
+    bot_settings.reset()
+    try:
+        bot_settings.update_settings("seller", {"system_prompt": "Be brief."})
+        await routes_admin.settings_save(workers[0])
+
+        # Another process: its own in-memory overrides and sync state
+        bot_settings.reset()
+        monkeypatch.setattr(routes_admin, "_settings_sync_state", {"version": 0, "checked_at": 0.0})
+        await routes_admin.settings_sync(workers[1])
+
+        assert bot_settings.get_override("seller") == {"system_prompt": "Be brief."}
+    finally:
+        bot_settings.reset()
@@ -0,0 +1,204 @@
+"""Near cache in front of a shared Redis stand-in, kept coherent over pub/sub."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bots.shared.cache_service import CacheService, MemoryCache
+from bots.shared.near_cache import NearCache
+
+STATE_KEY = "seller:state:c1"
+
+
+class CountingRedis:
+    """A MemoryCache shared by all workers that counts round trips."""
+
+    def __init__(self) -> None:
+        self.inner = MemoryCache()
+        self.calls = 0
+        self.fail = False
+
+    def __getattr__(self, name):
+        op = getattr(self.inner, name)
+
+        async def call(*args, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(0)
+            if self.fail:
+                raise ConnectionError("redis down")
+            return await op(*args, **kwargs)
+
+        return call
+
+
+def _worker(redis: CountingRedis, near: bool = True) -> CacheService:
+    service = object.__new__(CacheService)
+    service.backend = redis
+    service.fallback_backend = MemoryCache()
+    if near:
+        service.near_cache = NearCache(
+            prefixes=("seller:state:", "assigned_bot:"), ttl_seconds=60, max_entries=100
+        )
+    return service
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+async def workers():
+    redis = CountingRedis()
+    services = [_worker(redis), _worker(redis)]
+    for service in services:
+        service.start_near_cache()
+    await _settle()
+    yield redis, services
+    for service in services:
+        await service.stop_near_cache()
+
+
+@pytest.mark.asyncio
+async def test_hot_key_reads_skip_redis_after_first_fill(workers) -> None:
+    redis, (a, _) = workers
+    await a.set(STATE_KEY, {"current_question": 2}, ttl=3600)
+
+    calls = redis.calls
+    for _ in range(10):
+        assert await a.get(STATE_KEY) == {"current_question": 2}
+
+    assert redis.calls == calls
+    assert a.near_cache_stats()["hits"] == 10
+
+
+@pytest.mark.asyncio
+async def test_write_on_one_worker_invalidates_the_others(workers) -> None:
+    _, (a, b) = workers
+    await a.set(STATE_KEY, {"current_question": 1}, ttl=3600)
+    assert await b.get(STATE_KEY) == {"current_question": 1}  # b now holds a copy
+
+    await a.set(STATE_KEY, {"current_question": 2}, ttl=3600)
+    await _settle()
+
+    assert await b.get(STATE_KEY) == {"current_question": 2}
+    assert b.near_cache_stats()["invalidations"] == 2  # one per write by a
+
+
+@pytest.mark.asyncio
+async def test_batch_write_invalidates_every_key_in_one_message(workers) -> None:
+    _, (a, b) = workers
+    keys = [f"seller:state:c{i}" for i in range(3)]
+    await a.set_many({key: {"current_question": 1} for key in keys}, ttl=3600)
+    assert len(await b.get_many(keys)) == 3
+
+    await a.set_many({key: {"current_question": 2} for key in keys}, ttl=3600)
+    await _settle()
+
+    assert await b.get_many(keys) == {key: {"current_question": 2} for key in keys}
+    assert b.near_cache_stats()["invalidations"] == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_is_not_masked_by_the_local_mirror(workers) -> None:
+    _, (a, b) = workers
+    await a.set(STATE_KEY, {"current_question": 3}, ttl=3600)
+
+    await b.delete(STATE_KEY)
+    await _settle()
+
+    # a's MemoryCache mirror still has the value; a Redis miss must win
+    assert await a.fallback_backend.get(STATE_KEY) is not None
+    assert await a.get(STATE_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_read_racing_an_invalidation_is_not_cached(workers) -> None:
+    _, (_, b) = workers
+    near = b.near_cache
+    epoch = near.epoch
+
+    near._on_message(f"other-worker|{STATE_KEY}")
+    await near.fill(STATE_KEY, {"current_question": 1}, 60, epoch)
+
+    assert await near.get(STATE_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_taking_the_contact_lock_drops_its_hot_keys(workers) -> None:
+    redis, (a, _) = workers
+    await a.set(STATE_KEY, {"current_question": 1}, ttl=3600)
+    await a.set("assigned_bot:c1", "seller", ttl=3600)
+
+    assert await a.acquire_lock("lock:c1", "t1")
+
+    calls = redis.calls
+    assert await a.get(STATE_KEY) == {"current_question": 1}
+    assert redis.calls == calls + 1
+
+
+@pytest.mark.asyncio
+async def test_state_hash_and_history_are_near_cached_and_invalidated(workers) -> None:
+    redis, (a, b) = workers
+    fields_key, history_key = "seller:state:fields:c1", "seller:state:history:c1"
+    await a.hset(fields_key, {"contact_id": "c1", "stage": "Q1"}, ttl=3600)
+    await a.lpush_capped(history_key, ["hi"], max_length=20, ttl=3600)
+    await _settle()
+    assert await b.hgetall(fields_key) == {"contact_id": "c1", "stage": "Q1"}
+    assert await b.lrange(history_key, 0, 19) == ["hi"]
+
+    calls = redis.calls
+    assert await b.hgetall_many([fields_key]) == {fields_key: {"contact_id": "c1", "stage": "Q1"}}
+    assert await b.lrange_many([history_key], 0, 19) == {history_key: ["hi"]}
+    assert redis.calls == calls
+    assert await b.lrange(history_key, 0, 0) == ["hi"]  # another range: not served from the copy
+    assert redis.calls == calls + 1
+
+    await a.hset(fields_key, {"stage": "Q2"}, ttl=3600)
+    await a.lpush_capped(history_key, ["again"], max_length=20, ttl=3600)
+    await _settle()
+    assert (await b.hgetall(fields_key))["stage"] == "Q2"
+    assert await b.lrange(history_key, 0, 19) == ["again", "hi"]
+
+    await a.hgetall(fields_key)
+    assert await a.acquire_lock("lock:c1", "t1")
+    calls = redis.calls
+    await a.hgetall(fields_key)
+    assert redis.calls == calls + 1
+
+
+@pytest.mark.asyncio
+async def test_mutating_a_returned_value_does_not_touch_the_cached_copy(workers) -> None:
+    _, (a, _) = workers
+    await a.set(STATE_KEY, {"current_question": 1}, ttl=3600)
+
+    state = await a.get(STATE_KEY)
+    state["current_question"] = 4
+
+    assert await a.get(STATE_KEY) == {"current_question": 1}
+
+
+@pytest.mark.asyncio
+async def test_near_cache_serves_nothing_while_unsubscribed() -> None:
+    redis = CountingRedis()
+    a = _worker(redis)  # listener never started
+    await a.set(STATE_KEY, {"current_question": 1}, ttl=3600)
+
+    calls = redis.calls
+    assert await a.get(STATE_KEY) == {"current_question": 1}
+    assert redis.calls == calls + 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_is_only_read_when_redis_errors() -> None:
+    redis = CountingRedis()
+    a = _worker(redis, near=False)
+    await a.set("k", "v")
+    await redis.inner.delete("k")
+
+    assert await a.get("k") is None
+
+    redis.fail = True
+    assert await a.get("k") == "v"
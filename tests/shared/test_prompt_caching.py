@@ -0,0 +1,109 @@
+"""Prompt caching: stable system prefix, rolling history breakpoint and per-bot stats."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from bots.buyer_bot.buyer_bot import BuyerQualificationState, JorgeBuyerBot
+from bots.seller_bot.jorge_seller_bot import JorgeSellerBot, SellerQualificationState
+from bots.shared.claude_client import ClaudeClient, LLMResponse, PromptCacheStats, prompt_cache_stats
+
+HISTORY = [
+    {"role": "user", "content": "Hi, thinking about selling"},
+    {"role": "assistant", "content": "What condition is the house in?"},
+]
+
+
+def _client(label: str = "seller", read: int = 0, written: int = 0) -> ClaudeClient:
+    client = ClaudeClient(api_key="test-key", usage_label=label)
+    response = MagicMock()
+    response.content = [MagicMock(text="ok")]
+    response.usage.input_tokens = 100
+    response.usage.output_tokens = 10
+    response.usage.cache_creation_input_tokens = written
+    response.usage.cache_read_input_tokens = read
+    response.stop_reason = "end_turn"
+    client._async_client = AsyncMock()
+    client._async_client.messages.create = AsyncMock(return_value=response)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_system_prefix_and_last_history_turn_are_breakpoints() -> None:
+    client = _client()
+    history = [dict(message) for message in HISTORY]
+
+    await client.agenerate(prompt="It needs a roof", system_prompt="You are Jorge.", cached_context="Q1: ...",
+                           history=history)
+
+    request = client._async_client.messages.create.call_args[1]
+    assert request["system"] == [
+        {"type": "text", "text": "You are Jorge."},
+        {"type": "text", "text": "Q1: ...", "cache_control": {"type": "ephemeral"}},
+    ]
+    messages = request["messages"]
+    assert messages[0] == HISTORY[0]
+    assert messages[1]["content"] == [{
+        "type": "text", "text": HISTORY[1]["content"], "cache_control": {"type": "ephemeral"},
+    }]
+    assert messages[2] == {"role": "user", "content": "It needs a roof"}
+    assert history == HISTORY  # caller's history untouched
+
+
+@pytest.mark.asyncio
+async def test_caching_disabled_sends_plain_blocks() -> None:
+    client = _client()
+
+    await client.agenerate(prompt="hi", system_prompt="You are Jorge.", history=HISTORY, enable_caching=False)
+
+    request = client._async_client.messages.create.call_args[1]
+    assert "cache_control" not in str(request["system"])
+    assert request["messages"][:2] == HISTORY
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bot_class, state_class", [
+    (JorgeSellerBot, SellerQualificationState),
+    (JorgeBuyerBot, BuyerQualificationState),
+])
+async def test_bot_turns_share_one_cacheable_prefix(bot_class, state_class) -> None:
+    bot = bot_class()
+    agenerate = AsyncMock(return_value=LLMResponse(content="Got it.", model="m"))
+    bot.claude_client.agenerate = agenerate
+
+    for question, message in ((1, "needs a little paint"), (2, "around 400k")):
+        state = state_class(contact_id="c1", location_id="loc1", current_question=question)
+        await bot._generate_response(state, message)
+
+    first, second = (call[1] for call in agenerate.call_args_list)
+    assert first["cached_context"] and first["cached_context"] == second["cached_context"]
+    assert first["response_schema"] is second["response_schema"]
+    assert first["system_prompt"] == second["system_prompt"]
+    assert bot.claude_client.usage_label in ("seller", "buyer")
+
+
+@pytest.mark.asyncio
+async def test_cache_usage_is_reported_per_label() -> None:
+    prompt_cache_stats.reset()
+    await _client("seller", written=900).agenerate(prompt="a", system_prompt="s", history=HISTORY)
+    await _client("seller", read=900).agenerate(prompt="b", system_prompt="s", history=HISTORY)
+    await _client("buyer").agenerate(prompt="c", system_prompt="s")
+
+    stats = prompt_cache_stats.get_stats()
+    prompt_cache_stats.reset()
+
+    assert stats["seller"]["calls"] == 2
+    assert stats["seller"]["cache_read_input_tokens"] == 900
+    assert stats["seller"]["cache_creation_input_tokens"] == 900
+    assert stats["seller"]["cache_hit_rate"] == 45.0  # 900 / (200 + 900 + 900)
+    assert stats["seller"]["saved_input_tokens"] == 585  # 900 * 0.9 - 900 * 0.25
+    assert stats["buyer"]["cache_hit_rate"] == 0.0
+
+
+def test_stats_ignore_missing_usage_fields() -> None:
+    stats = PromptCacheStats()
+    stats.record("lead", MagicMock(input_tokens=50, cache_read_input_tokens=None))
+
+    totals = stats.get_stats()["lead"]
+    assert totals["input_tokens"] == 50
+    assert totals["cache_read_input_tokens"] == totals["cache_creation_input_tokens"] == 0
@@ -0,0 +1,186 @@
+"""Redis Cluster mode: hash-tagged contact keys and per-slot routing."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from bots.buyer_bot.buyer_bot import state_key as buyer_state_key
+from bots.seller_bot.jorge_seller_bot import state_key as seller_state_key
+from bots.shared import cache_service as cache_module
+from bots.shared.cache_service import _ADMIT_CONTACT_LUA, _TAKE_TOKENS_LUA, RedisCache
+from bots.shared.config import settings
+from bots.shared.message_coalescer import buffer_key
+from bots.shared.redis_connection import key_slot
+from bots.shared.token_bucket import BucketSpec, refill
+from bots.shared.webhook_admission import admission_keys
+
+SLOTS = 16384
+
+
+class CrossSlotError(Exception):
+    pass
+
+
+class StandInCluster:
+    """Three in-process "nodes" owning a third of the slots each.
+
+    Implements the slice of the redis-py cluster client RedisCache uses in
+    cluster mode.  Multi-key commands and scripts whose keys span slots
+    fail with CROSSSLOT, as on a real cluster.
+    """
+
+    def __init__(self, nodes: int = 3) -> None:
+        self.nodes = [dict() for _ in range(nodes)]
+        self.routed: dict[str, int] = {}
+
+    def _node(self, key) -> dict:
+        key = key.decode() if isinstance(key, bytes) else key
+        index = key_slot(key) * len(self.nodes) // SLOTS
+        self.routed[key] = index
+        return self.nodes[index]
+
+    @staticmethod
+    def _one_slot(keys) -> None:
+        if len({key_slot(k) for k in keys}) > 1:
+            raise CrossSlotError("CROSSSLOT Keys in request don't hash to the same slot")
+
+    def _live(self, key):
+        entry = self._node(key).get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    async def get(self, key):
+        return self._live(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._live(key) is not None:
+            return None
+        self._node(key)[key] = (value, time.time() + (ex or 10**9))
+        return True
+
+    async def mget(self, keys):
+        self._one_slot(keys)
+        return [self._live(k) for k in keys]
+
+    async def mget_nonatomic(self, keys):
+        return [self._live(k) for k in keys]
+
+    def register_script(self, lua):
+        async def run(keys, args):
+            self._one_slot(keys)
+            if lua == _TAKE_TOKENS_LUA:
+                return await self._take_tokens(keys[0], *args)
+            if lua == _ADMIT_CONTACT_LUA:
+                return await self._admit_contact(keys, *args)
+            raise AssertionError("script not expected in cluster mode")
+
+        return run
+
+    async def _take_tokens(self, key, capacity, rate, now, ttl, cost):
+        spec = BucketSpec(capacity=capacity, refill_per_second=rate)
+        tokens = refill(await self.get(key), spec, now)
+        if tokens < cost:
+            return [0, str(tokens)]
+        await self.set(key, {"tokens": tokens - cost, "ts": now}, ex=ttl)
+        return [1, str(tokens - cost)]
+
+    async def _admit_contact(self, keys, dedup_value, dedup_ttl, token, lock_ttl, bot, assigned_ttl):
+        dedup, lock, assigned = keys
+        if not await self.set(dedup, dedup_value, ex=dedup_ttl, nx=True):
+            return [2, b""]
+        if not token or not await self.set(lock, token, ex=lock_ttl, nx=True):
+            return [0, b""]
+        if bot:
+            await self.set(assigned, bot, ex=assigned_ttl)
+            return [3, bot]
+        return [3, await self.get(assigned) or b""]
+
+
+@pytest.fixture
+def cluster(monkeypatch):
+    monkeypatch.setattr(settings, "redis_cluster_enabled", True)
+    stand_in = StandInCluster()
+    monkeypatch.setattr(cache_module, "create_redis_client", lambda url: stand_in)
+    return stand_in, RedisCache("redis://seed:6379/0")
+
+
+def test_contact_keys_share_one_slot_in_cluster_mode(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "redis_cluster_enabled", True)
+    keys = admission_keys("contact_42", "msg-hash", "loc_1")
+    contact_keys = [keys.dedup, keys.lock, keys.assigned, seller_state_key("contact_42"),
+                    buyer_state_key("contact_42"), buffer_key("contact_42")]
+
+    assert len({key_slot(k) for k in contact_keys}) == 1
+    assert keys.lock == "lock:{contact_42}"
+    assert key_slot(seller_state_key("contact_42")) != key_slot(seller_state_key("contact_43"))
+
+
+def test_single_node_keys_are_unchanged(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "redis_cluster_enabled", False)
+
+    assert seller_state_key("c1") == "seller:state:c1"
+    assert admission_keys("c1", "h").assigned == "assigned_bot:c1"
+
+
+@pytest.mark.asyncio
+async def test_admission_splits_location_and_contact_slots(cluster) -> None:
+    stand_in, cache = cluster
+    bucket = BucketSpec(capacity=2, refill_per_second=0.001)
+    first = admission_keys("contact_1", "h1", "loc_1")
+    assert key_slot(first.rate) != key_slot(first.lock)
+
+    admitted = await cache.admit_webhook(first, bucket, "seller", lock_token="t1")
+    duplicate = await cache.admit_webhook(first, bucket, "seller", lock_token="t2")
+    throttled = await cache.admit_webhook(admission_keys("contact_2", "h2", "loc_1"), bucket, "", "t3")
+
+    assert admitted.lock_acquired and admitted.bot_type == "seller"
+    assert duplicate.duplicate
+    assert throttled.throttled
+    assert stand_in.routed[first.dedup] == stand_in.routed[first.lock] == stand_in.routed[first.assigned]
+    assert await cache.get(first.assigned) == "seller"
+
+
+@pytest.mark.asyncio
+async def test_get_many_reads_keys_from_every_node(cluster) -> None:
+    stand_in, cache = cluster
+    keys = [seller_state_key(f"contact_{i}") for i in range(30)]
+    for i, key in enumerate(keys):
+        await cache.set(key, {"q": i}, ttl=60)
+
+    assert len({stand_in.routed[k] for k in keys}) == 3
+    found = await cache.get_many(keys + [seller_state_key("missing")])
+
+    assert found == {key: {"q": i} for i, key in enumerate(keys)}
+
+
+class StandInPubSub:
+    def __init__(self) -> None:
+        self.channels: list[str] = []
+
+    async def subscribe(self, *channels: str) -> None:
+        self.channels.extend(channels)
+
+    async def listen(self):
+        yield {"type": "message", "data": b"hello"}
+
+
+@pytest.mark.asyncio
+async def test_subscribe_uses_a_single_node_client_in_cluster_mode(monkeypatch) -> None:
+    import redis.asyncio as redis
+    from redis.asyncio.cluster import RedisCluster
+
+    monkeypatch.setattr(settings, "redis_cluster_enabled", True)
+    cache = RedisCache("redis://seed:6379/0")
+    assert isinstance(cache.redis, RedisCluster) and not hasattr(cache.redis, "pubsub")
+    assert type(cache._pubsub_redis) is redis.Redis
+    assert cache._pubsub_redis.connection_pool.connection_kwargs["host"] == "seed"
+
+    pubsub = StandInPubSub()
+    monkeypatch.setattr(cache._pubsub_redis, "pubsub", lambda **kwargs: pubsub)
+    subscription = await cache.subscribe("near:invalidate")
+
+    assert pubsub.channels == ["near:invalidate"]
+    assert await subscription.__anext__() == "hello"
@@ -0,0 +1,138 @@
+"""SMS replies: channel token caps and early-stopping streams."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from bots.seller_bot.jorge_seller_bot import TURN_SCHEMA, JorgeSellerBot, SellerQualificationState
+from bots.shared.claude_client import (
+    ClaudeClient,
+    _sms_stop_index,
+    channel_max_tokens,
+    structured_overhead_tokens,
+)
+from bots.shared.config import settings
+
+SENTENCE = "Got it, thanks for sharing that with me. "  # 41 chars
+
+
+class _Stream:
+    """``messages.stream`` context manager yielding ``chunks``."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+        usage = SimpleNamespace(input_tokens=120, output_tokens=1, cache_creation_input_tokens=0,
+                                cache_read_input_tokens=0)
+        self.current_message_snapshot = SimpleNamespace(usage=usage, stop_reason="end_turn")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+
+
+def _client(stream: _Stream) -> ClaudeClient:
+    client = ClaudeClient(api_key="test-key")
+    client._async_client = SimpleNamespace(messages=SimpleNamespace(stream=MagicMock(return_value=stream)))
+    return client
+
+
+def test_stop_index_prefers_the_first_sentence_end_past_the_budget() -> None:
+    text = "Short one. " + "x" * 30 + ". And more"
+    assert _sms_stop_index(text, soft_chars=20) == len("Short one. " + "x" * 30 + ".")
+    assert _sms_stop_index("Short one. Still going", soft_chars=20) is None
+    # At the hard limit: back to the last sentence, or the limit itself
+    assert _sms_stop_index("One. " + "y" * 60, soft_chars=100, hard_chars=50) == 4
+    assert _sms_stop_index("z" * 60, soft_chars=100, hard_chars=50) == 50
+
+
+def test_channel_caps_max_tokens() -> None:
+    assert channel_max_tokens("sms", 2048) == 160
+    assert channel_max_tokens("sms", 100) == 100
+    assert channel_max_tokens("email", 2048) == 2048
+
+
+def test_structured_cap_grows_with_the_schema() -> None:
+    small = {"properties": {"message": {"type": "string"}, "ok": {"type": "boolean"}}}
+    large = {"properties": {
+        "message": {"type": "string"},
+        **{f"field_{i}": {"type": ["string", "null"]} for i in range(8)},
+        "motivation": {"type": ["string", "null"], "enum": ["medical_emergency", None]},
+    }}
+
+    assert 160 < channel_max_tokens("sms", 2048, schema=small) < channel_max_tokens("sms", 2048, schema=large)
+    assert structured_overhead_tokens(large) > 8 * 24
+
+
+@pytest.mark.asyncio
+async def test_truncated_structured_sms_turn_falls_back() -> None:
+    bot = JorgeSellerBot()
+    state = SellerQualificationState(contact_id="c1", location_id="loc1", current_question=1)
+    response = MagicMock()
+    response.content = [SimpleNamespace(type="tool_use", name="respond", input={"message": "Got it, and"})]
+    response.usage.cache_creation_input_tokens = 0
+    response.usage.cache_read_input_tokens = 0
+    response.stop_reason = "max_tokens"
+    bot.claude_client._async_client = AsyncMock()
+    bot.claude_client._async_client.messages.create = AsyncMock(return_value=response)
+
+    with patch.object(settings, "claude_structured_turns", True):
+        result = await bot._generate_response(state, "it needs a new roof")
+
+    request = bot.claude_client._async_client.messages.create.call_args[1]
+    assert request["max_tokens"] == channel_max_tokens("sms", 500, schema=TURN_SCHEMA)
+    assert result["message"].endswith(bot._questions[2])
+
+
+@pytest.mark.asyncio
+async def test_sms_reply_stops_streaming_at_a_sentence_past_the_budget() -> None:
+    stream = _Stream([SENTENCE] * 20)
+    client = _client(stream)
+
+    with patch.object(settings, "sms_reply_char_budget", 100):
+        response = await client.agenerate(prompt="It needs a roof", system_prompt="You are Jorge.", channel="sms")
+
+    assert stream.sent == 3
+    assert response.content == (SENTENCE * 3).rstrip()
+    assert response.finish_reason == "sms_budget"
+    assert response.input_tokens == 120
+    assert client._async_client.messages.stream.call_args[1]["max_tokens"] == 160
+
+
+@pytest.mark.asyncio
+async def test_short_sms_reply_streams_to_the_end() -> None:
+    stream = _Stream(["Perfect. ", "Are you pre-approved?"])
+
+    response = await _client(stream).agenerate(prompt="3 beds in Upland", channel="sms")
+
+    assert response.content == "Perfect. Are you pre-approved?"
+    assert response.finish_reason == "end_turn"
+
+
+@pytest.mark.asyncio
+async def test_structured_sms_turn_is_capped_but_not_streamed() -> None:
+    client = ClaudeClient(api_key="test-key")
+    response = MagicMock()
+    response.content = [SimpleNamespace(type="tool_use", name="respond", input={"message": "Got it."})]
+    response.usage.input_tokens = 100
+    response.usage.output_tokens = 20
+    response.stop_reason = "tool_use"
+    client._async_client = AsyncMock()
+    client._async_client.messages.create = AsyncMock(return_value=response)
+
+    result = await client.agenerate(
+        prompt="hi", max_tokens=500, channel="sms",
+        response_schema={"type": "object", "properties": {"message": {"type": "string"}}},
+    )
+
+    assert result.structured == {"message": "Got it."}
+    assert client._async_client.messages.create.call_args[1]["max_tokens"] == 160 + structured_overhead_tokens({"properties": {}})
@@ -0,0 +1,111 @@
+"""Persistent SQLite cache backend for deployments without Redis."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from bots.shared.sqlite_cache import SQLiteCache
+from bots.shared.token_bucket import BucketSpec
+from bots.shared.webhook_admission import admission_keys
+
+STATE_KEY = "seller:state:c1"
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "cache.sqlite3")
+
+
+@pytest.fixture
+def cache(path):
+    cache = SQLiteCache(path, commit_interval_ms=10)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_values_round_trip_and_expire(cache) -> None:
+    state = {"current_question": 2, "answers": {"1": "yes"}, "tags": {"hot"}}
+    await cache.set(STATE_KEY, state, ttl=3600)
+    await cache.set("short", "gone", ttl=-1)
+
+    assert await cache.get(STATE_KEY) == state
+    assert await cache.get("short") is None
+    assert await cache.get_many([STATE_KEY, "short", "missing"]) == {STATE_KEY: state}
+    assert await cache.delete(STATE_KEY)
+    assert not await cache.delete(STATE_KEY)
+
+
+@pytest.mark.asyncio
+async def test_state_survives_a_restart(path) -> None:
+    first = SQLiteCache(path, commit_interval_ms=10_000)
+    await first.set(STATE_KEY, {"current_question": 3}, ttl=3600)
+    await first.sadd("seller:active_contacts", "c1", "c2")
+    first.close()  # shutdown commits the open batch
+
+    second = SQLiteCache(path)
+    try:
+        assert await second.get(STATE_KEY) == {"current_question": 3}
+        assert await second.smembers("seller:active_contacts") == {"c1", "c2"}
+    finally:
+        second.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_are_committed_in_batches(cache, path) -> None:
+    await cache.set_many({f"k{i}": i for i in range(50)}, ttl=60)
+    await cache.set("one-more", 1)
+    assert cache.commits == 0
+
+    await asyncio.sleep(0.05)
+
+    assert cache.commits == 1
+    reader = SQLiteCache(path)
+    try:
+        assert len(await reader.get_many([f"k{i}" for i in range(50)])) == 50
+    finally:
+        reader.close()
+
+
+@pytest.mark.asyncio
+async def test_set_operations(cache) -> None:
+    assert await cache.sadd("active", "c1", "c2", "c2") == 2
+    assert await cache.sadd("active", "c2", "c3") == 1
+    assert await cache.srem("active", "c1", "missing") == 1
+    assert await cache.smembers("active") == {"c2", "c3"}
+    assert await cache.delete_many(["active", "missing"]) == 1
+    assert await cache.smembers("active") == set()
+
+
+@pytest.mark.asyncio
+async def test_sweep_removes_expired_rows(cache) -> None:
+    await cache.set("live", 1, ttl=60)
+    await cache.set_many({"a": 1, "b": 2}, ttl=-1)
+    await cache.sadd("expired-set", "x", ttl=60)
+    cache._conn.execute("UPDATE members SET expires_at = ?", (time.time() - 1,))
+
+    assert cache.sweep() == 3
+    assert cache.get_stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_coordination_ops_match_memory_cache(cache) -> None:
+    assert await cache.increment("counter", 5) == 5
+    assert await cache.increment("counter") == 6
+    assert await cache.acquire_lock("lock:c1", "a")
+    assert not await cache.acquire_lock("lock:c1", "b")
+    assert not await cache.release_lock("lock:c1", "b")
+    assert await cache.release_lock("lock:c1", "a")
+    assert await cache.rpush("burst:c1", "m1", "m2") == 2
+    assert await cache.drain_list("burst:c1", 1) is None
+    assert await cache.drain_list("burst:c1", 2) == ["m1", "m2"]
+
+    keys = admission_keys("c1", "evt1")
+    bucket = BucketSpec.per_minute(60)
+    first = await cache.admit_webhook(keys, bucket, "seller", lock_token="t1")
+    duplicate = await cache.admit_webhook(keys, bucket, "seller", lock_token="t2")
+    assert first.lock_acquired and first.bot_type == "seller"
+    assert duplicate.duplicate
@@ -0,0 +1,171 @@
+"""Structured turns: one Claude call returns the reply and the answer's fields."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from bots.buyer_bot.buyer_bot import BuyerQualificationState, JorgeBuyerBot
+from bots.seller_bot.jorge_seller_bot import JorgeSellerBot, SellerQualificationState
+from bots.shared.claude_client import ClaudeClient, LLMResponse, structured_reply
+from bots.shared.config import settings
+
+
+def _api_response(*blocks) -> MagicMock:
+    response = MagicMock()
+    response.content = list(blocks)
+    response.usage.input_tokens = 300
+    response.usage.output_tokens = 40
+    response.usage.cache_creation_input_tokens = 0
+    response.usage.cache_read_input_tokens = 0
+    response.stop_reason = "tool_use"
+    return response
+
+
+def _tool_call(**fields) -> SimpleNamespace:
+    return SimpleNamespace(type="tool_use", name="respond", input=fields)
+
+
+def _turn(**fields) -> LLMResponse:
+    return LLMResponse(content="", model="claude-test", structured=fields)
+
+
+@pytest.mark.asyncio
+async def test_response_schema_forces_the_tool_and_parses_its_input() -> None:
+    client = ClaudeClient(api_key="test-key")
+    client._async_client = AsyncMock()
+    client._async_client.messages.create = AsyncMock(return_value=_api_response(
+        SimpleNamespace(type="text", text="Sure."), _tool_call(message="Got it.", condition="move_in_ready"),
+    ))
+    schema = {"type": "object", "properties": {"message": {"type": "string"}}, "required": ["message"]}
+
+    response = await client.agenerate(prompt="It was remodeled last year", response_schema=schema)
+
+    request = client._async_client.messages.create.call_args[1]
+    assert request["tool_choice"] == {"type": "tool", "name": "respond"}
+    assert request["tools"][0]["input_schema"] is schema
+    assert response.structured == {"message": "Got it.", "condition": "move_in_ready"}
+    assert structured_reply(response) == ("Got it.", response.structured)
+
+
+@pytest.mark.asyncio
+async def test_missing_tool_call_raises() -> None:
+    client = ClaudeClient(api_key="test-key")
+    client._async_client = AsyncMock()
+    client._async_client.messages.create = AsyncMock(
+        return_value=_api_response(SimpleNamespace(type="text", text="Sure."))
+    )
+
+    with pytest.raises(ValueError):
+        await client.agenerate(prompt="hi", response_schema={"type": "object", "properties": {}})
+
+
+def test_plain_responses_keep_their_text() -> None:
+    assert structured_reply(LLMResponse(content="Hello", model="m")) == ("Hello", None)
+
+
+@pytest.mark.parametrize("response", [
+    _turn(condition="move_in_ready"),
+    _turn(message=None, condition="move_in_ready"),
+    _turn(message="  "),
+    LLMResponse(content='{"message": "Got it, and"}', model="m", finish_reason="max_tokens",
+                structured={"message": "Got it, and"}),
+])
+def test_structured_turn_without_a_message_is_a_failed_turn(response) -> None:
+    with pytest.raises(ValueError):
+        structured_reply(response)
+
+
+@pytest.mark.asyncio
+async def test_seller_falls_back_instead_of_sending_tool_json() -> None:
+    bot = JorgeSellerBot()
+    state = SellerQualificationState(contact_id="c1", location_id="loc1", current_question=1)
+    turn = LLMResponse(content='{"condition": "move_in_ready"}', model="m",
+                       structured={"condition": "move_in_ready"})
+
+    with patch.object(bot.claude_client, "agenerate", AsyncMock(return_value=turn)):
+        result = await bot._generate_response(state, "it's move in ready")
+
+    assert result["message"].endswith(bot._questions[2])
+    assert "{" not in result["message"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("question, message, fields, expected", [
+    (1, "the roof leaks when it rains", {"condition": "needs_major_repairs"},
+     {"condition": "needs_major_repairs"}),
+    (2, "around three fifty", {"price_expectation": 350}, {"price_expectation": 350000}),
+    (2, "depends on the offer", {"price_expectation": None}, {"price_expectation": 300000}),
+    (3, "we want to be near the grandkids", {"motivation": "downsizing"}, {"motivation": "downsizing"}),
+    (4, "let me talk to my wife", {"offer_accepted": True}, {"offer_accepted": True}),
+])
+async def test_seller_turn_makes_one_claude_call(question, message, fields, expected) -> None:
+    bot = JorgeSellerBot()
+    state = SellerQualificationState(contact_id="c1", location_id="loc1", current_question=question)
+    agenerate = AsyncMock(return_value=_turn(message="Thanks, got it.", **fields))
+
+    with patch.object(bot.claude_client, "agenerate", agenerate), \
+            patch.object(settings, "claude_structured_turns", True):
+        result = await bot._generate_response(state, message)
+
+    assert agenerate.await_count == 1
+    schema = agenerate.call_args[1]["response_schema"]
+    assert schema["required"] == ["message"]
+    assert set(fields) <= set(schema["properties"])
+    assert result["message"] == "Thanks, got it."
+    assert expected.items() <= result["extracted_data"].items()
+    assert result["should_advance"] is True
+
+
+@pytest.mark.asyncio
+async def test_seller_keywords_win_over_the_model() -> None:
+    bot = JorgeSellerBot()
+    state = SellerQualificationState(contact_id="c1", location_id="loc1", current_question=1)
+    agenerate = AsyncMock(return_value=_turn(message="Nice.", condition="needs_major_repairs"))
+
+    with patch.object(bot.claude_client, "agenerate", agenerate):
+        result = await bot._generate_response(state, "it's move in ready")
+
+    assert result["extracted_data"]["condition"] == "move_in_ready"
+
+
+@pytest.mark.asyncio
+async def test_seller_without_structured_data_classifies_separately() -> None:
+    bot = JorgeSellerBot()
+    state = SellerQualificationState(contact_id="c1", location_id="loc1", current_question=1)
+    agenerate = AsyncMock(side_effect=[
+        LLMResponse(content="Thanks, got it.", model="m"),
+        LLMResponse(content="needs_major_repairs", model="m"),
+    ])
+
+    with patch.object(bot.claude_client, "agenerate", agenerate), \
+            patch.object(settings, "claude_structured_turns", False):
+        result = await bot._generate_response(state, "the roof leaks when it rains")
+
+    assert agenerate.await_count == 2
+    assert agenerate.call_args_list[0][1]["response_schema"] is None
+    assert result["message"] == "Thanks, got it."
+    assert result["extracted_data"]["condition"] == "needs_major_repairs"
+
+
+@pytest.mark.asyncio
+async def test_buyer_model_fields_fill_keyword_misses() -> None:
+    bot = JorgeBuyerBot()
+    cases = [
+        (1, "something roomy near Upland, maybe four hundred", {
+            "beds_min": 3, "baths_min": None, "sqft_min": None, "price_min": None,
+            "price_max": 400000, "preferred_location": "Upland, CA",
+        }, {"beds_min": 3, "price_max": 400000, "preferred_location": "Upland"}),
+        (2, "my lender signed off last week", {"preapproved": True}, {"preapproved": True}),
+        (3, "once the house sells", {"timeline_days": 120}, {"timeline_days": 120}),
+        (4, "the commute is killing me", {"motivation": "job_relocation"}, {"motivation": "job_relocation"}),
+    ]
+    for question, message, fields, expected in cases:
+        state = BuyerQualificationState(contact_id="c1", location_id="loc1", current_question=question)
+        agenerate = AsyncMock(return_value=_turn(message="Perfect.", **fields))
+        with patch.object(bot.claude_client, "agenerate", agenerate):
+            result = await bot._generate_response(state, message)
+
+        assert agenerate.await_count == 1
+        assert result["message"] == "Perfect."
+        assert expected.items() <= result["extracted_data"].items(), question
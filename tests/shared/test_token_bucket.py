@@ -0,0 +1,97 @@
+"""Tests for the token-bucket rate limiter and per-IP middleware."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from bots.shared.cache_service import MemoryCache
+from bots.shared.config import settings
+from bots.shared.rate_limit_middleware import RateLimitMiddleware
+from bots.shared.token_bucket import (
+    BucketSpec,
+    TokenBucketLimiter,
+    take_tokens_via_get_set,
+    webhook_bucket_for,
+)
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_throttles() -> None:
+    cache = MemoryCache()
+    spec = BucketSpec(capacity=3, refill_per_second=1.0)
+
+    results = [await take_tokens_via_get_set(cache, "b", spec, now=100.0) for _ in range(4)]
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[2].remaining == 0
+    assert results[3].retry_after == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time_without_boundary_burst() -> None:
+    cache = MemoryCache()
+    spec = BucketSpec.per_minute(60)  # 1 token/second, capacity 60
+
+    for _ in range(60):
+        assert (await take_tokens_via_get_set(cache, "b", spec, now=59.9)).allowed
+    # A fixed window would reset at the minute boundary and allow 60 more
+    assert not (await take_tokens_via_get_set(cache, "b", spec, now=60.1)).allowed
+    assert (await take_tokens_via_get_set(cache, "b", spec, now=61.0)).allowed
+
+
+def test_per_location_overrides() -> None:
+    with patch.object(settings, "webhook_rate_overrides", "loc-big:200:120, loc-small:5:10"):
+        assert webhook_bucket_for("loc-big") == BucketSpec(capacity=200, refill_per_second=2.0)
+        assert webhook_bucket_for("loc-small").capacity == 5
+        default = webhook_bucket_for("loc-other")
+    assert default.capacity == settings.rate_limit_per_minute
+
+
+@pytest.mark.asyncio
+async def test_limiter_falls_back_to_local_bucket_on_cache_error() -> None:
+    class BrokenCache:
+        async def take_tokens(self, *args, **kwargs):
+            raise ConnectionError("redis down")
+
+    limiter = TokenBucketLimiter(cache=BrokenCache())
+    spec = BucketSpec(capacity=1, refill_per_second=0.001)
+
+    assert (await limiter.hit("k", spec)).allowed
+    assert not (await limiter.hit("k", spec)).allowed
+
+
+@pytest.mark.asyncio
+async def test_refund_gives_tokens_back_up_to_capacity() -> None:
+    limiter = TokenBucketLimiter(cache=MemoryCache())
+    spec = BucketSpec(capacity=2, refill_per_second=0.001)
+
+    assert (await limiter.hit("k", spec, 2)).allowed
+    await limiter.refund("k", spec)
+    assert (await limiter.hit("k", spec)).allowed
+    await limiter.refund("k", spec, 5)
+    assert (await limiter.hit("k", spec, 0)).remaining == 2
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_429_with_retry_after() -> None:
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        requests_per_minute=2,
+        limiter=TokenBucketLimiter(cache=MemoryCache()),
+    )
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        responses = [await c.get("/ping") for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[0].headers["X-RateLimit-Remaining"] == "1"
+    assert int(responses[2].headers["Retry-After"]) >= 1
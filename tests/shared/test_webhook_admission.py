@@ -0,0 +1,164 @@
+"""Tests for single-call webhook admission (throttle/dedup/lock/assignment)."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from bots.shared.cache_service import CacheService, MemoryCache
+from bots.shared.token_bucket import BucketSpec
+from bots.shared.webhook_admission import admission_keys, admit_stepwise, admit_webhook
+
+
+def _bucket(capacity: int) -> BucketSpec:
+    # Negligible refill so the bucket cannot top up mid-test
+    return BucketSpec(capacity=capacity, refill_per_second=0.001)
+
+
+class CountingCache:
+    """get/set/acquire_lock-only cache that counts round trips."""
+
+    def __init__(self) -> None:
+        self.inner = MemoryCache()
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        return await self.inner.get(key)
+
+    async def set(self, key, value, ttl=300):
+        self.calls += 1
+        return await self.inner.set(key, value, ttl)
+
+    async def acquire_lock(self, key, token, ttl=30):
+        self.calls += 1
+        return await self.inner.acquire_lock(key, token, ttl)
+
+
+@pytest.mark.asyncio
+async def test_first_message_acquires_lock_and_has_no_assignment() -> None:
+    cache = MemoryCache()
+    keys = admission_keys("c1", "h1")
+
+    result = await cache.admit_webhook(keys, _bucket(10), lock_token="t1")
+
+    assert result.lock_acquired is True
+    assert result.bot_type is None
+    assert await cache.get(keys.lock) == "t1"
+    assert await cache.get(keys.dedup) == "1"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_message_is_rejected_before_lock() -> None:
+    cache = MemoryCache()
+    keys = admission_keys("c1", "h1")
+
+    await cache.admit_webhook(keys, _bucket(10), lock_token="t1")
+    await cache.release_lock(keys.lock, "t1")
+    result = await cache.admit_webhook(keys, _bucket(10), lock_token="t2")
+
+    assert result.duplicate is True
+    assert result.lock_acquired is False
+    assert await cache.get(keys.lock) is None
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_throttles_without_touching_dedup() -> None:
+    cache = MemoryCache()
+
+    for i in range(3):
+        keys = admission_keys("c1", f"h{i}")
+        assert not (await cache.admit_webhook(keys, _bucket(3))).throttled
+
+    keys = admission_keys("c1", "h-over")
+    result = await cache.admit_webhook(keys, _bucket(3))
+
+    assert result.throttled is True
+    assert await cache.get(keys.dedup) is None
+
+
+@pytest.mark.asyncio
+async def test_explicit_bot_type_overrides_stored_assignment() -> None:
+    cache = MemoryCache()
+    keys = admission_keys("c1", "h1")
+    await cache.set(keys.assigned, "buyer", ttl=604800)
+
+    result = await cache.admit_webhook(keys, _bucket(10), bot_type="seller", lock_token="t1")
+
+    assert result.bot_type == "seller"
+    assert await cache.get(keys.assigned) == "seller"
+
+
+@pytest.mark.asyncio
+async def test_stored_assignment_returned_when_not_explicit() -> None:
+    cache = MemoryCache()
+    keys = admission_keys("c1", "h1")
+    await cache.set(keys.assigned, "buyer", ttl=604800)
+
+    result = await cache.admit_webhook(keys, _bucket(10), lock_token="t1")
+
+    assert result.bot_type == "buyer"
+
+
+@pytest.mark.asyncio
+async def test_busy_lock_skips_assignment() -> None:
+    cache = MemoryCache()
+    keys = admission_keys("c1", "h1")
+    await cache.acquire_lock(keys.lock, "other", ttl=30)
+
+    result = await cache.admit_webhook(keys, _bucket(10), bot_type="seller", lock_token="t1")
+
+    assert result.lock_acquired is False
+    assert await cache.get(keys.assigned) is None
+
+
+@pytest.mark.asyncio
+async def test_plain_cache_uses_stepwise_path() -> None:
+    cache = CountingCache()
+
+    result = await admit_webhook(cache, "c1", "h1", bot_type="seller", lock_token="t1")
+
+    assert result.lock_acquired is True
+    assert result.bot_type == "seller"
+    # rate get+set, dedup get+set, lock, assignment set
+    assert cache.calls == 6
+
+
+@pytest.mark.asyncio
+async def test_stepwise_and_memory_backend_agree() -> None:
+    stepwise_cache = CountingCache()
+    memory_cache = MemoryCache()
+    keys = admission_keys("c1", "h1")
+
+    a = await admit_stepwise(stepwise_cache, keys, _bucket(10), "buyer", "t1")
+    b = await memory_cache.admit_webhook(keys, _bucket(10), "buyer", "t1")
+
+    assert a == b
+
+
+@pytest.mark.asyncio
+async def test_cache_service_falls_back_to_memory_on_backend_error() -> None:
+    service = object.__new__(CacheService)
+    service.fallback_backend = MemoryCache()
+    service.backend = AsyncMock()
+    service.backend.admit_webhook = AsyncMock(side_effect=ConnectionError("redis down"))
+    keys = admission_keys("c1", "h1")
+
+    result = await service.admit_webhook(keys, _bucket(10), "", "t1")
+
+    assert result.lock_acquired is True
+    assert await service.fallback_backend.get(keys.lock) == "t1"
+
+
+@pytest.mark.asyncio
+async def test_rate_buckets_are_per_location() -> None:
+    cache = MemoryCache()
+
+    noisy = admission_keys("c1", "h1", location_id="loc-noisy")
+    assert not (await cache.admit_webhook(noisy, _bucket(1))).throttled
+    noisy_again = admission_keys("c1", "h2", location_id="loc-noisy")
+    assert (await cache.admit_webhook(noisy_again, _bucket(1))).throttled
+
+    quiet = admission_keys("c2", "h1", location_id="loc-quiet")
+    assert not (await cache.admit_webhook(quiet, _bucket(1))).throttled
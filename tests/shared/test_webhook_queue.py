@@ -0,0 +1,183 @@
+"""Tests for the fast-ack webhook job queue and worker pool."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bots.shared.webhook_queue import SQLiteJobQueue, WebhookJob, WebhookWorkerPool
+
+
+def _job(contact_id: str, message: str) -> WebhookJob:
+    return WebhookJob(contact_id=contact_id, location_id="loc", message=message)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_queue_round_trip() -> None:
+    queue = SQLiteJobQueue()
+    await queue.initialize()
+
+    await queue.enqueue(_job("c1", "one"))
+    await queue.enqueue(_job("c1", "two"))
+    entries = await queue.read(count=10, block_ms=0)
+
+    assert [job.message for _, job in entries] == ["one", "two"]
+    assert await queue.read(count=10, block_ms=0) == []
+    assert await queue.pending() == 2
+
+    for entry_id, _ in entries:
+        await queue.ack(entry_id)
+    assert await queue.pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_sqlite_queue_requeues_in_flight_jobs_after_restart(tmp_path) -> None:
+    path = str(tmp_path / "jobs.sqlite3")
+    queue = SQLiteJobQueue(path)
+    await queue.initialize()
+    await queue.enqueue(_job("c1", "crashed mid-flight"))
+    assert len(await queue.read(count=10, block_ms=0)) == 1
+    await queue.close()
+
+    restarted = SQLiteJobQueue(path)
+    await restarted.initialize()
+    entries = await restarted.read(count=10, block_ms=0)
+
+    assert [job.message for _, job in entries] == ["crashed mid-flight"]
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_read_wakes_on_enqueue() -> None:
+    queue = SQLiteJobQueue()
+    await queue.initialize()
+
+    reader = asyncio.create_task(queue.read(count=1, block_ms=2000))
+    await asyncio.sleep(0.01)
+    await queue.enqueue(_job("c1", "hello"))
+
+    entries = await asyncio.wait_for(reader, timeout=1)
+    assert entries[0][1].message == "hello"
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_preserves_per_contact_order() -> None:
+    queue = SQLiteJobQueue()
+    await queue.initialize()
+    handled: dict[str, list[str]] = {}
+
+    async def handler(job: WebhookJob) -> None:
+        await asyncio.sleep(0.001)
+        handled.setdefault(job.contact_id, []).append(job.message)
+
+    for i in range(10):
+        for contact in ("a", "b", "c"):
+            await queue.enqueue(_job(contact, str(i)))
+
+    pool = WebhookWorkerPool(queue, handler, workers=3, max_attempts=1, retry_backoff_seconds=0)
+    await pool.start()
+    for _ in range(100):
+        if pool.processed == 30:
+            break
+        await asyncio.sleep(0.02)
+    await pool.stop()
+
+    assert pool.processed == 30
+    for contact in ("a", "b", "c"):
+        assert handled[contact] == [str(i) for i in range(10)]
+    assert await queue.pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_retries_then_dead_letters() -> None:
+    queue = SQLiteJobQueue()
+    await queue.initialize()
+    attempts: list[int] = []
+
+    async def handler(job: WebhookJob) -> None:
+        attempts.append(job.attempts)
+        raise RuntimeError("claude down")
+
+    await queue.enqueue(_job("c1", "doomed"))
+    pool = WebhookWorkerPool(queue, handler, workers=1, max_attempts=3, retry_backoff_seconds=0)
+    await pool.start()
+    for _ in range(100):
+        if pool.dead_lettered:
+            break
+        await asyncio.sleep(0.01)
+    await pool.stop()
+
+    assert attempts == [1, 2, 3]
+    assert pool.retried == 2
+    dead = await queue.dead_letters()
+    assert len(dead) == 1
+    assert dead[0]["error"] == "claude down"
+    assert await queue.pending() == 0
+
+
+class _StrandedQueue(SQLiteJobQueue):
+    """SQLite queue plus one job stranded by a dead consumer, handed over on reclaim."""
+
+    def __init__(self, stranded: WebhookJob) -> None:
+        super().__init__()
+        self.stranded = [("stranded-1", stranded)]
+        self.reclaimed: list = []
+        self.reclaims = 0
+        self.acked: list[str] = []
+
+    async def reclaim(self) -> int:
+        self.reclaims += 1
+        claimed, self.stranded = self.stranded, []
+        self.reclaimed.extend(claimed)
+        return len(claimed)
+
+    async def read(self, count: int, block_ms: int):
+        reclaimed, self.reclaimed = self.reclaimed, []
+        return reclaimed or await super().read(count, block_ms=min(block_ms, 20))
+
+    async def ack(self, entry_id: str) -> None:
+        self.acked.append(entry_id)
+        if entry_id != "stranded-1":
+            await super().ack(entry_id)
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_reclaims_stranded_jobs_periodically() -> None:
+    queue = _StrandedQueue(_job("c1", "left by a crashed worker"))
+    await queue.initialize()
+    handled: list[str] = []
+
+    async def handler(job: WebhookJob) -> None:
+        handled.append(job.message)
+
+    pool = WebhookWorkerPool(
+        queue, handler, workers=1, max_attempts=1, retry_backoff_seconds=0, reclaim_interval_seconds=0.01,
+    )
+    await pool.start()
+    for _ in range(100):
+        if handled and queue.reclaims > 1:
+            break
+        await asyncio.sleep(0.01)
+    await pool.stop()
+
+    assert handled == ["left by a crashed worker"]
+    assert queue.acked == ["stranded-1"]
+    assert (await pool.get_metrics())["reclaimed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_fallback_is_durable_by_default(tmp_path, monkeypatch) -> None:
+    from bots.shared.config import settings
+    from bots.shared.webhook_queue import create_webhook_queue
+
+    assert settings.webhook_queue_sqlite_path != ":memory:"
+    path = tmp_path / "data" / "jobs.sqlite3"
+    monkeypatch.setattr(settings, "webhook_queue_backend", "sqlite")
+    monkeypatch.setattr(settings, "webhook_queue_sqlite_path", str(path))
+
+    queue = await create_webhook_queue()
+    await queue.enqueue(_job("c1", "survives a restart"))
+    await queue.close()
+
+    assert path.exists()
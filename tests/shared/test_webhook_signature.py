@@ -0,0 +1,123 @@
+"""Tests for the cached, rotation-aware webhook signature verifier."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+
+import pytest
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from bots.shared.config import settings
+from bots.shared.webhook_signature import WebhookSignatureVerifier
+
+PAYLOAD = b'{"contactId": "c1", "message": "hello"}'
+
+
+def _keypair():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_key, pem
+
+
+def _rsa_sign(private_key, payload: bytes = PAYLOAD) -> str:
+    return base64.b64encode(private_key.sign(payload, padding.PKCS1v15(), hashes.SHA256())).decode()
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return _keypair(), _keypair()
+
+
+@pytest.fixture
+def webhook_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ghl_webhook_public_key", None)
+    monkeypatch.setattr(settings, "ghl_webhook_secret", None)
+    monkeypatch.setattr(settings, "ghl_webhook_previous_secret", None)
+    return settings
+
+
+def test_pass_through_when_nothing_configured(webhook_settings) -> None:
+    assert WebhookSignatureVerifier().verify_sync(PAYLOAD, None) is True
+
+
+def test_rsa_key_is_parsed_once(webhook_settings, keys) -> None:
+    (private_key, pem), _ = keys
+    webhook_settings.ghl_webhook_public_key = pem
+    verifier = WebhookSignatureVerifier()
+
+    for _ in range(3):
+        assert verifier.verify_sync(PAYLOAD, _rsa_sign(private_key)) is True
+
+    assert verifier.key_reloads == 1
+    assert verifier.verify_sync(PAYLOAD, None) is False
+    assert verifier.verify_sync(b"tampered", _rsa_sign(private_key)) is False
+
+
+def test_rotation_accepts_old_and_new_keys(webhook_settings, keys) -> None:
+    (old_private, old_pem), (new_private, new_pem) = keys
+    webhook_settings.ghl_webhook_public_key = old_pem
+    verifier = WebhookSignatureVerifier()
+    assert verifier.verify_sync(PAYLOAD, _rsa_sign(old_private)) is True
+    assert verifier.verify_sync(PAYLOAD, _rsa_sign(new_private)) is False
+
+    # Rotation window: both keys configured
+    webhook_settings.ghl_webhook_public_key = old_pem + new_pem
+    assert verifier.verify_sync(PAYLOAD, _rsa_sign(new_private)) is True
+    assert verifier.verify_sync(PAYLOAD, _rsa_sign(old_private)) is True
+    assert verifier.get_metrics()["public_keys"] == 2
+
+    # Old key retired
+    webhook_settings.ghl_webhook_public_key = new_pem
+    assert verifier.verify_sync(PAYLOAD, _rsa_sign(old_private)) is False
+    assert verifier.key_reloads == 3
+
+
+def test_hmac_hex_and_base64_with_previous_secret(webhook_settings) -> None:
+    webhook_settings.ghl_webhook_secret = "new-secret"
+    webhook_settings.ghl_webhook_previous_secret = "old-secret"
+    verifier = WebhookSignatureVerifier()
+
+    new_digest = hmac.new(b"new-secret", PAYLOAD, hashlib.sha256).digest()
+    old_digest = hmac.new(b"old-secret", PAYLOAD, hashlib.sha256).digest()
+
+    assert verifier.verify_sync(PAYLOAD, "sha256=" + new_digest.hex()) is True
+    assert verifier.verify_sync(PAYLOAD, base64.b64encode(new_digest).decode()) is True
+    assert verifier.verify_sync(PAYLOAD, old_digest.hex()) is True
+    assert verifier.verify_sync(PAYLOAD, "deadbeef") is False
+    assert verifier.verify_sync(PAYLOAD, None) is False
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_are_verified_off_loop(webhook_settings, keys) -> None:
+    (private_key, pem), _ = keys
+    webhook_settings.ghl_webhook_public_key = pem
+    verifier = WebhookSignatureVerifier(offload_bytes=1024)
+    big = b"x" * 4096
+
+    assert await verifier.verify(PAYLOAD, _rsa_sign(private_key)) is True
+    assert await verifier.verify(big, _rsa_sign(private_key, big)) is True
+
+    metrics = verifier.get_metrics()
+    assert metrics["offloaded"] == 1
+    assert metrics["accepted"] == 2
+    assert metrics["latency_ms"]["count"] == 2
+    verifier.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_bursts_above_rate_are_offloaded(webhook_settings, keys) -> None:
+    (private_key, pem), _ = keys
+    webhook_settings.ghl_webhook_public_key = pem
+    verifier = WebhookSignatureVerifier(offload_per_second=2)
+    signature = _rsa_sign(private_key)
+
+    for _ in range(4):
+        assert await verifier.verify(PAYLOAD, signature) is True
+
+    assert verifier.get_metrics()["offloaded"] == 2
+    verifier.shutdown()
@@ -191,6 +191,7 @@ class TestSellerBotE2EFlow:
         cal_service = CalendarBookingService(mock_ghl)
         cal_service.calendar_id = "cal-test-123"
         cal_service._pending_slots["e2e-seller-003"] = MOCK_SLOTS
+        await cal_service._store_pending_slots("e2e-seller-003", MOCK_SLOTS)
 
         # Detect "the first one" → slot 0
         idx = cal_service.detect_slot_selection("the first one", "e2e-seller-003")
@@ -332,6 +333,7 @@ class TestBuyerBotE2EFlow:
         cal_service = CalendarBookingService(mock_ghl)
         cal_service.calendar_id = "cal-test-123"
         cal_service._pending_slots["e2e-buyer-003"] = MOCK_SLOTS
+        await cal_service._store_pending_slots("e2e-buyer-003", MOCK_SLOTS)
 
         # "Tuesday works" should match MOCK_SLOTS[0] (Tuesday Mar 10th at 10am)
         idx = cal_service.detect_slot_selection("Tuesday works", "e2e-buyer-003")
@@ -45,7 +45,7 @@ async def test_unified_webhook_accepts_valid_signature_and_processes(client: Asy
     payload = {"contactId": "c1", "message": "hello", "bot_type": "lead"}
 
     mock_analyzer = AsyncMock(return_value=({"score": 80, "temperature": "hot", "jorge_priority": "high"}, object()))
-    monkeypatch.setattr(lead_main, "verify_ghl_signature", lambda *_args, **_kwargs: True)
+    monkeypatch.setattr(lead_main, "verify_ghl_signature", AsyncMock(return_value=True))
     monkeypatch.setattr(lead_main, "lead_analyzer", type("MockAnalyzer", (), {"analyze_lead": mock_analyzer})())
 
     response = await client.post(
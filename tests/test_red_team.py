@@ -38,6 +38,7 @@ from bots.seller_bot.jorge_seller_bot import (
     SellerQualificationState,
     SellerResult,
 )
+from bots.shared.shared_counters import SharedCounters
 
 # ---------------------------------------------------------------------------
 # Shared helpers (mirrors test_prospect_personas.py)
@@ -60,6 +61,18 @@ class MockCache:
     async def delete(self, key):
         self.store.pop(key, None)
 
+    async def acquire_lock(self, key, token, ttl=None):
+        if key in self.store:
+            return False
+        self.store[key] = token
+        return True
+
+    async def release_lock(self, key, token):
+        if self.store.get(key) != token:
+            return False
+        del self.store[key]
+        return True
+
 
 MOCK_SLOTS = [
     {
@@ -233,13 +246,13 @@ def _make_webhook_state(
     )
 
     state = MagicMock()
-    state.verify_ghl_signature = MagicMock(return_value=signature_ok)
+    state.verify_ghl_signature = AsyncMock(return_value=signature_ok)
     state._webhook_cache = cache if cache is not None else MockCache()
     state.seller_bot_instance = mock_seller
     state.buyer_bot_instance = mock_buyer
     state.lead_analyzer = mock_lead
     state._ghl_client = mock_ghl
-    state.performance_stats = {"total_requests": 0, "cache_hits": 0}
+    state.performance_stats = SharedCounters("lead_bot:stats", ["total_requests", "cache_hits"], cache=state._webhook_cache)
     return state
 
 
@@ -1342,6 +1355,18 @@ class TestWebhookAdminSecurity:
 
     # --- Webhook signature tests ---
 
+    @pytest.mark.asyncio
+    async def test_admin_cache_stats_no_auth(self):
+        """9.3b — GET /admin/cache/stats with no token should return 401."""
+        app = _admin_app()
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get("/admin/cache/stats?profile=true")
+        assert response.status_code == 401, (
+            "Cache key-space stats should require authentication"
+        )
+
     @pytest.mark.asyncio
     async def test_webhook_no_signature_passthrough(self):
         """9.4 — No signature + no secret configured: webhook passes through (known behavior)."""
@@ -5,6 +5,7 @@ Tests call the FastAPI route handler directly via httpx AsyncClient + ASGITransp
 with _get_state() patched to a mock state object.  No Redis or GHL API calls.
 """
 
+import asyncio
 import json
 from typing import Any, Dict, List, Optional
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -16,6 +17,10 @@ from httpx import ASGITransport, AsyncClient
 from bots.buyer_bot.buyer_bot import BuyerResult
 from bots.lead_bot.routes_webhook import router
 from bots.seller_bot.jorge_seller_bot import SellerResult
+from bots.shared.shared_counters import SharedCounters
+
+# Captured before the autouse fixture makes asyncio.sleep instant
+_real_sleep = asyncio.sleep
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -35,6 +40,18 @@ class MockCache:
     async def delete(self, key: str) -> None:
         self._store.pop(key, None)
 
+    async def acquire_lock(self, key: str, token: str, ttl: int = 0) -> bool:
+        if key in self._store:
+            return False
+        self._store[key] = token
+        return True
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        if self._store.get(key) != token:
+            return False
+        del self._store[key]
+        return True
+
 
 def _seller_result(temperature: str = "cold", **kwargs) -> SellerResult:
     tag_actions: List[Dict] = [
@@ -110,13 +127,13 @@ def _make_state(
     )
 
     state = MagicMock()
-    state.verify_ghl_signature = MagicMock(return_value=True)
+    state.verify_ghl_signature = AsyncMock(return_value=True)
     state._webhook_cache = cache if cache is not None else MockCache()
     state.seller_bot_instance = mock_seller
     state.buyer_bot_instance = mock_buyer
     state.lead_analyzer = mock_lead
     state._ghl_client = mock_ghl
-    state.performance_stats = {"total_requests": 0, "cache_hits": 0}
+    state.performance_stats = SharedCounters("lead_bot:stats", ["total_requests", "cache_hits"], cache=state._webhook_cache)
 
     return state, mock_seller, mock_buyer, mock_ghl, mock_lead
 
@@ -339,3 +356,181 @@ class TestDeferredTags:
         mock_deferred.assert_awaited_once()
         _, _, tag_actions = mock_deferred.call_args.args
         assert any(a["type"] == "add_tag" for a in tag_actions)
+
+
+# ---------------------------------------------------------------------------
+# Fast-ack mode — enqueue and return, worker runs the bot
+# ---------------------------------------------------------------------------
+
+
+class TestFastAckMode:
+    @pytest.mark.asyncio
+    async def test_fast_ack_enqueues_without_running_bot(self, app):
+        from bots.shared.webhook_queue import SQLiteJobQueue
+
+        queue = SQLiteJobQueue()
+        await queue.initialize()
+        state, mock_seller, _, mock_ghl, _ = _make_state()
+        state._webhook_queue = queue
+
+        with (
+            patch("bots.lead_bot.routes_webhook._get_state", return_value=state),
+            patch("bots.lead_bot.routes_webhook.settings.webhook_fast_ack", True),
+        ):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+                r = await c.post(
+                    "/api/ghl/webhook",
+                    content=_body(bot_type="seller", contact_id="fast-s"),
+                    headers={"Content-Type": "application/json"},
+                )
+                dup = await c.post(
+                    "/api/ghl/webhook",
+                    content=_body(bot_type="seller", contact_id="fast-s"),
+                    headers={"Content-Type": "application/json"},
+                )
+
+        assert r.status_code == 200
+        assert r.json()["status"] == "queued"
+        assert dup.json()["reason"] == "duplicate"
+        mock_seller.process_seller_message.assert_not_awaited()
+        mock_ghl.send_message.assert_not_awaited()
+        entries = await queue.read(count=10, block_ms=0)
+        assert [job.contact_id for _, job in entries] == ["fast-s"]
+        assert entries[0][1].bot_type == "seller"
+
+    @pytest.mark.asyncio
+    async def test_worker_handler_runs_bot_and_sends_reply(self):
+        from bots.lead_bot.routes_webhook import process_queued_webhook
+        from bots.shared.webhook_queue import WebhookJob
+
+        cache = MockCache()
+        state, mock_seller, _, mock_ghl, _ = _make_state(cache=cache)
+        job = WebhookJob(contact_id="fast-w", location_id="loc-test", message="hi", bot_type="seller")
+
+        with patch("bots.lead_bot.routes_webhook._get_state", return_value=state):
+            result = await process_queued_webhook(job)
+
+        assert result["bot_type"] == "seller"
+        mock_seller.process_seller_message.assert_awaited_once()
+        mock_ghl.send_message.assert_awaited_once()
+        assert await cache.get("assigned_bot:fast-w") == "seller"
+        assert await cache.get("lock:fast-w") is None
+
+    @pytest.mark.asyncio
+    async def test_worker_handler_raises_when_bot_unavailable(self):
+        from bots.lead_bot.routes_webhook import process_queued_webhook
+        from bots.shared.webhook_queue import WebhookJob
+
+        state, _, _, _, _ = _make_state()
+        state.seller_bot_instance = None
+        job = WebhookJob(contact_id="fast-x", location_id="loc-test", message="hi", bot_type="seller")
+
+        with patch("bots.lead_bot.routes_webhook._get_state", return_value=state):
+            with pytest.raises(RuntimeError, match="seller bot unavailable"):
+                await process_queued_webhook(job)
+
+
+# ---------------------------------------------------------------------------
+# Message coalescing — a burst of texts costs one bot turn
+# ---------------------------------------------------------------------------
+
+
+class TestMessageCoalescing:
+    @pytest.mark.asyncio
+    async def test_burst_runs_seller_bot_once_with_merged_text(self, app):
+        from bots.shared.cache_service import MemoryCache
+        from bots.shared.message_coalescer import MessageCoalescer
+
+        state, mock_seller, _, mock_ghl, _ = _make_state(cache=MemoryCache())
+
+        with (
+            patch("bots.lead_bot.routes_webhook._get_state", return_value=state),
+            # The coalescing window needs a real sleep
+            patch("asyncio.sleep", new=_real_sleep),
+            patch("bots.lead_bot.routes_webhook._deferred_tag_apply", new=AsyncMock()),
+            patch(
+                "bots.lead_bot.routes_webhook.message_coalescer",
+                new=MessageCoalescer(window_ms=50),
+            ),
+        ):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+                async def post(text: str):
+                    return await c.post(
+                        "/api/ghl/webhook",
+                        content=_body(bot_type="seller", contact_id="burst-c", body=text),
+                        headers={"Content-Type": "application/json"},
+                    )
+
+                tasks = []
+                for text in ("hi", "I want to sell", "house needs work"):
+                    tasks.append(asyncio.create_task(post(text)))
+                    await asyncio.sleep(0.01)
+                responses = await asyncio.gather(*tasks)
+
+        statuses = [r.json()["status"] for r in responses]
+        assert statuses == ["skipped", "skipped", "processed"]
+        assert responses[0].json()["reason"] == "coalesced"
+        mock_seller.process_seller_message.assert_awaited_once()
+        assert (
+            mock_seller.process_seller_message.call_args.kwargs["message"]
+            == "hi\nI want to sell\nhouse needs work"
+        )
+        mock_ghl.send_message.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_queued_burst_survives_lock_timeout_and_failed_dispatch(self):
+        from bots.lead_bot.routes_webhook import process_queued_webhook
+        from bots.shared.cache_service import MemoryCache
+        from bots.shared.contact_lock import ContactLockManager, lock_key
+        from bots.shared.message_coalescer import MessageCoalescer
+        from bots.shared.webhook_queue import WebhookJob
+
+        cache = MemoryCache()
+        state, mock_seller, _, mock_ghl, _ = _make_state(cache=cache)
+        coalescer = MessageCoalescer(window_ms=1)
+        for text in ("hi", "I want to sell"):
+            position = await coalescer.push(cache, "retry-c", text)
+        job = WebhookJob(
+            contact_id="retry-c", location_id="loc-test", message="I want to sell",
+            bot_type="seller", coalesce_position=position, enqueued_at=0,
+        )
+        mock_seller.process_seller_message.side_effect = [RuntimeError("claude down"), _seller_result()]
+
+        with (
+            patch("bots.lead_bot.routes_webhook._get_state", return_value=state),
+            patch("bots.lead_bot.routes_webhook.message_coalescer", new=coalescer),
+            patch(
+                "bots.lead_bot.routes_webhook.contact_locks",
+                new=ContactLockManager(ttl_seconds=30, max_wait_seconds=0, recheck_interval_ms=1),
+            ),
+        ):
+            await cache.acquire_lock(lock_key("retry-c"), "other-worker", ttl=30)
+            with pytest.raises(RuntimeError, match="processing lock timeout"):
+                await process_queued_webhook(job)
+            await cache.release_lock(lock_key("retry-c"), "other-worker")
+
+            with pytest.raises(RuntimeError, match="claude down"):
+                await process_queued_webhook(job)
+            result = await process_queued_webhook(job)
+
+        assert result["status"] == "processed"
+        messages = [call.kwargs["message"] for call in mock_seller.process_seller_message.call_args_list]
+        assert messages == ["hi\nI want to sell", "hi\nI want to sell"]
+        mock_ghl.send_message.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_redelivered_job_does_not_send_the_reply_twice(self):
+        from bots.lead_bot.routes_webhook import process_queued_webhook
+        from bots.shared.webhook_queue import WebhookJob
+
+        state, mock_seller, _, mock_ghl, _ = _make_state(cache=MockCache())
+        job = WebhookJob(contact_id="redo-c", location_id="loc-test", message="hi", bot_type="seller")
+
+        with patch("bots.lead_bot.routes_webhook._get_state", return_value=state):
+            first = await process_queued_webhook(job)
+            # e.g. the ack failed, or the worker died before acking
+            second = await process_queued_webhook(WebhookJob.from_json(job.to_json()))
+
+        assert first == second
+        mock_seller.process_seller_message.assert_awaited_once()
+        mock_ghl.send_message.assert_awaited_once()